@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+bench_doc_text_index.py — Hyperlink label lookup cost on large, table-heavy docs.
+
+Builds a synthetic Google Docs body (top-level paragraphs plus many tables
+whose cells hold text split across several runs) ending in a sources table
+of the report's link display labels, as in the V2 template, then times
+locating every label:
+
+  per-label — one paragraph walk and join per label (the old
+              find_text_index_in_doc path)
+  indexed   — DocTextIndex built once, all labels found in one
+              multi-pattern pass
+
+Both paths must agree on the first occurrence of every label; the script
+exits non-zero otherwise.
+
+Run:
+    uv run python scripts/bench_doc_text_index.py
+    uv run python scripts/bench_doc_text_index.py --tables 400 --rows 20 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Ensure project src is on path when running as a script
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root / "src"))
+
+from due_diligence_reporter.report_schema import LINK_DISPLAY_LABELS
+from due_diligence_reporter.utils import DocTextIndex
+
+_WORDS = [
+    "capacity", "tuition", "zoning", "permit", "occupancy", "sprinkler", "egress",
+    "classroom", "parking", "lease", "inspection", "estimate", "timeline", "View",
+]
+
+
+class _Builder:
+    def __init__(self, rng: random.Random, labels: list[str]) -> None:
+        self.rng = rng
+        self.labels = labels
+        self.index = 1
+
+    def paragraph(self, text: str = "") -> dict[str, Any]:
+        if not text:
+            words = [self.rng.choice(_WORDS) for _ in range(self.rng.randint(4, 16))]
+            text = " ".join(words) + "\n"
+        # Split into runs the way styled text comes back from the Docs API
+        cuts = sorted(self.rng.sample(range(1, len(text)), min(3, len(text) - 1)))
+        elements = []
+        for a, b in zip([0, *cuts], [*cuts, len(text)], strict=True):
+            elements.append({"startIndex": self.index, "textRun": {"content": text[a:b]}})
+            self.index += b - a
+        return {"paragraph": {"elements": elements}}
+
+    def table(self, rows: int, cols: int) -> dict[str, Any]:
+        return {"table": {"tableRows": [
+            {"tableCells": [{"content": [self.paragraph()]} for _ in range(cols)]}
+            for _ in range(rows)
+        ]}}
+
+    def sources_table(self) -> dict[str, Any]:
+        return {"table": {"tableRows": [
+            {"tableCells": [
+                {"content": [self.paragraph()]},
+                {"content": [self.paragraph(f"{label}\n")]},
+            ]}
+            for label in self.labels
+        ]}}
+
+
+def _document(tables: int, rows: int, cols: int, rng: random.Random) -> dict[str, Any]:
+    builder = _Builder(rng, list(LINK_DISPLAY_LABELS.values()))
+    content: list[dict[str, Any]] = []
+    for _ in range(tables):
+        content.extend(builder.paragraph() for _ in range(3))
+        content.append(builder.table(rows, cols))
+    content.append(builder.sources_table())
+    return {"content": content}
+
+
+def _per_label_find(doc_body: dict[str, Any], search_text: str) -> int | None:
+    """The pre-index lookup: recursive paragraph list, join runs, str.find."""
+
+    def paragraphs(elements: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        for element in elements:
+            if "paragraph" in element:
+                out.append(element["paragraph"])
+            elif "table" in element:
+                for row in element["table"].get("tableRows", []):
+                    for cell in row.get("tableCells", []):
+                        out.extend(paragraphs(cell.get("content", [])))
+        return out
+
+    for paragraph in paragraphs(doc_body.get("content", [])):
+        runs = [
+            (pe.get("startIndex", 0), pe["textRun"].get("content", ""))
+            for pe in paragraph.get("elements", []) if "textRun" in pe
+        ]
+        if not runs:
+            continue
+        offset = "".join(c for _, c in runs).find(search_text)
+        if offset >= 0:
+            return runs[0][0] + offset
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=12)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    doc = _document(args.tables, args.rows, args.cols, rng)
+    labels = list(LINK_DISPLAY_LABELS.values())
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        linear = {label: _per_label_find(doc, label) for label in labels}
+    linear_s = (time.perf_counter() - t0) / args.repeat
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        index = DocTextIndex(doc)
+        spans = index.find_all(set(labels))
+    indexed_s = (time.perf_counter() - t0) / args.repeat
+
+    indexed = {label: spans[label][0][0] if spans[label] else None for label in labels}
+    mismatches = sum(1 for label in labels if linear[label] != indexed[label])
+    occurrences = sum(len(v) for v in spans.values())
+
+    print(
+        f"\nLabel lookup: {len(index.text):,} chars, {args.tables} tables of "
+        f"{args.rows}x{args.cols}, {len(labels)} labels ({occurrences} occurrences)"
+    )
+    print(f"  per-label: {linear_s * 1000:8.1f} ms")
+    print(f"  indexed:   {indexed_s * 1000:8.1f} ms  (all occurrences)")
+    print(f"  speedup:   {linear_s / indexed_s:.1f}x   mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+bench_google_client.py — Tool-call client setup latency: per-call vs shared client.
+
+Every MCP tool used to call ``GoogleClient.from_oauth_config`` on entry, which
+reloads the token file and rebuilds the Drive, Docs and Gmail discovery
+clients.  This benchmark times that path against ``get_shared_google_client``.
+It runs fully offline with a synthetic, non-expired token file.
+
+Run:
+    uv run python scripts/bench_google_client.py
+    uv run python scripts/bench_google_client.py --calls 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+# Ensure project src is on path when running as a script
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root / "src"))
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from due_diligence_reporter.google_client import (
+    get_shared_google_client,
+    reset_shared_google_clients,
+)
+
+SCOPES = [
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/documents",
+    "https://www.googleapis.com/auth/gmail.modify",
+]
+
+
+def _write_token_file(path: Path) -> None:
+    expiry = datetime.now(UTC) + timedelta(hours=1)
+    path.write_text(json.dumps({
+        "token": "bench-access-token",
+        "refresh_token": "bench-refresh-token",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": "bench-client",
+        "client_secret": "bench-secret",
+        "scopes": SCOPES,
+        "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }))
+
+
+def _per_call_client(token_file: Path) -> None:
+    """The pre-pooling tool-call path: load token, build three clients."""
+    creds = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+    build("drive", "v3", credentials=creds)
+    build("docs", "v1", credentials=creds)
+    build("gmail", "v1", credentials=creds)
+
+
+def _shared_client(token_file: Path) -> None:
+    gc = get_shared_google_client("unused.json", str(token_file), 0, SCOPES)
+    gc.drive_service, gc.docs_service, gc.gmail_service  # noqa: B018
+
+
+def _time(fn, token_file: Path, calls: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn(token_file)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"  {label:<28} total={sum(samples):8.1f} ms  "
+        f"p50={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms"
+    )
+
+
+def main(calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        token_file = Path(tmp) / "tokens.json"
+        _write_token_file(token_file)
+
+        reset_shared_google_clients()
+        before = _time(_per_call_client, token_file, calls)
+        after = _time(_shared_client, token_file, calls)
+
+    print(f"\nClient setup cost over {calls} tool calls (one agent run)")
+    _report("per-call client (before)", before)
+    _report("shared client (after)", after)
+    print(f"  speedup: {sum(before) / max(sum(after), 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=25, help="Tool calls per simulated run")
+    args = parser.parse_args()
+    main(args.calls)
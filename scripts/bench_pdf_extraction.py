@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+bench_pdf_extraction.py — PDF text extraction latency on large reports.
+
+Builds a synthetic multi-page PDF (dense text on every page, like a scanned
+SIR with an OCR layer) and times four paths:
+
+  serial      — every page on one core (the old behaviour)
+  parallel    — page ranges split across the process pool
+  budgeted    — stop once read_drive_document's 50k-char budget is reached
+  first-pages — Tier 3 classification's first-3-pages read
+
+Run:
+    uv run python scripts/bench_pdf_extraction.py
+    uv run python scripts/bench_pdf_extraction.py --pages 500 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Ensure project src is on path when running as a script
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root / "src"))
+
+from due_diligence_reporter.classifier import TIER3_MAX_CHARS, TIER3_MAX_PAGES
+from due_diligence_reporter.server import READ_DOCUMENT_MAX_CHARS
+from due_diligence_reporter.utils import PdfText, extract_pdf_text
+
+_LINES_PER_PAGE = 45
+
+
+def build_pdf(pages: int) -> bytes:
+    """Return a PDF with ``pages`` pages of Helvetica text."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for p in range(pages):
+        ops = ["BT /F1 9 Tf 12 TL 40 760 Td"]
+        for line in range(_LINES_PER_PAGE):
+            ops.append(
+                f"(Page {p + 1} line {line + 1}: zoning setback occupancy egress "
+                f"sprinkler parking review item {p * _LINES_PER_PAGE + line}) Tj T*"
+            )
+        ops.append("ET")
+        stream = "\n".join(ops).encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref,
+    )
+    return bytes(out)
+
+
+def _time(fn: Callable[[], PdfText], repeats: int) -> tuple[float, PdfText]:
+    samples = []
+    result = fn()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pdf = build_pdf(args.pages)
+    print(
+        f"Synthetic PDF: {args.pages} pages, {len(pdf) / 1024:.0f} KiB "
+        f"({os.cpu_count()} CPUs; parallel speedup needs more than one)\n"
+    )
+
+    cases: list[tuple[str, Callable[[], PdfText]]] = [
+        ("serial", lambda: extract_pdf_text(pdf, workers=1)),
+        ("parallel", lambda: extract_pdf_text(pdf, workers=args.workers)),
+        (
+            "budgeted",
+            lambda: extract_pdf_text(
+                pdf, max_chars=READ_DOCUMENT_MAX_CHARS + 1, workers=args.workers,
+            ),
+        ),
+        (
+            "first-pages",
+            lambda: extract_pdf_text(
+                pdf, max_chars=TIER3_MAX_CHARS, max_pages=TIER3_MAX_PAGES, workers=1,
+            ),
+        ),
+    ]
+
+    baseline = None
+    print(f"{'path':<12} {'median':>9} {'speedup':>8} {'pages':>11} {'chars':>9}")
+    for name, fn in cases:
+        elapsed, result = _time(fn, args.repeats)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<12} {elapsed * 1000:>7.0f}ms {baseline / elapsed:>7.1f}x "
+            f"{result.pages_read:>5}/{result.page_count:<5} {len(result.text):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+bench_shared_index.py — Shared-folder matching cost as the sweep scales.
+
+Builds synthetic SIR / ISP / Building Inspection folder listings and a set of
+sites with realistic match terms (full title, city, significant title words),
+then times the pass-1 match for every site:
+
+  linear  — every filename scanned with every term for every site (the old path)
+  indexed — SharedFolderIndex built once, then per-site posting-list lookups
+
+Both paths must agree on every match; the script exits non-zero otherwise.
+
+Run:
+    uv run python scripts/bench_shared_index.py
+    uv run python scripts/bench_shared_index.py --files 3000 --sites 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Ensure project src is on path when running as a script
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root / "src"))
+
+from due_diligence_reporter.server import _build_site_match_terms
+from due_diligence_reporter.shared_index import DOC_TYPES, PDF_MIME, SharedFolderCache
+
+_GDOC_MIME = "application/vnd.google-apps.document"
+_SUFFIX = {"sir": "SIR", "isp": "ISP", "building_inspection": "Building Inspection Report"}
+_WORDS = [
+    "Cedar", "Pine", "Oak", "Maple", "River", "Spring", "Fair", "Green", "Rock", "Elm",
+    "Lake", "Hill", "Park", "Bay", "Glen", "Brook", "Ridge", "Mill", "Stone", "Wood",
+]
+
+
+def _sites(n: int, rng: random.Random) -> list[tuple[str, str]]:
+    seen: set[str] = set()
+    sites: list[tuple[str, str]] = []
+    while len(sites) < n:
+        city = rng.choice(_WORDS) + rng.choice(["ville", "field", "dale", "ton", "port", "view"])
+        title = f"Alpha {city}"
+        if rng.random() < 0.3:
+            title += f" {rng.choice(_WORDS)}"
+        if title in seen:
+            continue
+        seen.add(title)
+        sites.append((title, f"{rng.randint(100, 9999)} Main St, {city}, TX 75001"))
+    return sites
+
+
+def _listing(sites: list[tuple[str, str]], n_files: int, rng: random.Random) -> SharedFolderCache:
+    cache = SharedFolderCache()
+    per_type = n_files // len(DOC_TYPES)
+    for doc_type in DOC_TYPES:
+        files: list[dict[str, Any]] = []
+        for i in range(per_type):
+            title = rng.choice(sites)[0]
+            date = f"{rng.choice(['Jan', 'Feb', 'Mar', 'Apr'])} {rng.randint(1, 28):02d} 2026"
+            name = f"{date} - {title} {_SUFFIX[doc_type]}"
+            pdf = rng.random() < 0.7
+            files.append({
+                "id": f"{doc_type}-{i}",
+                "name": f"{name}.pdf" if pdf else name,
+                "mimeType": PDF_MIME if pdf else _GDOC_MIME,
+            })
+        cache[doc_type] = files
+    return cache
+
+
+def _linear_match(
+    match_terms: list[str], shared_cache: dict[str, list[dict[str, Any]]],
+) -> dict[str, dict[str, Any] | None]:
+    """The pre-index pass 1: substring scan with PDF preference."""
+    needles = [t.lower() for t in match_terms if t]
+    result: dict[str, dict[str, Any] | None] = dict.fromkeys(DOC_TYPES)
+    for doc_type, files in shared_cache.items():
+        matches = [f for f in files if any(n in f.get("name", "").lower() for n in needles)]
+        if matches:
+            pdfs = [f for f in matches if f.get("mimeType") == PDF_MIME]
+            result[doc_type] = {**(pdfs[0] if pdfs else matches[0]), "doc_type": doc_type}
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=1500, help="Total shared files")
+    parser.add_argument("--sites", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sites = _sites(args.sites, rng)
+    # Sites with docs, plus the same number with none (the common miss path)
+    listed = sites[: max(1, args.sites // 2)]
+    cache = _listing(listed, args.files, rng)
+    terms = [_build_site_match_terms(title, address) for title, address in sites]
+
+    t0 = time.perf_counter()
+    linear = [_linear_match(t, cache) for t in terms]
+    linear_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = cache.index
+    build_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    indexed = [index.match(t) for t in terms]
+    lookup_s = time.perf_counter() - t0
+
+    mismatches = sum(
+        1 for a, b in zip(linear, indexed, strict=True)
+        if {k: v and v["id"] for k, v in a.items()} != {k: v and v["id"] for k, v in b.items()}
+    )
+
+    print(f"\nShared-folder pass-1 matching: {args.files} files, {args.sites} sites")
+    print(f"  linear:  {linear_s * 1000:8.1f} ms total  {linear_s / args.sites * 1e6:8.1f} µs/site")
+    print(
+        f"  indexed: {(build_s + lookup_s) * 1000:8.1f} ms total  "
+        f"{lookup_s / args.sites * 1e6:8.1f} µs/site  (build {build_s * 1000:.1f} ms)"
+    )
+    print(f"  speedup: {linear_s / (build_s + lookup_s):.1f}x   mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+bench_site_matching.py — LLM call rate and latency for Site Record matching.
+
+Builds a synthetic corpus of Site Records and a mixed query set (exact
+titles, lower-case/punctuation variants, typos, bare cities, addresses,
+abbreviations).  Compares the old path (every query → LLM with the full
+candidate list) against local ranking with LLM escalation only for
+ambiguous queries.  The LLM is simulated with a fixed per-call latency plus
+a per-candidate prompt cost, so the benchmark runs offline.
+
+Run:
+    uv run python scripts/bench_site_matching.py
+    uv run python scripts/bench_site_matching.py --sites 600 --llm-ms 900
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure project src is on path when running as a script
+_project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(_project_root / "src"))
+
+from due_diligence_reporter.site_matcher import rank_site_candidates
+
+_CITIES = [
+    "Keller", "Southlake", "Boca Raton", "Austin", "Plano", "Frisco", "Miami",
+    "Tampa", "Orlando", "Naples", "Scottsdale", "Phoenix", "Mesa", "Denver",
+    "Boulder", "Nashville", "Franklin", "Atlanta", "Charlotte", "Raleigh",
+    "Durham", "Houston", "Katy", "Sugar Land", "Dallas", "Irving", "Fort Worth",
+    "San Antonio", "Boerne", "Lake Forest", "Palo Alto", "San Jose", "Irvine",
+]
+_CITIES += [
+    f"{a}{b}"
+    for a in ["Cedar", "Pine", "Oak", "Maple", "River", "Spring", "Fair", "Green", "Rock", "Elm"]
+    for b in ["ville", "wood", "field", "dale", "ton", "port", "ridge", "view"]
+]
+_STATES = ["TX", "FL", "AZ", "CO", "TN", "GA", "NC", "CA", "IL"]
+_SUFFIXES = ["", " North", " South", " Downtown", " West", " Lakeside", " Hills"]
+
+
+def _corpus(n: int, rng: random.Random) -> list[dict[str, str]]:
+    seen: set[str] = set()
+    sites: list[dict[str, str]] = []
+    while len(sites) < n:
+        city = rng.choice(_CITIES)
+        suffix = rng.choice(_SUFFIXES) if rng.random() < 0.2 else ""
+        title = f"Alpha {city}{suffix}"
+        if title in seen:
+            title = f"{title} {len(sites)}"
+        seen.add(title)
+        address = (
+            f"{rng.randint(100, 9999)} {rng.choice(['Main', 'Oak', 'Elm', 'Park'])} St, "
+            f"{city}, {rng.choice(_STATES)} {rng.randint(10000, 99999)}"
+        )
+        sites.append({"id": f"ID{len(sites):05d}", "title": title, "address": address})
+    return sites
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1:]
+
+
+def _queries(sites: list[dict[str, str]], n: int, rng: random.Random) -> list[str]:
+    makers = [
+        lambda s: s["title"],
+        lambda s: s["title"].lower().replace(" ", "  ") + ",",
+        lambda s: s["title"].removeprefix("Alpha "),
+        lambda s: _typo(s["title"], rng),
+        lambda s: s["address"],
+        lambda s: s["address"].split(",")[1].strip(),
+        lambda s: "".join(w[0] for w in s["title"].split()).upper(),
+    ]
+    return [rng.choice(makers)(rng.choice(sites)) for _ in range(n)]
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def main(n_sites: int, n_queries: int, llm_ms: float, per_candidate_ms: float, seed: int) -> None:
+    rng = random.Random(seed)
+    sites = _corpus(n_sites, rng)
+    queries = _queries(sites, n_queries, rng)
+
+    def llm_cost(n_candidates: int) -> float:
+        return llm_ms + per_candidate_ms * n_candidates
+
+    before = [llm_cost(len(sites)) for _ in queries]
+
+    after: list[float] = []
+    llm_calls = local_hits = no_match = 0
+    for query in queries:
+        t0 = time.perf_counter()
+        result = rank_site_candidates(query, sites)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if result.match is not None:
+            local_hits += 1
+        elif result.ambiguous:
+            llm_calls += 1
+            elapsed += llm_cost(len(result.shortlist))
+        else:
+            no_match += 1
+        after.append(elapsed)
+
+    b50, b95 = _percentiles(before)
+    a50, a95 = _percentiles(after)
+    print(f"\nSite matching over {n_queries} queries, {n_sites} site records")
+    print(f"  simulated LLM: {llm_ms:.0f} ms/call + {per_candidate_ms:.2f} ms/candidate")
+    print(f"  before: LLM call rate 100.0%   p50={b50:8.1f} ms  p95={b95:8.1f} ms")
+    print(
+        f"  after:  LLM call rate {100 * llm_calls / n_queries:5.1f}%   "
+        f"p50={a50:8.1f} ms  p95={a95:8.1f} ms"
+    )
+    print(f"  local matches={local_hits}  escalated={llm_calls}  no-match={no_match}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, default=300, help="Site Records in the corpus")
+    parser.add_argument("--queries", type=int, default=500, help="Queries to run")
+    parser.add_argument("--llm-ms", type=float, default=700.0, help="Simulated LLM latency per call")
+    parser.add_argument(
+        "--per-candidate-ms", type=float, default=1.5,
+        help="Simulated prompt cost per candidate sent to the LLM",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.sites, args.queries, args.llm_ms, args.per_candidate_ms, args.seed)
@@ -11,6 +11,13 @@ SIR + ISP documents, and:
 
 Run:
     uv run python scripts/daily_dd_check.py
+    uv run python scripts/daily_dd_check.py --workers 6 --site-timeout 1200
+
+Sites run in parallel when --workers (or SWEEP_WORKERS) is above 1.  Wrike,
+Google and Anthropic calls share process-wide rate limits
+(RATE_LIMIT_*_PER_MINUTE).  With --site-timeout (or SWEEP_SITE_TIMEOUT_SECONDS)
+a site that overruns is reported as timed out, and the script exits once every
+result is posted instead of waiting for the stuck site.
 
 Environment (from .env):
     WRIKE_ACCESS_TOKEN, GOOGLE_CLIENT_CONFIG, GOOGLE_TOKEN_FILE,
@@ -22,6 +29,7 @@ Environment (from .env):
 from __future__ import annotations
 
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -37,9 +45,10 @@ from due_diligence_reporter.config import get_settings
 from due_diligence_reporter.google_client import GoogleClient
 from due_diligence_reporter.report_pipeline import (
     PipelineResult,
+    SiteJob,
     list_shared_folders_once,
     post_pipeline_result,
-    process_site_pipeline,
+    run_site_sweep,
 )
 from due_diligence_reporter.server import _build_site_match_terms
 from due_diligence_reporter.wrike import (
@@ -64,8 +73,15 @@ logger = logging.getLogger("daily_dd_check")
 # Main loop
 # ─────────────────────────────────────────────────────────────────────────────
 
-def main(site_filter: str | None = None) -> None:
+def main(
+    site_filter: str | None = None,
+    workers: int | None = None,
+    site_timeout: float | None = None,
+) -> bool:
+    """Run the sweep; returns True if a timed-out site was left running."""
     settings = get_settings()
+    workers = workers if workers is not None else settings.sweep_workers
+    site_timeout = site_timeout if site_timeout is not None else settings.sweep_site_timeout_seconds
     wrike_cfg = load_wrike_config()
 
     # Load the agent system prompt
@@ -97,8 +113,8 @@ def main(site_filter: str | None = None) -> None:
         len(shared_cache.get("building_inspection", [])),
     )
 
-    results: list[PipelineResult] = []
     skipped = len(all_records) - len(active_records)
+    jobs: list[SiteJob] = []
 
     for record in active_records:
         site_title = record.get("title", "Unknown")
@@ -115,20 +131,30 @@ def main(site_filter: str | None = None) -> None:
         address = extract_address_from_record(record)
         match_terms = _build_site_match_terms(site_title, address)
         p1_email = extract_p1_email_from_record(record)
-        logger.info("Checking site: %s (match terms: %s, p1: %s)", site_title, match_terms, p1_email)
-
-        result = process_site_pipeline(
-            gc, site_title, drive_folder_url, match_terms,
-            shared_cache, system_prompt, settings,
-            p1_email=p1_email, site_address=address,
-        )
-        results.append(result)
-
-        # Post each result to Google Chat
+        logger.info("Queued site: %s (match terms: %s, p1: %s)", site_title, match_terms, p1_email)
+        jobs.append(SiteJob(
+            site_title=site_title,
+            drive_folder_url=drive_folder_url,
+            match_terms=match_terms,
+            p1_email=p1_email,
+            site_address=address,
+        ))
+
+    def _post(job: SiteJob, result: PipelineResult) -> None:
+        # Post each result to Google Chat as soon as the site finishes
         post_pipeline_result(
-            settings.google_chat_webhook_url, result, drive_folder_url,
+            settings.google_chat_webhook_url, result, job.drive_folder_url,
         )
 
+    if site_timeout:
+        logger.info("Running %d sites with %d worker(s), %.0fs per-site timeout", len(jobs), workers, site_timeout)
+    else:
+        logger.info("Running %d sites with %d worker(s), no per-site timeout", len(jobs), workers)
+    results: list[PipelineResult] = run_site_sweep(
+        gc, jobs, shared_cache, system_prompt, settings,
+        workers=workers, site_timeout=site_timeout, on_result=_post,
+    )
+
     # Summary — use ASCII-safe markers to avoid encoding errors on Windows
     print("\n" + "=" * 60)
     print(f"Daily DD Check -- {len(results)} sites processed, {skipped} skipped (inactive or wrong stage)")
@@ -144,9 +170,12 @@ def main(site_filter: str | None = None) -> None:
             print(f"  [!!] {r.site_title} -- report incomplete ({len(r.unresolved_tokens)} unfilled tokens)")
         elif r.status == "generation_failed":
             print(f"  [XX] {r.site_title} -- generation failed: {r.error}")
+        elif r.status == "error":
+            print(f"  [XX] {r.site_title} -- error: {r.error}")
         else:
             print(f"  [??] {r.site_title} -- {r.status}")
     print("=" * 60)
+    return any(r.abandoned for r in results)
 
 
 if __name__ == "__main__":
@@ -154,5 +183,11 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Daily DD readiness check and report generation")
     parser.add_argument("--site", type=str, default=None, help="Run for a single site (substring match on title)")
+    parser.add_argument("--workers", type=int, default=None, help="Sites to process in parallel (default: SWEEP_WORKERS or 1)")
+    parser.add_argument("--site-timeout", type=float, default=None, help="Per-site time budget in seconds (default: SWEEP_SITE_TIMEOUT_SECONDS, 0 = no limit)")
     args = parser.parse_args()
-    main(site_filter=args.site)
+    if main(site_filter=args.site, workers=args.workers, site_timeout=args.site_timeout):
+        # Results are posted; don't let interpreter exit join the stuck site's threads
+        sys.stdout.flush()
+        logging.shutdown()
+        os._exit(0)
@@ -13,6 +13,11 @@ Run:
     uv run python scripts/scan_inbox.py
     uv run python scripts/scan_inbox.py --dry-run
     uv run python scripts/scan_inbox.py --scan-only
+    uv run python scripts/scan_inbox.py --full-scan
+
+Runs are incremental: only emails that arrived since the Gmail historyId saved
+by the previous run (INBOX_HISTORY_FILE) are examined.  --full-scan ignores
+the saved position and searches the whole inbox.
 
 Environment (from .env):
     WRIKE_ACCESS_TOKEN, GOOGLE_CLIENT_CONFIG, GOOGLE_TOKEN_FILE,
@@ -104,7 +109,7 @@ def _find_record_by_title_or_id(
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def main(dry_run: bool = False, scan_only: bool = False) -> None:
+def main(dry_run: bool = False, scan_only: bool = False, full_scan: bool = False) -> None:
     settings = get_settings()
 
     # Init Google client
@@ -124,7 +129,7 @@ def main(dry_run: bool = False, scan_only: bool = False) -> None:
     logger.info("Found %d site records (%d active)", len(all_records), len(site_records))
 
     # ── Phase 1: Inbox scan ──────────────────────────────────────────────────
-    results = scan_inbox(gc, site_records, settings, dry_run=dry_run)
+    results = scan_inbox(gc, site_records, settings, dry_run=dry_run, full_scan=full_scan)
 
     # Build summary
     summary = build_scan_summary(results)
@@ -252,5 +257,10 @@ if __name__ == "__main__":
         action="store_true",
         help="Run inbox scan only, skip readiness check and report pipeline",
     )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Ignore the saved Gmail history position and search the whole inbox",
+    )
     args = parser.parse_args()
-    main(dry_run=args.dry_run, scan_only=args.scan_only)
+    main(dry_run=args.dry_run, scan_only=args.scan_only, full_scan=args.full_scan)
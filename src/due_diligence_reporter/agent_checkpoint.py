@@ -0,0 +1,261 @@
+"""Resumable checkpoints of report agent runs.
+
+A report agent run is a sequence of model turns, each followed by the tool
+calls it asked for.  When the job running it dies or times out, those turns
+are lost and the next run starts over.  Instead, every completed turn is
+appended to a JSONL file (one per site) together with its tool results,
+trace events and token usage; a rerun with the same inputs replays the file
+and continues from the last completed turn.
+
+Tools with side effects (creating the report, sending mail) must not run
+twice.  Before a turn starts any of them, the turn's assistant message is
+recorded as pending, and each side-effecting result is appended the moment
+it finishes.  A rerun completes a pending turn from those results instead of
+asking the model again, running only the calls that never finished.
+
+A checkpoint is keyed by site and by a fingerprint of the run's inputs (system
+prompt, model, tool definitions, matched documents and their versions), so a
+changed input starts a fresh conversation.  The file is removed once the run
+ends with a report or without one; only interrupted runs leave it behind.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+
+logger = logging.getLogger("[agent_checkpoint]")
+
+_SUFFIX = ".jsonl"
+
+_STATE_VERSION = 1
+
+# Checkpoints of runs nobody resumed are dropped after this long
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+def input_fingerprint(*parts: Any) -> str:
+    """Stable hash of a run's inputs (any JSON-serializable values)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentCheckpoint:
+    """The completed turns of one site's agent run, appended as they finish.
+
+    The first line holds the run's opening message, pre-fetched tool calls
+    and pre-run trace events;
+    each further line is one turn (the assistant message, its tool results,
+    trace events and token usage).  After the last turn there may be a
+    ``pending`` line (a turn whose tools were running) followed by ``effect``
+    lines (its side-effecting results so far).  A torn last line from a
+    killed process is discarded on load.
+    """
+
+    def __init__(self, path: Path, site_title: str, fingerprint: str) -> None:
+        self.path = path
+        self.site_title = site_title
+        self.fingerprint = fingerprint
+        self.header: dict[str, Any] | None = None
+        self.turns: list[dict[str, Any]] = []
+        self.pending: dict[str, Any] | None = None
+        self.effects: dict[str, dict[str, Any]] = {}  # tool_use ID -> outcome
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def resumable(self) -> bool:
+        """True if a previous run left turns to continue from."""
+        return self.header is not None and (bool(self.turns) or self.pending is not None)
+
+    def start(
+        self,
+        opening: str,
+        events: list[dict[str, Any]],
+        prefetched: list[list[Any]] | None = None,
+    ) -> None:
+        """Begin a new run, replacing anything recorded before.
+
+        ``prefetched`` holds the pre-fetch tool calls handed to the agent
+        before its first turn, as ``[tool_use_id, tool_name, input, result]``.
+        """
+        self.header = {
+            "version": _STATE_VERSION,
+            "site_title": self.site_title,
+            "fingerprint": self.fingerprint,
+            "opening": opening,
+            "events": events,
+            "prefetched": prefetched or [],
+        }
+        self.turns = []
+        self.pending = None
+        self.effects = {}
+        self._rewrite()
+
+    def record_turn(self, turn: dict[str, Any]) -> None:
+        """Durably append one completed turn."""
+        with self._lock:
+            self.turns.append(turn)
+            self.pending = None
+            self.effects = {}
+            self._append(turn)
+
+    def record_pending(self, turn: dict[str, Any]) -> None:
+        """Durably note a turn whose side-effecting tools are about to start."""
+        with self._lock:
+            self.pending = turn
+            self.effects = {}
+            self._append({"pending": turn})
+
+    def record_effect(self, tool_use_id: str, outcome: dict[str, Any]) -> None:
+        """Durably append the result of a side-effecting call of the pending turn."""
+        with self._lock:
+            self.effects[tool_use_id] = outcome
+            self._append({"effect": {"tool_use_id": tool_use_id, "outcome": outcome}})
+
+    def clear(self) -> None:
+        """Remove the checkpoint (the run is over)."""
+        with self._lock:
+            self.header = None
+            self.turns = []
+            self.pending = None
+            self.effects = {}
+            try:
+                self.path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Could not remove agent checkpoint %s: %s", self.path, e)
+
+    def _load(self) -> None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        records: list[dict[str, Any]] = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break  # torn write; everything after it is unusable
+        if not records or records[0].get("version") != _STATE_VERSION \
+                or records[0].get("fingerprint") != self.fingerprint:
+            return
+        self.header = records[0]
+        for record in records[1:]:
+            if "pending" in record:
+                self.pending = record["pending"]
+                self.effects = {}
+            elif "effect" in record:
+                if self.pending is not None:
+                    effect = record["effect"]
+                    self.effects[effect["tool_use_id"]] = effect["outcome"]
+            else:
+                self.turns.append(record)
+                self.pending = None
+                self.effects = {}
+        if len(records) < len(lines):
+            self._rewrite()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        try:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, default=str) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+        except OSError as e:
+            logger.warning("Could not write agent checkpoint %s: %s", self.path, e)
+
+    def _rewrite(self) -> None:
+        """Atomically write the header, every recorded turn and any pending turn."""
+        with self._lock:
+            records: list[Any] = [self.header, *self.turns]
+            if self.pending is not None:
+                records.append({"pending": self.pending})
+                records.extend(
+                    {"effect": {"tool_use_id": tool_use_id, "outcome": outcome}}
+                    for tool_use_id, outcome in self.effects.items()
+                )
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    for record in records:
+                        fh.write(json.dumps(record, default=str) + "\n")
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logger.warning("Could not write agent checkpoint %s: %s", self.path, e)
+
+
+class AgentCheckpointStore:
+    """Directory of agent checkpoints, one file per site."""
+
+    def __init__(self, root: str = "") -> None:
+        self.root = Path(root) if root else None
+        self._lock = threading.Lock()
+        self._pruned = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def _path(self, site_title: str) -> Path:
+        assert self.root is not None
+        digest = hashlib.sha256(site_title.encode("utf-8")).hexdigest()[:32]
+        return self.root / f"{digest}{_SUFFIX}"
+
+    def open(self, site_title: str, fingerprint: str) -> AgentCheckpoint | None:
+        """The site's checkpoint for these inputs (``None`` when disabled).
+
+        A checkpoint left by a run with different inputs is not resumed; it
+        is replaced when the new run starts.
+        """
+        if self.root is None:
+            return None
+        with self._lock:
+            if not self._pruned:
+                self._prune()
+                self._pruned = True
+        checkpoint = AgentCheckpoint(self._path(site_title), site_title, fingerprint)
+        if checkpoint.resumable:
+            logger.info(
+                "Resuming agent run for '%s' after %d completed turns%s",
+                site_title, len(checkpoint.turns),
+                " (finishing an interrupted one)" if checkpoint.pending is not None else "",
+            )
+        return checkpoint
+
+    def _prune(self) -> None:
+        """Drop checkpoints older than :data:`CHECKPOINT_MAX_AGE_SECONDS`."""
+        assert self.root is not None
+        cutoff = time.time() - CHECKPOINT_MAX_AGE_SECONDS
+        try:
+            paths = list(self.root.glob(f"*{_SUFFIX}"))
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+
+_store: AgentCheckpointStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_agent_checkpoint_store() -> AgentCheckpointStore:
+    """Return the process-wide checkpoint store configured from settings."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AgentCheckpointStore(get_settings().agent_checkpoint_dir)
+        return _store
@@ -5,19 +5,30 @@ Tier 2: LLM filename classification via GPT-4o-mini (cheap, ~200ms)
 Tier 3: LLM content classification on first-page PDF text (moderate, ~2s)
 
 All LLM functions degrade gracefully — if OpenAI is unavailable the system
-falls back to regex-only behaviour.
+falls back to regex-only behaviour.  Their verdicts, negative ones included,
+are kept in the persistent verdict cache, so an unchanged question is never
+sent twice.
 """
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
+from .rate_limit import call_with_retries
+from .verdict_cache import VerdictCache, get_verdict_cache, text_digest
+
 logger = logging.getLogger("[classifier]")
 
+# Model for every LLM tier (part of each verdict cache key)
+CLASSIFIER_MODEL = "gpt-4o-mini"
+
 # Valid doc types returned by the classifier
 DOC_TYPES = frozenset({
     "sir",
@@ -86,26 +97,35 @@ def classify_by_filename_llm(
         logger.debug("OPENAI_API_KEY not set — skipping Tier 2 classification")
         return "unknown", 0.0
 
+    cache = get_verdict_cache()
+    key = VerdictCache.key(
+        "filename", CLASSIFIER_MODEL, _FILENAME_SYSTEM_PROMPT, filename, site_name,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1]
+
     try:
         from openai import OpenAI
 
-        client = OpenAI(api_key=openai_api_key)
+        client = OpenAI(api_key=openai_api_key, max_retries=0)
 
         user_msg = f"Filename: {filename}"
         if site_name:
             user_msg += f"\nSite name: {site_name}"
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = call_with_retries("openai", lambda: client.chat.completions.create(
+            model=CLASSIFIER_MODEL,
             messages=[
                 {"role": "system", "content": _FILENAME_SYSTEM_PROMPT},
                 {"role": "user", "content": user_msg},
             ],
             response_format={"type": "json_object"},
-        )
+        ))
 
         text = response.choices[0].message.content
         if not text:
+            cache.put(key, ["unknown", 0.0])
             return "unknown", 0.0
 
         result = json.loads(text)
@@ -115,6 +135,7 @@ def classify_by_filename_llm(
         if doc_type not in DOC_TYPES:
             doc_type = "unknown"
 
+        cache.put(key, [doc_type, confidence])
         logger.info(
             "Tier 2 classified '%s' as %s (%.2f): %s",
             filename, doc_type, confidence, result.get("reasoning", ""),
@@ -148,6 +169,15 @@ Return ONLY a JSON object:
 """
 
 
+# Tier 3 only reads the opening of a PDF
+TIER3_MAX_PAGES = 3
+TIER3_MAX_CHARS = 3000
+
+# Confidence at which a tier's verdict is accepted
+TIER2_MIN_CONFIDENCE = 0.7
+TIER3_MIN_CONFIDENCE = 0.5
+
+
 def classify_by_content_llm(
     first_page_text: str, filename: str
 ) -> tuple[str, float]:
@@ -156,22 +186,32 @@ def classify_by_content_llm(
     if not openai_api_key:
         return "unknown", 0.0
 
+    page_text = first_page_text[:TIER3_MAX_CHARS]
+    cache = get_verdict_cache()
+    key = VerdictCache.key(
+        "content", CLASSIFIER_MODEL, _CONTENT_SYSTEM_PROMPT, filename, text_digest(page_text),
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1]
+
     try:
         from openai import OpenAI
 
-        client = OpenAI(api_key=openai_api_key)
+        client = OpenAI(api_key=openai_api_key, max_retries=0)
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = call_with_retries("openai", lambda: client.chat.completions.create(
+            model=CLASSIFIER_MODEL,
             messages=[
                 {"role": "system", "content": _CONTENT_SYSTEM_PROMPT},
-                {"role": "user", "content": f"Filename: {filename}\n\nFirst page text:\n{first_page_text[:3000]}"},
+                {"role": "user", "content": f"Filename: {filename}\n\nFirst page text:\n{page_text}"},
             ],
             response_format={"type": "json_object"},
-        )
+        ))
 
         text = response.choices[0].message.content
         if not text:
+            cache.put(key, ["unknown", 0.0])
             return "unknown", 0.0
 
         result = json.loads(text)
@@ -181,6 +221,7 @@ def classify_by_content_llm(
         if doc_type not in DOC_TYPES:
             doc_type = "unknown"
 
+        cache.put(key, [doc_type, confidence])
         logger.info(
             "Tier 3 classified '%s' as %s (%.2f): %s",
             filename, doc_type, confidence, result.get("reasoning", ""),
@@ -192,6 +233,38 @@ def classify_by_content_llm(
         return "unknown", 0.0
 
 
+def _classify_pdf_content(
+    filename: str, file_id: str, gc: Any, file_version: str | None,
+) -> tuple[str, float]:
+    """Tier 3 for one PDF: read its first pages (via the text cache) and classify."""
+    try:
+        from .text_cache import get_text_cache
+        from .utils import extract_text_from_pdf_bytes
+
+        def _first_pages() -> str:
+            with gc.download_file(file_id) as fh:
+                return extract_text_from_pdf_bytes(
+                    fh, max_pages=TIER3_MAX_PAGES, max_chars=TIER3_MAX_CHARS, strict=True,
+                )
+
+        cache = get_text_cache()
+        # Reuse the full text if the document was already read; otherwise
+        # extract only the first pages, which is all Tier 3 looks at
+        text = (cache.get(file_id, file_version) if file_version else None) or (
+            cache.get_or_extract(
+                file_id,
+                file_version,
+                _first_pages,
+                variant="first_pages",
+            )
+        )
+        if text.strip():
+            return classify_by_content_llm(text[:TIER3_MAX_CHARS], filename)
+    except Exception as e:
+        logger.warning("Tier 3 PDF extraction failed for '%s': %s", filename, e)
+    return "unknown", 0.0
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Orchestrator — runs tiers in order
 # ─────────────────────────────────────────────────────────────────────────────
@@ -203,10 +276,13 @@ def classify_document(
     file_id: str | None = None,
     gc: Any | None = None,
     site_name: str | None = None,
+    file_version: str | None = None,
 ) -> tuple[str, float]:
     """Classify a document using the three-tier strategy.
 
     Tier 1 (regex) → Tier 2 (LLM filename) → Tier 3 (LLM content, PDF only).
+    Tier 3 reads PDF text through the shared text cache when ``file_version``
+    (md5Checksum or modifiedTime from the Drive listing) is given.
     Returns (doc_type, confidence).
     """
     # Tier 1: regex
@@ -216,24 +292,228 @@ def classify_document(
 
     # Tier 2: LLM on filename
     doc_type, conf = classify_by_filename_llm(filename, site_name)
-    if conf >= 0.7:
+    if conf >= TIER2_MIN_CONFIDENCE:
         return doc_type, conf
 
     # Tier 3: LLM on content (PDF only, requires gc + file_id)
     if file_id and gc and filename.lower().endswith(".pdf"):
+        doc_type, conf = _classify_pdf_content(filename, file_id, gc, file_version)
+        if conf >= TIER3_MIN_CONFIDENCE:
+            return doc_type, conf
+
+    return "unknown", 0.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Batch orchestrator — every unknown file of a site at once
+# ─────────────────────────────────────────────────────────────────────────────
+
+_BATCH_FILENAME_SYSTEM_PROMPT = """\
+You classify documents for an Alpha School due diligence workflow.
+Given a list of filenames from one site's folder (and optionally the site name for context),
+determine the document type of each file.
+
+Types:
+- sir: Site Investigation Report (also called Site Inspection Report)
+- isp: Internet Service Provider report / availability report
+- building_inspection: Building Inspection Report or property condition report
+- phase_i_esa: Phase I Environmental Site Assessment
+- dd_report: Due Diligence Report (the final compiled report)
+- matterport: Matterport 3D scan or virtual tour
+- unknown: Cannot determine from filename
+
+Return ONLY a JSON object with one entry per filename, copied exactly:
+{"files": [{"filename": "...", "doc_type": "<type>", "confidence": 0.0-1.0}]}
+"""
+
+# Filenames per Tier 2 batch request
+TIER2_BATCH_SIZE = 50
+
+# PDFs read and classified concurrently by Tier 3
+TIER3_WORKERS = 4
+
+
+def classify_filenames_llm(
+    filenames: list[str], site_name: str | None = None,
+) -> dict[str, tuple[str, float]]:
+    """Tier 2 for many filenames in one request per :data:`TIER2_BATCH_SIZE`.
+
+    Returns ``{filename: (doc_type, confidence)}``; filenames the model could
+    not be asked about (no API key, failed call) are left out.  A filename
+    the model skipped in its reply is asked about on its own.
+    """
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key or not filenames:
+        return {}
+
+    cache = get_verdict_cache()
+    keys = {
+        fn: VerdictCache.key(
+            "filename_batch", CLASSIFIER_MODEL, _BATCH_FILENAME_SYSTEM_PROMPT, fn, site_name,
+        )
+        for fn in dict.fromkeys(filenames)
+    }
+    verdicts: dict[str, tuple[str, float]] = {}
+    to_ask: list[str] = []
+    omitted: list[str] = []
+    for fn, key in keys.items():
+        cached = cache.get(key)
+        if cached is not None:
+            verdicts[fn] = (cached[0], cached[1])
+        else:
+            to_ask.append(fn)
+
+    for i in range(0, len(to_ask), TIER2_BATCH_SIZE):
+        chunk = to_ask[i:i + TIER2_BATCH_SIZE]
         try:
-            from .utils import extract_text_from_pdf_bytes
-
-            pdf_bytes = gc.download_file_bytes(file_id)
-            text = extract_text_from_pdf_bytes(pdf_bytes)
-            if text.strip():
-                doc_type, conf = classify_by_content_llm(text[:3000], filename)
-                if conf >= 0.5:
-                    return doc_type, conf
+            from openai import OpenAI
+
+            client = OpenAI(api_key=openai_api_key, max_retries=0)
+
+            user_msg = f"Site name: {site_name}\n" if site_name else ""
+            user_msg += "\nFilenames:\n" + "".join(f"- {fn}\n" for fn in chunk)
+
+            response = call_with_retries("openai", functools.partial(
+                client.chat.completions.create,
+                model=CLASSIFIER_MODEL,
+                messages=[
+                    {"role": "system", "content": _BATCH_FILENAME_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_msg},
+                ],
+                response_format={"type": "json_object"},
+            ))
+
+            text = response.choices[0].message.content
+            result = json.loads(text) if text else {}
+            answered: dict[str, tuple[str, float]] = {}
+            for entry in result.get("files", []):
+                fn = entry.get("filename", "")
+                if fn not in keys:
+                    continue
+                doc_type = entry.get("doc_type", "unknown")
+                if doc_type not in DOC_TYPES:
+                    doc_type = "unknown"
+                answered[fn] = (doc_type, float(entry.get("confidence", 0.0)))
+            # Only verdicts the model actually gave are cached
+            for fn in chunk:
+                if fn in answered:
+                    verdicts[fn] = answered[fn]
+                    cache.put(keys[fn], list(answered[fn]))
+                else:
+                    omitted.append(fn)
+            logger.info(
+                "Tier 2 batch classified %d/%d filenames for '%s': %d recognized",
+                len(answered), len(chunk), site_name or "",
+                sum(1 for v in answered.values() if v[0] != "unknown"),
+            )
         except Exception as e:
-            logger.warning("Tier 3 PDF extraction failed for '%s': %s", filename, e)
+            logger.warning("Tier 2 batch LLM classification failed (%d files): %s", len(chunk), e)
 
-    return "unknown", 0.0
+    if omitted:
+        logger.info("Tier 2 batch reply skipped %d filenames; asking one by one", len(omitted))
+    for fn in omitted:
+        verdicts[fn] = classify_by_filename_llm(fn, site_name)
+
+    return verdicts
+
+
+@dataclass
+class FileVerdict:
+    """One file's classification within a batch."""
+
+    file: dict[str, Any] = field(repr=False)
+    doc_type: str = "unknown"
+    confidence: float = 0.0
+    tier: str = "unclassified"  # "keywords" | "filename" | "content" | "unclassified"
+
+    @property
+    def name(self) -> str:
+        return self.file.get("name", "")
+
+
+@dataclass
+class BatchClassification:
+    """Verdicts for a batch of files and the wanted doc types they filled."""
+
+    verdicts: list[FileVerdict]
+    resolved: dict[str, FileVerdict] = field(default_factory=dict)
+    content_reads: int = 0  # Tier 3 results awaited
+
+
+def classify_documents_batch(
+    files: list[dict[str, Any]],
+    wanted: list[str],
+    *,
+    gc: Any | None = None,
+    site_name: str | None = None,
+) -> BatchClassification:
+    """Classify a site's unknown files, stopping once every ``wanted`` type is found.
+
+    Tier 1 runs on every file; Tier 2 sends all remaining filenames in one
+    request; Tier 3 reads only the PDFs still unresolved, concurrently, and
+    is skipped entirely once the wanted types are filled.  ``files`` are
+    Drive listing entries (``id``, ``name``, ``md5Checksum`` /
+    ``modifiedTime``); a wanted type is filled by the first file, in listing
+    order, classified as it.
+    """
+    from .text_cache import file_version
+
+    verdicts = [FileVerdict(file=f) for f in files]
+    batch = BatchClassification(verdicts)
+    remaining = list(wanted)
+
+    def settle(candidates: list[FileVerdict]) -> None:
+        for v in candidates:
+            if v.doc_type in remaining:
+                batch.resolved[v.doc_type] = v
+                remaining.remove(v.doc_type)
+
+    # Tier 1: regex
+    for v in verdicts:
+        doc_type, conf = classify_by_keywords(v.name)
+        if doc_type != "unknown":
+            v.doc_type, v.confidence, v.tier = doc_type, conf, "keywords"
+    settle(verdicts)
+    if not remaining:
+        return batch
+
+    # Tier 2: one LLM request for every filename still unknown
+    pending = [v for v in verdicts if v.tier == "unclassified"]
+    by_name = classify_filenames_llm([v.name for v in pending], site_name)
+    for v in pending:
+        doc_type, conf = by_name.get(v.name, ("unknown", 0.0))
+        if conf >= TIER2_MIN_CONFIDENCE:
+            v.doc_type, v.confidence, v.tier = doc_type, conf, "filename"
+    settle(verdicts)
+    if not remaining or gc is None:
+        return batch
+
+    # Tier 3: first-page content of the unresolved PDFs, read concurrently;
+    # results are taken in listing order so the first match still wins
+    pdfs = [
+        v for v in verdicts
+        if v.tier == "unclassified" and v.file.get("id") and v.name.lower().endswith(".pdf")
+    ]
+    if not pdfs:
+        return batch
+    pool = ThreadPoolExecutor(max_workers=min(TIER3_WORKERS, len(pdfs)), thread_name_prefix="tier3")
+    try:
+        futures = [
+            pool.submit(_classify_pdf_content, v.name, v.file["id"], gc, file_version(v.file))
+            for v in pdfs
+        ]
+        for v, future in zip(pdfs, futures, strict=True):
+            doc_type, conf = future.result()
+            batch.content_reads += 1
+            if conf >= TIER3_MIN_CONFIDENCE:
+                v.doc_type, v.confidence, v.tier = doc_type, conf, "content"
+                settle([v])
+            if not remaining:
+                break
+    finally:
+        # Early exit: queued reads are dropped, in-flight ones finish unawaited
+        pool.shutdown(wait=False, cancel_futures=True)
+    return batch
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -274,10 +554,20 @@ def match_file_to_site_llm(
     if not openai_api_key:
         return {}
 
+    # The listing is keyed as a set: its order does not change the question
+    cache = get_verdict_cache()
+    key = VerdictCache.key(
+        "site_match", CLASSIFIER_MODEL, _SITE_MATCH_SYSTEM_PROMPT,
+        site_title, site_address, text_digest("\n".join(sorted(set(filenames)))),
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
     try:
         from openai import OpenAI
 
-        client = OpenAI(api_key=openai_api_key)
+        client = OpenAI(api_key=openai_api_key, max_retries=0)
 
         user_msg = f"Site name: {site_title}\n"
         if site_address:
@@ -286,17 +576,18 @@ def match_file_to_site_llm(
         for fn in filenames:
             user_msg += f"- {fn}\n"
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = call_with_retries("openai", lambda: client.chat.completions.create(
+            model=CLASSIFIER_MODEL,
             messages=[
                 {"role": "system", "content": _SITE_MATCH_SYSTEM_PROMPT},
                 {"role": "user", "content": user_msg},
             ],
             response_format={"type": "json_object"},
-        )
+        ))
 
         text = response.choices[0].message.content
         if not text:
+            cache.put(key, {})
             return {}
 
         result = json.loads(text)
@@ -306,6 +597,7 @@ def match_file_to_site_llm(
             conf = float(m.get("confidence", 0.0))
             if fn and conf >= 0.7:
                 matches[fn] = conf
+        cache.put(key, matches)
 
         if matches:
             logger.info(
@@ -66,6 +66,16 @@ class Settings(BaseSettings):
         "15dfKaAnic9VRKhp_-vFSpTr7uPk_hhKo",
         description="Drive folder ID for shared Building Inspection documents",
     )
+    shared_folder_cache_file: str = Field(
+        ".cache/shared-folders.json",
+        description="Shared folder listing kept current from the Drive changes feed "
+        "(empty = relist on every process start)",
+    )
+    template_layout_cache_file: str = Field(
+        ".cache/template-layout.json",
+        description="Analyzed DD template layouts by revision "
+        "(empty = re-analyze on every process start)",
+    )
 
     # Building Optimizer / Pricing API (v2 — no API key required)
     pricing_api_url: str = Field(
@@ -98,6 +108,94 @@ class Settings(BaseSettings):
         50,
         description="Maximum number of emails to process per inbox scan run",
     )
+    inbox_workers: int = Field(
+        4,
+        description="Emails, and attachments within them, processed concurrently per inbox scan",
+    )
+    inbox_history_file: str = Field(
+        ".cache/inbox-history.json",
+        description="State file holding the last scanned Gmail historyId (empty = always full scan)",
+    )
+
+    # Report agent
+    agent_tool_concurrency: int = Field(
+        4,
+        description="Maximum tool calls from one agent turn executed concurrently",
+    )
+    agent_streaming: bool = Field(
+        True,
+        description="Stream agent turns and start each tool call as soon as its "
+        "tool_use block is complete",
+    )
+    agent_context_budget_tokens: int = Field(
+        40000,
+        description="Approximate tokens of tool results kept verbatim in the agent "
+        "conversation before older large results are compacted",
+    )
+    agent_compact_result_chars: int = Field(
+        4000,
+        description="Tool results longer than this are compacted when over budget",
+    )
+    agent_checkpoint_dir: str = Field(
+        ".cache/agent-checkpoints",
+        description="Directory of per-site agent checkpoints that let an interrupted "
+        "report run resume (empty = no checkpoints)",
+    )
+
+    # Daily sweep
+    sweep_workers: int = Field(
+        1,
+        description="Sites processed in parallel by the daily sweep (1 = sequential)",
+    )
+    sweep_site_timeout_seconds: float = Field(
+        0.0,
+        description="Per-site time budget in the daily sweep before it is reported as timed "
+        "out and the run exits without waiting for it (0 = no limit)",
+    )
+
+    # Upstream rate limits shared by all threads (requests per minute, 0 = unlimited)
+    rate_limit_wrike_per_minute: int = Field(
+        300, description="Wrike API requests per minute (Wrike allows 400/min per user)"
+    )
+    rate_limit_google_per_minute: int = Field(
+        600, description="Google Drive, Docs and Gmail API requests per minute (each API)"
+    )
+    rate_limit_anthropic_per_minute: int = Field(
+        50, description="Anthropic Messages API requests per minute"
+    )
+    rate_limit_openai_per_minute: int = Field(
+        300, description="OpenAI chat completion requests per minute (classifiers, site matching)"
+    )
+    rate_limit_pricing_per_minute: int = Field(
+        60, description="Building Optimizer pricing API requests per minute"
+    )
+    rate_limit_max_retries: int = Field(
+        5, description="Retries for a throttled (429) or 5xx upstream response"
+    )
+    rate_limit_max_backoff_seconds: float = Field(
+        60.0, description="Upper bound on a single retry backoff, including Retry-After"
+    )
+
+    # Extracted-text cache (shared by read_drive_document and Tier 3 classification)
+    text_cache_dir: str = Field(
+        ".cache/extracted-text",
+        description="Directory for cached text extracted from Drive files",
+    )
+    text_cache_max_mb: float = Field(
+        256.0,
+        description="Size budget for the extracted-text cache in MB (0 disables it)",
+    )
+
+    # Classifier verdict cache (Tier 2 / Tier 3 classification and LLM site matching)
+    classifier_cache_file: str = Field(
+        ".cache/classifier-verdicts.jsonl",
+        description="LLM classifier verdicts keyed by model, prompt and input "
+        "(empty = ask the model every time)",
+    )
+    classifier_cache_ttl_days: float = Field(
+        30.0,
+        description="Days a cached classifier verdict is trusted (0 = no expiry)",
+    )
 
     # Logging
     log_level: str = Field("INFO", description="Logging level")
@@ -3,30 +3,207 @@
 from __future__ import annotations
 
 import base64
+import functools
+import io
 import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaInMemoryUpload
+from googleapiclient.http import (
+    HttpRequest,
+    MediaInMemoryUpload,
+    MediaIoBaseDownload,
+    MediaIoBaseUpload,
+)
+
+from .rate_limit import call_with_retries
 
 logger = logging.getLogger("[google_client]")
 
+FOLDER_MIME = "application/vnd.google-apps.folder"
+
+# Google APIs with their own rate-limit bucket (see rate_limit.UPSTREAMS)
+GOOGLE_APIS = ("drive", "docs", "gmail")
+# Methods safe to resend after a 5xx (429s are retried regardless)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+# Folders whose children are listed by one files.list in the recursive crawl.
+# Keeps the OR-ed query well under Drive's query length limit.
+CRAWL_PARENTS_PER_QUERY = 40
+# Concurrent files.list calls per crawl depth level
+CRAWL_MAX_WORKERS = 4
+
+# Streaming transfers: media moves in chunks of this size, and downloads stay
+# in memory only up to SPOOL_MAX_BYTES before spilling to a temp file, so a
+# worker's peak memory is bounded regardless of file size.
+MEDIA_CHUNK_BYTES = 4 * 1024 * 1024  # multiple of 256 KiB, as uploads require
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Uploads larger than this use a chunked resumable session
+RESUMABLE_UPLOAD_MIN_BYTES = 5 * 1024 * 1024
+
+# Fields requested for files in folder listings and the changes feed
+_CHILD_FIELDS = "id,name,mimeType,modifiedTime,md5Checksum,webViewLink,parents"
+
+# Requests per Gmail HTTP batch (the API accepts 100; Google recommends <= 50
+# to avoid per-user concurrency rate limiting)
+GMAIL_BATCH_SIZE = 50
+
+# Parsed discovery documents keyed by (api, version).  The first build of each
+# API parses the bundled discovery JSON; later builds reuse the parsed dict.
+_DISCOVERY_DOCS: dict[tuple[str, str], Any] = {}
+_DISCOVERY_LOCK = threading.Lock()
+
+# Process-wide shared clients keyed by (token file, scopes)
+_SHARED_CLIENTS: dict[tuple[str, tuple[str, ...]], GoogleClient] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+class GmailHistoryExpiredError(RuntimeError):
+    """The start history ID is too old for ``history.list`` (HTTP 404)."""
+
+
+class DriveChangesTokenError(RuntimeError):
+    """The stored Drive changes page token is no longer valid."""
+
+
+class _ThrottledHttpRequest(HttpRequest):
+    """HttpRequest that runs under the shared rate governor for its Google API.
+
+    The upstream (``drive``, ``docs`` or ``gmail``) is the API prefix of the
+    discovery method ID; throttled and 5xx responses are retried with backoff.
+    """
+
+    def execute(self, http: Any = None, num_retries: int = 0) -> Any:
+        api = (self.methodId or "").partition(".")[0]
+        return call_with_retries(
+            api if api in GOOGLE_APIS else "google",
+            functools.partial(super().execute, http=http, num_retries=num_retries),
+            idempotent=self.method in _IDEMPOTENT_METHODS,
+        )
+
+
+def _build_service(api: str, version: str, credentials: Credentials) -> Any:
+    """Build a discovery client, reusing the cached discovery document."""
+    key = (api, version)
+    with _DISCOVERY_LOCK:
+        doc = _DISCOVERY_DOCS.get(key)
+    if doc is not None:
+        return build_from_document(
+            doc, credentials=credentials, requestBuilder=_ThrottledHttpRequest,
+        )
+
+    service = build(
+        api, version, credentials=credentials, cache_discovery=False,
+        requestBuilder=_ThrottledHttpRequest,
+    )
+    with _DISCOVERY_LOCK:
+        _DISCOVERY_DOCS.setdefault(key, service._rootDesc)
+    return service
+
+
+def get_shared_google_client(
+    client_config_path: str,
+    token_file_path: str,
+    oauth_port: int,
+    scopes: list[str],
+) -> GoogleClient:
+    """Return the process-wide GoogleClient for these credentials.
+
+    The first call runs :meth:`GoogleClient.from_oauth_config`; later calls
+    reuse the same client and only refresh the access token when it has
+    expired.  Safe to call from multiple threads.
+    """
+    key = (str(Path(token_file_path).resolve()), tuple(scopes))
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(key)
+        if client is None:
+            client = GoogleClient.from_oauth_config(
+                client_config_path=client_config_path,
+                token_file_path=token_file_path,
+                oauth_port=oauth_port,
+                scopes=scopes,
+            )
+            _SHARED_CLIENTS[key] = client
+            return client
+
+    client.ensure_valid_credentials()
+    return client
+
+
+def reset_shared_google_clients() -> None:
+    """Drop all shared clients (e.g. after re-authorising with new scopes)."""
+    with _SHARED_LOCK:
+        _SHARED_CLIENTS.clear()
+
 
 class GoogleClient:
-    """Client for interacting with Drive, Docs, and Gmail APIs using OAuth."""
+    """Client for interacting with Drive, Docs, and Gmail APIs using OAuth.
+
+    Service objects are built lazily and kept per thread, because the
+    underlying ``httplib2`` transport is not thread-safe.  A single client can
+    therefore be shared across worker threads.
+    """
 
-    def __init__(self, credentials: Credentials) -> None:
+    def __init__(
+        self,
+        credentials: Credentials,
+        *,
+        token_file_path: str | None = None,
+    ) -> None:
         self.credentials = credentials
-        self.drive_service = build("drive", "v3", credentials=credentials)
-        self.docs_service = build("docs", "v1", credentials=credentials)
-        self.gmail_service = build("gmail", "v1", credentials=credentials)
+        self._token_file_path = token_file_path
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()
+        self._crawl_lock = threading.Lock()
+        self._crawl_executor: ThreadPoolExecutor | None = None
         logger.info("Initialized GoogleClient with Drive v3, Docs v1, and Gmail v1 APIs")
 
+    def _service(self, api: str, version: str) -> Any:
+        services: dict[str, Any] | None = getattr(self._local, "services", None)
+        if services is None:
+            services = {}
+            self._local.services = services
+        service = services.get(api)
+        if service is None:
+            service = _build_service(api, version, self.credentials)
+            services[api] = service
+        return service
+
+    @property
+    def drive_service(self) -> Any:
+        return self._service("drive", "v3")
+
+    @property
+    def docs_service(self) -> Any:
+        return self._service("docs", "v1")
+
+    @property
+    def gmail_service(self) -> Any:
+        return self._service("gmail", "v1")
+
+    def ensure_valid_credentials(self) -> None:
+        """Refresh the access token if it has expired, persisting the new token."""
+        if self.credentials.valid:
+            return
+        with self._refresh_lock:
+            if self.credentials.valid:
+                return
+            if not self.credentials.refresh_token:
+                raise RuntimeError("OAuth credentials expired and no refresh_token is available")
+            logger.info("Refreshing expired credentials for shared GoogleClient")
+            self.credentials.refresh(Request())
+            if self._token_file_path:
+                with open(self._token_file_path, "w") as token:
+                    token.write(self.credentials.to_json())
+
     @classmethod
     def from_oauth_config(
         cls,
@@ -75,7 +252,7 @@ class GoogleClient:
         if credentials is None:
             raise RuntimeError("OAuth credentials are None after flow")
 
-        return cls(credentials)
+        return cls(credentials, token_file_path=str(token_file))
 
     # ---------- Drive API Methods ----------
 
@@ -108,7 +285,7 @@ class GoogleClient:
                     self.drive_service.files()
                     .list(
                         q=query,
-                        fields="nextPageToken,files(id,name,mimeType,modifiedTime,webViewLink)",
+                        fields="nextPageToken,files(id,name,mimeType,modifiedTime,md5Checksum,webViewLink)",
                         supportsAllDrives=True,
                         includeItemsFromAllDrives=True,
                         pageToken=page_token,
@@ -171,38 +348,222 @@ class GoogleClient:
             logger.error("Failed to list subfolders: %s", error)
             raise RuntimeError(f"Failed to list subfolders: {error}") from error
 
+    def _crawl_pool(self) -> ThreadPoolExecutor:
+        # Long-lived so worker threads keep their per-thread Drive services
+        with self._crawl_lock:
+            if self._crawl_executor is None:
+                self._crawl_executor = ThreadPoolExecutor(
+                    max_workers=CRAWL_MAX_WORKERS, thread_name_prefix="drive-crawl",
+                )
+            return self._crawl_executor
+
+    def _list_children_batch(self, parent_ids: list[str]) -> list[dict[str, Any]]:
+        """List files and folders directly inside any of *parent_ids* in one query.
+
+        Each item includes ``parents`` so results can be regrouped per folder.
+        """
+        parents_clause = " or ".join(f"'{pid}' in parents" for pid in parent_ids)
+        query = f"({parents_clause}) and trashed=false"
+
+        try:
+            items: list[dict[str, Any]] = []
+            page_token: str | None = None
+
+            while True:
+                response = (
+                    self.drive_service.files()
+                    .list(
+                        q=query,
+                        fields=f"nextPageToken,files({_CHILD_FIELDS})",
+                        supportsAllDrives=True,
+                        includeItemsFromAllDrives=True,
+                        pageSize=1000,
+                        pageToken=page_token,
+                        orderBy="name_natural",
+                    )
+                    .execute()
+                )
+                items.extend(response.get("files", []))
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+            return items
+
+        except HttpError as error:
+            logger.error("Failed to list children of %d folders: %s", len(parent_ids), error)
+            raise RuntimeError(f"Failed to list files in folder: {error}") from error
+
+    def _list_children_resilient(self, parent_ids: list[str]) -> list[dict[str, Any]]:
+        """:meth:`_list_children_batch`, falling back to one query per parent.
+
+        One bad folder (gone, permission revoked) fails the whole OR-ed query;
+        the others are then listed one by one, and a folder that still fails
+        on its own is logged and skipped.
+        """
+        try:
+            return self._list_children_batch(parent_ids)
+        except Exception as e:
+            if len(parent_ids) == 1:
+                logger.warning("Skipping folder %s: %s", parent_ids[0], e)
+                return []
+            logger.warning(
+                "Listing %d folders together failed (%s) — retrying one by one",
+                len(parent_ids), e,
+            )
+        items: list[dict[str, Any]] = []
+        for parent_id in parent_ids:
+            try:
+                items.extend(self._list_children_batch([parent_id]))
+            except Exception as e:
+                logger.warning("Skipping folder %s: %s", parent_id, e)
+        return items
+
+    def list_children(self, parent_ids: list[str]) -> list[dict[str, Any]]:
+        """List files and folders directly inside any of *parent_ids*.
+
+        Folders are queried ``CRAWL_PARENTS_PER_QUERY`` at a time; each item
+        includes ``parents``.  Items are name-sorted within each query.
+        """
+        items: list[dict[str, Any]] = []
+        for i in range(0, len(parent_ids), CRAWL_PARENTS_PER_QUERY):
+            items.extend(self._list_children_batch(parent_ids[i : i + CRAWL_PARENTS_PER_QUERY]))
+        return items
+
+    def drive_get_start_page_token(self) -> str:
+        """Return the Drive changes token for "now" (changes after this call)."""
+        try:
+            response = (
+                self.drive_service.changes()
+                .getStartPageToken(supportsAllDrives=True)
+                .execute()
+            )
+            return str(response["startPageToken"])
+
+        except HttpError as error:
+            logger.error("Failed to get Drive start page token: %s", error)
+            raise RuntimeError(f"Failed to get Drive start page token: {error}") from error
+
+    def drive_list_changes(
+        self, page_token: str, *, max_pages: int | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """List Drive changes since ``page_token``, across My Drive and shared drives.
+
+        Returns (changes, new start page token).  Each change has ``fileId``,
+        ``removed`` and, unless removed, ``file`` with the listing fields plus
+        ``trashed``.  The token is None when ``max_pages`` pages were read
+        without reaching the end of the feed.  Raises DriveChangesTokenError
+        when the token is rejected, in which case the caller must relist.
+        """
+        logger.info("Drive changes since %s", page_token)
+
+        try:
+            changes: list[dict[str, Any]] = []
+            token = page_token
+            pages = 0
+
+            while True:
+                response = (
+                    self.drive_service.changes()
+                    .list(
+                        pageToken=token,
+                        fields=(
+                            "nextPageToken,newStartPageToken,"
+                            f"changes(fileId,removed,file({_CHILD_FIELDS},trashed))"
+                        ),
+                        includeItemsFromAllDrives=True,
+                        supportsAllDrives=True,
+                        includeRemoved=True,
+                        pageSize=1000,
+                        spaces="drive",
+                    )
+                    .execute()
+                )
+                changes.extend(response.get("changes", []))
+                pages += 1
+                if response.get("newStartPageToken"):
+                    logger.info("Drive changes feed returned %d changes", len(changes))
+                    return changes, str(response["newStartPageToken"])
+                token = response.get("nextPageToken")
+                if not token or (max_pages is not None and pages >= max_pages):
+                    logger.info("Drive changes feed not exhausted after %d pages", pages)
+                    return changes, None
+
+        except HttpError as error:
+            if error.resp.status in (400, 404, 410):
+                logger.warning("Drive changes token %s rejected: %s", page_token, error)
+                raise DriveChangesTokenError(
+                    f"Drive changes token {page_token} is no longer valid"
+                ) from error
+            logger.error("Drive changes list failed: %s", error)
+            raise RuntimeError(f"Drive changes list failed: {error}") from error
+
     def list_files_recursive(
         self, folder_id: str, *, max_depth: int = 3
     ) -> list[dict[str, Any]]:
         """List all files recursively under a Drive folder, up to *max_depth* levels.
 
+        Crawls breadth-first: each depth level is listed with one ``files.list``
+        per batch of up to ``CRAWL_PARENTS_PER_QUERY`` folders (OR-ed
+        ``'x' in parents`` clauses returning files and folders together), and
+        the batches of a level run concurrently.  Results are returned in the
+        same depth-first, name-sorted order as a folder-by-folder walk.  A
+        subfolder that cannot be listed is skipped; only a failure to list
+        *folder_id* itself raises.
+
         Each returned file dict includes a ``folder_path`` key indicating its
         location relative to the root folder (e.g. ``"/Subfolder A"``).
         """
+        files_by_folder: dict[str, list[dict[str, Any]]] = {}
+        children_by_folder: dict[str, list[dict[str, Any]]] = {}
+        level = [folder_id]
+        seen = {folder_id}
+        round_trips = 0
+
+        for depth in range(max_depth + 1):
+            if not level:
+                break
+            batches = [
+                level[i : i + CRAWL_PARENTS_PER_QUERY]
+                for i in range(0, len(level), CRAWL_PARENTS_PER_QUERY)
+            ]
+            round_trips += len(batches)
+            lister = self._list_children_batch if depth == 0 else self._list_children_resilient
+            if len(batches) == 1:
+                results = [lister(batches[0])]
+            else:
+                results = list(self._crawl_pool().map(lister, batches))
+
+            level_ids = set(level)
+            next_level: list[str] = []
+            for item in (item for batch in results for item in batch):
+                # An item may have several parents; file it under the crawled one
+                parent = next((p for p in item.get("parents", []) if p in level_ids), None)
+                if parent is None:
+                    continue
+                if item.get("mimeType") == FOLDER_MIME:
+                    if depth < max_depth and item.get("id") and item["id"] not in seen:
+                        seen.add(item["id"])
+                        children_by_folder.setdefault(parent, []).append(item)
+                        next_level.append(item["id"])
+                else:
+                    item.pop("parents", None)
+                    files_by_folder.setdefault(parent, []).append(item)
+            level = next_level
+
+        # Rebuild depth-first order and folder paths locally
         all_files: list[dict[str, Any]] = []
 
-        def _walk(fid: str, depth: int, path: str) -> None:
-            files = self.list_files_in_folder(fid)
-            for f in files:
+        def _collect(fid: str, path: str) -> None:
+            for f in files_by_folder.get(fid, []):
                 f["folder_path"] = path
-            all_files.extend(files)
-
-            if depth < max_depth:
-                try:
-                    subfolders = self.list_subfolders(fid)
-                except Exception as e:
-                    logger.warning("Failed to list subfolders of %s: %s", fid, e)
-                    return
-                for sf in subfolders:
-                    sf_id = sf.get("id")
-                    sf_name = sf.get("name", "")
-                    if sf_id:
-                        _walk(sf_id, depth + 1, f"{path}/{sf_name}")
-
-        _walk(folder_id, 0, "")
+                all_files.append(f)
+            for sf in children_by_folder.get(fid, []):
+                _collect(sf["id"], f"{path}/{sf.get('name', '')}")
+
+        _collect(folder_id, "")
         logger.info(
-            "Recursive listing of %s found %d files (max_depth=%d)",
-            folder_id, len(all_files), max_depth,
+            "Recursive listing of %s found %d files (max_depth=%d, %d queries)",
+            folder_id, len(all_files), max_depth, round_trips,
         )
         return all_files
 
@@ -244,29 +605,44 @@ class GoogleClient:
             logger.error("Failed to export Google Doc %s: %s", file_id, error)
             raise RuntimeError(f"Failed to export Google Doc: {error}") from error
 
-    def download_file_bytes(self, file_id: str) -> bytes:
+    def download_file(self, file_id: str) -> IO[bytes]:
         """
-        Download a file's raw bytes from Google Drive.
+        Stream a Drive file's raw bytes into a spooled temporary file.
 
-        Used for PDFs and other binary/non-Google-Workspace files.
+        The file is fetched in ``MEDIA_CHUNK_BYTES`` chunks and held in memory
+        only up to ``SPOOL_MAX_BYTES``; larger files spill to disk.  Returns
+        the file positioned at the start; close it (or use ``with``) when done.
         """
-        logger.info("Downloading file bytes: %s", file_id)
+        logger.info("Downloading file: %s", file_id)
 
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
         try:
-            response = self.drive_service.files().get_media(fileId=file_id).execute()
+            request = self.drive_service.files().get_media(fileId=file_id)
+            downloader = MediaIoBaseDownload(spool, request, chunksize=MEDIA_CHUNK_BYTES)
+            done = False
+            while not done:
+                _, done = call_with_retries("drive", downloader.next_chunk)
 
-            if isinstance(response, bytes):
-                data = response
-            else:
-                data = bytes(response)
-
-            logger.info("Downloaded %d bytes for file %s", len(data), file_id)
-            return data
+            size = spool.tell()
+            spool.seek(0)
+            logger.info("Downloaded %d bytes for file %s", size, file_id)
+            return spool
 
         except HttpError as error:
+            spool.close()
             logger.error("Failed to download file %s: %s", file_id, error)
             raise RuntimeError(f"Failed to download file: {error}") from error
 
+    def download_file_bytes(self, file_id: str) -> bytes:
+        """
+        Download a file's raw bytes from Google Drive.
+
+        Used for small binary/non-Google-Workspace files; prefer
+        :meth:`download_file` for PDFs, which may be large.
+        """
+        with self.download_file(file_id) as fh:
+            return fh.read()
+
     def copy_document(
         self,
         template_id: str,
@@ -384,6 +760,19 @@ class GoogleClient:
             logger.error("Failed to get document %s: %s", document_id, error)
             raise RuntimeError(f"Failed to get document: {error}") from error
 
+    def get_document_revision(self, document_id: str) -> str:
+        """Return the document's current ``revisionId`` without its content."""
+        try:
+            doc = (
+                self.docs_service.documents()
+                .get(documentId=document_id, fields="revisionId")
+                .execute()
+            )
+            return str(doc.get("revisionId", ""))
+        except HttpError as error:
+            logger.error("Failed to get revision of document %s: %s", document_id, error)
+            raise RuntimeError(f"Failed to get document revision: {error}") from error
+
     # ---------- Docs: Create New Document ----------
 
     def create_document(
@@ -460,32 +849,53 @@ class GoogleClient:
         self,
         folder_id: str,
         file_name: str,
-        file_bytes: bytes,
+        file_bytes: bytes | IO[bytes],
         mime_type: str = "application/pdf",
+        *,
+        file_id: str | None = None,
     ) -> dict[str, Any]:
         """Upload a file to a specific Drive folder.
 
+        ``file_bytes`` may be bytes or a binary file object.  Files over
+        ``RESUMABLE_UPLOAD_MIN_BYTES`` (and all file objects) are sent as a
+        chunked resumable upload, so they are never fully buffered.
+        ``file_id`` creates the file under an ID from :meth:`generate_file_ids`.
+
         Returns the new file metadata including 'id', 'name', 'webViewLink'.
         """
-        logger.info("Uploading '%s' (%d bytes) to folder %s", file_name, len(file_bytes), folder_id)
-
-        media = MediaInMemoryUpload(file_bytes, mimetype=mime_type, resumable=False)
+        media: MediaInMemoryUpload | MediaIoBaseUpload
+        if isinstance(file_bytes, bytes) and len(file_bytes) <= RESUMABLE_UPLOAD_MIN_BYTES:
+            logger.info(
+                "Uploading '%s' (%d bytes) to folder %s", file_name, len(file_bytes), folder_id,
+            )
+            media = MediaInMemoryUpload(file_bytes, mimetype=mime_type, resumable=False)
+        else:
+            stream = io.BytesIO(file_bytes) if isinstance(file_bytes, bytes) else file_bytes
+            logger.info("Uploading '%s' (resumable) to folder %s", file_name, folder_id)
+            media = MediaIoBaseUpload(
+                stream, mimetype=mime_type, chunksize=MEDIA_CHUNK_BYTES, resumable=True,
+            )
         body: dict[str, Any] = {
             "name": file_name,
             "parents": [folder_id],
         }
+        if file_id:
+            body["id"] = file_id
 
         try:
-            result = (
-                self.drive_service.files()
-                .create(
-                    body=body,
-                    media_body=media,
-                    fields="id,name,webViewLink",
-                    supportsAllDrives=True,
-                )
-                .execute()
+            request = self.drive_service.files().create(
+                body=body,
+                media_body=media,
+                fields="id,name,webViewLink",
+                supportsAllDrives=True,
             )
+            if media.resumable():
+                result = None
+                while result is None:
+                    # Resumable chunks are safe to resend from the last committed byte
+                    _, result = call_with_retries("drive", request.next_chunk)
+            else:
+                result = request.execute()
             logger.info("Uploaded file: %s (id: %s)", file_name, result.get("id"))
             return result
 
@@ -493,6 +903,20 @@ class GoogleClient:
             logger.error("Failed to upload '%s': %s", file_name, error)
             raise RuntimeError(f"Failed to upload file: {error}") from error
 
+    def generate_file_ids(self, count: int = 1) -> list[str]:
+        """Pre-allocate Drive file IDs, so a file's URL is known before upload."""
+        try:
+            response = (
+                self.drive_service.files()
+                .generateIds(count=count, space="drive", type="files")
+                .execute()
+            )
+            return [str(i) for i in response.get("ids", [])]
+
+        except HttpError as error:
+            logger.error("Failed to generate file IDs: %s", error)
+            raise RuntimeError(f"Failed to generate file IDs: {error}") from error
+
     def file_exists_in_folder(self, folder_id: str, file_name: str) -> bool:
         """Check if a file with the exact name already exists in a folder."""
         query = (
@@ -553,6 +977,69 @@ class GoogleClient:
             logger.error("Gmail search failed: %s", error)
             raise RuntimeError(f"Gmail search failed: {error}") from error
 
+    def gmail_get_profile(self) -> dict[str, Any]:
+        """Get the mailbox profile (email address, message totals, current historyId)."""
+        try:
+            profile: dict[str, Any] = (
+                self.gmail_service.users().getProfile(userId="me").execute()
+            )
+            return profile
+
+        except HttpError as error:
+            logger.error("Failed to get Gmail profile: %s", error)
+            raise RuntimeError(f"Failed to get Gmail profile: {error}") from error
+
+    def gmail_list_history(
+        self, start_history_id: str, *, history_types: tuple[str, ...] = ("messageAdded",),
+    ) -> tuple[list[dict[str, Any]], str]:
+        """List mailbox changes since ``start_history_id``.
+
+        Returns (stubs of messages added since then, current historyId).
+        Raises GmailHistoryExpiredError when the start ID is outside Gmail's
+        history window, in which case the caller must fall back to a search.
+        """
+        logger.info("Gmail history since %s", start_history_id)
+
+        try:
+            added: dict[str, dict[str, Any]] = {}
+            history_id = start_history_id
+            page_token: str | None = None
+
+            while True:
+                response = (
+                    self.gmail_service.users()
+                    .history()
+                    .list(
+                        userId="me",
+                        startHistoryId=start_history_id,
+                        historyTypes=list(history_types),
+                        maxResults=500,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                for record in response.get("history", []):
+                    for item in record.get("messagesAdded", []):
+                        message = item.get("message", {})
+                        if message.get("id"):
+                            added[message["id"]] = message
+                history_id = response.get("historyId", history_id)
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+
+            logger.info("Gmail history returned %d added messages", len(added))
+            return list(added.values()), history_id
+
+        except HttpError as error:
+            if error.resp.status == 404:
+                logger.warning("Gmail history %s expired: %s", start_history_id, error)
+                raise GmailHistoryExpiredError(
+                    f"Gmail history {start_history_id} is no longer available"
+                ) from error
+            logger.error("Gmail history list failed: %s", error)
+            raise RuntimeError(f"Gmail history list failed: {error}") from error
+
     def gmail_get_message(self, message_id: str) -> dict[str, Any]:
         """Get a full Gmail message by ID (includes headers and parts)."""
         logger.info("Fetching Gmail message: %s", message_id)
@@ -570,6 +1057,109 @@ class GoogleClient:
             logger.error("Failed to get Gmail message %s: %s", message_id, error)
             raise RuntimeError(f"Failed to get Gmail message: {error}") from error
 
+    def _execute_gmail_batch(
+        self, requests: list[tuple[str, Any]],
+    ) -> dict[str, Any]:
+        """Run (key, HttpRequest) pairs as multiplexed Gmail batch calls.
+
+        Returns {key: response or exception}; one failed item never fails the
+        others.  Each item still counts against the rate limit.
+        """
+        results: dict[str, Any] = {}
+
+        for start in range(0, len(requests), GMAIL_BATCH_SIZE):
+            chunk = requests[start : start + GMAIL_BATCH_SIZE]
+
+            # Batch request IDs become Content-ID headers; use positions rather
+            # than the (long, opaque) Gmail IDs and map back in the callback
+            def _callback(
+                request_id: str, response: Any, exception: Exception | None,
+                chunk: list[tuple[str, Any]] = chunk,
+            ) -> None:
+                key = chunk[int(request_id)][0]
+                results[key] = exception if exception is not None else response
+
+            batch = self.gmail_service.new_batch_http_request(callback=_callback)
+            for i, (_, request) in enumerate(chunk):
+                batch.add(request, request_id=str(i))
+            try:
+                # Envelope-level 429/5xx are retried; a per-item failure is
+                # returned for the caller to fetch individually
+                call_with_retries("gmail", batch.execute, requests=len(chunk))
+            except HttpError as error:
+                # The batch envelope itself failed: every item in it failed
+                for key, _ in chunk:
+                    results.setdefault(key, error)
+        return results
+
+    def gmail_get_messages(
+        self,
+        message_ids: list[str],
+        *,
+        format: str = "full",
+        metadata_headers: list[str] | None = None,
+    ) -> dict[str, dict[str, Any] | Exception]:
+        """Fetch Gmail messages in HTTP batches.
+
+        ``format="metadata"`` with ``metadata_headers`` fetches only labels
+        and the named headers, which is cheap enough for messages that are
+        only being screened.
+
+        Returns {message_id: message} with a RuntimeError in place of any
+        message that could not be fetched.
+        """
+        ids = list(dict.fromkeys(message_ids))
+        if not ids:
+            return {}
+        logger.info("Fetching %d Gmail messages in batches of %d", len(ids), GMAIL_BATCH_SIZE)
+
+        messages = self.gmail_service.users().messages()
+        params: dict[str, Any] = {"format": format}
+        if metadata_headers:
+            params["metadataHeaders"] = metadata_headers
+        raw = self._execute_gmail_batch(
+            [(mid, messages.get(userId="me", id=mid, **params)) for mid in ids]
+        )
+        results: dict[str, dict[str, Any] | Exception] = {}
+        for mid in ids:
+            item = raw.get(mid)
+            if isinstance(item, dict):
+                results[mid] = item
+            else:
+                logger.error("Failed to get Gmail message %s: %s", mid, item)
+                results[mid] = RuntimeError(f"Failed to get Gmail message: {item}")
+        return results
+
+    def gmail_get_attachments(
+        self, message_id: str, attachment_ids: list[str],
+    ) -> dict[str, bytes | Exception]:
+        """Download several attachments of one message in HTTP batches.
+
+        Returns {attachment_id: bytes} with a RuntimeError in place of any
+        attachment that could not be downloaded.
+        """
+        ids = list(dict.fromkeys(attachment_ids))
+        if not ids:
+            return {}
+        logger.info("Downloading %d Gmail attachments of %s in batches", len(ids), message_id)
+
+        attachments = self.gmail_service.users().messages().attachments()
+        raw = self._execute_gmail_batch(
+            [
+                (aid, attachments.get(userId="me", messageId=message_id, id=aid))
+                for aid in ids
+            ]
+        )
+        results: dict[str, bytes | Exception] = {}
+        for aid in ids:
+            item = raw.get(aid)
+            if isinstance(item, dict):
+                results[aid] = base64.urlsafe_b64decode(item.get("data", ""))
+            else:
+                logger.error("Failed to get attachment %s of %s: %s", aid, message_id, item)
+                results[aid] = RuntimeError(f"Failed to get Gmail attachment: {item}")
+        return results
+
     def gmail_get_attachment(self, message_id: str, attachment_id: str) -> bytes:
         """Download a Gmail attachment by message and attachment ID.
 
@@ -592,6 +1182,37 @@ class GoogleClient:
             logger.error("Failed to get attachment: %s", error)
             raise RuntimeError(f"Failed to get Gmail attachment: {error}") from error
 
+    def gmail_download_attachment(self, message_id: str, attachment_id: str) -> IO[bytes]:
+        """Download a Gmail attachment into a spooled temporary file.
+
+        The API returns the attachment base64-encoded in a JSON body, so the
+        encoded text is necessarily held once; it is decoded chunk by chunk
+        into the spool rather than into a second full-size bytes object.
+        Returns the file positioned at the start.
+        """
+        logger.info("Downloading Gmail attachment: msg=%s, att=%s", message_id, attachment_id)
+
+        try:
+            attachment = (
+                self.gmail_service.users()
+                .messages()
+                .attachments()
+                .get(userId="me", messageId=message_id, id=attachment_id)
+                .execute()
+            )
+        except HttpError as error:
+            logger.error("Failed to get attachment: %s", error)
+            raise RuntimeError(f"Failed to get Gmail attachment: {error}") from error
+
+        data: str = attachment.pop("data", "")
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        # Decode on 4-character boundaries so each chunk is valid base64
+        step = MEDIA_CHUNK_BYTES // 3 * 4
+        for start in range(0, len(data), step):
+            spool.write(base64.urlsafe_b64decode(data[start : start + step]))
+        spool.seek(0)
+        return spool
+
     def gmail_modify_labels(
         self,
         message_id: str,
@@ -10,14 +10,20 @@ from __future__ import annotations
 import json
 import logging
 import os
-from dataclasses import dataclass
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 from openai import OpenAI
 
 from .config import Settings
-from .google_client import GoogleClient
+from .google_client import GmailHistoryExpiredError, GoogleClient
+from .rate_limit import call_with_retries
 
 logger = logging.getLogger("[inbox_scanner]")
 
@@ -34,6 +40,13 @@ DOC_TYPE_FOLDER_MAP = {
     "isp": "isp_folder_id",
 }
 
+# Attachments up to this size are fetched in the email's batched request;
+# larger ones are streamed individually to keep per-worker memory bounded
+BATCH_ATTACHMENT_MAX_BYTES = 8 * 1024 * 1024
+
+# Message IDs OR-ed into one search when screening history-added messages
+SCREEN_IDS_PER_QUERY = 20
+
 # Filename templates per doc_type — must match existing _classify_document_type() patterns
 DOC_TYPE_FILENAME_TEMPLATES = {
     "sir": "{date} - {site_title} SIR.pdf",
@@ -50,7 +63,7 @@ class EmailMetadata:
     subject: str
     sender: str
     body_snippet: str
-    attachments: list[dict[str, Any]]  # [{filename, attachment_id, mime_type}]
+    attachments: list[dict[str, Any]]  # [{filename, attachment_id, mime_type, size}]
 
 
 @dataclass
@@ -75,28 +88,154 @@ class ProcessedAttachment:
     drive_file_name: str
 
 
+@dataclass
+class InboxScanState:
+    """Incremental scan position persisted between runs."""
+
+    history_id: str | None = None
+    # Messages to look at again even if not new: those that errored or were
+    # left unlabelled as low confidence last run, and any deferred past the cap
+    retry_ids: list[str] = field(default_factory=list)
+
+
+def load_scan_state(path: str) -> InboxScanState:
+    """Read the scan state file; a missing or unreadable file means a full scan."""
+    if not path:
+        return InboxScanState()
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return InboxScanState()
+    return InboxScanState(
+        history_id=data.get("history_id") or None,
+        retry_ids=[str(i) for i in data.get("retry_ids", [])],
+    )
+
+
+def save_scan_state(path: str, state: InboxScanState) -> None:
+    """Atomically write the scan state file."""
+    if not path:
+        return
+    target = Path(path)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"history_id": state.history_id, "retry_ids": state.retry_ids}, fh)
+        os.replace(tmp, target)
+    except OSError as e:
+        logger.warning("Could not save inbox scan state to %s: %s", path, e)
+
+
+def _screen_messages(
+    gc: GoogleClient, query: str, message_ids: list[str],
+) -> list[dict[str, Any]]:
+    """Return stubs of those *message_ids* that match the search *query*.
+
+    The history API reports every added message, sent mail and newsletters
+    included, and Gmail search cannot filter by message ID.  Each message's
+    RFC 822 ``Message-ID`` header is fetched in one metadata batch instead,
+    and the query is run restricted to ``rfc822msgid:`` terms for those
+    messages, so only mail that can match is ever returned and the full
+    unprocessed-document search is never paged.
+    """
+    fetched = gc.gmail_get_messages(
+        message_ids, format="metadata", metadata_headers=["Message-ID"],
+    )
+    by_rfc_id: dict[str, str] = {}
+    for message_id in message_ids:
+        message = fetched.get(message_id)
+        if not isinstance(message, dict) or "DRAFT" in message.get("labelIds", []):
+            continue  # deleted since, or not mail at all
+        headers = message.get("payload", {}).get("headers", [])
+        rfc_id = next(
+            (h.get("value", "") for h in headers if h.get("name", "").lower() == "message-id"),
+            "",
+        ).strip().strip("<>")
+        if rfc_id and not any(c in rfc_id for c in ' "{}()'):
+            by_rfc_id[rfc_id] = message_id
+
+    wanted = set(message_ids)
+    matches: dict[str, dict[str, Any]] = {}
+    rfc_ids = list(by_rfc_id)
+    for start in range(0, len(rfc_ids), SCREEN_IDS_PER_QUERY):
+        chunk = rfc_ids[start : start + SCREEN_IDS_PER_QUERY]
+        terms = " ".join(f"rfc822msgid:{rfc_id}" for rfc_id in chunk)
+        for stub in gc.gmail_search(f"{query} {{{terms}}}", max_results=2 * len(chunk)):
+            if stub["id"] in wanted:
+                matches.setdefault(stub["id"], stub)
+    return [matches[m] for m in message_ids if m in matches]
+
+
+def _find_candidate_messages(
+    gc: GoogleClient,
+    settings: Settings,
+    state: InboxScanState,
+    *,
+    full_scan: bool,
+) -> tuple[list[dict[str, Any]], str | None, str, list[str]]:
+    """Return (message stubs to process, new historyId, scan mode, deferred IDs).
+
+    Incremental mode asks the history API which messages arrived since the
+    saved historyId.  When none did, no search runs and no message is
+    fetched.  Otherwise the new and retry IDs are screened against the
+    unprocessed-document query (see :func:`_screen_messages`), so a burst
+    of mail never pushes a new message out of the results.  Matches beyond
+    ``inbox_scan_max_results`` are deferred to the next run.  A missing or
+    expired historyId falls back to the full search.
+    """
+    # Exclude already-labeled messages from search
+    query = f"{settings.inbox_scan_query} -label:{settings.inbox_processed_label}"
+    max_results = settings.inbox_scan_max_results
+
+    if state.history_id and not full_scan:
+        try:
+            added, history_id = gc.gmail_list_history(state.history_id)
+        except GmailHistoryExpiredError:
+            logger.warning("Saved Gmail historyId expired — falling back to full search")
+        else:
+            wanted = list(dict.fromkeys([m["id"] for m in added] + state.retry_ids))
+            if not wanted:
+                return [], history_id, "incremental", []
+            messages = _screen_messages(gc, query, wanted)
+            deferred = [m["id"] for m in messages[max_results:]]
+            return messages[:max_results], history_id, "incremental", deferred
+
+    # Capture the position before searching so mail arriving mid-scan is
+    # picked up by the next incremental run
+    current_id: str | None = gc.gmail_get_profile().get("historyId")
+    messages = gc.gmail_search(query, max_results=max_results)
+    return messages, current_id, "full", []
+
+
 def scan_inbox(
     gc: GoogleClient,
     site_records: list[dict[str, Any]],
     settings: Settings,
     *,
     dry_run: bool = False,
+    full_scan: bool = False,
 ) -> dict[str, Any]:
     """Top-level orchestrator: scan Gmail, classify, upload, mark processed.
 
+    Only emails that arrived since the previous run are examined, unless
+    ``full_scan`` is set or no usable history position is saved.
+
     Returns a summary dict with counts and details.
     """
-    logger.info("Starting inbox scan (dry_run=%s)", dry_run)
+    logger.info("Starting inbox scan (dry_run=%s, full_scan=%s)", dry_run, full_scan)
 
     # Get or create the DD-Processed label
     label_id = gc.gmail_get_or_create_label(settings.inbox_processed_label)
 
-    # Exclude already-labeled messages from search
-    query = f"{settings.inbox_scan_query} -label:{settings.inbox_processed_label}"
-    messages = gc.gmail_search(query, max_results=settings.inbox_scan_max_results)
-    logger.info("Found %d unprocessed emails", len(messages))
+    state = load_scan_state(settings.inbox_history_file)
+    messages, history_id, mode, deferred = _find_candidate_messages(
+        gc, settings, state, full_scan=full_scan,
+    )
+    logger.info("Found %d unprocessed emails (%s scan)", len(messages), mode)
 
     results: dict[str, Any] = {
+        "scan_mode": mode,
         "emails_found": len(messages),
         "attachments_uploaded": 0,
         "attachments_skipped": 0,
@@ -106,24 +245,53 @@ def scan_inbox(
         "low_confidence": [],
     }
 
-    for msg_stub in messages:
-        message_id = msg_stub["id"]
-        try:
-            email_result = process_email(
-                gc, message_id, site_records, settings, label_id, dry_run=dry_run,
+    # Emails are fanned out to one pool; each email's attachments to a second
+    # pool, so an email worker waiting on its attachments never starves them
+    workers = max(1, settings.inbox_workers)
+    claims = UploadClaims()
+    prefetched = _prefetch_messages(gc, [m["id"] for m in messages])
+    retry_ids: list[str] = list(deferred)
+    with (
+        ThreadPoolExecutor(workers, thread_name_prefix="inbox-attachment") as attachment_pool,
+        ThreadPoolExecutor(workers, thread_name_prefix="inbox-email") as email_pool,
+    ):
+        futures = [
+            email_pool.submit(
+                process_email,
+                gc, msg_stub["id"], site_records, settings, label_id,
+                dry_run=dry_run, executor=attachment_pool, upload_claims=claims,
+                message=prefetched.get(msg_stub["id"]),
             )
-            if email_result.get("uploaded"):
-                results["attachments_uploaded"] += len(email_result["uploaded"])
-                results["uploads"].extend(email_result["uploaded"])
-            if email_result.get("skipped"):
-                results["attachments_skipped"] += email_result["skipped"]
-            if email_result.get("low_confidence"):
-                results["low_confidence"].extend(email_result["low_confidence"])
-            if email_result.get("marked"):
-                results["emails_processed"] += 1
-        except Exception as e:
-            logger.error("Failed to process email %s: %s", message_id, e)
-            results["errors"].append({"message_id": message_id, "error": str(e)})
+            for msg_stub in messages
+        ]
+        for msg_stub, future in zip(messages, futures, strict=True):
+            message_id = msg_stub["id"]
+            try:
+                email_result = future.result()
+                if email_result.get("uploaded"):
+                    results["attachments_uploaded"] += len(email_result["uploaded"])
+                    results["uploads"].extend(email_result["uploaded"])
+                if email_result.get("skipped"):
+                    results["attachments_skipped"] += email_result["skipped"]
+                if email_result.get("low_confidence"):
+                    results["low_confidence"].extend(email_result["low_confidence"])
+                    # Left unlabelled: re-classify next run, as a full scan would
+                    if not email_result.get("marked"):
+                        retry_ids.append(message_id)
+                if email_result.get("marked"):
+                    results["emails_processed"] += 1
+                if email_result.get("failed") and message_id not in retry_ids:
+                    retry_ids.append(message_id)
+            except Exception as e:
+                logger.error("Failed to process email %s: %s", message_id, e)
+                results["errors"].append({"message_id": message_id, "error": str(e)})
+                retry_ids.append(message_id)
+
+    if not dry_run:
+        save_scan_state(
+            settings.inbox_history_file,
+            InboxScanState(history_id=history_id, retry_ids=retry_ids),
+        )
 
     logger.info(
         "Inbox scan complete: %d uploaded, %d skipped, %d errors",
@@ -134,6 +302,71 @@ def scan_inbox(
     return results
 
 
+def _prefetch_messages(gc: GoogleClient, message_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Fetch all messages of a scan in HTTP batches.
+
+    Messages that fail here are left out and fetched individually by
+    process_email, so a per-message error is reported against that email.
+    """
+    if not message_ids:
+        return {}
+    try:
+        fetched = gc.gmail_get_messages(message_ids)
+    except Exception as e:
+        logger.warning("Batch message fetch failed, fetching individually: %s", e)
+        return {}
+    return {mid: msg for mid, msg in fetched.items() if isinstance(msg, dict)}
+
+
+class UploadClaims:
+    """Drive destinations claimed by uploads in flight during one scan.
+
+    Two attachments can resolve to the same dated filename (e.g. a vendor
+    re-sending an SIR).  Run concurrently, both would pass the
+    ``file_exists_in_folder`` check; the first to claim the name uploads and
+    the other is skipped as a duplicate.
+    """
+
+    def __init__(self) -> None:
+        self._claimed: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, folder_id: str, file_name: str) -> bool:
+        with self._lock:
+            key = (folder_id, file_name)
+            if key in self._claimed:
+                return False
+            self._claimed.add(key)
+            return True
+
+    def release(self, folder_id: str, file_name: str) -> None:
+        with self._lock:
+            self._claimed.discard((folder_id, file_name))
+
+
+@dataclass
+class _PendingUpload:
+    """A classified attachment with a claimed Drive destination, awaiting its bytes."""
+
+    filename: str
+    attachment_id: str
+    size: int
+    classification: ClassificationResult
+    target_folder_id: str
+    drive_filename: str
+
+
+@dataclass
+class _AttachmentOutcome:
+    """What happened to one attachment; aggregated per email by process_email."""
+
+    uploaded: dict[str, Any] | None = None
+    skipped: bool = False
+    low_confidence: dict[str, Any] | None = None
+    failed: bool = False
+    pending: _PendingUpload | None = None
+
+
 def process_email(
     gc: GoogleClient,
     message_id: str,
@@ -142,12 +375,22 @@ def process_email(
     label_id: str,
     *,
     dry_run: bool = False,
+    executor: Executor | None = None,
+    upload_claims: UploadClaims | None = None,
+    message: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """Process a single email: classify attachments, upload, mark done.
 
-    Returns a dict with keys: uploaded, skipped, low_confidence, marked.
+    Runs in three phases: classify every attachment, download all that need
+    uploading in one batched Gmail request, then upload them.  Classification
+    and uploads run on ``executor`` when given (sequentially otherwise).  The
+    email is labelled only after every attachment has finished and none
+    failed.  ``message`` is the already-fetched full message, if any.
+
+    Returns a dict with keys: uploaded, skipped, low_confidence, marked,
+    failed (an upload or folder lookup failed; the email should be retried).
     """
-    metadata = _extract_email_metadata(gc, message_id)
+    metadata = _extract_email_metadata(gc, message_id, message=message)
     logger.info(
         "Processing email: '%s' from %s (%d attachments)",
         metadata.subject,
@@ -155,143 +398,237 @@ def process_email(
         len(metadata.attachments),
     )
 
-    uploaded: list[dict[str, Any]] = []
-    skipped = 0
-    low_confidence: list[dict[str, Any]] = []
-    all_succeeded = True
-
-    for att in metadata.attachments:
-        filename = att["filename"]
-        attachment_id = att["attachment_id"]
-
-        # Classify and match
-        classification = _classify_and_match_site(
-            subject=metadata.subject,
-            body_snippet=metadata.body_snippet,
-            filename=filename,
-            site_records=site_records,
+    claims = upload_claims or UploadClaims()
+
+    def run_all(fn: Callable[[Any], _AttachmentOutcome], items: list[Any]) -> list[_AttachmentOutcome]:
+        if executor is None:
+            return [fn(item) for item in items]
+        # Wait for every attachment before deciding whether to mark the email
+        futures = [executor.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    outcomes = run_all(
+        lambda att: _plan_attachment(
+            gc, metadata, att, site_records, settings, dry_run=dry_run, upload_claims=claims,
+        ),
+        metadata.attachments,
+    )
+
+    pending = [(i, o.pending) for i, o in enumerate(outcomes) if o.pending is not None]
+    if pending:
+        payloads = _download_attachments(gc, message_id, [p for _, p in pending])
+        uploads = run_all(
+            lambda p: _upload_attachment(gc, metadata, p, payloads.get(p.attachment_id), claims),
+            [p for _, p in pending],
         )
+        for (i, _), outcome in zip(pending, uploads, strict=True):
+            outcomes[i] = outcome
 
-        logger.info(
-            "Classification for '%s': doc_type=%s, site=%s, confidence=%.2f — %s",
-            filename,
-            classification.doc_type,
-            classification.matched_site_title,
+    uploaded = [o.uploaded for o in outcomes if o.uploaded is not None]
+    skipped = sum(1 for o in outcomes if o.skipped)
+    low_confidence = [o.low_confidence for o in outcomes if o.low_confidence is not None]
+    all_succeeded = not any(o.failed for o in outcomes)
+
+    # Mark email as processed only if all attachments succeeded
+    marked = False
+    if all_succeeded and not dry_run and (uploaded or skipped == len(metadata.attachments)):
+        _mark_email_processed(gc, message_id, label_id)
+        marked = True
+
+    return {
+        "uploaded": uploaded,
+        "skipped": skipped,
+        "low_confidence": low_confidence,
+        "marked": marked,
+        "failed": not all_succeeded,
+    }
+
+
+def _plan_attachment(
+    gc: GoogleClient,
+    metadata: EmailMetadata,
+    att: dict[str, Any],
+    site_records: list[dict[str, Any]],
+    settings: Settings,
+    *,
+    dry_run: bool,
+    upload_claims: UploadClaims,
+) -> _AttachmentOutcome:
+    """Classify one attachment and match it to a site and Drive destination.
+
+    Returns a final outcome for attachments that will not be uploaded, or a
+    ``pending`` upload whose bytes are fetched in the email's batch download.
+    """
+    filename = att["filename"]
+    attachment_id = att["attachment_id"]
+
+    # Classify and match
+    classification = _classify_and_match_site(
+        subject=metadata.subject,
+        body_snippet=metadata.body_snippet,
+        filename=filename,
+        site_records=site_records,
+    )
+
+    logger.info(
+        "Classification for '%s': doc_type=%s, site=%s, confidence=%.2f — %s",
+        filename,
+        classification.doc_type,
+        classification.matched_site_title,
+        classification.confidence,
+        classification.reasoning,
+    )
+
+    # Skip unknown doc types
+    if classification.doc_type not in SUPPORTED_DOC_TYPES:
+        logger.info("Skipping '%s' — unsupported doc_type: %s", filename, classification.doc_type)
+        return _AttachmentOutcome(skipped=True)
+
+    # Check confidence threshold
+    if classification.confidence < AUTO_FILE_CONFIDENCE:
+        logger.warning(
+            "Low confidence (%.2f) for '%s' — skipping for manual review",
             classification.confidence,
-            classification.reasoning,
+            filename,
         )
-
-        # Skip unknown doc types
-        if classification.doc_type not in SUPPORTED_DOC_TYPES:
-            logger.info("Skipping '%s' — unsupported doc_type: %s", filename, classification.doc_type)
-            skipped += 1
-            continue
-
-        # Check confidence threshold
-        if classification.confidence < AUTO_FILE_CONFIDENCE:
-            logger.warning(
-                "Low confidence (%.2f) for '%s' — skipping for manual review",
-                classification.confidence,
-                filename,
-            )
-            low_confidence.append({
+        return _AttachmentOutcome(
+            skipped=True,
+            low_confidence={
                 "filename": filename,
                 "doc_type": classification.doc_type,
                 "matched_site": classification.matched_site_title,
                 "confidence": classification.confidence,
                 "reasoning": classification.reasoning,
                 "email_subject": metadata.subject,
-            })
-            skipped += 1
-            continue
-
-        # No site match
-        if not classification.matched_site_id or not classification.matched_site_title:
-            logger.warning("No site match for '%s' — skipping", filename)
-            low_confidence.append({
+            },
+        )
+
+    # No site match
+    if not classification.matched_site_id or not classification.matched_site_title:
+        logger.warning("No site match for '%s' — skipping", filename)
+        return _AttachmentOutcome(
+            skipped=True,
+            low_confidence={
                 "filename": filename,
                 "doc_type": classification.doc_type,
                 "matched_site": None,
                 "confidence": classification.confidence,
                 "reasoning": classification.reasoning,
                 "email_subject": metadata.subject,
-            })
-            skipped += 1
-            continue
-
-        # Determine target folder
-        folder_attr = DOC_TYPE_FOLDER_MAP.get(classification.doc_type)
-        if not folder_attr:
-            skipped += 1
-            continue
-        target_folder_id = getattr(settings, folder_attr, "")
-        if not target_folder_id:
-            logger.error("No folder ID configured for %s", classification.doc_type)
-            all_succeeded = False
-            continue
-
-        # Generate filename
-        drive_filename = _generate_drive_filename(
-            classification.matched_site_title, classification.doc_type,
+            },
         )
 
-        if dry_run:
-            logger.info("[DRY RUN] Would upload '%s' to folder %s", drive_filename, target_folder_id)
-            uploaded.append({
-                "original_filename": filename,
-                "drive_filename": drive_filename,
-                "doc_type": classification.doc_type,
-                "site_title": classification.matched_site_title,
-                "matched_site_id": classification.matched_site_id,
-                "dry_run": True,
-            })
-            continue
-
-        # Check for duplicates
-        if gc.file_exists_in_folder(target_folder_id, drive_filename):
-            logger.info("File '%s' already exists in folder — skipping upload", drive_filename)
-            skipped += 1
-            continue
-
-        # Download attachment and upload to Drive
-        try:
-            file_bytes = gc.gmail_get_attachment(message_id, attachment_id)
-            drive_file = gc.upload_file_to_folder(
-                folder_id=target_folder_id,
-                file_name=drive_filename,
-                file_bytes=file_bytes,
-            )
-            uploaded.append({
-                "original_filename": filename,
-                "drive_filename": drive_filename,
-                "doc_type": classification.doc_type,
-                "site_title": classification.matched_site_title,
-                "matched_site_id": classification.matched_site_id,
-                "drive_file_id": drive_file.get("id"),
-                "drive_link": drive_file.get("webViewLink"),
-            })
-            logger.info("Uploaded '%s' -> '%s'", filename, drive_filename)
-        except Exception as e:
-            logger.error("Upload failed for '%s': %s", filename, e)
-            all_succeeded = False
+    # Determine target folder
+    folder_attr = DOC_TYPE_FOLDER_MAP.get(classification.doc_type)
+    if not folder_attr:
+        return _AttachmentOutcome(skipped=True)
+    target_folder_id = getattr(settings, folder_attr, "")
+    if not target_folder_id:
+        logger.error("No folder ID configured for %s", classification.doc_type)
+        return _AttachmentOutcome(failed=True)
+
+    # Generate filename
+    drive_filename = _generate_drive_filename(
+        classification.matched_site_title, classification.doc_type,
+    )
 
-    # Mark email as processed only if all attachments succeeded
-    marked = False
-    if all_succeeded and not dry_run and (uploaded or skipped == len(metadata.attachments)):
-        _mark_email_processed(gc, message_id, label_id)
-        marked = True
+    if dry_run:
+        logger.info("[DRY RUN] Would upload '%s' to folder %s", drive_filename, target_folder_id)
+        return _AttachmentOutcome(uploaded={
+            "original_filename": filename,
+            "drive_filename": drive_filename,
+            "doc_type": classification.doc_type,
+            "site_title": classification.matched_site_title,
+            "matched_site_id": classification.matched_site_id,
+            "dry_run": True,
+        })
 
-    return {
-        "uploaded": uploaded,
-        "skipped": skipped,
-        "low_confidence": low_confidence,
-        "marked": marked,
-    }
+    # Check for duplicates, including uploads still in flight in this scan
+    if not upload_claims.claim(target_folder_id, drive_filename):
+        logger.info("File '%s' is already being uploaded in this scan — skipping", drive_filename)
+        return _AttachmentOutcome(skipped=True)
+    if gc.file_exists_in_folder(target_folder_id, drive_filename):
+        logger.info("File '%s' already exists in folder — skipping upload", drive_filename)
+        return _AttachmentOutcome(skipped=True)
+
+    return _AttachmentOutcome(pending=_PendingUpload(
+        filename=filename,
+        attachment_id=attachment_id,
+        size=int(att.get("size") or 0),
+        classification=classification,
+        target_folder_id=target_folder_id,
+        drive_filename=drive_filename,
+    ))
+
+
+def _download_attachments(
+    gc: GoogleClient, message_id: str, pending: list[_PendingUpload],
+) -> dict[str, bytes | Exception]:
+    """Fetch an email's small attachments in one batched request.
+
+    A batch response holds every attachment in memory at once, so only those
+    up to ``BATCH_ATTACHMENT_MAX_BYTES`` are batched.  Attachments missing
+    from the result (large ones, or all of them if the batch call fails) are
+    streamed individually through a spooled temp file.
+    """
+    small = [p.attachment_id for p in pending if 0 < p.size <= BATCH_ATTACHMENT_MAX_BYTES]
+    if not small:
+        return {}
+    try:
+        return gc.gmail_get_attachments(message_id, small)
+    except Exception as e:
+        logger.warning("Batch attachment download failed for %s: %s", message_id, e)
+        return {}
 
 
-def _extract_email_metadata(gc: GoogleClient, message_id: str) -> EmailMetadata:
-    """Fetch and parse email headers, snippet, and attachment info."""
-    message = gc.gmail_get_message(message_id)
+def _upload_attachment(
+    gc: GoogleClient,
+    metadata: EmailMetadata,
+    pending: _PendingUpload,
+    payload: bytes | Exception | None,
+    upload_claims: UploadClaims,
+) -> _AttachmentOutcome:
+    """Upload one downloaded attachment to its claimed Drive destination."""
+    classification = pending.classification
+    try:
+        if isinstance(payload, Exception):
+            raise payload
+        if isinstance(payload, bytes):
+            drive_file = gc.upload_file_to_folder(
+                folder_id=pending.target_folder_id,
+                file_name=pending.drive_filename,
+                file_bytes=payload,
+            )
+        else:
+            with gc.gmail_download_attachment(metadata.message_id, pending.attachment_id) as fh:
+                drive_file = gc.upload_file_to_folder(
+                    folder_id=pending.target_folder_id,
+                    file_name=pending.drive_filename,
+                    file_bytes=fh,
+                )
+    except Exception as e:
+        logger.error("Upload failed for '%s': %s", pending.filename, e)
+        upload_claims.release(pending.target_folder_id, pending.drive_filename)
+        return _AttachmentOutcome(failed=True)
+
+    logger.info("Uploaded '%s' -> '%s'", pending.filename, pending.drive_filename)
+    return _AttachmentOutcome(uploaded={
+        "original_filename": pending.filename,
+        "drive_filename": pending.drive_filename,
+        "doc_type": classification.doc_type,
+        "site_title": classification.matched_site_title,
+        "matched_site_id": classification.matched_site_id,
+        "drive_file_id": drive_file.get("id"),
+        "drive_link": drive_file.get("webViewLink"),
+    })
+
+
+def _extract_email_metadata(
+    gc: GoogleClient, message_id: str, *, message: dict[str, Any] | None = None,
+) -> EmailMetadata:
+    """Parse email headers, snippet, and attachment info, fetching the message if needed."""
+    if message is None:
+        message = gc.gmail_get_message(message_id)
 
     headers = message.get("payload", {}).get("headers", [])
     header_map: dict[str, str] = {}
@@ -329,6 +666,7 @@ def _walk_parts(part: dict[str, Any], attachments: list[dict[str, Any]]) -> None
             "filename": filename,
             "attachment_id": attachment_id,
             "mime_type": mime_type,
+            "size": int(body.get("size") or 0),
         })
 
     for sub_part in part.get("parts", []):
@@ -359,7 +697,7 @@ def _classify_and_match_site(
         logger.warning("OPENAI_API_KEY not set — falling back to filename classification")
         return _fallback_classify(filename, candidates)
 
-    client = OpenAI(api_key=openai_api_key)
+    client = OpenAI(api_key=openai_api_key, max_retries=0)
 
     system_prompt = (
         "You classify email attachments for an Alpha School due diligence workflow.\n\n"
@@ -399,14 +737,14 @@ def _classify_and_match_site(
     logger.info("Calling OpenAI to classify '%s'", filename)
 
     try:
-        response = client.chat.completions.create(
+        response = call_with_retries("openai", lambda: client.chat.completions.create(
             model="gpt-5.2",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
             response_format={"type": "json_object"},
-        )
+        ))
 
         result_text = response.choices[0].message.content
         if not result_text:
@@ -0,0 +1,337 @@
+"""Process-wide rate governor for upstream APIs.
+
+Each upstream (Wrike, Drive, Docs, Gmail, Anthropic, OpenAI, the pricing API)
+gets one token bucket shared by every thread in the process, so a parallel
+sweep stays under the provider's quota no matter how many site workers are
+running.  Limits come from :class:`config.Settings`
+(``rate_limit_*_per_minute``; Drive, Docs and Gmail fall back to the Google
+limit); a limit of 0 disables throttling.
+
+:func:`call_with_retries` wraps a request: it takes a token, retries 429 and
+5xx responses and dropped connections or timeouts with jittered exponential
+backoff (honouring ``Retry-After``),
+and feeds what it observes back into the bucket — a throttled response halves
+the admission rate and pauses the upstream for every thread, and successes
+recover it gradually towards the configured limit.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import anthropic
+import openai
+import requests
+
+from .config import get_settings
+
+logger = logging.getLogger("[rate_limit]")
+
+UPSTREAMS = ("wrike", "drive", "docs", "gmail", "anthropic", "openai", "pricing")
+
+# Upstreams without their own setting share another's limit
+_LIMIT_FALLBACK = {"drive": "google", "docs": "google", "gmail": "google"}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Failures with no HTTP response at all: a refused or dropped connection or a
+# timeout.  The SDK clients are built with max_retries=0, so these are retried
+# here instead (APITimeoutError is an APIConnectionError).
+TRANSPORT_ERRORS: tuple[type[BaseException], ...] = (
+    ConnectionError,
+    TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+    openai.APIConnectionError,
+    anthropic.APIConnectionError,
+)
+
+# Full-jitter backoff: attempt n sleeps uniform(0, base * 2**n), capped
+BACKOFF_BASE_SECONDS = 1.0
+
+# Admission control: a throttled response multiplies the rate by this, never
+# below MIN_RATE_FRACTION of the configured limit; each success adds back
+# RECOVERY_FRACTION of the limit
+THROTTLE_FACTOR = 0.5
+MIN_RATE_FRACTION = 0.1
+RECOVERY_FRACTION = 0.02
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a token could not be acquired before the timeout."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait.
+
+        A request for more than ``capacity`` (a large Gmail batch on a low
+        limit) could never be met, so it takes a full bucket instead.
+        """
+        tokens = min(tokens, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, *, timeout: float | None = None) -> float:
+        """Block until ``tokens`` are available.  Returns the seconds spent waiting."""
+        if self.try_acquire(tokens) == 0.0:
+            return 0.0
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return time.monotonic() - start
+            if timeout is not None and time.monotonic() - start + wait > timeout:
+                raise RateLimitTimeout(f"Rate limit wait exceeded {timeout:.1f}s")
+            time.sleep(wait)
+
+    def on_throttled(self, retry_after: float | None = None) -> None:
+        """Record a throttled response: slow admission and honour ``Retry-After``.
+
+        The pause applies to every thread sharing the bucket, so workers stop
+        hammering an upstream that has already said no.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.max_rate > 0:
+                self._refill(now)
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * THROTTLE_FACTOR)
+                self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def on_success(self) -> None:
+        """Record a successful response: recover the rate towards the limit."""
+        with self._lock:
+            if self.rate >= self.max_rate:
+                return
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+# (max retries, max backoff seconds), read from settings on first use
+_retry_policy: tuple[int, float] | None = None
+
+
+def _configured_per_minute(upstream: str) -> float:
+    settings = get_settings()
+    name = upstream if hasattr(settings, f"rate_limit_{upstream}_per_minute") else (
+        _LIMIT_FALLBACK.get(upstream, upstream)
+    )
+    return float(getattr(settings, f"rate_limit_{name}_per_minute", 0) or 0)
+
+
+def get_rate_limiter(upstream: str) -> TokenBucket:
+    """Return the shared bucket for ``upstream`` (one of :data:`UPSTREAMS`)."""
+    with _buckets_lock:
+        bucket = _buckets.get(upstream)
+        if bucket is None:
+            per_minute = _configured_per_minute(upstream)
+            # Allow a burst of up to ~5 seconds' worth of requests
+            rate = per_minute / 60.0
+            bucket = TokenBucket(rate, capacity=max(1.0, rate * 5))
+            _buckets[upstream] = bucket
+            logger.debug("Rate limit for %s: %.0f/min", upstream, per_minute)
+        return bucket
+
+
+def throttle(upstream: str, requests: int = 1) -> None:
+    """Wait for ``requests`` slots on ``upstream``, logging noticeable waits."""
+    waited = get_rate_limiter(upstream).acquire(requests)
+    if waited > 1.0:
+        logger.info("Throttled %s request for %.1fs", upstream, waited)
+
+
+@dataclass(frozen=True)
+class RetrySignal:
+    """A retryable response: its HTTP status and any ``Retry-After`` delay.
+
+    ``status`` is 0 for a transport failure that never got a response.
+    """
+
+    status: int
+    retry_after: float | None = None
+
+    @property
+    def throttled(self) -> bool:
+        return self.status in (403, 429)
+
+    def describe(self) -> str:
+        return f"HTTP {self.status}" if self.status else "no response"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` value (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _header(headers: Any, name: str) -> str | None:
+    if not isinstance(headers, Mapping):
+        return None
+    value = headers.get(name, headers.get(name.title()))
+    return str(value) if value is not None else None
+
+
+def _get_retry_policy() -> tuple[int, float]:
+    global _retry_policy
+    with _buckets_lock:
+        if _retry_policy is None:
+            settings = get_settings()
+            _retry_policy = (
+                settings.rate_limit_max_retries, settings.rate_limit_max_backoff_seconds,
+            )
+        return _retry_policy
+
+
+def retry_signal(outcome: Any) -> RetrySignal | None:
+    """Classify a response or exception from any upstream client.
+
+    Understands ``requests.Response``, OpenAI/Anthropic ``APIStatusError``
+    (``status_code`` + ``response.headers``) and googleapiclient ``HttpError``
+    (``resp`` — an httplib2 response with lower-case headers), plus the
+    :data:`TRANSPORT_ERRORS` raised when no response arrived.  Returns None
+    when the outcome is not a retryable failure.
+    """
+    if isinstance(outcome, TRANSPORT_ERRORS):
+        return RetrySignal(0)
+    headers = getattr(outcome, "resp", None)
+    status = getattr(headers, "status", None)
+    if not isinstance(status, int):
+        status = getattr(outcome, "status_code", None)
+        if not isinstance(status, int):
+            return None
+        headers = getattr(outcome, "headers", None)
+        if not isinstance(headers, Mapping):
+            headers = getattr(getattr(outcome, "response", None), "headers", None)
+
+    if status == 403:
+        # Google reports per-user quota as 403 rateLimitExceeded
+        content = getattr(outcome, "content", b"")
+        if not (isinstance(content, bytes) and b"ratelimitexceeded" in content.lower()):
+            return None
+    elif status not in RETRY_STATUSES:
+        return None
+
+    retry_after_ms = _header(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return RetrySignal(status, max(0.0, float(retry_after_ms) / 1000))
+        except ValueError:
+            pass
+    return RetrySignal(status, parse_retry_after(_header(headers, "retry-after")))
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Seconds to sleep before retry ``attempt`` (0-based), with jitter.
+
+    A server-supplied ``Retry-After`` is honoured plus a little jitter so
+    workers released together do not retry in lockstep; otherwise full-jitter
+    exponential backoff.  Capped at ``rate_limit_max_backoff_seconds``.
+    """
+    cap = _get_retry_policy()[1]
+    if retry_after is not None:
+        return min(cap, retry_after + random.uniform(0, BACKOFF_BASE_SECONDS / 2))
+    return random.uniform(0, min(cap, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def call_with_retries(
+    upstream: str,
+    send: Callable[[], Any],
+    *,
+    requests: int = 1,
+    idempotent: bool = True,
+) -> Any:
+    """Run ``send`` under ``upstream``'s rate limit, retrying throttled and 5xx replies.
+
+    ``send`` may raise (Google, OpenAI, Anthropic clients) or return an error
+    response (``requests``); both are classified by :func:`retry_signal`.
+    429s are always retried; 5xx and transport failures only when
+    ``idempotent``, since the request may have been applied.  When retries run out the last exception is
+    re-raised, or the last response returned for the caller to handle.
+    """
+    bucket = get_rate_limiter(upstream)
+    max_retries = _get_retry_policy()[0]
+    attempt = 0
+    while True:
+        throttle(upstream, requests)
+        error: Exception | None = None
+        result: Any = None
+        try:
+            result = send()
+            signal = retry_signal(result)
+        except Exception as exc:
+            error = exc
+            signal = retry_signal(exc)
+            if signal is None:
+                raise
+
+        if signal is None:
+            bucket.on_success()
+            return result
+        if signal.throttled:
+            bucket.on_throttled(signal.retry_after)
+
+        if attempt >= max_retries or not (signal.throttled or idempotent):
+            if error is not None:
+                raise error
+            return result
+
+        delay = backoff_delay(attempt, signal.retry_after)
+        attempt += 1
+        logger.warning(
+            "%s request failed (%s); retry %d/%d in %.1fs",
+            upstream, signal.describe(), attempt, max_retries, delay,
+        )
+        time.sleep(delay)
+
+
+def reset_rate_limiters() -> None:
+    """Drop all buckets so the next use re-reads limits from settings."""
+    global _retry_policy
+    with _buckets_lock:
+        _buckets.clear()
+        _retry_policy = None
@@ -6,19 +6,32 @@ and the 15-minute inbox scanner can trigger report generation for a single site.
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import logging
 import os
+import re
+import threading
 import time
-from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from types import SimpleNamespace
 from typing import Any
 
 import anthropic
+from anthropic.types import CacheControlEphemeralParam
 
+from .agent_checkpoint import AgentCheckpoint, get_agent_checkpoint_store, input_fingerprint
 from .config import Settings, get_settings
 from .google_client import GoogleClient
-from .classifier import classify_document, match_file_to_site_llm
+from .rate_limit import call_with_retries
+from .shared_folders import get_shared_folder_store
+from .shared_index import SharedFolderIndex
+from .text_cache import file_version
+from .classifier import classify_documents_batch, match_file_to_site_llm
 from .server import (
     _build_site_match_terms,
     _classify_document_type,
@@ -193,8 +206,22 @@ TOOL_DEFINITIONS: list[dict[str, Any]] = [
             "required": ["site_name", "report_url", "key_findings"],
         },
     },
+    {
+        "name": "recall_tool_result",
+        "description": "Re-read the full output of an earlier tool call whose result was compacted to save context (compacted results carry a recall_id). Only needed when the summary and preview are not enough.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "recall_id": {"type": "string", "description": "recall_id from the compacted tool result"},
+            },
+            "required": ["recall_id"],
+        },
+    },
 ]
 
+# Answered by the agent loop from its own context, not routed to the server
+RECALL_TOOL = "recall_tool_result"
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Tool router — calls the actual Python functions from the MCP server
@@ -226,11 +253,230 @@ async def route_tool_call(tool_name: str, tool_input: dict[str, Any]) -> Any:
     return await fn(**tool_input)
 
 
+_thread_loops = threading.local()
+
+
+def _thread_event_loop() -> asyncio.AbstractEventLoop:
+    """Return this thread's persistent event loop, creating it on first use."""
+    loop: asyncio.AbstractEventLoop | None = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_loops.loop = loop
+    return loop
+
+
 def route_tool_call_sync(tool_name: str, tool_input: dict[str, Any]) -> Any:
-    """Synchronous wrapper for route_tool_call."""
-    import asyncio
+    """Synchronous wrapper for route_tool_call.
+
+    Drives the coroutine on the calling thread's persistent event loop rather
+    than creating and tearing down a new loop per call.
+    """
+    return _thread_event_loop().run_until_complete(route_tool_call(tool_name, tool_input))
+
+
+# Tools with side effects, or that read what those side effects produce.  They
+# act as barriers: everything issued before them finishes first, and nothing
+# issued after them starts until they are done.
+SERIAL_TOOLS: frozenset[str] = frozenset({
+    "create_dd_report",
+    "check_report_completeness",
+    "send_dd_report_email",
+})
+
+# Tools that create Drive documents or send mail (the skills auto-publish
+# their assessments).  A streamed turn may still be retried, so they are
+# never started before the turn's response is complete.
+SIDE_EFFECT_TOOLS: frozenset[str] = frozenset({
+    "apply_e_occupancy_skill",
+    "apply_school_approval_skill",
+    "save_skill_report",
+    "create_dd_report",
+    "send_dd_report_email",
+})
+
+
+@dataclass
+class ToolOutcome:
+    """Result of executing one tool_use block."""
+
+    result: Any
+    duration_ms: int
+    finished_at: str
+    error: str | None = None
+
+
+class ToolExecutor:
+    """Executes the tool calls of one agent turn concurrently.
+
+    A single persistent event loop (on a background thread) schedules each
+    turn's calls under a bounded semaphore.  The MCP tool coroutines block on
+    synchronous HTTP, so each call runs on a worker thread that drives it with
+    that thread's own persistent loop.  Outcomes are returned in the order the
+    calls were issued.
+    """
+
+    def __init__(self, max_concurrency: int = 4, *, max_workers: int | None = None) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        # Several agent runs may share one executor (parallel sweep); the pool
+        # is sized for all of them while each turn keeps its own bound.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(self.max_concurrency, max_workers or 0),
+            thread_name_prefix="dd-tool",
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="dd-tool-loop", daemon=True,
+        )
+        self._thread.start()
+
+    def run_batch(self, calls: list[tuple[str, dict[str, Any]]]) -> list[ToolOutcome]:
+        """Execute ``(tool_name, tool_input)`` calls; blocks until all finish."""
+        batch = self.batch()
+        for tool_name, tool_input in calls:
+            batch.submit(tool_name, tool_input)
+        return batch.finish()
+
+    def batch(
+        self,
+        cancel: threading.Event | None = None,
+        on_done: Callable[[int, str, ToolOutcome], None] | None = None,
+    ) -> ToolBatch:
+        """Start an empty batch whose calls begin as soon as they are submitted.
+
+        Once ``cancel`` is set, :data:`SIDE_EFFECT_TOOLS` calls that have not
+        started yet are answered with an error instead of being run.
+        ``on_done(index, tool_name, outcome)`` is called on the worker thread
+        as each executed call finishes, before the batch does.
+        """
+        return ToolBatch(self, cancel, on_done)
+
+    def close(self) -> None:
+        """Stop the scheduling loop and worker threads."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=True)
+        self._loop.close()
+
+    async def _run_batch(
+        self,
+        queue: asyncio.Queue[tuple[str, dict[str, Any]] | None],
+        cancel: threading.Event | None = None,
+        on_done: Callable[[int, str, ToolOutcome], None] | None = None,
+    ) -> list[ToolOutcome]:
+        """Run calls from ``queue`` as they arrive, until a ``None`` ends the batch."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes: list[ToolOutcome | None] = []
+        pending: list[asyncio.Task[None]] = []
+
+        def execute(index: int, tool_name: str, tool_input: dict[str, Any]) -> ToolOutcome:
+            outcome = _execute_tool(tool_name, tool_input)
+            if on_done is not None:
+                on_done(index, tool_name, outcome)
+            return outcome
+
+        async def run_one(index: int, tool_name: str, tool_input: dict[str, Any]) -> None:
+            async with semaphore:
+                if cancel is not None and cancel.is_set() and tool_name in SIDE_EFFECT_TOOLS:
+                    outcomes[index] = _cancelled_tool(tool_name)
+                    return
+                outcomes[index] = await self._loop.run_in_executor(
+                    self._pool, execute, index, tool_name, tool_input,
+                )
+
+        while (call := await queue.get()) is not None:
+            tool_name, tool_input = call
+            index = len(outcomes)
+            outcomes.append(None)
+            if tool_name in SERIAL_TOOLS:
+                if pending:
+                    await asyncio.gather(*pending)
+                    pending = []
+                await run_one(index, tool_name, tool_input)
+            else:
+                pending.append(asyncio.ensure_future(run_one(index, tool_name, tool_input)))
+        if pending:
+            await asyncio.gather(*pending)
+
+        finished = [o for o in outcomes if o is not None]
+        if len(finished) != len(outcomes):
+            raise RuntimeError("Tool batch finished with missing outcomes")
+        return finished
+
+
+class ToolBatch:
+    """One turn's tool calls, each started as soon as it is submitted.
+
+    Lets the agent loop dispatch a ``tool_use`` block while the rest of the
+    model's turn is still streaming.  :data:`SERIAL_TOOLS` keep their barrier
+    semantics in submission order; outcomes come back in that order too.
+    """
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        cancel: threading.Event | None = None,
+        on_done: Callable[[int, str, ToolOutcome], None] | None = None,
+    ) -> None:
+        self._loop = executor._loop
+        self._queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+        self._future = asyncio.run_coroutine_threadsafe(
+            executor._run_batch(self._queue, cancel, on_done), self._loop,
+        )
+        self.size = 0
 
-    return asyncio.run(route_tool_call(tool_name, tool_input))
+    def submit(self, tool_name: str, tool_input: dict[str, Any]) -> None:
+        """Start a call (after any earlier serial tool finishes)."""
+        self.size += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (tool_name, tool_input))
+
+    def finish(self) -> list[ToolOutcome]:
+        """Close the batch and block until every submitted call is done."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        return self._future.result()
+
+
+def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> ToolOutcome:
+    """Run one tool on the current worker thread, capturing timing and errors."""
+    logger.info("Executing tool: %s", tool_name)
+    t0 = time.monotonic()
+    tool_error: str | None = None
+    try:
+        result = route_tool_call_sync(tool_name, tool_input)
+    except Exception as e:
+        logger.error("Tool %s failed: %s", tool_name, e)
+        result = {"status": "error", "message": str(e)}
+        tool_error = str(e)
+    return ToolOutcome(
+        result=result,
+        duration_ms=int((time.monotonic() - t0) * 1000),
+        finished_at=datetime.now(UTC).isoformat(),
+        error=tool_error,
+    )
+
+
+def _cancelled_tool(tool_name: str) -> ToolOutcome:
+    """Outcome of a side-effecting call skipped because its run was cancelled."""
+    logger.warning("Skipping %s: the run was cancelled", tool_name)
+    message = "Run cancelled (site timed out); no document was created or sent"
+    return ToolOutcome(
+        result={"status": "error", "message": message},
+        duration_ms=0,
+        finished_at=datetime.now(UTC).isoformat(),
+        error=message,
+    )
+
+
+_tool_executor: ToolExecutor | None = None
+_tool_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Return the process-wide ToolExecutor, sized from settings."""
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ToolExecutor(get_settings().agent_tool_concurrency)
+        return _tool_executor
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -241,27 +487,15 @@ def route_tool_call_sync(tool_name: str, tool_input: dict[str, Any]) -> Any:
 def list_shared_folders_once(
     gc: GoogleClient,
 ) -> dict[str, list[dict[str, Any]]]:
-    """List files in the three shared Drive folders once (cached per run).
+    """Return the files in the three shared Drive folders (once per run).
 
-    Returns {"sir": [...], "isp": [...], "building_inspection": [...]}.
+    Returns {"sir": [...], "isp": [...], "building_inspection": [...]} as a
+    :class:`SharedFolderCache`, which builds its filename index on first use
+    so every site in the run is matched against the same prebuilt postings.
+    The listing comes from the persistent :class:`SharedFolderStore`, so only
+    Drive changes since the previous run are fetched.
     """
-    settings = get_settings()
-    folder_map = {
-        "sir": settings.sir_folder_id,
-        "isp": settings.isp_folder_id,
-        "building_inspection": settings.building_inspection_folder_id,
-    }
-    result: dict[str, list[dict[str, Any]]] = {}
-    for doc_type, folder_id in folder_map.items():
-        if not folder_id:
-            result[doc_type] = []
-            continue
-        try:
-            result[doc_type] = gc.list_files_in_folder(folder_id)
-        except Exception as e:
-            logger.warning("Failed to list shared %s folder (%s): %s", doc_type, folder_id, e)
-            result[doc_type] = []
-    return result
+    return get_shared_folder_store().refresh(gc)
 
 
 def match_site_in_shared_cache(
@@ -273,30 +507,20 @@ def match_site_in_shared_cache(
 ) -> dict[str, dict[str, Any] | None]:
     """Find docs matching any of *match_terms* in the pre-fetched shared folder file lists.
 
-    Pass 1: substring match (free).
+    Pass 1: filename index lookup, preferring PDFs (free).
     Pass 2: LLM site-match for missing doc types (when *site_title* is provided).
     """
-    needles = [t.lower() for t in match_terms if t]
-    result: dict[str, dict[str, Any] | None] = {
-        "sir": None,
-        "isp": None,
-        "building_inspection": None,
-    }
+    index = SharedFolderIndex.of(shared_cache)
 
-    # Pass 1: substring match
-    for doc_type, files in shared_cache.items():
-        for f in files:
-            fname = f.get("name", "").lower()
-            if any(needle in fname for needle in needles):
-                result[doc_type] = {**f, "doc_type": doc_type}
-                break
+    # Pass 1: indexed term match
+    result = index.match(match_terms)
 
     # Pass 2: LLM fallback for missing doc types
     if site_title:
         for doc_type in ["sir", "isp", "building_inspection"]:
             if result[doc_type] is not None:
                 continue
-            files = shared_cache.get(doc_type, [])
+            files = index.files(doc_type)
             if not files:
                 continue
             filenames = [f.get("name", "") for f in files if f.get("name")]
@@ -368,22 +592,16 @@ def check_site_readiness_direct(
     ]
     if still_missing:
         unknown_files = [f for f in all_site_files if f.get("doc_type") == "unknown"]
-        for f in unknown_files:
-            fname = f.get("name", "")
-            fid = f.get("id")
-            doc_type, conf = classify_document(
-                fname, file_id=fid, gc=gc, site_name=site_title,
+        batch = classify_documents_batch(
+            unknown_files, still_missing, gc=gc, site_name=site_title,
+        )
+        for doc_type, verdict in batch.resolved.items():
+            verdict.file["doc_type"] = doc_type
+            files_by_type[doc_type] = verdict.file
+            logger.info(
+                "LLM classified '%s' as %s (%s, conf=%.2f) for '%s'",
+                verdict.name, doc_type, verdict.tier, verdict.confidence, site_title,
             )
-            if doc_type in still_missing and files_by_type.get(doc_type) is None:
-                f["doc_type"] = doc_type
-                files_by_type[doc_type] = f
-                still_missing.remove(doc_type)
-                logger.info(
-                    "LLM classified '%s' as %s (conf=%.2f) for '%s'",
-                    fname, doc_type, conf, site_title,
-                )
-            if not still_missing:
-                break
 
     return {
         "sir_found": files_by_type["sir"] is not None,
@@ -391,101 +609,591 @@ def check_site_readiness_direct(
         "inspection_found": files_by_type["building_inspection"] is not None,
         "report_exists": files_by_type["dd_report"] is not None,
         "all_files": all_site_files,
+        "files_by_type": files_by_type,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pre-fetch stage — site context bundle handed to the agent
+# ─────────────────────────────────────────────────────────────────────────────
+
+PREFETCH_DOC_TYPES = ("sir", "isp", "building_inspection")
+
+_STATE_SEGMENT_RE = re.compile(r"^([A-Z]{2})(?:\s+\d{5}(?:-\d{4})?)?$")
+
+
+def _state_from_address(address: str | None) -> str | None:
+    """Two-letter state code from a "..., City, TX 75001" address, if present."""
+    for segment in reversed((address or "").split(",")):
+        match = _STATE_SEGMENT_RE.match(segment.strip())
+        if match:
+            return match.group(1)
+    return None
+
+
+@dataclass
+class SiteContextBundle:
+    """Facts gathered for a site before the agent starts.
+
+    ``data`` (the matched files and the site's state) goes in the agent's
+    first message.  ``tool_calls`` are the pre-fetch calls as
+    ``[tool_use_id, tool_name, input, result]``; they are handed to the agent
+    as a tool turn of its own, so their results (the document texts above
+    all) are compacted by :class:`AgentContextBudget` like any other.
+    ``events`` are the same calls, recorded in the report trace.
+    """
+
+    data: dict[str, Any]
+    tool_calls: list[list[Any]] = field(default_factory=list)
+    events: list[TraceEvent] = field(default_factory=list)
+
+    def prompt(self, site_title: str) -> str:
+        """The agent's opening message with the bundle's facts attached."""
+        return (
+            f"Generate a DD Report for: {site_title}\n\n"
+            "Steps 1-2.5 and Step 4 were pre-fetched: the tool calls already made for "
+            "you follow this message. Use their results directly: do not call "
+            "get_site_record, list_drive_documents, get_site_comments, or "
+            "read_drive_document for a document already read, unless its result has "
+            "status \"error\".\n\n"
+            f"<site_context>\n{json.dumps(self.data, indent=1)}\n</site_context>"
+        )
+
+
+def _prefetch_turn(
+    context: AgentContextBudget, tool_calls: list[list[Any]],
+) -> list[dict[str, Any]]:
+    """Pre-fetched calls as an assistant ``tool_use`` turn and its ``tool_result`` reply."""
+    return [
+        {"role": "assistant", "content": [
+            {"type": "tool_use", "id": tool_use_id, "name": name, "input": tool_input}
+            for tool_use_id, name, tool_input, _ in tool_calls
+        ]},
+        {"role": "user", "content": [
+            context.result_block(tool_use_id, name, result)
+            for tool_use_id, name, _, result in tool_calls
+        ]},
+    ]
+
+
+def prefetch_site_context(
+    site_title: str,
+    drive_folder_url: str,
+    files_by_type: dict[str, dict[str, Any] | None],
+    *,
+    site_address: str | None = None,
+    tool_executor: ToolExecutor | None = None,
+) -> SiteContextBundle:
+    """Gather the site record, comments and document texts concurrently.
+
+    Runs the same read-only tools the agent would call one turn at a time, as
+    a single concurrent batch on the agent's :class:`ToolExecutor`.  The
+    school approval skill publishes a Doc, so it is left to the agent, where
+    cancellation and the run checkpoint cover it.
+    """
+    executor = tool_executor or get_tool_executor()
+    calls: list[tuple[str, str, dict[str, Any]]] = [
+        ("site_record", "get_site_record", {"site_name_or_id": site_title}),
+        ("comments", "get_site_comments", {"site_name_or_id": site_title}),
+    ]
+    for doc_type in PREFETCH_DOC_TYPES:
+        f = files_by_type.get(doc_type)
+        if f and f.get("id"):
+            calls.append((doc_type, "read_drive_document", {
+                "file_id": f["id"], "file_name": f.get("name", ""),
+            }))
+
+    t0 = time.monotonic()
+    outcomes = executor.run_batch([(name, args) for _, name, args in calls])
+
+    data: dict[str, Any] = {
+        "drive_folder_url": drive_folder_url,
+        "files": {
+            doc_type: {k: f.get(k) for k in ("id", "name", "mimeType", "webViewLink", "doc_type")}
+            for doc_type, f in files_by_type.items() if f
+        },
     }
+    state = _state_from_address(site_address)
+    if state:
+        data["state"] = state
+    bundle = SiteContextBundle(data)
+    for i, ((key, name, args), outcome) in enumerate(zip(calls, outcomes, strict=True)):
+        bundle.tool_calls.append([f"prefetch_{i}_{key}", name, args, outcome.result])
+        bundle.events.append(TraceEvent(
+            timestamp=outcome.finished_at,
+            event_type="prefetch",
+            tool_name=name,
+            input_summary=_sanitize_input(args),
+            output_summary=_summarize_tool_output(outcome.result),
+            duration_ms=outcome.duration_ms,
+            error=outcome.error,
+        ))
+    logger.info(
+        "Pre-fetched %d context items for '%s' in %d ms",
+        len(calls), site_title, int((time.monotonic() - t0) * 1000),
+    )
+    return bundle
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Claude agentic loop — generates one DD report
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Prompt caching: the cached prefix runs tools → system → messages, so
+# breakpoints on the last tool, the system prompt and the newest message
+# let every iteration reuse everything sent before it.
+_CACHE_CONTROL: CacheControlEphemeralParam = {"type": "ephemeral"}
+
+_AGENT_MODEL = "claude-sonnet-4-6"
+
+_CACHED_TOOL_DEFINITIONS: list[dict[str, Any]] = [
+    *TOOL_DEFINITIONS[:-1],
+    {**TOOL_DEFINITIONS[-1], "cache_control": _CACHE_CONTROL},
+]
+
+
+def _with_cache_breakpoint(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Messages to send, with a cache breakpoint on the newest message's last block.
+
+    The stored conversation is left unmarked, so only one message breakpoint
+    is ever sent (the API allows four in total).
+    """
+    last = messages[-1]
+    content = last["content"]
+    blocks = [{"type": "text", "text": content}] if isinstance(content, str) else list(content)
+    blocks[-1] = {**blocks[-1], "cache_control": _CACHE_CONTROL}
+    return [*messages[:-1], {**last, "content": blocks}]
+
+
+class _ToolDispatch:
+    """Starts a turn's tool calls, as early as the response allows.
+
+    With a streamed response, each ``tool_use`` block is dispatched as soon
+    as it is complete, while the model is still generating the rest of the
+    turn.  Calls from the first serial tool onward wait for the complete
+    message, so barrier order is unchanged, and so do :data:`SIDE_EFFECT_TOOLS`:
+    a stream that fails is retried and regenerates its blocks, and only
+    read-only calls may run twice.  Recalls are answered by the loop and
+    never dispatched.
+
+    ``on_effect(tool_use_id, outcome)`` is called as each side-effecting call
+    finishes, and calls already answered in ``done`` (a resumed turn) are not
+    run again.
+    """
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        started: float,
+        cancel: threading.Event | None = None,
+        *,
+        on_effect: Callable[[str, ToolOutcome], None] | None = None,
+        done: dict[str, ToolOutcome] | None = None,
+    ) -> None:
+        self.batch = executor.batch(cancel, self._on_done if on_effect is not None else None)
+        self.started = started
+        self.dispatched: list[str] = []  # tool_use IDs, in submission order
+        self.done = dict(done or {})
+        self.early = 0  # dispatched before the response was complete
+        self.first_tool_ms: int | None = None
+        self._on_effect = on_effect
+        self._held = False
+
+    def on_block(self, block: Any) -> None:
+        """A content block finished streaming."""
+        if block.type != "tool_use" or block.name == RECALL_TOOL:
+            return
+        if self._held or block.name in SERIAL_TOOLS:
+            self._held = True
+            return
+        if block.name in SIDE_EFFECT_TOOLS:
+            return
+        self._submit(block)
+        self.early += 1
+
+    def finish(self, tool_uses: list[Any]) -> dict[str, ToolOutcome]:
+        """Dispatch the remaining calls and wait for all; outcomes by tool_use ID."""
+        for tool_use in tool_uses:
+            if tool_use.name == RECALL_TOOL or tool_use.id in self.done:
+                continue
+            if tool_use.id not in self.dispatched:
+                self._submit(tool_use)
+        return {**self.done, **dict(zip(self.dispatched, self.batch.finish(), strict=True))}
+
+    def _submit(self, tool_use: Any) -> None:
+        if self.first_tool_ms is None:
+            self.first_tool_ms = int((time.monotonic() - self.started) * 1000)
+        self.dispatched.append(tool_use.id)
+        self.batch.submit(tool_use.name, tool_use.input)
+
+    def _on_done(self, index: int, tool_name: str, outcome: ToolOutcome) -> None:
+        if self._on_effect is not None and tool_name in SIDE_EFFECT_TOOLS:
+            self._on_effect(self.dispatched[index], outcome)
+
+
+def _streamed_turn(
+    client: anthropic.Anthropic,
+    request: dict[str, Any],
+    executor: ToolExecutor,
+    started: float,
+    cancel: threading.Event | None = None,
+    on_effect: Callable[[str, ToolOutcome], None] | None = None,
+) -> tuple[Any, _ToolDispatch]:
+    """Stream one model turn, dispatching tool calls as their blocks complete."""
+    dispatch = _ToolDispatch(executor, started, cancel, on_effect=on_effect)
+    try:
+        with client.messages.stream(**request) as stream:
+            for event in stream:
+                if event.type == "content_block_stop":
+                    dispatch.on_block(event.content_block)
+            return stream.get_final_message(), dispatch
+    except Exception:
+        # Let calls already started finish; a retried turn dispatches afresh
+        dispatch.finish([])
+        raise
+
+
+def _content_param(block: Any) -> dict[str, Any]:
+    """A response content block as a plain dict, to send back and checkpoint."""
+    if block.type == "text":
+        return {"type": "text", "text": block.text}
+    if block.type == "tool_use":
+        return {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+    return dict(block.model_dump(exclude_none=True))
+
+
+def _record_effect(checkpoint: AgentCheckpoint, tool_use_id: str, outcome: ToolOutcome) -> None:
+    """Checkpoint a side-effecting tool result the moment it finishes."""
+    checkpoint.record_effect(tool_use_id, asdict(outcome))
+
+
+def agent_checkpoint_for(
+    site_title: str,
+    system_prompt: str,
+    files_by_type: dict[str, dict[str, Any] | None],
+) -> AgentCheckpoint | None:
+    """The site's agent checkpoint for these inputs, if checkpoints are enabled.
+
+    The fingerprint covers the prompt, model, tool definitions and the
+    matched documents' IDs and versions; any change starts a fresh run.
+    """
+    fingerprint = input_fingerprint(
+        site_title, system_prompt, _AGENT_MODEL, TOOL_DEFINITIONS,
+        {t: [f.get("id"), file_version(f)] for t, f in sorted(files_by_type.items()) if f},
+    )
+    return get_agent_checkpoint_store().open(site_title, fingerprint)
+
+
+class AgentContextBudget:
+    """Keeps the tool results resent on every agent iteration within a budget.
+
+    Every tool result is kept in full here.  While the results in the
+    conversation fit the budget they are left untouched (so the cached prompt
+    prefix stays valid); once they exceed it, every large result before the
+    newest turn is replaced at once by a compact summary, a preview and a
+    ``recall_id`` the agent can pass to ``recall_tool_result``.
+    """
+
+    # Rough characters per token for JSON tool output
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, budget_tokens: int, compact_over_chars: int) -> None:
+        self.budget_chars = budget_tokens * self.CHARS_PER_TOKEN
+        self.compact_over_chars = compact_over_chars
+        self._full: dict[str, str] = {}
+        self._summaries: dict[str, tuple[str, dict[str, Any]]] = {}
+        self._compacted: set[str] = set()
+        self._removed_chars = 0  # taken out of the conversation so far
+        self.compactions = 0
+        self.recalls = 0
+        self.tokens_saved = 0
+        self.compaction_ms = 0
+
+    def result_block(self, tool_use_id: str, tool_name: str, result: Any) -> dict[str, Any]:
+        """The ``tool_result`` block for a tool's output (recalled text passes through)."""
+        if tool_name == RECALL_TOOL and isinstance(result, str):
+            content = result
+        else:
+            content = json.dumps(result)
+            self._summaries[tool_use_id] = (tool_name, _summarize_tool_output(result))
+        self._full[tool_use_id] = content
+        return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content}
+
+    def recall(self, tool_input: dict[str, Any]) -> ToolOutcome:
+        """Outcome of a ``recall_tool_result`` call."""
+        recall_id = str(tool_input.get("recall_id", ""))
+        content = self._full.get(recall_id)
+        self.recalls += 1
+        return ToolOutcome(
+            result=content if content is not None else {
+                "status": "error", "message": f"No stored tool result for recall_id {recall_id!r}",
+            },
+            duration_ms=0,
+            finished_at=datetime.now(UTC).isoformat(),
+        )
+
+    def before_call(self, messages: list[dict[str, Any]]) -> None:
+        """Compact older results if the conversation is over budget; count the savings."""
+        older: list[dict[str, Any]] = []
+        total = 0
+        for i, message in enumerate(messages):
+            if message["role"] != "user" or not isinstance(message["content"], list):
+                continue
+            for block in message["content"]:
+                if isinstance(block, dict) and block.get("type") == "tool_result":
+                    total += len(block["content"])
+                    if i < len(messages) - 1:
+                        older.append(block)
+
+        if total > self.budget_chars:
+            t0 = time.monotonic()
+            removed = 0
+            for block in older:
+                tool_use_id = block["tool_use_id"]
+                content = block["content"]
+                if tool_use_id in self._compacted or len(content) <= self.compact_over_chars:
+                    continue
+                tool_name, summary = self._summaries.get(tool_use_id, (RECALL_TOOL, {}))
+                block["content"] = json.dumps({
+                    "compacted": True,
+                    "recall_id": tool_use_id,
+                    "tool": tool_name,
+                    "original_chars": len(content),
+                    "summary": summary,
+                    "preview": content[: self.compact_over_chars // 2],
+                })
+                self._compacted.add(tool_use_id)
+                removed += len(content) - len(block["content"])
+            if removed:
+                self.compactions += 1
+                self._removed_chars += removed
+                logger.info(
+                    "Compacted agent context: %d chars of tool results over a %d budget, %d removed",
+                    total, self.budget_chars, removed,
+                )
+            self.compaction_ms += int((time.monotonic() - t0) * 1000)
+
+        self.tokens_saved += self._removed_chars // self.CHARS_PER_TOKEN
+
 
 def run_dd_report_agent(
     site_title: str,
     system_prompt: str,
+    *,
+    tool_executor: ToolExecutor | None = None,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+    context_bundle: SiteContextBundle | None = None,
+    checkpoint: AgentCheckpoint | None = None,
 ) -> dict[str, Any]:
     """Run Claude as a tool-calling agent to generate one DD report.
 
+    Independent tool calls issued in the same turn run concurrently through
+    a :class:`ToolExecutor`; ``tool_results`` keep the order Claude issued them.
+    With ``agent_streaming`` set, each turn is streamed and its tool calls
+    start as their blocks complete, overlapping the rest of the generation.
+
     Args:
         site_title: Site name to generate the report for.
         system_prompt: Full system prompt text.
-
-    Returns a dict with keys: success, doc_id, doc_url, error.
+        tool_executor: Executor for tool calls (defaults to the shared one).
+        deadline: ``time.monotonic()`` value after which no further agent
+            iteration is started.
+        cancel: Set by the caller to abandon the run.  No further iteration
+            is started, and a report, skill assessment or email not yet
+            under way is skipped.
+        context_bundle: Pre-fetched site context from
+            :func:`prefetch_site_context`, given to the agent up front.
+        checkpoint: Where each completed turn, and each side-effecting tool
+            result as it finishes, is recorded (see
+            :func:`agent_checkpoint_for`).  If it holds turns from an
+            interrupted run, the conversation resumes after the last one and
+            ``context_bundle`` is not used; a turn cut short while its tools
+            ran is completed without re-running the side effects it recorded.
+
+    Returns a dict with keys: success, doc_id, doc_url, completeness, error.
     """
     anthropic_api_key = os.getenv("ANTHROPIC_API_KEY", "")
     if not anthropic_api_key:
         return {"success": False, "error": "ANTHROPIC_API_KEY not set"}
 
-    client = anthropic.Anthropic(api_key=anthropic_api_key)
+    # Retries are handled by the shared governor, not the SDK
+    client = anthropic.Anthropic(api_key=anthropic_api_key, max_retries=0)
+    executor = tool_executor or get_tool_executor()
+    settings = get_settings()
+    context = AgentContextBudget(
+        settings.agent_context_budget_tokens, settings.agent_compact_result_chars,
+    )
 
     # Initialize provenance trace
     trace = ReportTrace(
         site_name=site_title,
-        started_at=datetime.now(timezone.utc).isoformat(),
+        started_at=datetime.now(UTC).isoformat(),
         prompt_version=2,
     )
     run_start = time.monotonic()
 
-    messages: list[dict[str, Any]] = [
-        {"role": "user", "content": f"Generate a DD Report for: {site_title}"},
-    ]
+    messages: list[dict[str, Any]]
+    if checkpoint is not None and checkpoint.resumable:
+        # Replay the interrupted run's completed turns
+        assert checkpoint.header is not None
+        messages = [{"role": "user", "content": checkpoint.header["opening"]}]
+        if checkpoint.header.get("prefetched"):
+            messages.extend(_prefetch_turn(context, checkpoint.header["prefetched"]))
+        for event_data in checkpoint.header.get("events", []):
+            trace.add_event(TraceEvent(**event_data))
+        for turn in checkpoint.turns:
+            messages.append({"role": "assistant", "content": turn["assistant"]})
+            messages.append({"role": "user", "content": [
+                context.result_block(tool_use_id, tool_name, result)
+                for tool_use_id, tool_name, result in turn["results"]
+            ]})
+            for event_data in turn["events"]:
+                trace.add_event(TraceEvent(**event_data))
+            trace.record_usage(turn["usage"], turn["llm_duration_ms"])
+            if turn.get("timing"):
+                trace.iterations.append(turn["timing"])
+        trace.resumed_turns = len(checkpoint.turns)
+        resume_turn = checkpoint.pending
+        resume_done = {
+            tool_use_id: ToolOutcome(**outcome)
+            for tool_use_id, outcome in checkpoint.effects.items()
+        }
+    else:
+        opening = f"Generate a DD Report for: {site_title}"
+        prefetch_events: list[TraceEvent] = []
+        prefetched: list[list[Any]] = []
+        if context_bundle is not None:
+            opening = context_bundle.prompt(site_title)
+            prefetch_events = context_bundle.events
+            prefetched = context_bundle.tool_calls
+        for event in prefetch_events:
+            trace.add_event(event)
+        messages = [{"role": "user", "content": opening}]
+        if prefetched:
+            messages.extend(_prefetch_turn(context, prefetched))
+        if checkpoint is not None:
+            checkpoint.start(opening, [asdict(e) for e in prefetch_events], prefetched)
+        resume_turn = None
+        resume_done = {}
+
+    on_effect = (
+        functools.partial(_record_effect, checkpoint) if checkpoint is not None else None
+    )
 
     doc_id: str | None = None
     doc_url: str | None = None
+    completeness: dict[str, Any] | None = None
     max_iterations = 40  # Safety limit
 
-    for iteration in range(max_iterations):
-        logger.info("Agent iteration %d for site: %s", iteration + 1, site_title)
+    timed_out = False
 
-        response = client.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=8192,
-            system=system_prompt,
-            tools=TOOL_DEFINITIONS,
-            messages=messages,
-        )
+    for iteration in range(trace.resumed_turns, max_iterations):
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning("Agent deadline reached for '%s' after %d iterations", site_title, iteration)
+            timed_out = True
+            break
+        if cancel is not None and cancel.is_set():
+            logger.warning("Agent run for '%s' cancelled after %d iterations", site_title, iteration)
+            timed_out = True
+            break
 
-        # Collect assistant message
-        assistant_content: list[Any] = []
-        tool_uses: list[Any] = []
+        logger.info("Agent iteration %d for site: %s", iteration + 1, site_title)
 
-        for block in response.content:
-            assistant_content.append(block)
-            if block.type == "tool_use":
-                tool_uses.append(block)
+        call_start = time.monotonic()
+        assistant_content: list[dict[str, Any]] = []
+        tool_uses: list[Any] = []
+        usage: Any
+        if resume_turn is not None:
+            # Complete the interrupted turn from its record, without asking again
+            assistant_content = resume_turn["assistant"]
+            tool_uses = [SimpleNamespace(**b) for b in assistant_content if b["type"] == "tool_use"]
+            usage = resume_turn["usage"]
+            call_ms = resume_turn["llm_duration_ms"]
+            dispatch = _ToolDispatch(
+                executor, call_start, cancel, on_effect=on_effect, done=resume_done,
+            )
+            resume_turn = None
+        else:
+            context.before_call(messages)
+            request: dict[str, Any] = {
+                "model": _AGENT_MODEL,
+                "max_tokens": 8192,
+                "system": [{"type": "text", "text": system_prompt, "cache_control": _CACHE_CONTROL}],
+                "tools": _CACHED_TOOL_DEFINITIONS,
+                "messages": _with_cache_breakpoint(messages),
+            }
+            if settings.agent_streaming:
+                response, dispatch = call_with_retries("anthropic", functools.partial(
+                    _streamed_turn, client, request, executor, call_start, cancel, on_effect,
+                ))
+            else:
+                response = call_with_retries(
+                    "anthropic", functools.partial(client.messages.create, **request),
+                )
+                dispatch = _ToolDispatch(executor, call_start, cancel, on_effect=on_effect)
+            call_ms = int((time.monotonic() - call_start) * 1000)
+            usage = response.usage
+
+            # Collect assistant message
+            for block in response.content:
+                assistant_content.append(_content_param(block))
+                if block.type == "tool_use":
+                    tool_uses.append(block)
+
+            # Side effects are recorded as they finish; note the turn they belong to
+            if checkpoint is not None and any(tu.name in SIDE_EFFECT_TOOLS for tu in tool_uses):
+                checkpoint.record_pending({
+                    "iteration": iteration,
+                    "assistant": assistant_content,
+                    "usage": _usage_counts(usage),
+                    "llm_duration_ms": call_ms,
+                })
+        trace.record_usage(usage, call_ms)
 
         messages.append({"role": "assistant", "content": assistant_content})
 
+        # Execute tool calls (independent ones concurrently; when streamed, most
+        # are already running) and collect results; recalls of compacted results
+        # are answered from the context store
+        routed_outcomes = dispatch.finish(tool_uses)
+        outcomes = [
+            context.recall(tu.input) if tu.name == RECALL_TOOL else routed_outcomes[tu.id]
+            for tu in tool_uses
+        ]
+        timing = {
+            "iteration": iteration + 1,
+            "streamed": settings.agent_streaming,
+            "llm_ms": call_ms,
+            "first_tool_ms": dispatch.first_tool_ms,
+            "tools_started_early": dispatch.early,
+            "tool_calls": len(tool_uses),
+            "latency_ms": int((time.monotonic() - call_start) * 1000),
+        }
+        trace.iterations.append(timing)
+
         # If no tool calls, agent is done
         if not tool_uses:
             logger.info("Agent finished (no more tool calls) after %d iterations", iteration + 1)
             break
 
-        # Execute tool calls and collect results
         tool_results: list[dict[str, Any]] = []
-        for tool_use in tool_uses:
-            logger.info("Executing tool: %s", tool_use.name)
-            tool_input = tool_use.input
-
-            t0 = time.monotonic()
-            tool_error: str | None = None
-            try:
-                result = route_tool_call_sync(tool_use.name, tool_input)
-            except Exception as e:
-                logger.error("Tool %s failed: %s", tool_use.name, e)
-                result = {"status": "error", "message": str(e)}
-                tool_error = str(e)
-            elapsed_ms = int((time.monotonic() - t0) * 1000)
+        turn_events: list[TraceEvent] = []
+        for tool_use, outcome in zip(tool_uses, outcomes, strict=True):
+            result = outcome.result
 
             # Record in provenance trace
-            trace.add_event(TraceEvent(
-                timestamp=datetime.now(timezone.utc).isoformat(),
+            event = TraceEvent(
+                timestamp=outcome.finished_at,
                 event_type="tool_call",
                 tool_name=tool_use.name,
-                input_summary=_sanitize_input(tool_input),
+                input_summary=_sanitize_input(tool_use.input),
                 output_summary=_summarize_tool_output(result),
-                duration_ms=elapsed_ms,
-                error=tool_error,
-            ))
+                duration_ms=outcome.duration_ms,
+                error=outcome.error,
+            )
+            trace.add_event(event)
+            turn_events.append(event)
 
             # Capture doc_id from create_dd_report
             if tool_use.name == "create_dd_report" and isinstance(result, dict):
@@ -497,27 +1205,57 @@ def run_dd_report_agent(
                     trace.doc_id = doc_id
                     trace.tokens_filled = result.get("replacements_applied", 0)
                     trace.tokens_unfilled = result.get("unfilled_template_tokens", 0)
+                    completeness = result.get("completeness")
 
-            tool_results.append({
-                "type": "tool_result",
-                "tool_use_id": tool_use.id,
-                "content": json.dumps(result),
-            })
+            tool_results.append(context.result_block(tool_use.id, tool_use.name, result))
 
         messages.append({"role": "user", "content": tool_results})
 
+        if checkpoint is not None and not doc_id:
+            checkpoint.record_turn({
+                "iteration": iteration,
+                "assistant": assistant_content,
+                "results": [
+                    [tu.id, tu.name, outcome.result]
+                    for tu, outcome in zip(tool_uses, outcomes, strict=True)
+                ],
+                "events": [asdict(e) for e in turn_events],
+                "usage": _usage_counts(usage),
+                "llm_duration_ms": call_ms,
+                "timing": timing,
+            })
+
         # Stop as soon as we have a report — completeness check happens separately
         if doc_id:
             logger.info("Report created, stopping agent loop after %d iterations", iteration + 1)
             break
 
     # Finalize trace
-    trace.ended_at = datetime.now(timezone.utc).isoformat()
+    trace.ended_at = datetime.now(UTC).isoformat()
     trace.total_duration_ms = int((time.monotonic() - run_start) * 1000)
-    trace.final_status = "success" if doc_id else "no_report"
+    trace.final_status = "success" if doc_id else ("timed_out" if timed_out else "no_report")
+    trace.context_compactions = context.compactions
+    trace.context_recalls = context.recalls
+    trace.context_tokens_saved = context.tokens_saved
+    trace.context_compaction_ms = context.compaction_ms
+    if checkpoint is not None and not timed_out:
+        # Only an interrupted run is worth resuming
+        checkpoint.clear()
+    logger.info(
+        "Agent LLM usage for '%s': %d calls, %d input + %d cache-write + %d cache-read tokens; "
+        "~%d input tokens saved by %d context compactions (%d recalls)",
+        site_title, trace.llm_calls, trace.input_tokens,
+        trace.cache_creation_input_tokens, trace.cache_read_input_tokens,
+        trace.context_tokens_saved, trace.context_compactions, trace.context_recalls,
+    )
 
     if doc_id:
-        return {"success": True, "doc_id": doc_id, "doc_url": doc_url, "trace": trace}
+        return {
+            "success": True, "doc_id": doc_id, "doc_url": doc_url,
+            "completeness": completeness, "trace": trace,
+        }
+    if timed_out:
+        return {"success": False, "error": "Agent timed out before creating a report", "trace": trace}
     return {"success": False, "error": "Agent completed without creating a report", "trace": trace}
 
 
@@ -539,6 +1277,8 @@ class PipelineResult:
     pending_count: int = 0
     error: str | None = None
     trace_url: str | None = None
+    # Reported while its thread was still running (see run_site_sweep)
+    abandoned: bool = False
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -551,7 +1291,7 @@ class TraceEvent:
     """A single event in the report generation trace."""
 
     timestamp: str
-    event_type: str  # "tool_call" | "run_start" | "run_end"
+    event_type: str  # "tool_call" | "prefetch" | "run_start" | "run_end"
     tool_name: str = ""
     input_summary: dict[str, Any] = field(default_factory=dict)
     output_summary: dict[str, Any] = field(default_factory=dict)
@@ -573,10 +1313,32 @@ class ReportTrace:
     doc_id: str | None = None
     tokens_filled: int = 0
     tokens_unfilled: int = 0
+    llm_calls: int = 0
+    llm_duration_ms: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    context_compactions: int = 0
+    context_recalls: int = 0
+    context_tokens_saved: int = 0
+    context_compaction_ms: int = 0
+    resumed_turns: int = 0
+    iterations: list[dict[str, Any]] = field(default_factory=list)
 
     def add_event(self, event: TraceEvent) -> None:
         self.events.append(event)
 
+    def record_usage(self, usage: Any, duration_ms: int) -> None:
+        """Add one model call's token usage (uncached, cache write, cache read)."""
+        counts = _usage_counts(usage)
+        self.llm_calls += 1
+        self.llm_duration_ms += duration_ms
+        self.input_tokens += counts["input_tokens"]
+        self.output_tokens += counts["output_tokens"]
+        self.cache_creation_input_tokens += counts["cache_creation_input_tokens"]
+        self.cache_read_input_tokens += counts["cache_read_input_tokens"]
+
     def to_dict(self) -> dict[str, Any]:
         """Serialize to a JSON-compatible dict."""
         return {
@@ -589,6 +1351,22 @@ class ReportTrace:
             "doc_id": self.doc_id,
             "tokens_filled": self.tokens_filled,
             "tokens_unfilled": self.tokens_unfilled,
+            "llm_usage": {
+                "calls": self.llm_calls,
+                "duration_ms": self.llm_duration_ms,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "cache_creation_input_tokens": self.cache_creation_input_tokens,
+                "cache_read_input_tokens": self.cache_read_input_tokens,
+            },
+            "context": {
+                "compactions": self.context_compactions,
+                "recalls": self.context_recalls,
+                "input_tokens_saved": self.context_tokens_saved,
+                "compaction_ms": self.context_compaction_ms,
+            },
+            "resumed_turns": self.resumed_turns,
+            "iterations": self.iterations,
             "event_count": len(self.events),
             "events": [
                 {
@@ -605,6 +1383,20 @@ class ReportTrace:
         }
 
 
+_USAGE_FIELDS = (
+    "input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens",
+)
+
+
+def _usage_counts(usage: Any) -> dict[str, int]:
+    """Token counts from an API ``usage`` object (or a checkpointed dict of them)."""
+    counts: dict[str, int] = {}
+    for name in _USAGE_FIELDS:
+        value = usage.get(name, 0) if isinstance(usage, dict) else getattr(usage, name, 0)
+        counts[name] = value if isinstance(value, int) else 0
+    return counts
+
+
 def _sanitize_input(tool_input: dict[str, Any]) -> dict[str, Any]:
     """Remove or truncate large input values for trace logging."""
     sanitized: dict[str, Any] = {}
@@ -643,6 +1435,8 @@ def _summarize_tool_output(result: Any) -> dict[str, Any]:
         summary["replacements_applied"] = result["replacements_applied"]
     if "unfilled_template_tokens" in result:
         summary["unfilled_template_tokens"] = result["unfilled_template_tokens"]
+    if "render" in result:
+        summary["render"] = result["render"]
 
     return summary
 
@@ -662,9 +1456,17 @@ def process_site_pipeline(
     settings: Settings,
     p1_email: str | None = None,
     site_address: str | None = None,
+    *,
+    tool_executor: ToolExecutor | None = None,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
 ) -> PipelineResult:
     """Full single-site pipeline: readiness -> report generation -> completeness -> email.
 
+    ``tool_executor``, ``deadline`` and ``cancel`` are forwarded to
+    :func:`run_dd_report_agent`, which resumes the site's interrupted run from
+    its checkpoint if there is one.  Once ``cancel`` is set the email is not sent.
+
     Returns a PipelineResult describing what happened.
     """
     import asyncio
@@ -703,9 +1505,24 @@ def process_site_pipeline(
         logger.info("'%s' — report already exists, skipping", site_title)
         return PipelineResult(site_title=site_title, status="report_exists")
 
-    # Case 3: All docs present, no report yet — generate
+    # Case 3: All docs present, no report yet — gather context, then generate
     logger.info("'%s' — all docs present, generating report...", site_title)
-    agent_result = run_dd_report_agent(site_title, system_prompt)
+    files_by_type = readiness.get("files_by_type", {})
+    checkpoint = agent_checkpoint_for(site_title, system_prompt, files_by_type)
+    context_bundle: SiteContextBundle | None = None
+    if checkpoint is None or not checkpoint.resumable:
+        try:
+            context_bundle = prefetch_site_context(
+                site_title, drive_folder_url, files_by_type,
+                site_address=site_address, tool_executor=tool_executor,
+            )
+        except Exception as e:
+            # The agent can still gather everything itself
+            logger.warning("Context pre-fetch failed for '%s': %s", site_title, e)
+    agent_result = run_dd_report_agent(
+        site_title, system_prompt, tool_executor=tool_executor, deadline=deadline,
+        cancel=cancel, context_bundle=context_bundle, checkpoint=checkpoint,
+    )
 
     if not agent_result.get("success"):
         err = agent_result.get("error", "unknown error")
@@ -723,7 +1540,7 @@ def process_site_pipeline(
     if trace:
         folder_id = extract_folder_id_from_url(drive_folder_url)
         if folder_id:
-            trace_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            trace_date = datetime.now(UTC).strftime("%Y-%m-%d")
             trace_name = f"{site_title} DD Report Trace - {trace_date}.json"
             try:
                 trace_json = json.dumps(trace.to_dict(), indent=2)
@@ -738,8 +1555,10 @@ def process_site_pipeline(
             except Exception as e:
                 logger.warning("Failed to save report trace: %s", e)
 
-    # 4. Check completeness
-    completeness = asyncio.run(srv.check_report_completeness(doc_id))
+    # 4. Check completeness (create_dd_report returns it; re-export only if missing)
+    completeness = agent_result.get("completeness") or asyncio.run(
+        srv.check_report_completeness(doc_id),
+    )
 
     if not completeness.get("ready_to_send", False):
         unresolved = completeness.get("unresolved_tokens", [])
@@ -752,7 +1571,9 @@ def process_site_pipeline(
         )
 
     # 5. Send email (to configured recipients + P1 Assignee)
-    if settings.email_sender and settings.email_app_password:
+    if cancel is not None and cancel.is_set():
+        logger.warning("'%s' was cancelled — report created but not emailed", site_title)
+    elif settings.email_sender and settings.email_app_password:
         base_recipients = [
             r.strip()
             for r in settings.dd_report_email_recipients.split(",")
@@ -793,6 +1614,118 @@ def process_site_pipeline(
     )
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Parallel multi-site sweep
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# Grace period past a site's deadline for its in-flight iteration to wind down
+SWEEP_TIMEOUT_GRACE_SECONDS = 120.0
+
+
+@dataclass
+class SiteJob:
+    """Per-site inputs for :func:`run_site_sweep`."""
+
+    site_title: str
+    drive_folder_url: str
+    match_terms: list[str]
+    p1_email: str | None = None
+    site_address: str | None = None
+
+
+def run_site_sweep(
+    gc: GoogleClient,
+    jobs: list[SiteJob],
+    shared_cache: dict[str, list[dict[str, Any]]],
+    system_prompt: str,
+    settings: Settings,
+    *,
+    workers: int = 1,
+    site_timeout: float | None = None,
+    on_result: Callable[[SiteJob, PipelineResult], None] | None = None,
+) -> list[PipelineResult]:
+    """Run :func:`process_site_pipeline` for many sites on a worker pool.
+
+    Each site gets ``site_timeout`` seconds (no limit when 0 or None): the
+    agent stops starting new iterations at the deadline, and a site still
+    running shortly after it is reported as an ``error`` result with
+    ``abandoned`` set so the sweep can finish.  Its thread is then
+    cancelled, so it cannot go on to create the report or send mail for a
+    site already reported as timed out.  Upstream calls share the
+    process-wide rate limits in :mod:`rate_limit`.
+
+    Cancelling does not interrupt a call that is blocked, and worker threads
+    are joined at interpreter exit.  A caller that gets an abandoned result
+    should therefore end the process with ``os._exit`` once it has used the
+    results, or it will wait for the stuck call anyway.
+
+    ``on_result(job, result)`` is called from the calling thread as each site
+    finishes.  Results are returned in ``jobs`` order.
+    """
+    workers = max(1, workers)
+    executor = ToolExecutor(
+        settings.agent_tool_concurrency,
+        max_workers=settings.agent_tool_concurrency * workers,
+    )
+    results: list[PipelineResult | None] = [None] * len(jobs)
+    started: dict[int, float] = {}
+    cancels = [threading.Event() for _ in jobs]
+    abandoned = False
+
+    def run_one(index: int, job: SiteJob) -> PipelineResult:
+        started[index] = time.monotonic()
+        deadline = started[index] + site_timeout if site_timeout else None
+        logger.info("Sweep: starting '%s'", job.site_title)
+        try:
+            return process_site_pipeline(
+                gc, job.site_title, job.drive_folder_url, job.match_terms,
+                shared_cache, system_prompt, settings,
+                p1_email=job.p1_email, site_address=job.site_address,
+                tool_executor=executor, deadline=deadline, cancel=cancels[index],
+            )
+        except Exception as e:
+            logger.error("Sweep: '%s' failed: %s", job.site_title, e)
+            return PipelineResult(site_title=job.site_title, status="error", error=str(e))
+
+    def finish(index: int, result: PipelineResult) -> None:
+        results[index] = result
+        if on_result is not None:
+            on_result(jobs[index], result)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dd-site")
+    try:
+        pending: dict[Future[PipelineResult], int] = {
+            pool.submit(run_one, i, job): i for i, job in enumerate(jobs)
+        }
+        while pending:
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(pending.pop(future), future.result())
+
+            if site_timeout:
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    start = started.get(index)
+                    if start is not None and now - start > site_timeout + SWEEP_TIMEOUT_GRACE_SECONDS:
+                        title = jobs[index].site_title
+                        logger.error("Sweep: '%s' exceeded %.0fs — abandoning", title, site_timeout)
+                        cancels[index].set()
+                        pending.pop(future)
+                        abandoned = True
+                        finish(index, PipelineResult(
+                            site_title=title, status="error",
+                            error=f"Timed out after {site_timeout:.0f}s", abandoned=True,
+                        ))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        # An abandoned site may still be finishing a tool call on the executor
+        if not abandoned:
+            executor.close()
+
+    return [r for r in results if r is not None]
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Google Chat notification per pipeline result
 # ─────────────────────────────────────────────────────────────────────────────
@@ -5,6 +5,9 @@ from __future__ import annotations
 import json
 import logging
 import re
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any
 
@@ -13,9 +16,10 @@ import requests
 from dotenv import load_dotenv
 from mcp.server import FastMCP
 
-from .classifier import classify_by_keywords, classify_document, match_file_to_site_llm
+from .classifier import classify_by_keywords, classify_documents_batch, match_file_to_site_llm
 from .config import get_settings
-from .google_client import GoogleClient
+from .google_client import GoogleClient, get_shared_google_client
+from .rate_limit import call_with_retries
 from .report_schema import (
     LINK_DISPLAY_LABELS,
     LINK_TOKENS,
@@ -24,7 +28,12 @@ from .report_schema import (
     compute_deltas,
     normalize_report_data,
 )
+from .shared_folders import get_shared_folder_store
+from .shared_index import SharedFolderIndex
+from .template_layout import TemplateLayout, get_template_layout_cache
+from .text_cache import file_version, get_text_cache
 from .utils import (
+    HyperlinkResult,
     build_hyperlink_requests,
     build_replace_all_text_requests,
     extract_folder_id_from_url,
@@ -454,13 +463,17 @@ def _call_pricing_api(
     rooms_payload: list[dict[str, Any]],
     region: str,
 ) -> dict[str, Any]:
-    """POST to the Building Optimizer v2 /v1/estimate endpoint."""
-    resp = requests.post(
+    """POST to the Building Optimizer v2 /v1/estimate endpoint.
+
+    The estimate is a pure calculation, so 5xx responses are retried along
+    with 429s under the shared pricing rate limit.
+    """
+    resp = call_with_retries("pricing", lambda: requests.post(
         f"{api_url}/v1/estimate",
         headers={"Content-Type": "application/json"},
         json={"rooms": rooms_payload, "region": region, "fees": {}},
         timeout=30,
-    )
+    ))
     resp.raise_for_status()
     return resp.json()  # type: ignore[no-any-return]
 
@@ -580,56 +593,18 @@ def _find_site_docs_in_shared_folders(
 ) -> dict[str, dict[str, Any] | None]:
     """Search the three shared Drive folders (SIR, ISP, Building Inspection) for docs matching a site.
 
-    **Pass 1** — substring match on filenames (free, instant).
+    **Pass 1** — indexed term match on filenames, preferring PDFs (free, instant).
     **Pass 2** — for any missing doc types, ask GPT-4o-mini to match unmatched
     filenames against the site (handles non-standard naming).
 
     Returns ``{"sir": file_dict|None, "isp": file_dict|None, "building_inspection": file_dict|None}``.
     """
-    settings = get_settings()
-    folder_map: dict[str, str] = {
-        "sir": settings.sir_folder_id,
-        "isp": settings.isp_folder_id,
-        "building_inspection": settings.building_inspection_folder_id,
-    }
-
-    result: dict[str, dict[str, Any] | None] = {
-        "sir": None,
-        "isp": None,
-        "building_inspection": None,
-    }
-
-    needles = [t.lower() for t in match_terms if t]
-
-    # Keep track of all files per folder for the LLM fallback pass
-    all_files_by_type: dict[str, list[dict[str, Any]]] = {}
+    # Files per folder, also used by the LLM fallback pass.  Kept current from
+    # the Drive changes feed; Building Inspection includes its subfolders.
+    all_files_by_type = get_shared_folder_store().refresh(gc)
 
-    for doc_type, folder_id in folder_map.items():
-        if not folder_id:
-            continue
-        try:
-            # Use recursive listing (building inspection has subfolders)
-            if doc_type == "building_inspection":
-                files = gc.list_files_recursive(folder_id, max_depth=1)
-            else:
-                files = gc.list_files_in_folder(folder_id)
-
-            all_files_by_type[doc_type] = files
-
-            # Pass 1: substring match — collect all matches, prefer PDF over converted Google Doc
-            matches = [
-                f for f in files
-                if any(needle in f.get("name", "").lower() for needle in needles)
-            ]
-            if matches:
-                pdf_matches = [f for f in matches if f.get("mimeType") == PDF_MIME]
-                best = pdf_matches[0] if pdf_matches else matches[0]
-                result[doc_type] = {**best, "doc_type": doc_type}
-
-        except Exception as e:
-            logger.warning(
-                "Failed to list shared %s folder (%s): %s", doc_type, folder_id, e
-            )
+    # Pass 1: indexed term match — prefers PDF over converted Google Doc
+    result = SharedFolderIndex.of(all_files_by_type).match(match_terms)
 
     # Pass 2: LLM site-matching for missing doc types
     if site_title:
@@ -660,9 +635,13 @@ def _find_site_docs_in_shared_folders(
 
 
 def _make_google_client() -> GoogleClient:
-    """Initialise and return a GoogleClient using settings from config."""
+    """Return the shared GoogleClient for the configured OAuth credentials.
+
+    The client is built once per process and reused by every tool call; the
+    access token is refreshed only when it has expired.
+    """
     settings = get_settings()
-    return GoogleClient.from_oauth_config(
+    return get_shared_google_client(
         client_config_path=str(settings.get_client_config_path()),
         token_file_path=str(settings.get_token_file_path()),
         oauth_port=settings.oauth_port,
@@ -840,6 +819,10 @@ async def list_drive_documents(
         }
 
 
+# Text returned by read_drive_document is capped at this many characters
+READ_DOCUMENT_MAX_CHARS = 50_000
+
+
 @mcp.tool()
 async def read_drive_document(file_id: str, file_name: str) -> dict[str, Any]:
     """Read and return the full text content of a Google Drive file.
@@ -878,7 +861,7 @@ async def read_drive_document(file_id: str, file_name: str) -> dict[str, Any]:
                 gc.drive_service.files()
                 .get(
                     fileId=file_id,
-                    fields="id,name,mimeType,size",
+                    fields="id,name,mimeType,size,md5Checksum,modifiedTime",
                     supportsAllDrives=True,
                 )
                 .execute()
@@ -894,33 +877,26 @@ async def read_drive_document(file_id: str, file_name: str) -> dict[str, Any]:
         mime_type: str = file_metadata.get("mimeType", "")
         logger.info("File %s has MIME type: %s", file_id, mime_type)
 
-        text_content: str = ""
-
-        if mime_type in EXPORTABLE_MIME_TYPES:
-            # Google Workspace file — export as plain text
-            text_content = gc.export_google_doc_as_text(file_id)
-
-        elif mime_type == PDF_MIME or file_name.lower().endswith(".pdf"):
-            # PDF — download bytes then extract text
-            pdf_bytes = gc.download_file_bytes(file_id)
-            text_content = extract_text_from_pdf_bytes(pdf_bytes)
-            if not text_content:
-                logger.warning(
-                    "PDF text extraction returned empty for %s — may be image-only", file_id
-                )
-                text_content = (
-                    "[PDF text extraction returned no text. "
-                    "This may be an image-only PDF that requires OCR.]"
-                )
+        def _extract() -> str:
+            if mime_type in EXPORTABLE_MIME_TYPES:
+                # Google Workspace file — export as plain text
+                return gc.export_google_doc_as_text(file_id)
+
+            if mime_type == PDF_MIME or file_name.lower().endswith(".pdf"):
+                # PDF — stream to a spooled file then extract text, stopping one
+                # char past the budget so truncation below is still detected
+                with gc.download_file(file_id) as fh:
+                    return extract_text_from_pdf_bytes(
+                        fh, max_chars=READ_DOCUMENT_MAX_CHARS + 1, strict=True,
+                    )
 
-        elif mime_type.startswith("text/") or file_name.lower().endswith(
-            (".txt", ".md", ".csv")
-        ):
-            # Plain text file — download directly
-            raw_bytes = gc.download_file_bytes(file_id)
-            text_content = raw_bytes.decode("utf-8", errors="replace")
+            if mime_type.startswith("text/") or file_name.lower().endswith(
+                (".txt", ".md", ".csv")
+            ):
+                # Plain text file — download directly
+                raw_bytes = gc.download_file_bytes(file_id)
+                return raw_bytes.decode("utf-8", errors="replace")
 
-        else:
             logger.warning(
                 "Unsupported MIME type %s for file %s — attempting generic download",
                 mime_type,
@@ -928,19 +904,37 @@ async def read_drive_document(file_id: str, file_name: str) -> dict[str, Any]:
             )
             try:
                 raw_bytes = gc.download_file_bytes(file_id)
-                text_content = raw_bytes.decode("utf-8", errors="replace")
+                return raw_bytes.decode("utf-8", errors="replace")
             except Exception as dl_err:
                 logger.error("Could not download file %s: %s", file_id, dl_err)
-                text_content = (
-                    f"[Could not extract text from file with MIME type: {mime_type}]"
-                )
+                raise RuntimeError(
+                    f"Could not extract text from file with MIME type: {mime_type}"
+                ) from dl_err
+
+        # Cached per file version, so repeat reads skip the download and parse;
+        # a failed extraction raises and is not cached
+        text_content = get_text_cache().get_or_extract(
+            file_id, file_version(file_metadata), _extract,
+        )
+
+        is_pdf = mime_type == PDF_MIME or (
+            mime_type not in EXPORTABLE_MIME_TYPES and file_name.lower().endswith(".pdf")
+        )
+        if is_pdf and not text_content:
+            logger.warning(
+                "PDF text extraction returned empty for %s — may be image-only", file_id
+            )
+            text_content = (
+                "[PDF text extraction returned no text. "
+                "This may be an image-only PDF that requires OCR.]"
+            )
 
         logger.info(
             "read_drive_document: extracted %d characters from %s", len(text_content), file_name
         )
 
         # Truncate very large documents to avoid exceeding the LLM context window.
-        max_chars = 50_000
+        max_chars = READ_DOCUMENT_MAX_CHARS
         truncated = False
         original_length = len(text_content)
         if original_length > max_chars:
@@ -1413,6 +1407,75 @@ async def get_cost_estimate(
     }
 
 
+class _RenderSteps:
+    """Google API calls and latency per step of one report render (for the trace)."""
+
+    def __init__(self) -> None:
+        self.steps: list[dict[str, Any]] = []
+
+    @contextmanager
+    def step(self, name: str, calls: int = 1) -> Iterator[dict[str, Any]]:
+        record: dict[str, Any] = {"step": name, "calls": calls}
+        start = time.monotonic()
+        try:
+            yield record
+        finally:
+            record["duration_ms"] = int((time.monotonic() - start) * 1000)
+            self.steps.append(record)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "api_calls": sum(s["calls"] for s in self.steps),
+            "duration_ms": sum(s["duration_ms"] for s in self.steps),
+            "steps": list(self.steps),
+        }
+
+
+def _link_trace_after_upload(
+    gc: GoogleClient, doc_id: str, trace_url: str, render: _RenderSteps,
+) -> None:
+    """Fill and hyperlink {{sources.trace_link}} once the trace's URL is known.
+
+    Only used when the trace file ID could not be pre-allocated; costs a
+    replace, a document read and a style update.
+    """
+    trace_label = LINK_DISPLAY_LABELS.get("sources.trace_link", trace_url)
+    with render.step("link_trace", calls=3):
+        gc.batch_update_document(doc_id, build_replace_all_text_requests(
+            {"sources.trace_link": trace_label},
+        ))
+        doc_body = gc.get_document(doc_id).get("body", {})
+        start_idx = find_text_index_in_doc(doc_body, trace_label)
+        if start_idx is not None:
+            gc.batch_update_document(doc_id, [{
+                "updateTextStyle": {
+                    "range": {
+                        "startIndex": start_idx,
+                        "endIndex": start_idx + len(trace_label),
+                    },
+                    "textStyle": {"link": {"url": trace_url}},
+                    "fields": "link",
+                }
+            }])
+            logger.info("Linked trace report in doc: %s", trace_label)
+
+
+def _unlink_trace(gc: GoogleClient, doc_id: str, render: _RenderSteps) -> None:
+    """Remove the trace link label after the trace upload failed."""
+    trace_label = LINK_DISPLAY_LABELS["sources.trace_link"]
+    try:
+        with render.step("unlink_trace"):
+            gc.batch_update_document(doc_id, [{
+                "replaceAllText": {
+                    "containsText": {"text": trace_label, "matchCase": True},
+                    "replaceText": "",
+                },
+            }])
+        logger.info("Removed trace link from doc %s", doc_id)
+    except Exception as e:
+        logger.warning("Could not remove trace link from doc %s: %s", doc_id, e)
+
+
 @mcp.tool()
 async def create_dd_report(
     site_name: str,
@@ -1486,18 +1549,52 @@ async def create_dd_report(
 
     logger.info("Creating DD report: %s", doc_name)
 
+    render = _RenderSteps()
+
     try:
         gc = _make_google_client()
 
+        # The cached template layout lists the template's tokens (for
+        # completeness) and predicts where each link label lands, so the
+        # links go into the same batchUpdate as the text.  It is taken before
+        # the copy and trusted only if the template is still at its revision
+        # after; a cached layout needs no lookup before the copy.
+        layout: TemplateLayout | None = None
+        try:
+            layout_cache = get_template_layout_cache()
+            layout = layout_cache.cached(template_id)
+            if layout is None:
+                analyses = layout_cache.analyses
+                with render.step("template_layout") as layout_step:
+                    layout = layout_cache.get(gc, template_id)
+                    layout_step["calls"] += layout_cache.analyses - analyses
+        except Exception as e:
+            logger.warning("Template layout unavailable, reading links back: %s", e)
+
         # Step 1: Copy the template to the site's Drive folder
         logger.info(
             "Copying template %s to folder %s as '%s'", template_id, folder_id, doc_name
         )
-        copied_doc = gc.copy_document(
-            template_id=template_id,
-            name=doc_name,
-            parent_folder_id=folder_id,
-        )
+        with render.step("copy_template"):
+            copied_doc = gc.copy_document(
+                template_id=template_id,
+                name=doc_name,
+                parent_folder_id=folder_id,
+            )
+        if layout is not None:
+            try:
+                with render.step("template_revision"):
+                    revision_id = gc.get_document_revision(template_id)
+            except Exception as e:
+                logger.warning("Could not confirm template revision: %s", e)
+                revision_id = None
+            if revision_id != layout.revision_id:
+                logger.warning(
+                    "Template %s is not at the analyzed revision — not using its layout", template_id,
+                )
+                layout = None
+                if revision_id is not None:
+                    layout_cache.forget(template_id)
 
         doc_id = copied_doc.get("id")
         doc_url = copied_doc.get("webViewLink")
@@ -1527,10 +1624,20 @@ async def create_dd_report(
         if unmatched:
             logger.warning("Unmatched agent keys (no template token): %s", unmatched)
 
-        # Step 3: Build and apply replaceAllText batch update
+        # Step 3: Pre-allocate the trace file's ID so its link is filled with
+        # everything else rather than patched in after the upload
+        trace_file_id: str | None = None
+        try:
+            with render.step("generate_trace_id"):
+                trace_file_id = gc.generate_file_ids(1)[0]
+        except Exception as e:
+            logger.warning("Could not pre-allocate trace file ID: %s", e)
+        trace_url = f"https://drive.google.com/file/d/{trace_file_id}/view" if trace_file_id else ""
+
+        # Step 4: Build and apply replaceAllText batch update
         text_replacements = dict(replacements)
 
-        # Step 3a: Swap URL values with display labels for link tokens.
+        # Step 4a: Swap URL values with display labels for link tokens.
         # Save the original URLs so the hyperlink builder can set link targets.
         link_urls: dict[str, str] = {}
         for token in LINK_TOKENS:
@@ -1538,18 +1645,13 @@ async def create_dd_report(
             if value.startswith("http") and token in LINK_DISPLAY_LABELS:
                 link_urls[token] = value
                 text_replacements[token] = LINK_DISPLAY_LABELS[token]
+        if trace_url:
+            link_urls["sources.trace_link"] = trace_url
+            text_replacements["sources.trace_link"] = LINK_DISPLAY_LABELS["sources.trace_link"]
 
         replace_requests = build_replace_all_text_requests(text_replacements)
 
-        if replace_requests:
-            gc.batch_update_document(doc_id, replace_requests)
-            logger.info(
-                "Applied %d text replacements to document %s", len(replace_requests), doc_id
-            )
-        else:
-            logger.warning("No placeholder replacements to apply — report_data may be empty")
-
-        # Step 3b: Hyperlink display labels (convert label text to clickable links)
+        # Step 4b: Hyperlink display labels (convert label text to clickable links)
         hyperlink_trace: dict[str, Any] = {
             "candidates": {},
             "found_in_doc": [],
@@ -1590,22 +1692,67 @@ async def create_dd_report(
             )
         hyperlink_trace["unmapped_agent_urls"] = unmapped_agent_urls
 
-        # Build and apply hyperlinks using display labels
-        try:
-            hyperlink_trace["candidates"] = {
-                k: {"label": LINK_DISPLAY_LABELS.get(k, v), "url": v[:200]}
-                for k, v in link_urls.items()
-            }
+        hyperlink_trace["candidates"] = {
+            k: {"label": LINK_DISPLAY_LABELS.get(k, v), "url": v[:200]}
+            for k, v in link_urls.items()
+        }
+        if link_urls:
+            logger.info(
+                "Hyperlinks: %d URL candidates: %s", len(link_urls), list(link_urls.keys()),
+            )
+        else:
+            logger.info("Hyperlinks: no URL candidates found in link tokens")
+
+        predicted: HyperlinkResult | None = None
+        if layout is not None and link_urls:
+            predicted = layout.hyperlink_requests(text_replacements, link_urls)
 
-            if not link_urls:
-                logger.info("Hyperlinks: no URL candidates found in link tokens")
+        # Step 4c: Apply text (and predicted links) in one update
+        stale_links: list[dict[str, Any]] = []
+        if replace_requests:
+            link_requests = predicted.requests if predicted else []
+            try:
+                with render.step("replace_text"):
+                    response = gc.batch_update_document(doc_id, replace_requests + link_requests)
+            except Exception as e:
+                if not link_requests:
+                    raise
+                # The batch is atomic: nothing was applied, retry the text alone
+                logger.warning("Predicted link ranges rejected (%s) — applying text alone", e)
+                predicted = None
+                with render.step("replace_text"):
+                    gc.batch_update_document(doc_id, replace_requests)
             else:
-                logger.info(
-                    "Hyperlinks: %d URL candidates: %s",
-                    len(link_urls), list(link_urls.keys()),
-                )
-                doc_struct = gc.get_document(doc_id)
-                doc_body = doc_struct.get("body", {})
+                replies = response.get("replies", []) if isinstance(response, dict) else []
+                if predicted is not None and layout is not None \
+                        and not layout.confirms(replace_requests, replies):
+                    # The copy differs from the analyzed layout: the links may
+                    # cover the wrong text, so clear them and read the doc back
+                    logger.warning("Replacements do not match the template layout — relinking")
+                    stale_links = [
+                        {"updateTextStyle": {**r["updateTextStyle"], "textStyle": {}}}
+                        for r in predicted.requests
+                    ]
+                    predicted = None
+            logger.info(
+                "Applied %d text replacements to document %s", len(replace_requests), doc_id
+            )
+        else:
+            logger.warning("No placeholder replacements to apply — report_data may be empty")
+
+        if predicted is not None:
+            hyperlink_trace["found_in_doc"] = predicted.found_tokens
+            hyperlink_trace["not_found_in_doc"] = predicted.not_found_tokens
+            hyperlink_trace["applied"] = len(predicted.requests)
+            logger.info(
+                "Applied %d hyperlinks to document %s: %s",
+                hyperlink_trace["applied"], doc_id, predicted.found_tokens,
+            )
+        elif link_urls:
+            # No usable layout: read the rendered doc back to find the labels
+            try:
+                with render.step("read_layout"):
+                    doc_body = gc.get_document(doc_id).get("body", {})
                 hl_result = build_hyperlink_requests(
                     doc_body, link_urls, LINK_TOKENS, LINK_DISPLAY_LABELS,
                 )
@@ -1617,22 +1764,27 @@ async def create_dd_report(
                         "Hyperlinks: display labels not found in doc body — "
                         "0 of %d candidates matched", len(link_urls),
                     )
+                    if stale_links:
+                        with render.step("apply_links"):
+                            gc.batch_update_document(doc_id, stale_links)
                 else:
-                    gc.batch_update_document(doc_id, hl_result.requests)
+                    with render.step("apply_links"):
+                        gc.batch_update_document(doc_id, stale_links + hl_result.requests)
                     hyperlink_trace["applied"] = len(hl_result.requests)
                     logger.info(
                         "Applied %d hyperlinks to document %s: %s",
                         hyperlink_trace["applied"], doc_id, hl_result.found_tokens,
                     )
-        except Exception as e:
-            logger.warning(
-                "Hyperlink insertion failed (report still usable): %s", e,
-            )
-            hyperlink_trace["error"] = str(e)
+            except Exception as e:
+                logger.warning(
+                    "Hyperlink insertion failed (report still usable): %s", e,
+                )
+                hyperlink_trace["error"] = str(e)
 
         logger.info("DD report created successfully: %s", doc_url)
 
-        # Step 4: Upload report trace JSON to the same Drive folder
+        # Step 5: Upload report trace JSON to the same Drive folder, under the
+        # pre-allocated ID the doc already links to
         evidence = token_evidence or {}
         token_report = {
             token: {
@@ -1654,42 +1806,44 @@ async def create_dd_report(
             "unmatched_keys": unmatched,
             "unfilled_tokens": unfilled,
             "hyperlinks": hyperlink_trace,
+            "render": render.to_dict(),
         }
         try:
             trace_name = f"{site_name.strip()} Report Trace - {today_str.replace('/', '-')}.json"
             trace_json = json.dumps(trace_data, indent=2)
-            trace_file = gc.upload_file_to_folder(
-                folder_id=folder_id,
-                file_name=trace_name,
-                file_bytes=trace_json.encode("utf-8"),
-                mime_type="application/json",
-            )
-            trace_url = trace_file.get("webViewLink", "")
-            logger.info("Uploaded report trace: %s", trace_url)
+            with render.step("upload_trace"):
+                trace_file = gc.upload_file_to_folder(
+                    folder_id=folder_id,
+                    file_name=trace_name,
+                    file_bytes=trace_json.encode("utf-8"),
+                    mime_type="application/json",
+                    file_id=trace_file_id,
+                )
+            logger.info("Uploaded report trace: %s", trace_file.get("webViewLink", ""))
 
-            # Fill {{sources.trace_link}} with display label and hyperlink it
-            if trace_url:
-                trace_label = LINK_DISPLAY_LABELS.get("sources.trace_link", trace_url)
-                gc.batch_update_document(doc_id, build_replace_all_text_requests(
-                    {"sources.trace_link": trace_label},
-                ))
-                doc_struct = gc.get_document(doc_id)
-                doc_body = doc_struct.get("body", {})
-                start_idx = find_text_index_in_doc(doc_body, trace_label)
-                if start_idx is not None:
-                    gc.batch_update_document(doc_id, [{
-                        "updateTextStyle": {
-                            "range": {
-                                "startIndex": start_idx,
-                                "endIndex": start_idx + len(trace_label),
-                            },
-                            "textStyle": {"link": {"url": trace_url}},
-                            "fields": "link",
-                        }
-                    }])
-                    logger.info("Linked trace report in doc: %s", trace_label)
+            if not trace_file_id and trace_file.get("webViewLink"):
+                _link_trace_after_upload(gc, doc_id, trace_file["webViewLink"], render)
+                text_replacements["sources.trace_link"] = trace_file["webViewLink"]
         except Exception as e:
             logger.warning("Failed to upload report trace (report still valid): %s", e)
+            if trace_url:
+                # The doc already links to the pre-allocated ID; don't leave a dead link
+                _unlink_trace(gc, doc_id, render)
+
+        # Every template token without a value is still a placeholder in the
+        # new doc, so completeness follows from the replacements and the
+        # tokens of the copied template revision — no re-export
+        if layout is not None:
+            completeness = completeness_from_replacements(
+                doc_id, text_replacements, layout.tokens,
+            )
+        else:
+            with render.step("check_completeness"):
+                completeness = await check_report_completeness(doc_id)
+        logger.info(
+            "Rendered report in %d Google API calls: %s",
+            render.to_dict()["api_calls"], [st["step"] for st in render.steps],
+        )
 
         return {
             "status": "success",
@@ -1702,6 +1856,8 @@ async def create_dd_report(
             "unmatched_agent_keys": len(unmatched),
             "unfilled_template_tokens": len(unfilled),
             "hyperlinks_applied": hyperlink_trace["applied"],
+            "completeness": completeness,
+            "render": render.to_dict(),
             "message": f"DD report created: {doc_url}",
         }
 
@@ -1809,22 +1965,16 @@ async def check_site_readiness(site_name_or_id: str) -> dict[str, Any]:
         ]
         if still_missing:
             unknown_files = [f for f in all_site_files if f.get("doc_type") == "unknown"]
-            for f in unknown_files:
-                fname = f.get("name", "")
-                fid = f.get("id")
-                doc_type, conf = classify_document(
-                    fname, file_id=fid, gc=gc, site_name=site_title,
+            batch = classify_documents_batch(
+                unknown_files, still_missing, gc=gc, site_name=site_title,
+            )
+            for doc_type, verdict in batch.resolved.items():
+                verdict.file["doc_type"] = doc_type
+                files_by_type[doc_type] = verdict.file
+                logger.info(
+                    "LLM classified site file '%s' as %s (%s, conf=%.2f) for '%s'",
+                    verdict.name, doc_type, verdict.tier, verdict.confidence, site_title,
                 )
-                if doc_type in still_missing and files_by_type.get(doc_type) is None:
-                    f["doc_type"] = doc_type
-                    files_by_type[doc_type] = f
-                    still_missing.remove(doc_type)
-                    logger.info(
-                        "LLM classified site file '%s' as %s (conf=%.2f) for '%s'",
-                        fname, doc_type, conf, site_title,
-                    )
-                if not still_missing:
-                    break
 
         sir_found = files_by_type["sir"] is not None
         isp_found = files_by_type["isp"] is not None
@@ -1878,6 +2028,65 @@ async def check_site_readiness(site_name_or_id: str) -> dict[str, Any]:
         }
 
 
+_UNRESOLVED_TOKEN_RE = re.compile(r"\{\{([^}]+)\}\}")
+_PENDING_LABEL_RE = re.compile(r"\[(?:Not found[^]]*|Pending[^]]*)\]", re.IGNORECASE)
+
+
+def _completeness_result(
+    doc_id: str, unresolved_tokens: list[str], pending_labels: list[str],
+) -> dict[str, Any]:
+    """Build the check_report_completeness response from what was found."""
+    unresolved_token_count = len(unresolved_tokens)
+    pending_section_count = len(pending_labels)
+    ready_to_send = unresolved_token_count == 0
+
+    if ready_to_send and pending_section_count == 0:
+        summary = "Report complete. All fields filled."
+    elif ready_to_send:
+        summary = (
+            f"Report complete. {pending_section_count} field(s) pending "
+            f"(data not yet available): {'; '.join(pending_labels[:5])}"
+            + (" ..." if len(pending_labels) > 5 else "")
+        )
+    else:
+        summary = (
+            f"Report NOT ready to send. {unresolved_token_count} unfilled placeholder(s): "
+            + ", ".join(f"{{{{{t}}}}}" for t in unresolved_tokens[:10])
+            + (" ..." if len(unresolved_tokens) > 10 else "")
+        )
+
+    return {
+        "status": "success",
+        "doc_id": doc_id,
+        "ready_to_send": ready_to_send,
+        "unresolved_token_count": unresolved_token_count,
+        "unresolved_tokens": unresolved_tokens,
+        "pending_section_count": pending_section_count,
+        "pending_sections": pending_labels,
+        "summary": summary,
+        "message": summary,
+    }
+
+
+def completeness_from_replacements(
+    doc_id: str, replacements: dict[str, str], tokens: Iterable[str] = TEMPLATE_TOKENS,
+) -> dict[str, Any]:
+    """Completeness of a report rendered from the template with ``replacements``.
+
+    Equivalent to :func:`check_report_completeness` on the freshly rendered
+    doc: template ``tokens`` without a value remain as placeholders, and gap
+    labels can only come from the replacement values.
+    """
+    tokens = list(tokens)
+    unresolved = [t for t in tokens if t not in replacements]
+    pending: list[str] = []
+    for token in tokens:
+        value = replacements.get(token, "")
+        unresolved.extend(_UNRESOLVED_TOKEN_RE.findall(value))
+        pending.extend(_PENDING_LABEL_RE.findall(value))
+    return _completeness_result(doc_id, unresolved, pending)
+
+
 @mcp.tool()
 async def check_report_completeness(doc_id: str) -> dict[str, Any]:
     """Check a generated DD report Google Doc for unresolved placeholders and pending sections.
@@ -1905,42 +2114,13 @@ async def check_report_completeness(doc_id: str) -> dict[str, Any]:
         gc = _make_google_client()
         text = gc.export_google_doc_as_text(doc_id)
 
-        # Find unresolved {{token}} patterns — these are hard blocks
-        unresolved_tokens = re.findall(r"\{\{([^}]+)\}\}", text)
-        unresolved_token_count = len(unresolved_tokens)
-
-        # Find all [Not found — ...] and [Pending...] labels
-        pending_labels = re.findall(r"\[(?:Not found[^]]*|Pending[^]]*)\]", text, re.IGNORECASE)
-        pending_section_count = len(pending_labels)
-
-        ready_to_send = unresolved_token_count == 0
-
-        if ready_to_send and pending_section_count == 0:
-            summary = "Report complete. All fields filled."
-        elif ready_to_send:
-            summary = (
-                f"Report complete. {pending_section_count} field(s) pending "
-                f"(data not yet available): {'; '.join(pending_labels[:5])}"
-                + (" ..." if len(pending_labels) > 5 else "")
-            )
-        else:
-            summary = (
-                f"Report NOT ready to send. {unresolved_token_count} unfilled placeholder(s): "
-                + ", ".join(f"{{{{{t}}}}}" for t in unresolved_tokens[:10])
-                + (" ..." if len(unresolved_tokens) > 10 else "")
-            )
-
-        return {
-            "status": "success",
-            "doc_id": doc_id,
-            "ready_to_send": ready_to_send,
-            "unresolved_token_count": unresolved_token_count,
-            "unresolved_tokens": unresolved_tokens,
-            "pending_section_count": pending_section_count,
-            "pending_sections": pending_labels,
-            "summary": summary,
-            "message": summary,
-        }
+        # Unresolved {{token}} patterns are hard blocks; [Not found — ...] and
+        # [Pending...] labels are acceptable sourced gaps
+        return _completeness_result(
+            doc_id,
+            _UNRESOLVED_TOKEN_RE.findall(text),
+            _PENDING_LABEL_RE.findall(text),
+        )
 
     except Exception as e:
         logger.error("check_report_completeness failed: %s", e)
@@ -0,0 +1,279 @@
+"""Persistent listing of the shared SIR / ISP / Building Inspection folders.
+
+Listing the three shared folders from scratch on every inbox scan, sweep and
+tool call is the slow part of shared-folder matching.  Instead the listing is
+kept on disk together with a Drive changes ``startPageToken``: each refresh
+replays only the changes since the last one (usually a single empty
+``changes.list`` page), and the folders are relisted in full only when the
+token is missing or rejected, the configured folder IDs change, or the
+backlog of changes is longer than a relist.
+
+Building Inspection reports sit one subfolder deep, so that folder's direct
+subfolders are tracked too; SIR and ISP are flat.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+from .google_client import FOLDER_MIME, DriveChangesTokenError, GoogleClient
+from .shared_index import DOC_TYPES, SharedFolderCache
+
+logger = logging.getLogger("[shared_folders]")
+
+# Subfolder levels tracked below each shared folder
+SHARED_FOLDER_DEPTH = {"sir": 0, "isp": 0, "building_inspection": 1}
+
+# Changes pages replayed before a full relist is cheaper
+CHANGES_MAX_PAGES = 10
+
+_STATE_VERSION = 1
+
+_NATURAL_RE = re.compile(r"(\d+)")
+
+
+def _natural_key(text: str) -> list[Any]:
+    """Sort key approximating Drive's ``name_natural`` ordering."""
+    return [int(t) if t.isdigit() else t.lower() for t in _NATURAL_RE.split(text)]
+
+
+@dataclass
+class _Folder:
+    doc_type: str
+    path: str  # relative to the shared folder, "" for the folder itself
+    depth: int
+
+
+class SharedFolderStore:
+    """The shared folders' files, kept current from the Drive changes feed.
+
+    Thread-safe; :meth:`refresh` returns a :class:`SharedFolderCache` that is
+    reused (with its filename index) until a change touches the folders.
+    """
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._roots: dict[str, str] = {}
+        self._page_token: str | None = None
+        self._folders: dict[str, _Folder] = {}
+        self._files: dict[str, dict[str, Any]] = {}
+        self._cache: SharedFolderCache | None = None
+        self._loaded = False
+
+    # ---------- Refresh ----------
+
+    def refresh(self, gc: GoogleClient, *, full: bool = False) -> SharedFolderCache:
+        """Bring the listing up to date and return it.
+
+        Applies Drive changes since the stored token, or relists the folders
+        when ``full`` is set or the token cannot be used.
+        """
+        settings = get_settings()
+        roots = {
+            "sir": settings.sir_folder_id,
+            "isp": settings.isp_folder_id,
+            "building_inspection": settings.building_inspection_folder_id,
+        }
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+            if full or roots != self._roots or not self._page_token:
+                self._relist(gc, roots)
+            else:
+                try:
+                    changes, token = gc.drive_list_changes(
+                        self._page_token, max_pages=CHANGES_MAX_PAGES,
+                    )
+                except DriveChangesTokenError:
+                    self._relist(gc, roots)
+                except Exception as e:
+                    # Serve the last listing; the token is kept for next time
+                    logger.warning("Drive changes unavailable, using stored listing: %s", e)
+                else:
+                    if token is None:
+                        logger.info("Drive changes backlog too long — relisting shared folders")
+                        self._relist(gc, roots)
+                    else:
+                        changed = self._apply_changes(gc, changes)
+                        self._page_token = token
+                        if changed:
+                            self._cache = None
+                        logger.info(
+                            "Applied %d Drive changes (%d touched shared folders)",
+                            len(changes), changed,
+                        )
+                        self._save()
+
+            if self._cache is None:
+                self._cache = self._build_cache()
+            return self._cache
+
+    def _relist(self, gc: GoogleClient, roots: dict[str, str]) -> None:
+        """List every shared folder from scratch and take a fresh changes token."""
+        # Take the token first so changes made during the listing are replayed
+        token: str | None
+        try:
+            token = gc.drive_get_start_page_token()
+        except Exception as e:
+            logger.warning("Failed to get Drive changes token: %s", e)
+            token = None
+        self._roots = dict(roots)
+        self._folders = {
+            folder_id: _Folder(doc_type, "", 0)
+            for doc_type, folder_id in roots.items() if folder_id
+        }
+        self._files = {}
+        level = list(self._folders)
+        while level:
+            try:
+                items = gc.list_children(level)
+            except Exception as e:
+                logger.warning("Failed to list shared folders %s: %s", level, e)
+                # Incomplete listing: do not keep a token, relist next time
+                token = None
+                items = []
+            next_level: list[str] = []
+            for item in items:
+                if self._add_item(item):
+                    next_level.append(item["id"])
+            level = next_level
+        self._page_token = token
+        self._cache = None
+        logger.info(
+            "Relisted shared folders: %d files in %d folders", len(self._files), len(self._folders),
+        )
+        self._save()
+
+    def _tracked_parent(self, item: dict[str, Any]) -> str | None:
+        return next((p for p in item.get("parents", []) if p in self._folders), None)
+
+    def _add_item(self, item: dict[str, Any]) -> bool:
+        """File a listed item under its tracked parent.  True if it is a new tracked folder."""
+        parent_id = self._tracked_parent(item)
+        item_id = item.get("id")
+        if parent_id is None or not item_id:
+            return False
+        parent = self._folders[parent_id]
+        if item.get("mimeType") == FOLDER_MIME:
+            if parent.depth >= SHARED_FOLDER_DEPTH.get(parent.doc_type, 0) or item_id in self._folders:
+                return False
+            self._folders[item_id] = _Folder(
+                parent.doc_type, f"{parent.path}/{item.get('name', '')}", parent.depth + 1,
+            )
+            return True
+        self._files[item_id] = {k: v for k, v in item.items() if k != "trashed"}
+        return False
+
+    def _apply_changes(self, gc: GoogleClient, changes: list[dict[str, Any]]) -> int:
+        """Apply a batch of Drive changes; returns how many touched the shared folders."""
+        touched = 0
+        new_folders: list[str] = []
+        for change in changes:
+            file_id = change.get("fileId")
+            if not file_id:
+                continue
+            item = change.get("file") or {}
+            gone = bool(change.get("removed") or not item or item.get("trashed"))
+
+            if file_id in self._folders and self._folders[file_id].depth > 0:
+                # A tracked subfolder was renamed (re-filed with its new path),
+                # or removed / moved away (its files are dropped)
+                del self._folders[file_id]
+                touched += 1
+                if gone or not self._add_item(item):
+                    for fid in [f for f, v in self._files.items() if file_id in v.get("parents", [])]:
+                        del self._files[fid]
+                continue
+
+            was_tracked = self._files.pop(file_id, None) is not None
+            if not gone and self._add_item(item):
+                new_folders.append(file_id)
+            if was_tracked or file_id in self._files or file_id in new_folders:
+                touched += 1
+
+        if new_folders:
+            # A folder moved in brings existing files the feed will not report
+            for item in gc.list_children(new_folders):
+                self._add_item(item)
+        return touched
+
+    # ---------- Output ----------
+
+    def _build_cache(self) -> SharedFolderCache:
+        by_type: dict[str, list[dict[str, Any]]] = {t: [] for t in DOC_TYPES}
+        for item in self._files.values():
+            parent_id = self._tracked_parent(item)
+            if parent_id is None:
+                continue
+            parent = self._folders[parent_id]
+            entry = {k: v for k, v in item.items() if k != "parents"}
+            entry["folder_path"] = parent.path
+            by_type.setdefault(parent.doc_type, []).append(entry)
+
+        cache = SharedFolderCache()
+        for doc_type, files in by_type.items():
+            files.sort(key=lambda f: (_natural_key(f["folder_path"]), _natural_key(f.get("name", ""))))
+            cache[doc_type] = files
+        return cache
+
+    # ---------- Persistence ----------
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            data = json.loads(Path(self.path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != _STATE_VERSION:
+            return
+        self._roots = dict(data.get("roots", {}))
+        self._page_token = data.get("page_token") or None
+        self._folders = {fid: _Folder(**f) for fid, f in data.get("folders", {}).items()}
+        self._files = dict(data.get("files", {}))
+
+    def _save(self) -> None:
+        """Atomically write the listing and changes token."""
+        if not self.path:
+            return
+        target = Path(self.path)
+        state = {
+            "version": _STATE_VERSION,
+            "roots": self._roots,
+            "page_token": self._page_token,
+            "folders": {fid: vars(f) for fid, f in self._folders.items()},
+            "files": self._files,
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.warning("Could not save shared folder listing to %s: %s", self.path, e)
+
+
+_store: SharedFolderStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_shared_folder_store() -> SharedFolderStore:
+    """Return the process-wide shared folder store configured from settings."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SharedFolderStore(get_settings().shared_folder_cache_file)
+        return _store
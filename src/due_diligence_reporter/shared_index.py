@@ -0,0 +1,115 @@
+"""Token index over the shared SIR / ISP / Building Inspection folder listings.
+
+The sweep matches every site against the same three shared folders.  Rather
+than scanning every filename with every match term for every site, the
+listings are indexed once: each filename is split into lower-case tokens and
+each token (plus its prefixes) maps to the files containing it.  A site
+lookup intersects a handful of posting lists and verifies the few candidates
+with the original substring test.
+
+Match terms are found where they start at a word boundary in the filename
+(``"Keller"`` matches ``"Alpha Keller SIR.pdf"`` and ``"KellerISD.pdf"``);
+a term buried mid-word is not.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cached_property
+from typing import Any
+
+PDF_MIME = "application/pdf"
+
+DOC_TYPES = ("sir", "isp", "building_inspection")
+
+# Prefixes shorter than this are not indexed (full tokens always are)
+_MIN_PREFIX = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case alphanumeric tokens of a filename or match term."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _FolderIndex:
+    """Postings for one shared folder's files, in listing order."""
+
+    def __init__(self, files: list[dict[str, Any]]) -> None:
+        self.files = files
+        self.names = [f.get("name", "").lower() for f in files]
+        self.is_pdf = [f.get("mimeType") == PDF_MIME for f in files]
+        postings: dict[str, set[int]] = {}
+        for i, name in enumerate(self.names):
+            for token in tokenize(name):
+                postings.setdefault(token, set()).add(i)
+                for end in range(_MIN_PREFIX, len(token)):
+                    postings.setdefault(token[:end], set()).add(i)
+        self.postings = postings
+
+    def candidates(self, needle: str) -> set[int]:
+        """Files containing every token of ``needle`` at a word start."""
+        tokens = tokenize(needle)
+        if not tokens:
+            return set()
+        lists = sorted((self.postings.get(t, set()) for t in tokens), key=len)
+        return set(lists[0]).intersection(*lists[1:])
+
+    def best_match(self, needles: list[str]) -> dict[str, Any] | None:
+        """First file (PDF preferred) whose name contains any needle."""
+        matched: set[int] = set()
+        for needle in needles:
+            matched.update(i for i in self.candidates(needle) if needle in self.names[i])
+        if not matched:
+            return None
+        ordered = sorted(matched)
+        best = next((i for i in ordered if self.is_pdf[i]), ordered[0])
+        return self.files[best]
+
+
+class SharedFolderIndex:
+    """Prebuilt match structures over ``{"sir": [...], "isp": [...], ...}`` listings."""
+
+    def __init__(self, files_by_type: dict[str, list[dict[str, Any]]]) -> None:
+        self._folders = {
+            doc_type: _FolderIndex(files) for doc_type, files in files_by_type.items()
+        }
+
+    @classmethod
+    def of(cls, shared_cache: dict[str, list[dict[str, Any]]]) -> SharedFolderIndex:
+        """Return the index attached to a :class:`SharedFolderCache`, or build one."""
+        if isinstance(shared_cache, SharedFolderCache):
+            return shared_cache.index
+        return cls(shared_cache)
+
+    def files(self, doc_type: str) -> list[dict[str, Any]]:
+        folder = self._folders.get(doc_type)
+        return folder.files if folder else []
+
+    def match(self, match_terms: list[str]) -> dict[str, dict[str, Any] | None]:
+        """Best file per doc type matching any term, tagged with ``doc_type``.
+
+        Returns ``{"sir": file|None, "isp": file|None, "building_inspection": file|None}``.
+        """
+        needles = [t.lower() for t in match_terms if t]
+        result: dict[str, dict[str, Any] | None] = dict.fromkeys(DOC_TYPES)
+        if not needles:
+            return result
+        for doc_type, folder in self._folders.items():
+            best = folder.best_match(needles)
+            if best is not None:
+                result[doc_type] = {**best, "doc_type": doc_type}
+        return result
+
+
+class SharedFolderCache(dict[str, list[dict[str, Any]]]):
+    """Shared folder listings with a lazily built :class:`SharedFolderIndex`.
+
+    A plain dict everywhere else; the index is built on first lookup and
+    reused for every site in the run.  Do not mutate the listings afterwards.
+    """
+
+    @cached_property
+    def index(self) -> SharedFolderIndex:
+        return SharedFolderIndex(self)
@@ -0,0 +1,170 @@
+"""Deterministic fuzzy ranking of Site Records against a free-text query.
+
+Scores each candidate's title, address, and city with character-trigram
+similarity plus query-token containment.  A clear winner is returned without
+any network call; only ambiguous results are escalated to the LLM, and then
+with just the top-k candidates.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+# A top score at or above this, beating the runner-up by MATCH_MARGIN, is
+# accepted without the LLM.
+MATCH_ACCEPT_SCORE = 0.8
+MATCH_MARGIN = 0.15
+
+# A weaker top score (typos, partial addresses) is still accepted when it
+# dominates every other candidate by this much.
+MATCH_DOMINANT_SCORE = 0.6
+MATCH_DOMINANT_MARGIN = 0.4
+
+# Below this nothing resembles the query; treated as "no match".
+MATCH_FLOOR_SCORE = 0.1
+
+# Candidates forwarded to the LLM for ambiguous queries
+LLM_TOP_K = 5
+
+_TITLE_PREFIX = "alpha "
+
+
+def normalize_site_key(value: str) -> str:
+    """Normalise a site title, address, or query for comparison.
+
+    Lower-cases, strips HTML and punctuation, and collapses whitespace so
+    ``"Alpha  Keller,"`` and ``"alpha keller"`` produce the same key.
+    """
+    text = re.sub(r"<[^>]+>", " ", value).lower()
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return " ".join(text.split())
+
+
+def strip_site_prefix(key: str) -> str:
+    """Drop the brand prefix from a normalised title (``"alpha keller"`` → ``"keller"``)."""
+    return key[len(_TITLE_PREFIX):] if key.startswith(_TITLE_PREFIX) else key
+
+
+def city_from_address(address: str) -> str | None:
+    """Return the city component of ``"street, city, ST 12345"`` style addresses."""
+    parts = [p.strip() for p in address.split(",") if p.strip()]
+    if len(parts) < 3:
+        return None
+    return parts[-2] or None
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+@dataclass(frozen=True)
+class _FieldKey:
+    key: str
+    tokens: frozenset[str]
+    grams: frozenset[str]
+
+    @classmethod
+    def of(cls, key: str) -> _FieldKey:
+        return _field_key(key)
+
+
+@lru_cache(maxsize=8192)
+def _field_key(key: str) -> _FieldKey:
+    # Candidate fields repeat across queries; cache their token/trigram sets
+    return _FieldKey(key, frozenset(key.split()), frozenset(_trigrams(key)))
+
+
+def _field_score(query: _FieldKey, field: _FieldKey) -> float:
+    """Similarity of a query to one candidate field, in [0, 1]."""
+    if not field.key:
+        return 0.0
+    if query.key == field.key:
+        return 1.0
+    containment = len(query.tokens & field.tokens) / len(query.tokens) if query.tokens else 0.0
+    # Containment is capped below 1.0 so a partial title never ties an exact one
+    return max(_dice(query.grams, field.grams), 0.95 * containment)
+
+
+@dataclass(frozen=True)
+class ScoredCandidate:
+    """A candidate with its best field score and the field that produced it."""
+
+    score: float
+    matched_on: str
+    candidate: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class RankResult:
+    """Outcome of ranking: a confident match, an ambiguous shortlist, or nothing."""
+
+    ranked: list[ScoredCandidate]
+    match: dict[str, Any] | None
+    ambiguous: bool
+
+    @property
+    def shortlist(self) -> list[dict[str, Any]]:
+        """The top-k candidates worth showing to the LLM."""
+        return [sc.candidate for sc in self.ranked[:LLM_TOP_K]]
+
+
+def _query_keys(query: str) -> tuple[_FieldKey, _FieldKey]:
+    q_key = normalize_site_key(query)
+    return _FieldKey.of(q_key), _FieldKey.of(strip_site_prefix(q_key))
+
+
+def score_candidate(query: str, candidate: dict[str, Any]) -> ScoredCandidate:
+    """Score one ``{"id", "title", "address"}`` candidate against ``query``."""
+    return _score(*_query_keys(query), candidate)
+
+
+def _score(q: _FieldKey, q_stripped: _FieldKey, candidate: dict[str, Any]) -> ScoredCandidate:
+    title_key = normalize_site_key(str(candidate.get("title") or ""))
+    address = str(candidate.get("address") or "")
+    city = city_from_address(address) or ""
+
+    scores = {
+        "title": max(
+            _field_score(q, _FieldKey.of(title_key)),
+            _field_score(q_stripped, _FieldKey.of(strip_site_prefix(title_key))),
+        ),
+        "address": _field_score(q, _FieldKey.of(normalize_site_key(address))),
+        # A bare city is weaker evidence than a title
+        "city": 0.9 * _field_score(q_stripped, _FieldKey.of(normalize_site_key(city))),
+    }
+    matched_on = max(scores, key=lambda k: scores[k])
+    return ScoredCandidate(scores[matched_on], matched_on, candidate)
+
+
+def rank_site_candidates(query: str, candidates: list[dict[str, Any]]) -> RankResult:
+    """Rank candidates and decide whether the top one is an unambiguous match."""
+    q, q_stripped = _query_keys(query)
+    ranked = sorted(
+        (_score(q, q_stripped, c) for c in candidates),
+        key=lambda sc: sc.score,
+        reverse=True,
+    )
+    if not ranked or ranked[0].score < MATCH_FLOOR_SCORE:
+        return RankResult(ranked, None, ambiguous=False)
+
+    top = ranked[0].score
+    runner_up = ranked[1].score if len(ranked) > 1 else 0.0
+    margin = top - runner_up
+    # An exact title/address match beats any partial one
+    exact = top == 1.0 and runner_up < 1.0
+    if exact or (top >= MATCH_ACCEPT_SCORE and margin >= MATCH_MARGIN) or (
+        top >= MATCH_DOMINANT_SCORE and margin >= MATCH_DOMINANT_MARGIN
+    ):
+        return RankResult(ranked, ranked[0].candidate, ambiguous=False)
+
+    return RankResult(ranked, None, ambiguous=True)
@@ -0,0 +1,252 @@
+"""Pre-analyzed layout of the DD report template.
+
+Hyperlinking the rendered report used to need the new document's structure
+read back after ``replaceAllText``, only to find where each link label
+landed.  The template's own layout answers that: every ``{{token}}`` in the
+template body is recorded once with its start index, and the post-replacement
+index of each token follows arithmetically from the lengths of the values
+that replaced the tokens before it.  The ``updateTextStyle`` requests can
+then go into the same ``batchUpdate`` as the replacements.  Tokens in
+headers, footers and footnotes are only counted: ``replaceAllText`` replaces
+them too, but they have their own index spaces and never shift the body.
+
+Layouts are keyed by template ID and Docs ``revisionId``, kept in memory and
+on disk; an edited template is re-read once.  Indices are UTF-16 code units,
+as in the Docs API.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+from .google_client import GoogleClient
+from .utils import DocTextIndex, HyperlinkResult, utf16_len
+
+logger = logging.getLogger("[template_layout]")
+
+_TOKEN_RE = re.compile(r"\{\{([^{}\x00]+)\}\}")
+
+_STATE_VERSION = 2
+
+_SEGMENT_KINDS = ("headers", "footers", "footnotes")
+
+
+@dataclass(frozen=True)
+class TemplateLayout:
+    """Start index of every ``{{token}}`` in a template's body, in document order."""
+
+    template_id: str
+    revision_id: str
+    occurrences: tuple[tuple[int, str], ...]
+    # (token, count) for tokens in headers, footers and footnotes
+    segment_counts: tuple[tuple[str, int], ...] = ()
+
+    @classmethod
+    def from_document(cls, template_id: str, document: dict[str, Any]) -> TemplateLayout:
+        """Analyze a ``documents.get`` response (paragraphs and table cells)."""
+        index = DocTextIndex(document.get("body", {}))
+        found = [
+            (index.doc_index(match.start()), match.group(1))
+            for match in _TOKEN_RE.finditer(index.text)
+        ]
+        found.sort()
+        segment_counts: dict[str, int] = {}
+        for kind in _SEGMENT_KINDS:
+            for segment in document.get(kind, {}).values():
+                for match in _TOKEN_RE.finditer(DocTextIndex(segment).text):
+                    segment_counts[match.group(1)] = segment_counts.get(match.group(1), 0) + 1
+        return cls(
+            template_id, document.get("revisionId", ""), tuple(found),
+            tuple(sorted(segment_counts.items())),
+        )
+
+    @property
+    def tokens(self) -> tuple[str, ...]:
+        """Every distinct token in the template, in document order."""
+        return tuple(dict.fromkeys(token for _, token in self.occurrences))
+
+    def confirms(
+        self, replace_requests: list[dict[str, Any]], replies: list[dict[str, Any]],
+    ) -> bool:
+        """Whether a batchUpdate's replaceAllText replies match this layout.
+
+        Each token must have been replaced exactly as many times as it occurs
+        here, body and other segments together; otherwise the document was
+        not a copy of this revision and predicted ranges may be off.
+        """
+        counts = dict(self.segment_counts)
+        for _, token in self.occurrences:
+            counts[token] = counts.get(token, 0) + 1
+        if len(replies) < len(replace_requests):
+            return False
+        for request, reply in zip(replace_requests, replies, strict=False):
+            text = request["replaceAllText"]["containsText"]["text"]
+            changed = reply.get("replaceAllText", {}).get("occurrencesChanged", 0)
+            if changed != counts.get(text[2:-2], 0):
+                return False
+        return True
+
+    def predict_starts(self, replacements: dict[str, str]) -> dict[str, list[int]] | None:
+        """Start index of each token's text once ``replacements`` are applied.
+
+        Returns ``None`` when a value contains braces: replaceAllText runs
+        token by token, so such a value could form or fill another token and
+        the arithmetic would no longer hold.
+        """
+        if any("{" in v or "}" in v for v in replacements.values()):
+            return None
+        starts: dict[str, list[int]] = {}
+        shift = 0
+        for index, token in self.occurrences:
+            starts.setdefault(token, []).append(index + shift)
+            if token in replacements:
+                shift += utf16_len(replacements[token]) - utf16_len(f"{{{{{token}}}}}")
+        return starts
+
+    def hyperlink_requests(
+        self, replacements: dict[str, str], link_urls: dict[str, str],
+    ) -> HyperlinkResult | None:
+        """``updateTextStyle`` requests linking each token's replaced text to its URL.
+
+        ``replacements`` are the values sent to replaceAllText (display labels
+        for link tokens); ``link_urls`` maps link tokens to their targets.  The
+        requests are valid directly after the replacements, in the same batch.
+        """
+        starts = self.predict_starts(replacements)
+        if starts is None:
+            return None
+        result = HyperlinkResult()
+        for token, url in link_urls.items():
+            label = replacements.get(token, "")
+            if not label or token not in starts:
+                result.not_found_tokens.append(token)
+                continue
+            result.found_tokens.append(token)
+            for start in starts[token]:
+                result.requests.append({
+                    "updateTextStyle": {
+                        "range": {"startIndex": start, "endIndex": start + utf16_len(label)},
+                        "textStyle": {"link": {"url": url}},
+                        "fields": "link",
+                    }
+                })
+        return result
+
+
+class TemplateLayoutCache:
+    """Template layouts by template ID, re-analyzed when the revision changes."""
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._layouts: dict[str, TemplateLayout] = {}
+        self._loaded = False
+        self.analyses = 0  # template documents read (for render accounting)
+
+    def cached(self, template_id: str) -> TemplateLayout | None:
+        """Last analyzed layout of the template, without checking its revision.
+
+        Revision IDs only move forward, so a copy made after this lookup
+        matches the layout if the template is still at ``revision_id``
+        once the copy exists — one revision lookup per render.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._layouts.get(template_id)
+
+    def forget(self, template_id: str) -> None:
+        """Drop a layout found to be stale; the next render re-analyzes."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._layouts.pop(template_id, None) is not None:
+                self._save()
+
+    def get(self, gc: GoogleClient, template_id: str) -> TemplateLayout:
+        """Layout of the template's current revision (one small revision lookup when cached).
+
+        Call it before copying the template, and check the revision again
+        after the copy: an edit in between means the copy may not match.
+        """
+        revision_id = gc.get_document_revision(template_id)
+        with self._lock:
+            self._ensure_loaded()
+            layout = self._layouts.get(template_id)
+            if layout is not None and layout.revision_id == revision_id:
+                return layout
+
+        logger.info("Analyzing template %s (revision %s)", template_id, revision_id)
+        layout = TemplateLayout.from_document(template_id, gc.get_document(template_id))
+        with self._lock:
+            self.analyses += 1
+            self._layouts[template_id] = layout
+            self._save()
+        return layout
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            data = json.loads(Path(self.path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != _STATE_VERSION:
+            return
+        for template_id, entry in data.get("layouts", {}).items():
+            self._layouts[template_id] = TemplateLayout(
+                template_id,
+                entry["revision_id"],
+                tuple((int(i), str(t)) for i, t in entry["occurrences"]),
+                tuple((str(t), int(n)) for t, n in entry["segment_counts"]),
+            )
+
+    def _save(self) -> None:
+        """Atomically write every known layout."""
+        if not self.path:
+            return
+        target = Path(self.path)
+        state = {
+            "version": _STATE_VERSION,
+            "layouts": {
+                tid: {
+                    "revision_id": lay.revision_id,
+                    "occurrences": list(lay.occurrences),
+                    "segment_counts": list(lay.segment_counts),
+                }
+                for tid, lay in self._layouts.items()
+            },
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.warning("Could not save template layout to %s: %s", self.path, e)
+
+
+_cache: TemplateLayoutCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_template_layout_cache() -> TemplateLayoutCache:
+    """Return the process-wide template layout cache configured from settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TemplateLayoutCache(get_settings().template_layout_cache_file)
+        return _cache
@@ -0,0 +1,152 @@
+"""Persistent on-disk cache of text extracted from Drive files.
+
+Entries are keyed by Drive file ID plus a content version (``md5Checksum`` for
+binary files, ``modifiedTime`` for Google Workspace files), so an edited file
+is never served stale text.  The cache directory is bounded in size; the
+least recently used entries are evicted first.
+
+Shared by ``read_drive_document`` and Tier 3 content classification so a PDF
+is downloaded and parsed at most once per version across the MCP server, the
+inbox scanner and the daily sweep.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+
+logger = logging.getLogger("[text_cache]")
+
+_SUFFIX = ".txt"
+
+
+def file_version(metadata: dict[str, Any]) -> str | None:
+    """Return the cache version for a Drive file's metadata, if it has one."""
+    return metadata.get("md5Checksum") or metadata.get("modifiedTime") or None
+
+
+class TextCache:
+    """Size-bounded LRU cache of extracted text, stored one file per entry.
+
+    Recency is tracked through file mtimes, so it survives restarts and is
+    shared by every process using the same directory.  Writes are atomic.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, file_id: str, version: str, variant: str) -> Path:
+        digest = hashlib.sha256(f"{file_id}\0{version}\0{variant}".encode()).hexdigest()
+        return self.root / f"{digest}{_SUFFIX}"
+
+    def get(self, file_id: str, version: str, variant: str = "text") -> str | None:
+        """Return cached text, or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(file_id, version, variant)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return text
+
+    def put(self, file_id: str, version: str, text: str, variant: str = "text") -> None:
+        """Store text for this file version, evicting old entries if over budget."""
+        if not self.enabled:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, self._path(file_id, version, variant))
+        except OSError as e:
+            logger.warning("Could not write text cache entry for %s: %s", file_id, e)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            try:
+                entries = [
+                    (st.st_mtime, st.st_size, p)
+                    for p in self.root.glob(f"*{_SUFFIX}")
+                    for st in (p.stat(),)
+                ]
+            except OSError:
+                return
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            logger.info("Text cache evicted to %d bytes", total)
+
+    def get_or_extract(
+        self,
+        file_id: str,
+        version: str | None,
+        extract: Callable[[], str],
+        variant: str = "text",
+    ) -> str:
+        """Return cached text for this version, or run ``extract`` and cache it.
+
+        Without a ``version`` the file cannot be validated, so ``extract`` is
+        always run and nothing is stored.  ``extract`` signals a failure by
+        raising; the exception propagates and nothing is stored, so a
+        transient error is retried on the next read.
+        """
+        if version:
+            cached = self.get(file_id, version, variant)
+            if cached is not None:
+                logger.info("Text cache hit for %s", file_id)
+                return cached
+        text = extract()
+        if version:
+            self.put(file_id, version, text, variant)
+        return text
+
+
+_text_cache: TextCache | None = None
+_text_cache_lock = threading.Lock()
+
+
+def get_text_cache() -> TextCache:
+    """Return the process-wide text cache configured from settings."""
+    global _text_cache
+    with _text_cache_lock:
+        if _text_cache is None:
+            settings = get_settings()
+            _text_cache = TextCache(
+                Path(settings.text_cache_dir),
+                int(settings.text_cache_max_mb * 1024 * 1024),
+            )
+        return _text_cache
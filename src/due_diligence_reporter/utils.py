@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import bisect
+import io
 import logging
+import mmap
+import multiprocessing
+import os
 import re
+import shutil
 import smtplib
+import tempfile
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from io import BytesIO
-from typing import Any
+from typing import IO, Any
 
 import requests as _requests
 
@@ -50,51 +62,355 @@ def extract_folder_id_from_url(url: str) -> str | None:
     return None
 
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
+# PDFs with at least this many pages are split across the process pool
+PDF_PARALLEL_MIN_PAGES = 24
+# Pages handed to one worker task
+PDF_PAGES_PER_TASK = 8
+# Upper bound on extraction worker processes
+PDF_MAX_WORKERS = 4
+
+
+@dataclass
+class PdfText:
+    """Result of a PDF text extraction.
+
+    ``error`` is set when the PDF could not be read at all (as opposed to a
+    readable PDF with no text), so callers can avoid caching the failure.
+    """
+
+    text: str
+    page_count: int
+    pages_read: int
+    truncated: bool = False
+    error: str | None = None
+
+
+def _extract_pages(reader: Any, start: int, end: int) -> list[str]:
+    texts: list[str] = []
+    for i in range(start, end):
+        text = reader.pages[i].extract_text() or ""
+        if text.strip():
+            texts.append(text)
+    return texts
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list[str]:
+    """Process-pool task: extract pages ``[start, end)`` from a PDF on disk."""
+    from pypdf import PdfReader  # type: ignore[import-untyped]
+
+    return _extract_pages(PdfReader(pdf_path), start, end)
+
+
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            workers = max(1, min(PDF_MAX_WORKERS, os.cpu_count() or 1))
+            # spawn: the callers are multi-threaded, which makes fork unsafe
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+@contextmanager
+def _pdf_stream(source: bytes | IO[bytes]) -> Iterator[Any]:
+    """Yield a seekable stream over a PDF for pypdf without copying it.
+
+    Bytes are wrapped in BytesIO.  A file already on disk (e.g. a spooled
+    download that spilled over its memory threshold) is memory-mapped, so
+    pages are read through the OS page cache instead of the Python heap.
+    """
+    if isinstance(source, bytes):
+        yield BytesIO(source)
+        return
+
+    source.seek(0)
+    mapped: mmap.mmap | None = None
+    # SpooledTemporaryFile.fileno() forces a rollover; only map files on disk
+    if getattr(source, "_rolled", True):
+        try:
+            fileno = source.fileno()
+            if os.fstat(fileno).st_size:
+                mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, io.UnsupportedOperation):
+            mapped = None
+    if mapped is None:
+        yield source
+        return
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+@contextmanager
+def _pdf_path(source: bytes | IO[bytes]) -> Iterator[str]:
+    """Yield a path the pool workers can open the PDF from.
+
+    A file on disk is shared in place: a named file by its own path, an
+    unnamed temp file (such as a rolled-over spool) through this process's
+    ``/proc/<pid>/fd`` entry, which stays valid while the file is open.  An
+    in-memory spool is rolled over to disk first.  Only bytes, or a file
+    with no usable path, are copied to a temporary file.
+    """
+    shared: str | None = None
+    if not isinstance(source, bytes):
+        rollover = getattr(source, "rollover", None)
+        if rollover is not None:
+            rollover()
+        try:
+            source.flush()
+            name = getattr(source, "name", None)
+            if isinstance(name, str) and os.path.isfile(name):
+                shared = os.path.abspath(name)
+            elif os.path.exists(fd_path := f"/proc/{os.getpid()}/fd/{source.fileno()}"):
+                shared = fd_path
+        except (OSError, ValueError, io.UnsupportedOperation):
+            shared = None
+    if shared is not None:
+        yield shared
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            if isinstance(source, bytes):
+                fh.write(source)
+            else:
+                source.seek(0)
+                shutil.copyfileobj(source, fh)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def _extract_parallel(
+    source: bytes | IO[bytes], page_count: int, max_chars: int | None, workers: int,
+) -> tuple[list[str], int]:
+    """Extract page ranges on the process pool, in waves, stopping at the budget.
+
+    The PDF is handed to workers by path (see :func:`_pdf_path`) so the
+    bytes are not pickled into every task.  Returns (page texts in order,
+    pages read).
     """
-    Extract plain text from PDF bytes using pypdf.
+    pool = _get_pdf_pool()
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    texts: list[str] = []
+    chars = 0
+    pages_read = 0
+
+    with _pdf_path(source) as path:
+        for w in range(0, len(ranges), workers):
+            wave = ranges[w : w + workers]
+            futures: list[Future[list[str]]] = [
+                pool.submit(_extract_page_range, path, start, end) for start, end in wave
+            ]
+            for (_, end), future in zip(wave, futures, strict=True):
+                chunk = future.result()
+                texts.extend(chunk)
+                chars += sum(len(t) for t in chunk)
+                pages_read = end
+            if max_chars is not None and chars >= max_chars:
+                break
+
+    return texts, pages_read
+
+
+def extract_pdf_text(
+    pdf: bytes | IO[bytes],
+    *,
+    max_chars: int | None = None,
+    max_pages: int | None = None,
+    workers: int | None = None,
+) -> PdfText:
+    """
+    Extract plain text from a PDF (bytes or a binary file) using pypdf.
+
+    File objects, such as :meth:`GoogleClient.download_file` spools, are read
+    in place (memory-mapped when on disk) rather than loaded into memory.
+    Large PDFs are split into page ranges extracted in parallel on a process
+    pool.  Extraction stops once ``max_chars`` characters have been collected
+    (the text is then cut to ``max_chars``), and ``max_pages`` reads only the
+    first N pages — enough for classification.
 
-    Returns extracted text (may be empty for image-only PDFs).
+    Returns a :class:`PdfText`; ``text`` may be empty for image-only PDFs,
+    and ``error`` is set if extraction failed.
     """
     try:
         from pypdf import PdfReader  # type: ignore[import-untyped]
     except ImportError:
         logger.error("pypdf not installed; cannot extract PDF text")
-        return ""
+        return PdfText(text="", page_count=0, pages_read=0, error="pypdf not installed")
 
     try:
-        reader = PdfReader(BytesIO(pdf_bytes))
-        pages_text: list[str] = []
-        for page in reader.pages:
-            text = page.extract_text() or ""
-            if text.strip():
-                pages_text.append(text)
+        with _pdf_stream(pdf) as stream:
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            limit = min(page_count, max_pages) if max_pages is not None else page_count
+            if workers is None:
+                workers = max(1, min(PDF_MAX_WORKERS, os.cpu_count() or 1))
+
+            if workers > 1 and limit >= PDF_PARALLEL_MIN_PAGES:
+                pages_text, pages_read = _extract_parallel(pdf, limit, max_chars, workers)
+            else:
+                pages_text = []
+                chars = 0
+                pages_read = 0
+                for i in range(limit):
+                    page_text = _extract_pages(reader, i, i + 1)
+                    pages_text.extend(page_text)
+                    chars += sum(len(t) for t in page_text)
+                    pages_read = i + 1
+                    if max_chars is not None and chars >= max_chars:
+                        break
+            del reader  # release page objects before the map is closed
 
         result = "\n\n".join(pages_text)
+        truncated = pages_read < page_count
+        if max_chars is not None and len(result) > max_chars:
+            result = result[:max_chars]
+            truncated = True
+
         logger.info(
-            "Extracted %d characters from %d PDF pages", len(result), len(reader.pages)
+            "Extracted %d characters from %d of %d PDF pages",
+            len(result), pages_read, page_count,
+        )
+        return PdfText(
+            text=result, page_count=page_count, pages_read=pages_read, truncated=truncated,
         )
-        return result
     except Exception as e:
         logger.error("Failed to extract text from PDF: %s", e)
-        return ""
+        return PdfText(text="", page_count=0, pages_read=0, error=str(e))
 
 
-def _iter_paragraphs(elements: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Yield all paragraph dicts from a Google Docs content tree.
+def extract_text_from_pdf_bytes(
+    pdf_bytes: bytes | IO[bytes],
+    *,
+    max_chars: int | None = None,
+    max_pages: int | None = None,
+    strict: bool = False,
+) -> str:
+    """
+    Extract plain text from PDF bytes (or a binary file) using pypdf.
+
+    See :func:`extract_pdf_text` for ``max_chars`` / ``max_pages``.
+    Returns extracted text (may be empty for image-only PDFs).  A failed
+    extraction returns "" too, unless ``strict`` is set, in which case it
+    raises ``RuntimeError`` so the failure is not mistaken for (and cached
+    as) an empty document.
+    """
+    result = extract_pdf_text(pdf_bytes, max_chars=max_chars, max_pages=max_pages)
+    if strict and result.error is not None:
+        raise RuntimeError(f"Failed to extract text from PDF: {result.error}")
+    return result.text
+
+
+def utf16_len(text: str) -> int:
+    """Length of ``text`` in UTF-16 code units (the Docs API index unit)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _iter_paragraphs(elements: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Yield all paragraph dicts from a Google Docs content tree, in document order.
 
     Recurses into tables (tableRows → tableCells → content) so that
     paragraphs inside table cells are included alongside top-level ones.
     """
-    paragraphs: list[dict[str, Any]] = []
     for element in elements:
         if "paragraph" in element:
-            paragraphs.append(element["paragraph"])
+            yield element["paragraph"]
         elif "table" in element:
             for row in element["table"].get("tableRows", []):
                 for cell in row.get("tableCells", []):
-                    paragraphs.extend(_iter_paragraphs(cell.get("content", [])))
-    return paragraphs
+                    yield from _iter_paragraphs(cell.get("content", []))
+
+
+class DocTextIndex:
+    """A Google Docs body flattened once into a searchable text buffer.
+
+    Each paragraph's text runs are joined (so strings split across runs are
+    found) and paragraphs are separated by a NUL so no match crosses one.
+    Buffer positions map back to document indices through the paragraph
+    offsets, counted in UTF-16 units from the run a match starts in.
+    """
+
+    _SEPARATOR = "\x00"
+
+    def __init__(self, doc_body: dict[str, Any]) -> None:
+        self._offsets: list[int] = []
+        self._paragraphs: list[list[dict[str, Any]]] = []
+        texts: list[str] = []
+        pos = 0
+        for paragraph in _iter_paragraphs(doc_body.get("content", [])):
+            elements = paragraph.get("elements", [])
+            text = "".join([pe["textRun"].get("content", "") for pe in elements if "textRun" in pe])
+            self._offsets.append(pos)
+            self._paragraphs.append(elements)
+            texts.append(text)
+            pos += len(text) + 1
+        self.text = self._SEPARATOR.join(texts)
+
+    def doc_index(self, pos: int) -> int:
+        """Document index of the character at buffer position ``pos``."""
+        i = bisect.bisect_right(self._offsets, pos) - 1
+        offset = pos - self._offsets[i]
+        start = 0
+        for pe in self._paragraphs[i]:
+            text_run = pe.get("textRun")
+            if not text_run:
+                continue
+            content = text_run.get("content", "")
+            start = pe.get("startIndex", 0)
+            if offset < len(content):
+                return start + utf16_len(content[:offset])
+            offset -= len(content)
+        return start
+
+    def _span(self, pos: int, text: str) -> tuple[int, int]:
+        start = self.doc_index(pos)
+        return start, start + utf16_len(text)
+
+    def find(self, search_text: str, occurrence: int = 0) -> tuple[int, int] | None:
+        """``(startIndex, endIndex)`` of the ``occurrence``-th match of ``search_text``."""
+        if not search_text or self._SEPARATOR in search_text:
+            return None
+        pos = -1
+        for _ in range(occurrence + 1):
+            pos = self.text.find(search_text, pos + 1)
+            if pos < 0:
+                return None
+        return self._span(pos, search_text)
+
+    def find_all(self, patterns: set[str]) -> dict[str, list[tuple[int, int]]]:
+        """Every ``(startIndex, endIndex)`` of each pattern, in document order.
+
+        One scan of the buffer for all patterns: a lookahead alternation,
+        longest pattern first, reports the longest pattern starting at each
+        position; any shorter pattern matching there is a prefix of it.
+        """
+        found: dict[str, list[tuple[int, int]]] = {p: [] for p in patterns}
+        searchable = sorted(
+            (p for p in patterns if p and self._SEPARATOR not in p), key=len, reverse=True,
+        )
+        if not searchable:
+            return found
+        prefixes = {
+            p: [q for q in searchable if q != p and p.startswith(q)] for p in searchable
+        }
+        scanner = re.compile("(?=(" + "|".join(map(re.escape, searchable)) + "))")
+        for match in scanner.finditer(self.text):
+            pos, longest = match.start(), match.group(1)
+            for pattern in (longest, *prefixes[longest]):
+                found[pattern].append(self._span(pos, pattern))
+        return found
 
 
 def find_text_index_in_doc(doc_body: dict[str, Any], search_text: str) -> int | None:
@@ -104,25 +420,10 @@ def find_text_index_in_doc(doc_body: dict[str, Any], search_text: str) -> int |
     so URLs or other strings split across multiple consecutive textRun
     elements are still found.  Recurses into tables so that text inside
     table cells is also searchable.  Returns the absolute start index or
-    ``None``.
+    ``None``.  To look up several strings, build one :class:`DocTextIndex`.
     """
-    for paragraph in _iter_paragraphs(doc_body.get("content", [])):
-        # Collect all textRun elements with their start indices
-        runs: list[tuple[int, str]] = []
-        for pe in paragraph.get("elements", []):
-            text_run = pe.get("textRun")
-            if text_run:
-                runs.append((pe.get("startIndex", 0), text_run.get("content", "")))
-        if not runs:
-            continue
-        # Concatenate and search the full paragraph text
-        para_start = runs[0][0]
-        full_text = "".join(content for _, content in runs)
-        offset = full_text.find(search_text)
-        if offset >= 0:
-            return para_start + offset
-
-    return None
+    span = DocTextIndex(doc_body).find(search_text)
+    return span[0] if span else None
 
 
 def flatten_report_data_for_replacement(
@@ -261,19 +562,28 @@ def build_hyperlink_requests(
     Must be called **after** ``replaceAllText`` has been applied — pass a
     fresh ``doc_body`` from ``get_document()``.
 
+    All search strings are located in a single pass over the body.  When
+    several tokens share the same search text, each takes the next
+    occurrence (in *link_tokens* order) rather than all linking the first;
+    once occurrences run out, the first is reused.
+
     Returns a :class:`HyperlinkResult` with the requests list plus
     ``found_tokens`` and ``not_found_tokens`` for diagnostics.
     """
     result = HyperlinkResult()
 
-    for token in link_tokens:
-        url = replacements.get(token, "")
-        if not url.startswith("http"):
-            continue
-
-        search_text = (display_labels or {}).get(token, url)
-        start_idx = find_text_index_in_doc(doc_body, search_text)
-        if start_idx is None:
+    search_texts = {
+        token: (display_labels or {}).get(token, replacements[token])
+        for token in link_tokens
+        if replacements.get(token, "").startswith("http")
+    }
+    spans = DocTextIndex(doc_body).find_all(set(search_texts.values()))
+    taken: dict[str, int] = {}
+
+    for token, search_text in search_texts.items():
+        url = replacements[token]
+        matches = spans.get(search_text, [])
+        if not matches:
             logger.warning(
                 "Hyperlink: text for token '%s' not found in doc body "
                 "(search=%r, url=%s)",
@@ -282,6 +592,9 @@ def build_hyperlink_requests(
             result.not_found_tokens.append(token)
             continue
 
+        occurrence = taken.get(search_text, 0)
+        taken[search_text] = occurrence + 1
+        start_idx, end_idx = matches[occurrence if occurrence < len(matches) else 0]
         logger.debug(
             "Hyperlink: found token '%s' at index %d (search=%r, url=%s)",
             token, start_idx, search_text, url[:80],
@@ -291,7 +604,7 @@ def build_hyperlink_requests(
             "updateTextStyle": {
                 "range": {
                     "startIndex": start_idx,
-                    "endIndex": start_idx + len(search_text),
+                    "endIndex": end_idx,
                 },
                 "textStyle": {
                     "link": {"url": url},
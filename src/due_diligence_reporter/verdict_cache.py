@@ -0,0 +1,180 @@
+"""Persistent cache of LLM classifier verdicts.
+
+The daily sweep and the inbox scanner ask the classifier the same questions
+day after day: what is this unknown site-folder file, which of these shared
+folder filenames belong to this site.  Each verdict is stored under a key
+built from the question kind, the model, a version of its system prompt and
+the exact inputs (filename, a hash of the first-page text, or the file list
+with the site), so an unchanged question is answered from disk.
+
+Negative verdicts ("unknown", no matches) are cached like any other; failed
+calls are not.  Entries expire after a TTL, and editing a prompt or
+switching model changes every key for that tier.
+
+The file is an append-only JSONL log: a version header, then one line per
+stored verdict (a later line for the same key wins).  Storing a verdict
+appends one line; the log is compacted on load once superseded and expired
+lines outnumber the live ones.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import get_settings
+
+logger = logging.getLogger("[verdict_cache]")
+
+_STATE_VERSION = 1
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Short hash identifying a system prompt's wording."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def text_digest(text: str) -> str:
+    """Hash of a (possibly long) input text, for use in a key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """Classifier verdicts by question, kept in memory and in one JSONL log.
+
+    Thread-safe.  Each :meth:`put` appends one line, so storing a batch of
+    verdicts costs the same per verdict however large the cache is.
+    """
+
+    def __init__(self, path: str = "", ttl_seconds: float = 0.0) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, model: str, system_prompt: str, *inputs: Any) -> str:
+        """Key for one question: kind, model, prompt version and inputs."""
+        payload = json.dumps(
+            [kind, model, prompt_version(system_prompt), *inputs], sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached verdict, or None on a miss or expired entry."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["verdict"]
+
+    def put(self, key: str, verdict: Any) -> None:
+        """Store a verdict (JSON-serializable) and persist."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = {"verdict": verdict, "at": time.time()}
+            self._entries[key] = entry
+            self._append({"key": key, **entry})
+
+    def clear(self) -> None:
+        """Drop every verdict, in memory and on disk."""
+        with self._lock:
+            self._entries = {}
+            self._loaded = True
+            self._rewrite()
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        return self.ttl_seconds > 0 and time.time() - entry.get("at", 0) > self.ttl_seconds
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            lines = Path(self.path).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if not isinstance(header, dict) or header.get("version") != _STATE_VERSION:
+            # Unknown or older format: start a fresh log
+            self._rewrite()
+            return
+        torn = False
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+                self._entries[record["key"]] = {"verdict": record["verdict"], "at": record["at"]}
+            except (ValueError, KeyError, TypeError):
+                torn = True  # a write cut short by a killed process
+        self._entries = {k: v for k, v in self._entries.items() if not self._expired(v)}
+        # Rewrite a torn log too, so the next append starts on a fresh line
+        if torn or len(lines) - 1 > 2 * len(self._entries):
+            self._rewrite()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Append one verdict line to the log."""
+        if not self.path:
+            return
+        target = Path(self.path)
+        if not target.exists():
+            self._rewrite()  # the new log already holds the record
+            return
+        try:
+            with target.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning("Could not save classifier verdict to %s: %s", self.path, e)
+
+    def _rewrite(self) -> None:
+        """Atomically write a compacted log of every unexpired verdict."""
+        if not self.path:
+            return
+        target = Path(self.path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(json.dumps({"version": _STATE_VERSION}) + "\n")
+                for key, entry in self._entries.items():
+                    fh.write(json.dumps({"key": key, **entry}) + "\n")
+            os.replace(tmp, target)
+        except OSError as e:
+            logger.warning("Could not save classifier verdicts to %s: %s", self.path, e)
+
+
+_cache: VerdictCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Return the process-wide verdict cache configured from settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = VerdictCache(
+                settings.classifier_cache_file,
+                settings.classifier_cache_ttl_days * 86400,
+            )
+        return _cache
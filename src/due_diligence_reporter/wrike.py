@@ -4,17 +4,41 @@ import json
 import logging
 import os
 import re
+import threading
+import time
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import requests
 from openai import OpenAI
 
+from .rate_limit import call_with_retries
+from .site_matcher import (
+    city_from_address,
+    normalize_site_key,
+    rank_site_candidates,
+    strip_site_prefix,
+)
+
 logger = logging.getLogger("[wrike]")
 
 WRIKE_API_BASE_URL = "https://www.wrike.com/api/v4"
 WRIKE_TIMEOUT_SECONDS = 20.0
 
+# Default lifetime of the in-memory site-record directory before an incremental
+# refresh is attempted.  Override with WRIKE_DIRECTORY_TTL_SECONDS.
+WRIKE_DIRECTORY_TTL_SECONDS = 300.0
+
+# Interval between full reloads of the directory, which are what drop records
+# deleted or moved out of the space (an incremental refresh cannot see those).
+# Override with WRIKE_DIRECTORY_FULL_REFRESH_SECONDS.
+WRIKE_DIRECTORY_FULL_REFRESH_SECONDS = 3600.0
+
+# Overlap applied to the updatedDate window so clock skew between this host
+# and Wrike never drops an edit.
+_DIRECTORY_SYNC_OVERLAP = timedelta(minutes=2)
+
 # Wrike Space ID - Site Records space
 WRIKE_SPACE_ID = "IEAGN6I6I5RFSYZI"
 
@@ -62,6 +86,8 @@ class WrikeConfig:
     """Wrike API configuration."""
 
     access_token: str
+    directory_ttl_seconds: float = WRIKE_DIRECTORY_TTL_SECONDS
+    directory_full_refresh_seconds: float = WRIKE_DIRECTORY_FULL_REFRESH_SECONDS
 
 
 class WrikeError(RuntimeError):
@@ -80,7 +106,25 @@ def load_wrike_config() -> WrikeConfig:
         )
 
     logger.info("Wrike config loaded: space_id=%s", WRIKE_SPACE_ID)
-    return WrikeConfig(access_token=access_token)
+    return WrikeConfig(
+        access_token=access_token,
+        directory_ttl_seconds=_env_seconds(
+            "WRIKE_DIRECTORY_TTL_SECONDS", WRIKE_DIRECTORY_TTL_SECONDS,
+        ),
+        directory_full_refresh_seconds=_env_seconds(
+            "WRIKE_DIRECTORY_FULL_REFRESH_SECONDS", WRIKE_DIRECTORY_FULL_REFRESH_SECONDS,
+        ),
+    )
+
+
+def _env_seconds(name: str, default: float) -> float:
+    """A duration in seconds from the environment, or ``default`` if unset or invalid."""
+    raw = os.getenv(name, "")
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        logger.warning("Invalid %s=%r, using default %.0fs", name, raw, default)
+        return default
 
 
 def _wrike_headers(access_token: str) -> dict[str, str]:
@@ -91,6 +135,15 @@ def _wrike_headers(access_token: str) -> dict[str, str]:
     }
 
 
+def _wrike_get(url: str, **kwargs: Any) -> requests.Response:
+    """GET a Wrike endpoint under the process-wide Wrike rate limit.
+
+    429 and 5xx responses are retried with backoff; a response that still
+    fails is returned for :func:`_raise_for_wrike_error` to report.
+    """
+    return call_with_retries("wrike", lambda: requests.get(url, **kwargs))
+
+
 def _raise_for_wrike_error(resp: requests.Response) -> None:
     """Raise WrikeError if response is not successful."""
     if resp.ok:
@@ -199,7 +252,7 @@ def get_contact_email(
         cfg = load_wrike_config()
 
     try:
-        resp = requests.get(
+        resp = _wrike_get(
             f"https://www.wrike.com/api/v4/contacts/{contact_id}",
             headers=_wrike_headers(cfg.access_token),
             timeout=15,
@@ -267,7 +320,7 @@ def _get_active_status_ids(*, access_token: str) -> set[str]:
     url = f"{WRIKE_API_BASE_URL}/workflows"
     logger.info("Fetching Wrike workflows to resolve active status IDs")
 
-    resp = requests.get(
+    resp = _wrike_get(
         url,
         headers=_wrike_headers(access_token),
         timeout=WRIKE_TIMEOUT_SECONDS,
@@ -334,7 +387,7 @@ def get_site_record_by_id(
     url = f"{WRIKE_API_BASE_URL}/folders/{record_id}"
     logger.info("Fetching site record: %s", record_id)
 
-    resp = requests.get(
+    resp = _wrike_get(
         url,
         headers=_wrike_headers(cfg.access_token),
         timeout=WRIKE_TIMEOUT_SECONDS,
@@ -360,7 +413,7 @@ def resolve_permalink_to_id(*, permalink: str, cfg: WrikeConfig | None = None) -
     url = f"{WRIKE_API_BASE_URL}/folders"
     logger.info("Resolving permalink to record ID: %s", permalink)
 
-    resp = requests.get(
+    resp = _wrike_get(
         url,
         headers=_wrike_headers(cfg.access_token),
         params={"permalink": permalink},
@@ -384,14 +437,27 @@ def resolve_permalink_to_id(*, permalink: str, cfg: WrikeConfig | None = None) -
     return record_id
 
 
-def _get_all_folder_ids(*, access_token: str) -> list[str]:
-    """Get all folder IDs from the Wrike space."""
-    url = f"{WRIKE_API_BASE_URL}/spaces/{WRIKE_SPACE_ID}/folders"
-    logger.info("Fetching all folder IDs from space %s", WRIKE_SPACE_ID)
+def _get_all_folder_ids(
+    *, access_token: str, updated_since: datetime | None = None
+) -> list[str]:
+    """Get all folder IDs from the Wrike space.
 
-    resp = requests.get(
+    With ``updated_since``, only folders modified at or after that time are
+    returned (Wrike ``updatedDate`` filter).
+    """
+    url = f"{WRIKE_API_BASE_URL}/spaces/{WRIKE_SPACE_ID}/folders"
+    params: dict[str, str] = {}
+    if updated_since is not None:
+        start = updated_since.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+        params["updatedDate"] = json.dumps({"start": start})
+        logger.info("Fetching folder IDs updated since %s from space %s", start, WRIKE_SPACE_ID)
+    else:
+        logger.info("Fetching all folder IDs from space %s", WRIKE_SPACE_ID)
+
+    resp = _wrike_get(
         url,
         headers=_wrike_headers(access_token),
+        params=params or None,
         timeout=WRIKE_TIMEOUT_SECONDS,
     )
     _raise_for_wrike_error(resp)
@@ -409,13 +475,12 @@ def _get_all_folder_ids(*, access_token: str) -> list[str]:
     return folder_ids
 
 
-def _get_all_site_records(*, cfg: WrikeConfig) -> list[dict[str, Any]]:
-    """Get all Site Records from the Wrike space (all stages)."""
-    folder_ids = _get_all_folder_ids(access_token=cfg.access_token)
-    logger.info("Found %d folder IDs", len(folder_ids))
-
+def _get_site_records_by_ids(
+    folder_ids: list[str], *, cfg: WrikeConfig
+) -> list[dict[str, Any]]:
+    """Fetch folders by ID (100 per request) and keep only Site Records."""
     batch_size = 100
-    all_site_records: list[dict[str, Any]] = []
+    site_records: list[dict[str, Any]] = []
 
     for i in range(0, len(folder_ids), batch_size):
         batch = folder_ids[i : i + batch_size]
@@ -429,7 +494,7 @@ def _get_all_site_records(*, cfg: WrikeConfig) -> list[dict[str, Any]]:
             len(folder_ids),
         )
 
-        resp = requests.get(
+        resp = _wrike_get(
             url,
             headers=_wrike_headers(cfg.access_token),
             params={"fields": '["customItemTypeId"]'},
@@ -447,12 +512,211 @@ def _get_all_site_records(*, cfg: WrikeConfig) -> list[dict[str, Any]]:
             if not isinstance(item, dict):
                 continue
             if item.get("customItemTypeId") == WRIKE_SITE_RECORD_TYPE_ID:
-                all_site_records.append(item)
+                site_records.append(item)
+
+    return site_records
+
+
+def _get_all_site_records(*, cfg: WrikeConfig) -> list[dict[str, Any]]:
+    """Get all Site Records from the Wrike space (all stages)."""
+    folder_ids = _get_all_folder_ids(access_token=cfg.access_token)
+    logger.info("Found %d folder IDs", len(folder_ids))
+
+    all_site_records = _get_site_records_by_ids(folder_ids, cfg=cfg)
 
     logger.info("Found %d total Site Records", len(all_site_records))
     return all_site_records
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Site-record directory (TTL cache + name/address index)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SiteRecordDirectory:
+    """In-memory directory of Wrike Site Records with a TTL and incremental refresh.
+
+    The first use lists every Site Record in the space.  Once the TTL lapses,
+    only folders whose ``updatedDate`` is newer than the last sync are
+    re-fetched and merged in.  Deleting a folder or moving it out of the
+    space does not update it, so those records are dropped by a full reload
+    every ``directory_full_refresh_seconds``.  Titles, addresses, and cities
+    are indexed by their normalised form so exact lookups resolve without a
+    network call.
+
+    Wrike is queried outside ``_lock``: one thread refreshes at a time
+    (``_refresh_lock``) while lookups keep answering from the current
+    records, and the result is swapped in when it is complete.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate() to discard in-flight refreshes
+        self._loaded_at = 0.0
+        self._records: dict[str, dict[str, Any]] = {}
+        self._title_index: dict[str, set[str]] = {}
+        self._address_index: dict[str, set[str]] = {}
+        self._city_index: dict[str, set[str]] = {}
+        self._synced_at: datetime | None = None
+        self._checked_at = 0.0
+
+    # ---------- Loading ----------
+
+    def records(self, *, cfg: WrikeConfig) -> list[dict[str, Any]]:
+        """Return all Site Records, refreshing first if the TTL has lapsed."""
+        self._ensure_fresh(cfg)
+        with self._lock:
+            return list(self._records.values())
+
+    def refresh(self, *, cfg: WrikeConfig, full: bool = False) -> None:
+        """Synchronise with Wrike (incrementally unless ``full`` or never loaded)."""
+        with self._refresh_lock:
+            self._sync(cfg, full=full)
+
+    def invalidate(self) -> None:
+        """Drop all cached records; the next use performs a full load."""
+        with self._lock:
+            self._records.clear()
+            self._rebuild_index()
+            self._synced_at = None
+            self._checked_at = 0.0
+            self._generation += 1
+
+    def _is_fresh(self, cfg: WrikeConfig) -> bool:
+        with self._lock:
+            age = time.monotonic() - self._checked_at
+            return self._synced_at is not None and age < cfg.directory_ttl_seconds
+
+    def _ensure_fresh(self, cfg: WrikeConfig) -> None:
+        if self._is_fresh(cfg):
+            return
+        with self._lock:
+            loaded = self._synced_at is not None
+        # Once loaded, answer from the current records while another thread refreshes
+        if not self._refresh_lock.acquire(blocking=not loaded):
+            return
+        try:
+            if not self._is_fresh(cfg):
+                self._sync(cfg, full=False)
+        finally:
+            self._refresh_lock.release()
+
+    def _sync(self, cfg: WrikeConfig, *, full: bool) -> None:
+        """Fetch from Wrike and swap the result in; the caller holds ``_refresh_lock``."""
+        sync_started = datetime.now(UTC)
+        with self._lock:
+            synced_at = self._synced_at
+            generation = self._generation
+            records = dict(self._records)
+            full = full or time.monotonic() - self._loaded_at >= cfg.directory_full_refresh_seconds
+
+        if full or synced_at is None:
+            loaded = _get_all_site_records(cfg=cfg)
+            records = {r["id"]: r for r in loaded if isinstance(r.get("id"), str)}
+            full = True
+            logger.info("Site directory loaded: %d records", len(records))
+        else:
+            since = synced_at - _DIRECTORY_SYNC_OVERLAP
+            changed_ids = _get_all_folder_ids(access_token=cfg.access_token, updated_since=since)
+            changed = _get_site_records_by_ids(changed_ids, cfg=cfg) if changed_ids else []
+            refreshed = {r["id"]: r for r in changed if isinstance(r.get("id"), str)}
+            changed_set = set(changed_ids)
+            # A changed folder that came back without being a Site Record no longer is one
+            stale = [
+                record_id for record_id in records
+                if record_id in changed_set and record_id not in refreshed
+            ]
+            for record_id in stale:
+                del records[record_id]
+            records.update(refreshed)
+            logger.info(
+                "Site directory refreshed: %d changed folders, %d site records updated, "
+                "%d removed",
+                len(changed_ids), len(refreshed), len(stale),
+            )
+
+        with self._lock:
+            if self._generation != generation:
+                return  # invalidated meanwhile; the next use reloads
+            self._records = records
+            self._rebuild_index()
+            self._synced_at = sync_started
+            self._checked_at = time.monotonic()
+            if full:
+                self._loaded_at = self._checked_at
+
+    def _rebuild_index(self) -> None:
+        title_index: dict[str, set[str]] = {}
+        address_index: dict[str, set[str]] = {}
+        city_index: dict[str, set[str]] = {}
+
+        for record_id, record in self._records.items():
+            title = record.get("title", "")
+            if isinstance(title, str) and title:
+                key = normalize_site_key(title)
+                title_index.setdefault(key, set()).add(record_id)
+                title_index.setdefault(strip_site_prefix(key), set()).add(record_id)
+
+            address = extract_address_from_record(record)
+            if address:
+                address_index.setdefault(normalize_site_key(address), set()).add(record_id)
+                city = city_from_address(address)
+                if city:
+                    city_index.setdefault(normalize_site_key(city), set()).add(record_id)
+
+        self._title_index = title_index
+        self._address_index = address_index
+        self._city_index = city_index
+
+    # ---------- Lookup ----------
+
+    def lookup(self, query: str, *, cfg: WrikeConfig) -> dict[str, Any] | None:
+        """Resolve a query to a single Site Record via the local index.
+
+        Title matches win over address matches, which win over city matches.
+        Returns None when nothing matches or the best tier is ambiguous, so
+        the caller can fall back to fuzzy matching.
+        """
+        key = normalize_site_key(query)
+        if not key:
+            return None
+
+        self._ensure_fresh(cfg)
+        with self._lock:
+            stripped = strip_site_prefix(key)
+            for index, lookup_key in (
+                (self._title_index, key),
+                (self._title_index, stripped),
+                (self._address_index, key),
+                (self._city_index, stripped),
+            ):
+                ids = index.get(lookup_key)
+                if not ids:
+                    continue
+                if len(ids) == 1:
+                    return self._records[next(iter(ids))]
+                logger.info("Directory lookup '%s' is ambiguous (%d records)", query, len(ids))
+                return None
+        return None
+
+
+_SITE_DIRECTORY = SiteRecordDirectory()
+
+
+def get_site_directory() -> SiteRecordDirectory:
+    """Return the process-wide Site Record directory."""
+    return _SITE_DIRECTORY
+
+
+def _site_candidate(record: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a Site Record to the fields used for matching."""
+    return {
+        "id": record.get("id"),
+        "title": record.get("title", ""),
+        "address": extract_address_from_record(record) or "",
+    }
+
+
 def _match_site_with_llm(
     *, query: str, site_records: list[dict[str, Any]]
 ) -> dict[str, Any] | None:
@@ -461,16 +725,7 @@ def _match_site_with_llm(
         logger.warning("No site records to match against")
         return None
 
-    candidates: list[dict[str, Any]] = []
-    for record in site_records:
-        if not isinstance(record, dict):
-            continue
-
-        record_id = record.get("id")
-        title = record.get("title", "")
-        address = extract_address_from_record(record) or ""
-
-        candidates.append({"id": record_id, "title": title, "address": address})
+    candidates = [_site_candidate(r) for r in site_records if isinstance(r, dict)]
 
     openai_api_key = os.getenv("OPENAI_API_KEY")
     if not openai_api_key:
@@ -483,7 +738,7 @@ def _match_site_with_llm(
                 return record
         return None
 
-    client = OpenAI(api_key=openai_api_key)
+    client = OpenAI(api_key=openai_api_key, max_retries=0)
 
     system_prompt = (
         "You are a site record matching assistant. Given a search query (site name or address) "
@@ -497,20 +752,20 @@ def _match_site_with_llm(
 
     user_prompt = (
         f"Search query: {query}\n\n"
-        f"Candidate Site Records:\n{json.dumps(candidates, indent=2)}\n\n"
+        f"Candidate Site Records:\n{json.dumps(candidates)}\n\n"
         "Which candidate best matches the search query?"
     )
 
     logger.info("Calling OpenAI to match site query: %s", query)
 
-    response = client.chat.completions.create(
+    response = call_with_retries("openai", lambda: client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
         response_format={"type": "json_object"},
-    )
+    ))
 
     result_text = response.choices[0].message.content
     if not result_text:
@@ -535,6 +790,38 @@ def _match_site_with_llm(
     return None
 
 
+def _match_site_record(
+    *, query: str, site_records: list[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Match a query to a Site Record, ranking locally before asking the LLM.
+
+    A clear winner from :func:`site_matcher.rank_site_candidates` is returned
+    directly.  Only ambiguous rankings go to the LLM, with the top-k records.
+    """
+    records = [r for r in site_records if isinstance(r, dict)]
+    by_id = {r.get("id"): r for r in records}
+    result = rank_site_candidates(query, [_site_candidate(r) for r in records])
+
+    if result.match is not None:
+        top = result.ranked[0]
+        logger.info(
+            "Local match for '%s': %s (score=%.2f on %s)",
+            query, top.candidate.get("title"), top.score, top.matched_on,
+        )
+        return by_id.get(result.match.get("id"))
+
+    if not result.ambiguous:
+        logger.warning("No Site Record resembles '%s' — skipping LLM", query)
+        return None
+
+    shortlist = [by_id[c["id"]] for c in result.shortlist if c.get("id") in by_id]
+    logger.info(
+        "Local ranking ambiguous for '%s' (top=%.2f) — asking LLM about %d candidates",
+        query, result.ranked[0].score, len(shortlist),
+    )
+    return _match_site_with_llm(query=query, site_records=shortlist)
+
+
 def _looks_like_wrike_id(value: str) -> bool:
     """Return True if the value looks like a Wrike record ID (alphanumeric, 8-16 chars)."""
     return bool(re.fullmatch(r"[A-Z0-9]{8,16}", value.strip()))
@@ -553,7 +840,9 @@ def find_site_record(
 
     - If it looks like a Wrike ID: fetch directly.
     - If it looks like a permalink: resolve then fetch.
-    - Otherwise: search all Site Records and use LLM to find the best match.
+    - Otherwise: resolve exact/normalised title, address, or city matches from
+      the cached site directory, then rank fuzzily; only ambiguous rankings
+      go to the LLM, with the top-k candidates.
 
     Returns the Site Record dict enriched with human-readable custom field names,
     or None if not found.
@@ -585,8 +874,16 @@ def find_site_record(
 
     # Name / fuzzy search
     logger.info("Searching for Site Record by name: %s", query)
-    all_records = _get_all_site_records(cfg=cfg)
-    matched = _match_site_with_llm(query=query, site_records=all_records)
+    directory = get_site_directory()
+    indexed = directory.lookup(query, cfg=cfg)
+    if indexed:
+        logger.info(
+            "Directory match for '%s': %s (%s)", query, indexed.get("title"), indexed.get("id"),
+        )
+        return enrich_custom_fields_with_names(indexed)
+
+    all_records = directory.records(cfg=cfg)
+    matched = _match_site_record(query=query, site_records=all_records)
 
     if matched:
         logger.info(
@@ -613,7 +910,7 @@ def get_record_comments(
     url = f"{WRIKE_API_BASE_URL}/folders/{record_id}/comments"
     logger.info("Fetching comments for record: %s", record_id)
 
-    resp = requests.get(
+    resp = _wrike_get(
         url,
         headers=_wrike_headers(cfg.access_token),
         timeout=WRIKE_TIMEOUT_SECONDS,
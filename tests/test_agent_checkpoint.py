@@ -0,0 +1,94 @@
+"""Tests for resumable agent run checkpoints."""
+
+from __future__ import annotations
+
+import os
+import time
+
+from due_diligence_reporter.agent_checkpoint import (
+    CHECKPOINT_MAX_AGE_SECONDS,
+    AgentCheckpointStore,
+    input_fingerprint,
+)
+
+
+def _turn(i: int) -> dict:
+    return {"iteration": i, "assistant": [], "results": [], "events": [], "usage": {}}
+
+
+class TestAgentCheckpointStore:
+    def test_turns_survive_a_new_process(self, tmp_path):
+        cp = AgentCheckpointStore(str(tmp_path)).open("Alpha Keller", "fp1")
+        assert not cp.resumable
+        cp.start("Generate a DD Report for: Alpha Keller", [{"event_type": "prefetch"}])
+        cp.record_turn(_turn(0))
+        cp.record_turn(_turn(1))
+
+        resumed = AgentCheckpointStore(str(tmp_path)).open("Alpha Keller", "fp1")
+
+        assert resumed.resumable
+        assert resumed.header["opening"] == "Generate a DD Report for: Alpha Keller"
+        assert [t["iteration"] for t in resumed.turns] == [0, 1]
+
+    def test_changed_inputs_start_fresh(self, tmp_path):
+        store = AgentCheckpointStore(str(tmp_path))
+        cp = store.open("Alpha Keller", "fp1")
+        cp.start("opening", [])
+        cp.record_turn(_turn(0))
+
+        assert not store.open("Alpha Keller", "fp2").resumable
+        assert not store.open("Alpha Boca", "fp1").resumable
+
+    def test_torn_last_line_is_dropped(self, tmp_path):
+        store = AgentCheckpointStore(str(tmp_path))
+        cp = store.open("Alpha Keller", "fp1")
+        cp.start("opening", [])
+        cp.record_turn(_turn(0))
+        with cp.path.open("a", encoding="utf-8") as fh:
+            fh.write('{"iteration": 1, "assist')
+
+        resumed = store.open("Alpha Keller", "fp1")
+        resumed.record_turn(_turn(1))
+
+        assert [t["iteration"] for t in store.open("Alpha Keller", "fp1").turns] == [0, 1]
+
+    def test_pending_turn_and_its_effects_survive_until_the_turn_completes(self, tmp_path):
+        store = AgentCheckpointStore(str(tmp_path))
+        cp = store.open("Alpha Keller", "fp1")
+        cp.start("opening", [])
+        cp.record_pending({"iteration": 0, "assistant": [], "usage": {}, "llm_duration_ms": 0})
+        cp.record_effect("t1", {"result": {"status": "success"}})
+
+        resumed = store.open("Alpha Keller", "fp1")
+        assert resumed.resumable
+        assert resumed.turns == []
+        assert resumed.pending["iteration"] == 0
+        assert resumed.effects == {"t1": {"result": {"status": "success"}}}
+
+        resumed.record_turn(_turn(0))
+        reloaded = store.open("Alpha Keller", "fp1")
+        assert [t["iteration"] for t in reloaded.turns] == [0]
+        assert reloaded.pending is None
+        assert reloaded.effects == {}
+
+    def test_clear_and_prune(self, tmp_path):
+        store = AgentCheckpointStore(str(tmp_path))
+        cp = store.open("Alpha Keller", "fp1")
+        cp.start("opening", [])
+        cp.record_turn(_turn(0))
+        cp.clear()
+        assert not cp.path.exists()
+
+        old = AgentCheckpointStore(str(tmp_path)).open("Alpha Boca", "fp1")
+        old.start("opening", [])
+        stale = time.time() - CHECKPOINT_MAX_AGE_SECONDS - 60
+        os.utime(old.path, (stale, stale))
+        AgentCheckpointStore(str(tmp_path)).open("Alpha Keller", "fp1")
+        assert not old.path.exists()
+
+    def test_disabled_without_directory(self):
+        assert AgentCheckpointStore("").open("Alpha Keller", "fp1") is None
+
+    def test_fingerprint_is_order_independent_for_dicts(self):
+        assert input_fingerprint({"a": 1, "b": 2}) == input_fingerprint({"b": 2, "a": 1})
+        assert input_fingerprint("x", 1) != input_fingerprint("x", 2)
@@ -0,0 +1,152 @@
+"""Tests for batched multi-file classification."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter import classifier
+from due_diligence_reporter.classifier import classify_documents_batch, classify_filenames_llm
+from due_diligence_reporter.verdict_cache import VerdictCache
+
+
+def _completion(payload: dict) -> SimpleNamespace:
+    message = SimpleNamespace(content=json.dumps(payload))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _files(*names: str) -> list[dict]:
+    return [{"id": f"id-{i}", "name": name} for i, name in enumerate(names)]
+
+
+@pytest.fixture
+def openai_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    cache = VerdictCache(str(tmp_path / "v.jsonl"))
+    monkeypatch.setattr(classifier, "get_verdict_cache", lambda: cache)
+    client = MagicMock()
+    with patch("openai.OpenAI", return_value=client):
+        yield client
+
+
+def _asked(client: MagicMock, call: int = -1) -> list[str]:
+    user_msg = client.chat.completions.create.call_args_list[call].kwargs["messages"][1]["content"]
+    return [line[2:] for line in user_msg.splitlines() if line.startswith("- ")]
+
+
+class TestClassifyFilenamesLlm:
+    def test_one_request_and_per_file_cache(self, openai_client):
+        openai_client.chat.completions.create.side_effect = [
+            _completion({"files": [
+                {"filename": "a.pdf", "doc_type": "sir", "confidence": 0.9},
+                {"filename": "b.pdf", "doc_type": "unknown", "confidence": 0.1},
+            ]}),
+            _completion({"files": [{"filename": "c.pdf", "doc_type": "isp", "confidence": 0.8}]}),
+        ]
+        verdicts = classify_filenames_llm(["a.pdf", "b.pdf"], "Alpha Keller")
+
+        assert verdicts == {"a.pdf": ("sir", 0.9), "b.pdf": ("unknown", 0.1)}
+        assert _asked(openai_client) == ["a.pdf", "b.pdf"]
+
+        classify_filenames_llm(["a.pdf", "b.pdf", "c.pdf"], "Alpha Keller")
+        assert openai_client.chat.completions.create.call_count == 2
+        assert _asked(openai_client) == ["c.pdf"]
+
+    def test_partial_reply_asks_skipped_names_alone_and_caches_only_answers(
+        self, openai_client,
+    ):
+        openai_client.chat.completions.create.side_effect = [
+            _completion({"files": [{"filename": "a.pdf", "doc_type": "sir", "confidence": 0.9}]}),
+            _completion({"doc_type": "isp", "confidence": 0.8}),
+            _completion({"files": [{"filename": "b.pdf", "doc_type": "isp", "confidence": 0.8}]}),
+        ]
+        verdicts = classify_filenames_llm(["a.pdf", "b.pdf"], "Alpha Keller")
+
+        assert verdicts == {"a.pdf": ("sir", 0.9), "b.pdf": ("isp", 0.8)}
+        single = openai_client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert "b.pdf" in single[1]["content"]
+
+        # The skipped name was not cached as a batch verdict
+        classify_filenames_llm(["a.pdf", "b.pdf"], "Alpha Keller")
+        assert _asked(openai_client) == ["b.pdf"]
+
+    def test_failure_returns_nothing_and_is_not_cached(self, openai_client):
+        openai_client.chat.completions.create.side_effect = RuntimeError("network")
+        assert classify_filenames_llm(["a.pdf"]) == {}
+        classify_filenames_llm(["a.pdf"])
+        assert openai_client.chat.completions.create.call_count == 2
+
+
+class TestClassifyDocumentsBatch:
+    def test_keywords_fill_everything_without_llm(self, openai_client):
+        batch = classify_documents_batch(_files("Keller SIR.pdf", "notes.pdf"), ["sir"])
+
+        assert batch.resolved["sir"].tier == "keywords"
+        openai_client.chat.completions.create.assert_not_called()
+
+    @patch("due_diligence_reporter.classifier._classify_pdf_content")
+    def test_filename_batch_resolves_before_content(self, mock_content, openai_client):
+        openai_client.chat.completions.create.return_value = _completion({"files": [
+            {"filename": "scan1.pdf", "doc_type": "isp", "confidence": 0.9},
+            {"filename": "scan2.pdf", "doc_type": "building_inspection", "confidence": 0.8},
+            {"filename": "scan3.pdf", "doc_type": "unknown", "confidence": 0.2},
+        ]})
+        files = _files("scan1.pdf", "scan2.pdf", "scan3.pdf")
+
+        batch = classify_documents_batch(files, ["isp", "building_inspection"], gc=MagicMock())
+
+        assert openai_client.chat.completions.create.call_count == 1
+        assert batch.resolved["isp"].file is files[0]
+        assert batch.resolved["building_inspection"].name == "scan2.pdf"
+        assert [v.tier for v in batch.verdicts] == ["filename", "filename", "unclassified"]
+        mock_content.assert_not_called()
+
+    def test_content_reads_unresolved_pdfs_concurrently(self, openai_client):
+        openai_client.chat.completions.create.return_value = _completion({"files": []})
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fake_content(filename, file_id, gc, version):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return {"b.pdf": ("sir", 0.8), "c.pdf": ("isp", 0.9)}.get(filename, ("unknown", 0.1))
+
+        files = _files("a.pdf", "b.pdf", "c.pdf", "d.docx")
+        with patch("due_diligence_reporter.classifier._classify_pdf_content", fake_content):
+            batch = classify_documents_batch(files, ["sir", "isp"], gc=MagicMock())
+
+        assert active["peak"] > 1
+        assert batch.content_reads == 3
+        assert {t: v.name for t, v in batch.resolved.items()} == {"sir": "b.pdf", "isp": "c.pdf"}
+        assert batch.verdicts[3].tier == "unclassified"  # not a PDF
+
+    def test_content_stops_once_wanted_types_are_filled(self, openai_client):
+        openai_client.chat.completions.create.return_value = _completion({"files": []})
+        release = threading.Event()
+
+        def fake_content(filename, file_id, gc, version):
+            if filename == "a.pdf":
+                return "sir", 0.9
+            release.wait(2)
+            return "unknown", 0.0
+
+        files = _files("a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf", "f.pdf")
+        t0 = time.monotonic()
+        try:
+            with patch("due_diligence_reporter.classifier._classify_pdf_content", fake_content):
+                batch = classify_documents_batch(files, ["sir"], gc=MagicMock())
+        finally:
+            release.set()
+
+        assert time.monotonic() - t0 < 1
+        assert batch.content_reads == 1
+        assert batch.resolved["sir"].tier == "content"
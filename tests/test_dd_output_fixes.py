@@ -254,3 +254,234 @@ class TestGenerateMarketingPack:
 
         assert result["status"] == "error"
         assert "failed" in result["error"].lower()
+
+
+# ---------------------------------------------------------------------------
+# create_dd_report — Docs round trips and completeness
+# ---------------------------------------------------------------------------
+
+_TEMPLATE_BODY = {"content": [{"paragraph": {"elements": [
+    {"startIndex": 1, "textRun": {"content": "SIR: {{sources.sir_link}} "}},
+    {"startIndex": 27, "textRun": {"content": "Trace: {{sources.trace_link}}\n"}},
+]}}]}
+
+
+def _replies(template_text: str):
+    """batchUpdate replies as the Docs API gives them for a copy of ``template_text``."""
+    def batch_update(doc_id: str, reqs: list[dict]) -> dict:
+        return {"replies": [
+            {"replaceAllText": {
+                "occurrencesChanged": template_text.count(r["replaceAllText"]["containsText"]["text"]),
+            }} if "replaceAllText" in r else {}
+            for r in reqs
+        ]}
+    return batch_update
+
+
+def _render_gc() -> MagicMock:
+    gc = MagicMock()
+    gc.copy_document.return_value = {"id": "doc1", "webViewLink": "https://docs.google.com/d/doc1"}
+    gc.generate_file_ids.return_value = ["trace1"]
+    gc.get_document_revision.return_value = "r1"
+    gc.get_document.return_value = {"revisionId": "r1", "body": _TEMPLATE_BODY}
+    gc.upload_file_to_folder.return_value = {"id": "trace1", "webViewLink": "https://x/trace1"}
+    gc.batch_update_document.side_effect = _replies(
+        "SIR: {{sources.sir_link}} Trace: {{sources.trace_link}}\n",
+    )
+    return gc
+
+
+class TestCreateDdReportRendering:
+    """create_dd_report fills text and links in a single batchUpdate."""
+
+    @pytest.fixture(autouse=True)
+    def _template(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        from due_diligence_reporter.template_layout import TemplateLayoutCache
+
+        monkeypatch.setenv("DD_TEMPLATE_V2_GOOGLE_DOC_ID", "tmpl")
+        self.layouts = TemplateLayoutCache()
+        monkeypatch.setattr(
+            "due_diligence_reporter.server.get_template_layout_cache", lambda: self.layouts,
+        )
+
+    def _create(self, gc: MagicMock) -> dict[str, Any]:
+        import asyncio
+        from due_diligence_reporter.server import create_dd_report
+
+        with patch("due_diligence_reporter.server._make_google_client", return_value=gc):
+            return asyncio.run(create_dd_report(
+                site_name="Alpha Keller",
+                drive_folder_url="https://drive.google.com/drive/folders/folder123",
+                report_data={"sources.sir_link": "https://drive.google.com/file/d/sir/view"},
+            ))
+
+    def test_text_and_links_in_one_batch(self) -> None:
+        gc = _render_gc()
+
+        result = self._create(gc)
+
+        assert result["status"] == "success"
+        gc.batch_update_document.assert_called_once()
+        reqs = gc.batch_update_document.call_args.args[1]
+        trace_fill = [
+            r for r in reqs if "replaceAllText" in r
+            and r["replaceAllText"]["containsText"]["text"] == "{{sources.trace_link}}"
+        ]
+        assert trace_fill[0]["replaceAllText"]["replaceText"] == "View Report Trace"
+        links = {
+            r["updateTextStyle"]["textStyle"]["link"]["url"]: r["updateTextStyle"]["range"]
+            for r in reqs if "updateTextStyle" in r
+        }
+        assert links["https://drive.google.com/file/d/sir/view"]["startIndex"] == 6
+        assert "https://drive.google.com/file/d/trace1/view" in links
+        gc.get_document.assert_called_once_with("tmpl")
+        assert gc.upload_file_to_folder.call_args.kwargs["file_id"] == "trace1"
+        gc.export_google_doc_as_text.assert_not_called()
+        assert result["hyperlinks_applied"] == 2
+        assert result["render"]["api_calls"] == 7
+
+    def test_template_analyzed_once_per_revision(self) -> None:
+        gc = _render_gc()
+        self._create(gc)
+
+        result = self._create(gc)
+
+        gc.get_document.assert_called_once_with("tmpl")
+        # Copy, one revision check after it, IDs, batchUpdate, trace upload
+        assert result["render"]["api_calls"] == 5
+        assert gc.get_document_revision.call_count == 3
+
+    def test_template_edited_since_cached_is_reanalyzed_next_time(self) -> None:
+        gc = _render_gc()
+        self._create(gc)
+        gc.get_document_revision.return_value = "r2"
+        gc.get_document.side_effect = lambda doc_id: (
+            {"revisionId": "r2", "body": _TEMPLATE_BODY} if doc_id == "tmpl" else {"body": _TEMPLATE_BODY}
+        )
+
+        self._create(gc)
+
+        # The stale layout was not used for this copy, nor kept
+        assert gc.get_document.call_args_list[-1].args == ("doc1",)
+        assert self.layouts.cached("tmpl") is None
+
+        self._create(gc)
+
+        assert gc.get_document.call_args_list[-1].args == ("tmpl",)
+        assert self.layouts.cached("tmpl").revision_id == "r2"
+
+    def test_template_edited_during_copy_is_not_trusted(self) -> None:
+        gc = _render_gc()
+        gc.get_document_revision.side_effect = ["r1", "r2"]
+        rendered = {"content": [{"paragraph": {"elements": [
+            {"startIndex": 1, "textRun": {"content": "SIR: View SIR Trace: View Report Trace\n"}},
+        ]}}]}
+        gc.get_document.side_effect = lambda doc_id: (
+            {"revisionId": "r1", "body": _TEMPLATE_BODY} if doc_id == "tmpl" else {"body": rendered}
+        )
+        gc.export_google_doc_as_text.return_value = "SIR: View SIR Trace: View Report Trace"
+
+        result = self._create(gc)
+
+        first_batch = gc.batch_update_document.call_args_list[0].args[1]
+        assert all("replaceAllText" in r for r in first_batch)
+        assert gc.get_document.call_args_list[-1].args == ("doc1",)
+        assert result["completeness"]["ready_to_send"] is True
+        gc.export_google_doc_as_text.assert_called_once_with("doc1")
+
+    def test_rejected_link_ranges_fall_back_to_reading_doc(self) -> None:
+        gc = _render_gc()
+        gc.batch_update_document.side_effect = [RuntimeError("bad range"), {}, {}]
+        rendered = {"content": [{"paragraph": {"elements": [
+            {"startIndex": 1, "textRun": {"content": "SIR: View SIR Trace: View Report Trace\n"}},
+        ]}}]}
+        gc.get_document.side_effect = lambda doc_id: (
+            {"revisionId": "r1", "body": _TEMPLATE_BODY} if doc_id == "tmpl" else {"body": rendered}
+        )
+
+        self._create(gc)
+
+        calls = gc.batch_update_document.call_args_list
+        assert len(calls) == 3
+        assert all("replaceAllText" in r for r in calls[1].args[1])
+        assert gc.get_document.call_args_list[-1].args == ("doc1",)
+
+    def test_completeness_from_replacements(self) -> None:
+        result = self._create(_render_gc())
+
+        completeness = result["completeness"]
+        assert completeness["doc_id"] == "doc1"
+        assert completeness["ready_to_send"] is True
+        assert completeness["unresolved_tokens"] == []
+
+    def test_completeness_follows_the_template_revision(self) -> None:
+        gc = _render_gc()
+        body = {"content": [{"paragraph": {"elements": [
+            {"startIndex": 1, "textRun": {"content": "{{sources.sir_link}} {{q9.new_section}}\n"}},
+        ]}}]}
+        gc.get_document.return_value = {"revisionId": "r1", "body": body}
+        gc.batch_update_document.side_effect = _replies("{{sources.sir_link}} {{q9.new_section}}")
+
+        completeness = self._create(gc)["completeness"]
+
+        assert completeness["unresolved_tokens"] == ["q9.new_section"]
+        gc.export_google_doc_as_text.assert_not_called()
+
+    def test_replies_not_matching_layout_relink_from_the_doc(self) -> None:
+        gc = _render_gc()
+        # The copy has the SIR link twice, unlike the analyzed template
+        copy_text = "SIR: {{sources.sir_link}} {{sources.sir_link}} Trace: {{sources.trace_link}}"
+        rendered = {"content": [{"paragraph": {"elements": [
+            {"startIndex": 1, "textRun": {"content": "SIR: View SIR View SIR Trace: View Report Trace\n"}},
+        ]}}]}
+        gc.get_document.side_effect = lambda doc_id: (
+            {"revisionId": "r1", "body": _TEMPLATE_BODY} if doc_id == "tmpl" else {"body": rendered}
+        )
+        gc.batch_update_document.side_effect = _replies(copy_text)
+
+        self._create(gc)
+
+        assert gc.get_document.call_args_list[-1].args == ("doc1",)
+        relink = gc.batch_update_document.call_args_list[1].args[1]
+        cleared = [r for r in relink if r["updateTextStyle"]["textStyle"] == {}]
+        assert len(cleared) == 2  # the two predicted ranges
+        assert len(relink) > len(cleared)
+
+    def test_trace_link_removed_when_upload_fails(self) -> None:
+        gc = _render_gc()
+        gc.upload_file_to_folder.side_effect = RuntimeError("Drive down")
+
+        result = self._create(gc)
+
+        assert result["status"] == "success"
+        last_reqs = gc.batch_update_document.call_args_list[-1].args[1]
+        assert last_reqs == [{"replaceAllText": {
+            "containsText": {"text": "View Report Trace", "matchCase": True}, "replaceText": "",
+        }}]
+
+    def test_trace_linked_after_upload_without_preallocated_id(self) -> None:
+        gc = _render_gc()
+        gc.generate_file_ids.side_effect = RuntimeError("quota")
+
+        result = self._create(gc)
+
+        assert gc.upload_file_to_folder.call_args.kwargs["file_id"] is None
+        last_reqs = gc.batch_update_document.call_args_list[-1].args[1]
+        assert last_reqs[0]["replaceAllText"]["replaceText"] == "View Report Trace"
+        assert "sources.trace_link" not in result["completeness"]["unresolved_tokens"]
+
+
+class TestCompletenessFromReplacements:
+    def test_unfilled_and_pending_detected(self) -> None:
+        from due_diligence_reporter.report_schema import TEMPLATE_TOKENS
+        from due_diligence_reporter.server import completeness_from_replacements
+
+        values = dict.fromkeys(TEMPLATE_TOKENS, "ok")
+        values[TEMPLATE_TOKENS[0]] = "[Pending — SIR]"
+        result = completeness_from_replacements("d", values)
+        assert result["ready_to_send"] is True
+        assert result["pending_sections"] == ["[Pending — SIR]"]
+
+        del values[TEMPLATE_TOKENS[1]]
+        result = completeness_from_replacements("d", values)
+        assert result["unresolved_tokens"] == [TEMPLATE_TOKENS[1]]
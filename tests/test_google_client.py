@@ -0,0 +1,474 @@
+"""Tests for the shared GoogleClient and per-thread service handling."""
+
+from __future__ import annotations
+
+import base64
+import io
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter import google_client
+from due_diligence_reporter.google_client import (
+    GoogleClient,
+    get_shared_google_client,
+    reset_shared_google_clients,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    reset_shared_google_clients()
+    google_client._DISCOVERY_DOCS.clear()
+    yield
+    reset_shared_google_clients()
+    google_client._DISCOVERY_DOCS.clear()
+
+
+def _creds(valid: bool = True, refresh_token: str | None = "rt") -> MagicMock:
+    creds = MagicMock()
+    creds.valid = valid
+    creds.refresh_token = refresh_token
+    creds.to_json.return_value = '{"token": "new"}'
+    return creds
+
+
+# ---------------------------------------------------------------------------
+# Shared client
+# ---------------------------------------------------------------------------
+
+
+class TestSharedGoogleClient:
+    @patch("due_diligence_reporter.google_client.GoogleClient.from_oauth_config")
+    def test_reuses_instance_across_calls(self, mock_from_config, tmp_path):
+        mock_from_config.return_value = GoogleClient(_creds())
+        token = str(tmp_path / "token.json")
+
+        first = get_shared_google_client("client.json", token, 8080, ["scope-a"])
+        second = get_shared_google_client("client.json", token, 8080, ["scope-a"])
+
+        assert first is second
+        mock_from_config.assert_called_once()
+
+    @patch("due_diligence_reporter.google_client.GoogleClient.from_oauth_config")
+    def test_different_scopes_get_separate_clients(self, mock_from_config, tmp_path):
+        mock_from_config.side_effect = lambda **_: GoogleClient(_creds())
+        token = str(tmp_path / "token.json")
+
+        a = get_shared_google_client("client.json", token, 8080, ["scope-a"])
+        b = get_shared_google_client("client.json", token, 8080, ["scope-b"])
+
+        assert a is not b
+        assert mock_from_config.call_count == 2
+
+    @patch("due_diligence_reporter.google_client.GoogleClient.from_oauth_config")
+    def test_refreshes_expired_token_on_reuse(self, mock_from_config, tmp_path):
+        creds = _creds()
+        token = tmp_path / "token.json"
+        mock_from_config.return_value = GoogleClient(creds, token_file_path=str(token))
+        get_shared_google_client("client.json", str(token), 8080, ["scope-a"])
+
+        creds.valid = False
+        get_shared_google_client("client.json", str(token), 8080, ["scope-a"])
+
+        creds.refresh.assert_called_once()
+        assert token.read_text() == '{"token": "new"}'
+
+
+class TestEnsureValidCredentials:
+    def test_valid_credentials_not_refreshed(self):
+        creds = _creds(valid=True)
+        GoogleClient(creds).ensure_valid_credentials()
+        creds.refresh.assert_not_called()
+
+    def test_missing_refresh_token_raises(self):
+        gc = GoogleClient(_creds(valid=False, refresh_token=None))
+        with pytest.raises(RuntimeError, match="refresh_token"):
+            gc.ensure_valid_credentials()
+
+
+# ---------------------------------------------------------------------------
+# Service construction
+# ---------------------------------------------------------------------------
+
+
+class TestServices:
+    @patch("due_diligence_reporter.google_client.build_from_document")
+    @patch("due_diligence_reporter.google_client.build")
+    def test_services_built_lazily_and_cached_per_thread(self, mock_build, mock_from_doc):
+        mock_build.return_value = MagicMock(_rootDesc={"name": "drive"})
+        gc = GoogleClient(_creds())
+        mock_build.assert_not_called()
+
+        main_drive = gc.drive_service
+        assert gc.drive_service is main_drive
+        mock_build.assert_called_once()
+
+        other: dict[str, object] = {}
+        thread = threading.Thread(target=lambda: other.update(drive=gc.drive_service))
+        thread.start()
+        thread.join()
+
+        assert other["drive"] is not main_drive
+        mock_from_doc.assert_called_once()
+        assert mock_from_doc.call_args.args == ({"name": "drive"},)
+
+    @patch("due_diligence_reporter.google_client.build_from_document")
+    @patch("due_diligence_reporter.google_client.build")
+    def test_discovery_document_reused_across_clients(self, mock_build, mock_from_doc):
+        mock_build.return_value = MagicMock(_rootDesc={"name": "docs"})
+
+        assert GoogleClient(_creds()).docs_service is not None
+        assert GoogleClient(_creds()).docs_service is not None
+
+        assert mock_build.call_count == 1
+        assert mock_from_doc.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Gmail history
+# ---------------------------------------------------------------------------
+
+
+class TestGmailHistory:
+    @patch("due_diligence_reporter.google_client.build")
+    def test_collects_added_messages_across_pages(self, mock_build):
+        gmail = MagicMock()
+        mock_build.return_value = gmail
+        gmail.users.return_value.history.return_value.list.return_value.execute.side_effect = [
+            {
+                "history": [{"messagesAdded": [{"message": {"id": "m1"}}]}],
+                "historyId": "105",
+                "nextPageToken": "p2",
+            },
+            {
+                "history": [
+                    {"messagesAdded": [{"message": {"id": "m2"}}, {"message": {"id": "m1"}}]},
+                ],
+                "historyId": "110",
+            },
+        ]
+
+        added, history_id = GoogleClient(_creds()).gmail_list_history("100")
+
+        assert [m["id"] for m in added] == ["m1", "m2"]
+        assert history_id == "110"
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_expired_history_raises_dedicated_error(self, mock_build):
+        from googleapiclient.errors import HttpError
+
+        gmail = MagicMock()
+        mock_build.return_value = gmail
+        gmail.users.return_value.history.return_value.list.return_value.execute.side_effect = (
+            HttpError(MagicMock(status=404), b"Requested entity was not found.")
+        )
+
+        with pytest.raises(google_client.GmailHistoryExpiredError):
+            GoogleClient(_creds()).gmail_list_history("1")
+
+
+# ---------------------------------------------------------------------------
+# Drive changes feed
+# ---------------------------------------------------------------------------
+
+
+class TestDriveChanges:
+    @patch("due_diligence_reporter.google_client.build")
+    def test_pages_until_new_start_token(self, mock_build):
+        changes = mock_build.return_value.changes.return_value.list.return_value
+        changes.execute.side_effect = [
+            {"changes": [{"fileId": "a"}], "nextPageToken": "p2"},
+            {"changes": [{"fileId": "b"}], "newStartPageToken": "t9"},
+        ]
+
+        result, token = GoogleClient(_creds()).drive_list_changes("t1")
+
+        assert [c["fileId"] for c in result] == ["a", "b"]
+        assert token == "t9"
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_max_pages_returns_no_token(self, mock_build):
+        changes = mock_build.return_value.changes.return_value.list.return_value
+        changes.execute.return_value = {"changes": [{"fileId": "a"}], "nextPageToken": "p2"}
+
+        result, token = GoogleClient(_creds()).drive_list_changes("t1", max_pages=3)
+
+        assert len(result) == 3
+        assert token is None
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_rejected_token_raises_dedicated_error(self, mock_build):
+        from googleapiclient.errors import HttpError
+
+        changes = mock_build.return_value.changes.return_value.list.return_value
+        changes.execute.side_effect = HttpError(MagicMock(status=400), b"Invalid Value")
+
+        with pytest.raises(google_client.DriveChangesTokenError):
+            GoogleClient(_creds()).drive_list_changes("bogus")
+
+
+# ---------------------------------------------------------------------------
+# Recursive listing
+# ---------------------------------------------------------------------------
+
+
+_FOLDER = google_client.FOLDER_MIME
+
+
+def _tree_children(tree: dict[str, list[dict]]):
+    """Fake _list_children_batch over {folder_id: [child, ...]}, recording calls."""
+    calls: list[list[str]] = []
+    lock = threading.Lock()
+
+    def list_children(parent_ids):
+        with lock:
+            calls.append(list(parent_ids))
+        items = [
+            {**child, "parents": [pid]}
+            for pid in parent_ids
+            for child in tree.get(pid, [])
+        ]
+        return sorted(items, key=lambda item: item["name"])
+
+    return list_children, calls
+
+
+class TestListFilesRecursive:
+    def _tree(self) -> dict[str, list[dict]]:
+        return {
+            "root": [
+                {"id": "f_root", "name": "a.pdf", "mimeType": "application/pdf"},
+                {"id": "sub_b", "name": "B", "mimeType": _FOLDER},
+                {"id": "sub_a", "name": "A", "mimeType": _FOLDER},
+            ],
+            "sub_a": [
+                {"id": "f_a", "name": "in_a.pdf", "mimeType": "application/pdf"},
+                {"id": "sub_a1", "name": "Deep", "mimeType": _FOLDER},
+            ],
+            "sub_b": [{"id": "f_b", "name": "in_b.pdf", "mimeType": "application/pdf"}],
+            "sub_a1": [{"id": "f_deep", "name": "deep.pdf", "mimeType": "application/pdf"}],
+        }
+
+    def test_depth_first_order_and_folder_paths(self):
+        gc = GoogleClient(_creds())
+        list_children, calls = _tree_children(self._tree())
+        with patch.object(gc, "_list_children_batch", side_effect=list_children):
+            files = gc.list_files_recursive("root", max_depth=2)
+
+        assert [(f["id"], f["folder_path"]) for f in files] == [
+            ("f_root", ""),
+            ("f_a", "/A"),
+            ("f_deep", "/A/Deep"),
+            ("f_b", "/B"),
+        ]
+        assert "parents" not in files[0]
+        # One query per depth level instead of two per folder
+        assert calls == [["root"], ["sub_a", "sub_b"], ["sub_a1"]]
+
+    def test_max_depth_limits_crawl(self):
+        gc = GoogleClient(_creds())
+        list_children, calls = _tree_children(self._tree())
+        with patch.object(gc, "_list_children_batch", side_effect=list_children):
+            files = gc.list_files_recursive("root", max_depth=1)
+
+        assert {f["id"] for f in files} == {"f_root", "f_a", "f_b"}
+        assert len(calls) == 2
+
+    def test_wide_level_split_into_concurrent_batches(self):
+        n = google_client.CRAWL_PARENTS_PER_QUERY + 5
+        tree: dict[str, list[dict]] = {
+            "root": [{"id": f"s{i:03d}", "name": f"S{i:03d}", "mimeType": _FOLDER} for i in range(n)],
+        }
+        for i in range(n):
+            tree[f"s{i:03d}"] = [{"id": f"f{i:03d}", "name": "x.pdf", "mimeType": "application/pdf"}]
+        gc = GoogleClient(_creds())
+        list_children, calls = _tree_children(tree)
+        with patch.object(gc, "_list_children_batch", side_effect=list_children):
+            files = gc.list_files_recursive("root", max_depth=1)
+
+        assert [f["id"] for f in files] == [f"f{i:03d}" for i in range(n)]
+        assert sorted(len(c) for c in calls[1:]) == [5, google_client.CRAWL_PARENTS_PER_QUERY]
+
+    def test_failed_batch_retried_per_parent(self):
+        gc = GoogleClient(_creds())
+        list_children, calls = _tree_children(self._tree())
+
+        def flaky(parent_ids):
+            if "sub_b" in parent_ids:
+                list_children(parent_ids)
+                raise RuntimeError("Failed to list files in folder: 404")
+            return list_children(parent_ids)
+
+        with patch.object(gc, "_list_children_batch", side_effect=flaky):
+            files = gc.list_files_recursive("root", max_depth=2)
+
+        assert [f["id"] for f in files] == ["f_root", "f_a", "f_deep"]
+        assert calls == [["root"], ["sub_a", "sub_b"], ["sub_a"], ["sub_b"], ["sub_a1"]]
+
+    def test_unlistable_root_raises(self):
+        gc = GoogleClient(_creds())
+        with (
+            patch.object(gc, "_list_children_batch", side_effect=RuntimeError("403")),
+            pytest.raises(RuntimeError),
+        ):
+            gc.list_files_recursive("root")
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_batch_query_ors_parent_clauses(self, mock_build):
+        drive = MagicMock()
+        mock_build.return_value = drive
+        drive.files.return_value.list.return_value.execute.return_value = {"files": []}
+
+        GoogleClient(_creds())._list_children_batch(["p1", "p2"])
+
+        query = drive.files.return_value.list.call_args.kwargs["q"]
+        assert query == "('p1' in parents or 'p2' in parents) and trashed=false"
+
+
+# ---------------------------------------------------------------------------
+# Gmail HTTP batches
+# ---------------------------------------------------------------------------
+
+
+class _FakeBatch:
+    """Stands in for BatchHttpRequest: answers each added request via ``respond``."""
+
+    def __init__(self, callback, respond, log):
+        self._callback = callback
+        self._respond = respond
+        self._items: list[tuple[str, object]] = []
+        log.append(self._items)
+
+    def add(self, request, request_id=None):
+        self._items.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self._items:
+            response, error = self._respond(request)
+            self._callback(request_id, response, error)
+
+
+def _batching_gmail(mock_build, respond):
+    gmail = MagicMock()
+    mock_build.return_value = gmail
+    batches: list[list] = []
+    gmail.new_batch_http_request.side_effect = (
+        lambda callback: _FakeBatch(callback, respond, batches)
+    )
+    # Requests are identified by the kwargs they were built with
+    gmail.users.return_value.messages.return_value.get.side_effect = lambda **kw: kw
+    gmail.users.return_value.messages.return_value.attachments.return_value.get.side_effect = (
+        lambda **kw: kw
+    )
+    return batches
+
+
+class TestGmailBatches:
+    @patch("due_diligence_reporter.google_client.build")
+    def test_messages_fetched_in_chunks_with_errors_mapped_to_ids(self, mock_build):
+        from googleapiclient.errors import HttpError
+
+        def respond(request):
+            if request["id"] == "m7":
+                return None, HttpError(MagicMock(status=404), b"gone")
+            return {"id": request["id"], "snippet": "hi"}, None
+
+        batches = _batching_gmail(mock_build, respond)
+        ids = [f"m{i}" for i in range(google_client.GMAIL_BATCH_SIZE + 3)]
+
+        results = GoogleClient(_creds()).gmail_get_messages(ids)
+
+        assert [len(b) for b in batches] == [google_client.GMAIL_BATCH_SIZE, 3]
+        assert list(results) == ids
+        assert results["m0"]["snippet"] == "hi"
+        assert isinstance(results["m7"], RuntimeError)
+        assert results["m8"]["id"] == "m8"
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_metadata_fetch_requests_only_named_headers(self, mock_build):
+        batches = _batching_gmail(mock_build, lambda request: (dict(request), None))
+
+        results = GoogleClient(_creds()).gmail_get_messages(
+            ["m1"], format="metadata", metadata_headers=["Message-ID"],
+        )
+
+        assert results["m1"]["format"] == "metadata"
+        assert results["m1"]["metadataHeaders"] == ["Message-ID"]
+        assert len(batches) == 1
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_attachments_decoded(self, mock_build):
+        import base64
+
+        def respond(request):
+            return {"data": base64.urlsafe_b64encode(request["id"].encode()).decode()}, None
+
+        batches = _batching_gmail(mock_build, respond)
+
+        results = GoogleClient(_creds()).gmail_get_attachments("msg", ["a1", "a2"])
+
+        assert results == {"a1": b"a1", "a2": b"a2"}
+        assert len(batches) == 1
+
+
+# ---------------------------------------------------------------------------
+# Streaming media transfers
+# ---------------------------------------------------------------------------
+
+
+class TestMediaTransfers:
+    @patch("due_diligence_reporter.google_client.MediaIoBaseDownload")
+    @patch("due_diligence_reporter.google_client.build")
+    def test_download_spools_chunks(self, mock_build, mock_download):
+        chunks = [b"abc", b"def", b"g"]
+
+        def _downloader(fh, request, chunksize):
+            downloader = MagicMock()
+            downloader.next_chunk.side_effect = [
+                (fh.write(c), i == len(chunks) - 1) for i, c in enumerate(chunks)
+            ]
+            return downloader
+
+        mock_download.side_effect = _downloader
+        gc = GoogleClient(_creds())
+
+        with gc.download_file("F1") as fh:
+            assert fh.read() == b"abcdefg"
+        assert gc.download_file_bytes("F1") == b"abcdefg"
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_small_bytes_upload_single_request(self, mock_build):
+        create = mock_build.return_value.files.return_value.create
+        create.return_value.execute.return_value = {"id": "new"}
+        gc = GoogleClient(_creds())
+
+        assert gc.upload_file_to_folder("P", "a.pdf", b"%PDF")["id"] == "new"
+        create.return_value.next_chunk.assert_not_called()
+
+    @patch("due_diligence_reporter.google_client.build")
+    def test_file_object_upload_is_resumable(self, mock_build):
+        create = mock_build.return_value.files.return_value.create
+        create.return_value.next_chunk.side_effect = [(MagicMock(), None), (None, {"id": "new"})]
+        gc = GoogleClient(_creds())
+
+        result = gc.upload_file_to_folder("P", "a.pdf", io.BytesIO(b"%PDF" * 10))
+
+        assert result["id"] == "new"
+        assert create.return_value.next_chunk.call_count == 2
+        assert create.call_args.kwargs["media_body"].resumable()
+        create.return_value.execute.assert_not_called()
+
+    @patch("due_diligence_reporter.google_client.MEDIA_CHUNK_BYTES", 6)
+    @patch("due_diligence_reporter.google_client.build")
+    def test_gmail_attachment_decoded_in_chunks(self, mock_build):
+        payload = bytes(range(256)) * 3
+        get = mock_build.return_value.users.return_value.messages.return_value.attachments.return_value.get
+        get.return_value.execute.return_value = {
+            "data": base64.urlsafe_b64encode(payload).decode(), "size": len(payload),
+        }
+        gc = GoogleClient(_creds())
+
+        with gc.gmail_download_attachment("M1", "A1") as fh:
+            assert fh.read() == payload
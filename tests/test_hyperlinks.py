@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
-from due_diligence_reporter.utils import build_hyperlink_requests, find_text_index_in_doc
+import random
+
+from due_diligence_reporter.utils import (
+    DocTextIndex,
+    build_hyperlink_requests,
+    find_text_index_in_doc,
+)
 
 
 # Minimal Google Docs body structure for testing
@@ -348,3 +354,51 @@ class TestFindTextIndexSplitRuns:
         assert find_text_index_in_doc(
             doc_body, "https://docs.google.com/document/d/abc123"
         ) == 100
+
+
+class TestDocTextIndex:
+    """Tests for the single-pass multi-pattern body index."""
+
+    def test_find_all_overlapping_labels_in_document_order(self):
+        doc_body = _make_doc_body([(1, "View ISP View Inspection\n"), (30, "View ISP\n")])
+
+        spans = DocTextIndex(doc_body).find_all({"View ISP", "View I", "Inspection"})
+
+        assert spans["View ISP"] == [(1, 9), (30, 38)]
+        assert spans["View I"] == [(1, 7), (10, 16), (30, 36)]
+        assert spans["Inspection"] == [(15, 25)]
+
+    def test_matches_agree_with_str_find(self):
+        rng = random.Random(3)
+        text = "".join(rng.choice("ab ") for _ in range(400))
+        patterns = {"ab", "aba", "b a", "bb", "a", "abab"}
+
+        spans = DocTextIndex(_make_doc_body([(0, text)])).find_all(patterns)
+
+        for pattern in patterns:
+            expected = [i for i in range(len(text)) if text.startswith(pattern, i)]
+            assert [start for start, _ in spans[pattern]] == expected
+
+    def test_no_match_across_paragraphs(self):
+        doc_body = _make_doc_body([(1, "View"), (5, " SIR")])
+        index = DocTextIndex(doc_body)
+        assert index.find("View SIR") is None
+        assert index.find_all({"View SIR"}) == {"View SIR": []}
+
+    def test_occurrence_and_utf16_offsets(self):
+        index = DocTextIndex(_make_doc_body([(1, "🏫 View SIR, View SIR\n")]))
+        assert index.find("View SIR") == (4, 12)
+        assert index.find("View SIR", occurrence=1) == (14, 22)
+        assert index.find("View SIR", occurrence=2) is None
+
+    def test_shared_search_text_takes_successive_occurrences(self):
+        url = "https://drive.google.com/file/d/same"
+        doc_body = _make_doc_body([(1, f"SIR {url}\n"), (60, f"ISP {url}\n")])
+        tokens = frozenset({"sources.sir_link", "sources.isp_link"})
+
+        result = build_hyperlink_requests(
+            doc_body, {"sources.sir_link": url, "sources.isp_link": url}, tokens,
+        )
+
+        starts = sorted(r["updateTextStyle"]["range"]["startIndex"] for r in result.requests)
+        assert starts == [5, 64]
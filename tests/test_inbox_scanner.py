@@ -3,20 +3,28 @@
 from __future__ import annotations
 
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from due_diligence_reporter.google_client import GmailHistoryExpiredError
 from due_diligence_reporter.inbox_scanner import (
     AUTO_FILE_CONFIDENCE,
     DOC_TYPE_FILENAME_TEMPLATES,
     SUPPORTED_DOC_TYPES,
     ClassificationResult,
+    EmailMetadata,
+    InboxScanState,
     _fallback_classify,
     _generate_drive_filename,
     _walk_parts,
+    load_scan_state,
     process_email,
+    save_scan_state,
+    scan_inbox,
 )
 
 
@@ -222,3 +230,406 @@ class TestIdempotency:
         assert len(result["uploaded"]) == 0
         # Email should still be marked (all attachments were handled, just skipped)
         assert result["marked"] is True
+
+
+# ---------------------------------------------------------------------------
+# Incremental scanning
+# ---------------------------------------------------------------------------
+
+
+def _settings(tmp_path):
+    from due_diligence_reporter.config import Settings
+
+    return Settings(inbox_history_file=str(tmp_path / "inbox-history.json"))
+
+
+def _email_result(**overrides):
+    result = {"uploaded": [], "skipped": 0, "low_confidence": [], "marked": True, "failed": False}
+    result.update(overrides)
+    return result
+
+
+def _mailbox(gc, matching):
+    """Gmail stand-in: every message has a Message-ID; *matching* ones match the query."""
+
+    def get_messages(ids, format="full", metadata_headers=None):
+        if format != "metadata":
+            return {}
+        return {
+            m: {"id": m, "labelIds": ["INBOX"], "payload": {"headers": [
+                {"name": "Message-ID", "value": f"<{m}@mail>"},
+            ]}}
+            for m in ids
+        }
+
+    def search(query, max_results=50):
+        return [{"id": m} for m in matching if f"rfc822msgid:{m}@mail" in query][:max_results]
+
+    gc.gmail_get_messages.side_effect = get_messages
+    gc.gmail_search.side_effect = search
+
+
+class TestIncrementalScan:
+    """Runs after the first only look at messages added since the saved historyId."""
+
+    def test_state_round_trip(self, tmp_path):
+        path = str(tmp_path / "state" / "inbox-history.json")
+        save_scan_state(path, InboxScanState(history_id="42", retry_ids=["m1"]))
+        state = load_scan_state(path)
+        assert state.history_id == "42"
+        assert state.retry_ids == ["m1"]
+
+    def test_missing_state_means_full_scan(self, tmp_path):
+        assert load_scan_state(str(tmp_path / "nope.json")).history_id is None
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_first_run_full_search_saves_history_id(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        gc = MagicMock()
+        gc.gmail_get_profile.return_value = {"historyId": "100"}
+        gc.gmail_search.return_value = [{"id": "m1"}]
+        mock_process.return_value = _email_result()
+
+        results = scan_inbox(gc, [], settings)
+
+        assert results["scan_mode"] == "full"
+        gc.gmail_list_history.assert_not_called()
+        assert load_scan_state(settings.inbox_history_file).history_id == "100"
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_no_new_mail_skips_search(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="100"))
+        gc = MagicMock()
+        gc.gmail_list_history.return_value = ([], "105")
+
+        results = scan_inbox(gc, [], settings)
+
+        assert results["scan_mode"] == "incremental"
+        assert results["emails_found"] == 0
+        gc.gmail_search.assert_not_called()
+        mock_process.assert_not_called()
+        assert load_scan_state(settings.inbox_history_file).history_id == "105"
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_only_new_and_retry_messages_processed(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(
+            settings.inbox_history_file, InboxScanState(history_id="100", retry_ids=["old_failed"]),
+        )
+        gc = MagicMock()
+        gc.gmail_list_history.return_value = ([{"id": "new"}, {"id": "not_a_dd_email"}], "110")
+        _mailbox(gc, ["new", "old_low_conf", "old_failed"])
+        mock_process.return_value = _email_result()
+
+        scan_inbox(gc, [], settings)
+
+        processed = [c.args[1] for c in mock_process.call_args_list]
+        assert processed == ["new", "old_failed"]
+        # One search, restricted to the screened messages
+        (query,), _ = gc.gmail_search.call_args
+        assert "-label:DD-Processed" in query
+        assert "{rfc822msgid:new@mail rfc822msgid:not_a_dd_email@mail" in query
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_unrelated_new_mail_never_pages_the_full_search(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="100"))
+        gc = MagicMock()
+        added = [{"id": f"sent{i}"} for i in range(45)] + [{"id": "dd"}]
+        gc.gmail_list_history.return_value = (added, "110")
+        _mailbox(gc, ["dd"])
+        mock_process.return_value = _email_result()
+
+        scan_inbox(gc, [], settings)
+
+        assert [c.args[1] for c in mock_process.call_args_list] == ["dd"]
+        queries = [c.args[0] for c in gc.gmail_search.call_args_list]
+        assert len(queries) == 3
+        assert all("{rfc822msgid:" in q for q in queries)
+        assert all(c.kwargs["max_results"] <= 40 for c in gc.gmail_search.call_args_list)
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_messages_past_the_cap_are_deferred_not_dropped(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        settings.inbox_scan_max_results = 2
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="100"))
+        gc = MagicMock()
+        gc.gmail_list_history.return_value = ([{"id": f"n{i}"} for i in range(3)], "110")
+        _mailbox(gc, [f"n{i}" for i in range(3)])
+        mock_process.return_value = _email_result()
+
+        scan_inbox(gc, [], settings)
+
+        assert [c.args[1] for c in mock_process.call_args_list] == ["n0", "n1"]
+        assert load_scan_state(settings.inbox_history_file).retry_ids == ["n2"]
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_low_confidence_emails_are_retried(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="100"))
+        gc = MagicMock()
+        gc.gmail_list_history.return_value = ([{"id": "unsure"}], "110")
+        _mailbox(gc, ["unsure"])
+        mock_process.return_value = _email_result(
+            marked=False, low_confidence=[{"filename": "scan.pdf"}],
+        )
+
+        scan_inbox(gc, [], settings)
+
+        assert load_scan_state(settings.inbox_history_file).retry_ids == ["unsure"]
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_expired_history_falls_back_to_full_search(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="1"))
+        gc = MagicMock()
+        gc.gmail_list_history.side_effect = GmailHistoryExpiredError("expired")
+        gc.gmail_get_profile.return_value = {"historyId": "200"}
+        gc.gmail_search.return_value = [{"id": "a"}, {"id": "b"}]
+        mock_process.return_value = _email_result()
+
+        results = scan_inbox(gc, [], settings)
+
+        assert results["scan_mode"] == "full"
+        assert mock_process.call_count == 2
+        assert load_scan_state(settings.inbox_history_file).history_id == "200"
+
+    @patch("due_diligence_reporter.inbox_scanner.process_email")
+    def test_failed_emails_saved_for_retry(self, mock_process, tmp_path):
+        settings = _settings(tmp_path)
+        gc = MagicMock()
+        gc.gmail_get_profile.return_value = {"historyId": "100"}
+        gc.gmail_search.return_value = [{"id": "ok"}, {"id": "upload_failed"}, {"id": "boom"}]
+        mock_process.side_effect = [
+            _email_result(),
+            _email_result(marked=False, failed=True),
+            RuntimeError("Gmail down"),
+        ]
+
+        scan_inbox(gc, [], settings)
+
+        assert load_scan_state(settings.inbox_history_file).retry_ids == ["upload_failed", "boom"]
+
+    def test_dry_run_does_not_advance_history(self, tmp_path):
+        settings = _settings(tmp_path)
+        save_scan_state(settings.inbox_history_file, InboxScanState(history_id="100"))
+        gc = MagicMock()
+        gc.gmail_list_history.return_value = ([], "105")
+
+        scan_inbox(gc, [], settings, dry_run=True)
+
+        assert load_scan_state(settings.inbox_history_file).history_id == "100"
+
+
+# ---------------------------------------------------------------------------
+# Concurrent processing
+# ---------------------------------------------------------------------------
+
+
+def _metadata(message_id, filenames):
+    return EmailMetadata(
+        message_id=message_id,
+        subject="Reports",
+        sender="vendor@example.com",
+        body_snippet="",
+        attachments=[
+            {"filename": f, "attachment_id": f"att_{f}", "mime_type": "application/pdf"}
+            for f in filenames
+        ],
+    )
+
+
+def _sir_match(title="Alpha Keller"):
+    return ClassificationResult(
+        doc_type="sir",
+        matched_site_id=f"id_{title}",
+        matched_site_title=title,
+        confidence=0.95,
+        reasoning="",
+    )
+
+
+def _upload_settings(tmp_path, workers=4):
+    from due_diligence_reporter.config import Settings
+
+    return Settings(
+        sir_folder_id="sir_folder",
+        inbox_workers=workers,
+        inbox_history_file=str(tmp_path / "inbox-history.json"),
+    )
+
+
+class TestConcurrentProcessing:
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    @patch("due_diligence_reporter.inbox_scanner._extract_email_metadata")
+    def test_attachments_classified_concurrently(self, mock_extract, mock_classify, tmp_path):
+        mock_extract.return_value = _metadata("m1", ["a.pdf", "b.pdf", "c.pdf"])
+        barrier = threading.Barrier(3, timeout=5)
+
+        def classify(**kwargs):
+            barrier.wait()  # only passes if all three run at once
+            return _sir_match(kwargs["filename"])
+
+        mock_classify.side_effect = classify
+        gc = MagicMock()
+        gc.file_exists_in_folder.return_value = False
+        gc.upload_file_to_folder.return_value = {"id": "d"}
+
+        with ThreadPoolExecutor(3) as pool:
+            result = process_email(
+                gc, "m1", [], _upload_settings(tmp_path), "label", executor=pool,
+            )
+
+        assert [u["original_filename"] for u in result["uploaded"]] == ["a.pdf", "b.pdf", "c.pdf"]
+        assert result["marked"] is True
+        gc.gmail_modify_labels.assert_called_once()
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    @patch("due_diligence_reporter.inbox_scanner._extract_email_metadata")
+    def test_email_not_marked_when_one_upload_fails(self, mock_extract, mock_classify, tmp_path):
+        mock_extract.return_value = _metadata("m1", ["a.pdf", "b.pdf"])
+        mock_classify.side_effect = lambda **kw: _sir_match(kw["filename"])
+        gc = MagicMock()
+        gc.file_exists_in_folder.return_value = False
+        gc.upload_file_to_folder.side_effect = [{"id": "d"}, RuntimeError("quota")]
+
+        with ThreadPoolExecutor(1) as pool:
+            result = process_email(
+                gc, "m1", [], _upload_settings(tmp_path), "label", executor=pool,
+            )
+
+        assert len(result["uploaded"]) == 1
+        assert result["failed"] is True
+        assert result["marked"] is False
+        gc.gmail_modify_labels.assert_not_called()
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    @patch("due_diligence_reporter.inbox_scanner._extract_email_metadata")
+    def test_same_destination_uploaded_once_across_emails(
+        self, mock_extract, mock_classify, tmp_path,
+    ):
+        mock_extract.side_effect = lambda _gc, message_id, **_: _metadata(message_id, ["sir.pdf"])
+        mock_classify.return_value = _sir_match()
+        gc = MagicMock()
+        gc.gmail_get_or_create_label.return_value = "label"
+        gc.gmail_get_profile.return_value = {"historyId": "1"}
+        gc.gmail_search.return_value = [{"id": "m1"}, {"id": "m2"}]
+        gc.file_exists_in_folder.return_value = False
+        gc.upload_file_to_folder.return_value = {"id": "d"}
+
+        results = scan_inbox(gc, [], _upload_settings(tmp_path))
+
+        assert results["attachments_uploaded"] == 1
+        assert results["attachments_skipped"] == 1
+        gc.upload_file_to_folder.assert_called_once()
+        assert results["emails_processed"] == 2
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    @patch("due_diligence_reporter.inbox_scanner._extract_email_metadata")
+    def test_emails_processed_concurrently_results_in_order(
+        self, mock_extract, mock_classify, tmp_path,
+    ):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def extract(_gc, message_id, **_):
+            barrier.wait()
+            return _metadata(message_id, [f"{message_id}.pdf"])
+
+        mock_extract.side_effect = extract
+        mock_classify.side_effect = lambda **kw: _sir_match(kw["filename"])
+        gc = MagicMock()
+        gc.gmail_get_profile.return_value = {"historyId": "1"}
+        gc.gmail_search.return_value = [{"id": "m1"}, {"id": "m2"}]
+        gc.file_exists_in_folder.return_value = False
+        gc.upload_file_to_folder.return_value = {"id": "d"}
+
+        results = scan_inbox(gc, [], _upload_settings(tmp_path, workers=2))
+
+        assert [u["original_filename"] for u in results["uploads"]] == ["m1.pdf", "m2.pdf"]
+
+
+class TestBatchedFetches:
+    def _gc(self):
+        gc = MagicMock()
+        gc.gmail_get_or_create_label.return_value = "label"
+        gc.gmail_get_profile.return_value = {"historyId": "1"}
+        gc.file_exists_in_folder.return_value = False
+        gc.upload_file_to_folder.return_value = {"id": "d"}
+        return gc
+
+    @staticmethod
+    def _message(message_id, filenames, size=50_000):
+        return {
+            "id": message_id,
+            "snippet": "",
+            "payload": {
+                "headers": [{"name": "Subject", "value": "Reports"}],
+                "parts": [
+                    {
+                        "filename": f,
+                        "mimeType": "application/pdf",
+                        "body": {"attachmentId": f"att_{f}", "size": size},
+                    }
+                    for f in filenames
+                ],
+            },
+        }
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    def test_messages_and_attachments_fetched_in_batches(self, mock_classify, tmp_path):
+        mock_classify.side_effect = lambda **kw: _sir_match(kw["filename"])
+        gc = self._gc()
+        gc.gmail_search.return_value = [{"id": "m1"}, {"id": "m2"}]
+        gc.gmail_get_messages.return_value = {
+            "m1": self._message("m1", ["a.pdf", "b.pdf"]),
+            "m2": RuntimeError("Failed to get Gmail message"),
+        }
+        gc.gmail_get_message.return_value = self._message("m2", ["c.pdf"])
+        gc.gmail_get_attachments.side_effect = lambda mid, ids: dict.fromkeys(ids, b"%PDF")
+
+        results = scan_inbox(gc, [], _upload_settings(tmp_path))
+
+        assert results["attachments_uploaded"] == 3
+        gc.gmail_get_messages.assert_called_once_with(["m1", "m2"])
+        # Only the message that failed in the batch is re-fetched on its own
+        gc.gmail_get_message.assert_called_once_with("m2")
+        batches = sorted(c.args for c in gc.gmail_get_attachments.call_args_list)
+        assert batches == [("m1", ["att_a.pdf", "att_b.pdf"]), ("m2", ["att_c.pdf"])]
+        gc.gmail_download_attachment.assert_not_called()
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    def test_large_attachments_streamed_individually(self, mock_classify, tmp_path):
+        from due_diligence_reporter.inbox_scanner import BATCH_ATTACHMENT_MAX_BYTES
+
+        mock_classify.side_effect = lambda **kw: _sir_match(kw["filename"])
+        gc = self._gc()
+        gc.gmail_search.return_value = [{"id": "m1"}]
+        gc.gmail_get_messages.return_value = {
+            "m1": self._message("m1", ["big.pdf"], size=BATCH_ATTACHMENT_MAX_BYTES + 1),
+        }
+        stream = MagicMock()
+        gc.gmail_download_attachment.return_value.__enter__.return_value = stream
+
+        results = scan_inbox(gc, [], _upload_settings(tmp_path))
+
+        assert results["attachments_uploaded"] == 1
+        gc.gmail_get_attachments.assert_not_called()
+        gc.gmail_download_attachment.assert_called_once_with("m1", "att_big.pdf")
+        assert gc.upload_file_to_folder.call_args.kwargs["file_bytes"] is stream
+
+    @patch("due_diligence_reporter.inbox_scanner._classify_and_match_site")
+    def test_failed_attachment_in_batch_blocks_marking(self, mock_classify, tmp_path):
+        mock_classify.side_effect = lambda **kw: _sir_match(kw["filename"])
+        gc = self._gc()
+        gc.gmail_search.return_value = [{"id": "m1"}]
+        gc.gmail_get_messages.return_value = {"m1": self._message("m1", ["a.pdf", "b.pdf"])}
+        gc.gmail_get_attachments.return_value = {
+            "att_a.pdf": b"%PDF", "att_b.pdf": RuntimeError("Failed to get Gmail attachment"),
+        }
+
+        results = scan_inbox(gc, [], _upload_settings(tmp_path))
+
+        assert results["attachments_uploaded"] == 1
+        assert results["emails_processed"] == 0
+        gc.gmail_modify_labels.assert_not_called()
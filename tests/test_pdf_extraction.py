@@ -0,0 +1,129 @@
+"""Tests for page-parallel PDF text extraction in utils."""
+
+from __future__ import annotations
+
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from due_diligence_reporter.utils import (
+    PDF_PARALLEL_MIN_PAGES,
+    extract_pdf_text,
+    extract_text_from_pdf_bytes,
+)
+
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # pages tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref,
+    )
+    return bytes(out)
+
+
+class TestExtractPdfText:
+    def test_serial_extracts_all_pages_in_order(self):
+        pdf = _make_pdf([f"Page {i}" for i in range(5)])
+        result = extract_pdf_text(pdf, workers=1)
+        assert result.page_count == 5
+        assert result.pages_read == 5
+        assert not result.truncated
+        assert [line.strip() for line in result.text.split("\n\n")] == [
+            f"Page {i}" for i in range(5)
+        ]
+
+    def test_parallel_matches_serial(self):
+        pdf = _make_pdf([f"Section {i} findings" for i in range(PDF_PARALLEL_MIN_PAGES + 9)])
+        serial = extract_pdf_text(pdf, workers=1)
+        parallel = extract_pdf_text(pdf, workers=2)
+        assert parallel.text == serial.text
+        assert parallel.pages_read == serial.pages_read == PDF_PARALLEL_MIN_PAGES + 9
+
+    def test_max_chars_stops_early_and_truncates(self):
+        pdf = _make_pdf([f"Page {i:03d} " + "x" * 40 for i in range(40)])
+        result = extract_pdf_text(pdf, max_chars=100, workers=1)
+        assert len(result.text) == 100
+        assert result.truncated
+        assert result.pages_read < result.page_count
+
+    def test_max_pages_reads_only_first_pages(self):
+        pdf = _make_pdf([f"Page {i}" for i in range(10)])
+        result = extract_pdf_text(pdf, max_pages=3, workers=1)
+        assert result.pages_read == 3
+        assert result.truncated
+        assert "Page 2" in result.text
+        assert "Page 3" not in result.text
+
+    def test_invalid_pdf_returns_empty(self):
+        result = extract_pdf_text(b"not a pdf")
+        assert result.text == ""
+        assert result.page_count == 0
+
+    def test_failure_sets_error_and_strict_wrapper_raises(self):
+        assert extract_pdf_text(b"not a pdf").error
+        assert extract_pdf_text(_make_pdf(["Hi"])).error is None
+        assert extract_text_from_pdf_bytes(b"not a pdf") == ""
+        with pytest.raises(RuntimeError):
+            extract_text_from_pdf_bytes(b"not a pdf", strict=True)
+
+    def test_string_wrapper_returns_text(self):
+        pdf = _make_pdf(["Hello world"])
+        assert extract_text_from_pdf_bytes(pdf).strip() == "Hello world"
+
+    def test_reads_spooled_file_in_memory_and_on_disk(self):
+        pdf = _make_pdf([f"Page {i}" for i in range(4)])
+        expected = extract_pdf_text(pdf, workers=1).text
+        for max_size in (len(pdf) * 2, 16):
+            with tempfile.SpooledTemporaryFile(max_size=max_size) as fh:
+                fh.write(pdf)
+                assert extract_pdf_text(fh, workers=1).text == expected
+                assert fh._rolled is (max_size == 16)  # in-memory spools are not forced to disk
+
+    def test_parallel_from_file_object(self):
+        pdf = _make_pdf([f"Section {i}" for i in range(PDF_PARALLEL_MIN_PAGES + 2)])
+        with tempfile.TemporaryFile() as fh:
+            fh.write(pdf)
+            result = extract_pdf_text(fh, workers=2)
+        assert result.text == extract_pdf_text(pdf, workers=1).text
+
+    def test_parallel_shares_spool_with_workers_without_copying(self):
+        pdf = _make_pdf([f"Section {i}" for i in range(PDF_PARALLEL_MIN_PAGES + 2)])
+        expected = extract_pdf_text(pdf, workers=1).text
+        for max_size in (len(pdf) * 2, 16):
+            with tempfile.SpooledTemporaryFile(max_size=max_size) as fh:
+                fh.write(pdf)
+                with patch("tempfile.mkstemp", side_effect=AssertionError("copied")):
+                    assert extract_pdf_text(fh, workers=2).text == expected
+
+    def test_bytes_are_written_once_for_workers(self):
+        pdf = _make_pdf([f"Section {i}" for i in range(PDF_PARALLEL_MIN_PAGES + 2)])
+        with patch("tempfile.mkstemp", wraps=tempfile.mkstemp) as mkstemp:
+            result = extract_pdf_text(pdf, workers=2)
+        assert mkstemp.call_count == 1
+        assert result.pages_read == PDF_PARALLEL_MIN_PAGES + 2
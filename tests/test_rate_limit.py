@@ -0,0 +1,275 @@
+"""Tests for the shared upstream rate limiter."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from due_diligence_reporter import rate_limit
+from due_diligence_reporter.rate_limit import (
+    RateLimitTimeout,
+    TokenBucket,
+    call_with_retries,
+    get_rate_limiter,
+    parse_retry_after,
+    reset_rate_limiters,
+    retry_signal,
+)
+
+
+class TestTokenBucket:
+    def test_burst_then_throttle(self):
+        bucket = TokenBucket(rate=20.0, capacity=2)
+        t0 = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        elapsed = time.monotonic() - t0
+        # Two from the burst, two more at 20/s
+        assert 0.08 <= elapsed < 0.5
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        for _ in range(100):
+            assert bucket.acquire() == 0.0
+
+    def test_timeout_raises(self):
+        bucket = TokenBucket(rate=0.5, capacity=1)
+        bucket.acquire()
+        with pytest.raises(RateLimitTimeout):
+            bucket.acquire(timeout=0.1)
+
+    def test_batch_larger_than_capacity_is_admitted(self):
+        # Like a 50-message Gmail batch at 300/min (a 25-token bucket): it
+        # must go through whenever the bucket is full instead of waiting forever
+        bucket = TokenBucket(rate=50.0, capacity=5)
+        assert bucket.acquire(10, timeout=1) == 0.0
+        t0 = time.monotonic()
+        bucket.acquire(10, timeout=1)
+        assert 0.08 <= time.monotonic() - t0 < 0.5
+
+    def test_shared_across_threads(self):
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+        t0 = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 1 immediate + 5 at 50/s
+        assert time.monotonic() - t0 >= 0.08
+
+
+class TestRegistry:
+    def test_limits_read_from_settings(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_WRIKE_PER_MINUTE", "120")
+        reset_rate_limiters()
+        try:
+            bucket = get_rate_limiter("wrike")
+            assert bucket.rate == pytest.approx(2.0)
+            assert get_rate_limiter("wrike") is bucket
+        finally:
+            reset_rate_limiters()
+
+    def test_google_apis_fall_back_to_google_limit(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_GOOGLE_PER_MINUTE", "240")
+        reset_rate_limiters()
+        try:
+            assert get_rate_limiter("gmail").rate == pytest.approx(4.0)
+            assert get_rate_limiter("gmail") is not get_rate_limiter("drive")
+        finally:
+            reset_rate_limiters()
+
+
+class TestAdmissionControl:
+    def test_throttled_slows_then_recovers(self):
+        bucket = TokenBucket(rate=10.0)
+        bucket.on_throttled()
+        assert bucket.rate == pytest.approx(5.0)
+        for _ in range(10):
+            bucket.on_throttled()
+        assert bucket.rate == pytest.approx(1.0)  # floor
+        for _ in range(100):
+            bucket.on_success()
+        assert bucket.rate == pytest.approx(10.0)
+
+    def test_retry_after_pauses_every_caller(self):
+        bucket = TokenBucket(rate=0)  # unlimited, but Retry-After still applies
+        bucket.on_throttled(retry_after=0.15)
+        t0 = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - t0 >= 0.1
+
+
+class TestRetrySignal:
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert 5 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+    def test_google_http_error(self):
+        resp = httplib2.Response({"status": 429, "retry-after": "7"})
+        signal = retry_signal(HttpError(resp, b"{}"))
+        assert signal is not None and signal.throttled and signal.retry_after == 7.0
+
+        quota = HttpError(httplib2.Response({"status": 403}), b'{"reason": "userRateLimitExceeded"}')
+        assert retry_signal(quota).throttled
+        assert retry_signal(HttpError(httplib2.Response({"status": 403}), b"forbidden")) is None
+        assert retry_signal(HttpError(httplib2.Response({"status": 404}), b"")) is None
+
+    def test_sdk_status_error_and_plain_results(self):
+        error = MagicMock(status_code=503, headers=None)
+        error.response.headers = {"retry-after-ms": "250"}
+        assert retry_signal(error).retry_after == 0.25
+        assert retry_signal({"id": "ok"}) is None
+        assert retry_signal(MagicMock()) is None
+
+    def test_transport_errors(self):
+        import anthropic
+        import httpx
+        import openai
+        import requests
+
+        request = httpx.Request("POST", "https://api.example.com")
+        for error in (
+            openai.APIConnectionError(request=request),
+            anthropic.APITimeoutError(request=request),
+            requests.ConnectionError("reset"),
+            requests.Timeout("read timed out"),
+            TimeoutError("timed out"),
+        ):
+            signal = retry_signal(error)
+            assert signal is not None and signal.status == 0 and not signal.throttled
+
+
+# ---------------------------------------------------------------------------
+# Retries against a local fake upstream
+# ---------------------------------------------------------------------------
+
+
+class _FakeUpstream(BaseHTTPRequestHandler):
+    """Replies from ``server.script`` — (status, headers) per request — then 200."""
+
+    def _reply(self) -> None:
+        self.server.hits += 1  # type: ignore[attr-defined]
+        script = self.server.script  # type: ignore[attr-defined]
+        status, headers = script.pop(0) if script else (200, {})
+        body = json.dumps({"hits": self.server.hits}).encode()  # type: ignore[attr-defined]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch) -> Iterator[ThreadingHTTPServer]:
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+    for upstream in ("PRICING", "WRIKE", "GOOGLE"):
+        monkeypatch.setenv(f"RATE_LIMIT_{upstream}_PER_MINUTE", "60000")
+    reset_rate_limiters()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUpstream)
+    server.script = []  # type: ignore[attr-defined]
+    server.hits = 0  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_rate_limiters()
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class TestCallWithRetries:
+    def test_pricing_api_retries_429_then_succeeds(self, fake_upstream):
+        from due_diligence_reporter.server import _call_pricing_api
+
+        fake_upstream.script = [(429, {"Retry-After": "0"}), (503, {})]
+        assert _call_pricing_api(_url(fake_upstream), [], "TX") == {"hits": 3}
+        bucket = get_rate_limiter("pricing")
+        assert bucket.rate < bucket.max_rate  # throttling fed back into admission
+
+    def test_gives_up_after_max_retries(self, fake_upstream, monkeypatch):
+        import requests
+
+        monkeypatch.setenv("RATE_LIMIT_MAX_RETRIES", "2")
+        reset_rate_limiters()
+        fake_upstream.script = [(429, {})] * 5
+        resp = call_with_retries("wrike", lambda: requests.get(_url(fake_upstream), timeout=5))
+        assert resp.status_code == 429
+        assert fake_upstream.hits == 3
+
+    def test_non_idempotent_5xx_not_retried(self, fake_upstream):
+        import requests
+
+        fake_upstream.script = [(500, {})]
+        resp = call_with_retries(
+            "pricing",
+            lambda: requests.post(_url(fake_upstream), timeout=5),
+            idempotent=False,
+        )
+        assert resp.status_code == 500
+        assert fake_upstream.hits == 1
+
+    def test_google_request_retries_http_error(self, fake_upstream):
+        from due_diligence_reporter.google_client import _ThrottledHttpRequest
+
+        fake_upstream.script = [(429, {"Retry-After": "0"})]
+        request = _ThrottledHttpRequest(
+            httplib2.Http(), lambda resp, content: json.loads(content),
+            _url(fake_upstream), methodId="gmail.users.messages.get",
+        )
+        assert request.execute() == {"hits": 2}
+        assert get_rate_limiter("gmail").rate < get_rate_limiter("gmail").max_rate
+        assert get_rate_limiter("drive").rate == get_rate_limiter("drive").max_rate
+
+    def test_connection_errors_retried_only_when_idempotent(self, monkeypatch):
+        import anthropic
+        import httpx
+
+        monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, retry_after=None: 0.0)
+        calls = []
+
+        def send() -> str:
+            calls.append(1)
+            if len(calls) < 3:
+                raise anthropic.APIConnectionError(request=httpx.Request("POST", "https://x"))
+            return "ok"
+
+        assert call_with_retries("anthropic", send) == "ok"
+        assert len(calls) == 3
+
+        calls.clear()
+        with pytest.raises(anthropic.APIConnectionError):
+            call_with_retries("anthropic", send, idempotent=False)
+        assert len(calls) == 1
+
+    def test_other_errors_raise_immediately(self):
+        calls = []
+
+        def send() -> None:
+            calls.append(1)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            call_with_retries("openai", send)
+        assert len(calls) == 1
@@ -8,9 +8,11 @@ import pytest
 
 from due_diligence_reporter.report_pipeline import (
     PipelineResult,
+    SiteJob,
     check_site_readiness_direct,
     match_site_in_shared_cache,
     process_site_pipeline,
+    run_site_sweep,
 )
 
 
@@ -135,10 +137,13 @@ class TestProcessSitePipeline:
 
         assert result.status == "report_exists"
 
+    @patch("due_diligence_reporter.report_pipeline.prefetch_site_context")
     @patch("due_diligence_reporter.server.check_report_completeness")
     @patch("due_diligence_reporter.report_pipeline.run_dd_report_agent")
     @patch("due_diligence_reporter.report_pipeline.check_site_readiness_direct")
-    def test_all_present_generates_report(self, mock_readiness, mock_agent, mock_completeness):
+    def test_all_present_generates_report(
+        self, mock_readiness, mock_agent, mock_completeness, mock_prefetch,
+    ):
         """Triggers agent and returns report_created when all docs present."""
         mock_readiness.return_value = {
             "sir_found": True,
@@ -168,10 +173,12 @@ class TestProcessSitePipeline:
         assert result.doc_id == "doc123"
         assert result.doc_url == "https://docs.google.com/document/d/doc123"
         mock_agent.assert_called_once()
+        assert mock_agent.call_args.kwargs["context_bundle"] is mock_prefetch.return_value
 
+    @patch("due_diligence_reporter.report_pipeline.prefetch_site_context")
     @patch("due_diligence_reporter.report_pipeline.run_dd_report_agent")
     @patch("due_diligence_reporter.report_pipeline.check_site_readiness_direct")
-    def test_agent_failure(self, mock_readiness, mock_agent):
+    def test_agent_failure(self, mock_readiness, mock_agent, mock_prefetch):
         """Returns generation_failed when agent fails."""
         mock_readiness.return_value = {
             "sir_found": True,
@@ -233,3 +240,97 @@ class TestPipelineResult:
         )
         assert r.doc_id == "abc"
         assert r.pending_count == 2
+
+
+# ---------------------------------------------------------------------------
+# run_site_sweep
+# ---------------------------------------------------------------------------
+
+
+def _jobs(n: int) -> list[SiteJob]:
+    return [
+        SiteJob(site_title=f"Alpha Site {i}", drive_folder_url=f"https://drive/{i}", match_terms=[])
+        for i in range(n)
+    ]
+
+
+class TestRunSiteSweep:
+    def _settings(self):
+        settings = _make_settings()
+        settings.agent_tool_concurrency = 2
+        return settings
+
+    @patch("due_diligence_reporter.report_pipeline.process_site_pipeline")
+    def test_parallel_results_in_job_order(self, mock_pipeline):
+        import threading
+        import time
+
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fake(gc, site_title, *args, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return PipelineResult(site_title=site_title, status="report_exists")
+
+        mock_pipeline.side_effect = fake
+        seen: list[str] = []
+
+        results = run_site_sweep(
+            MagicMock(), _jobs(4), {}, "prompt", self._settings(),
+            workers=4, on_result=lambda job, r: seen.append(job.site_title),
+        )
+
+        assert [r.site_title for r in results] == [f"Alpha Site {i}" for i in range(4)]
+        assert active["peak"] > 1
+        assert sorted(seen) == sorted(r.site_title for r in results)
+
+    @patch("due_diligence_reporter.report_pipeline.process_site_pipeline")
+    def test_deadline_passed_to_pipeline(self, mock_pipeline):
+        mock_pipeline.return_value = PipelineResult(site_title="x", status="report_exists")
+        run_site_sweep(MagicMock(), _jobs(1), {}, "prompt", self._settings(), site_timeout=60)
+
+        kwargs = mock_pipeline.call_args.kwargs
+        assert kwargs["deadline"] is not None
+        assert kwargs["tool_executor"] is not None
+
+    @patch("due_diligence_reporter.report_pipeline.process_site_pipeline")
+    def test_exception_becomes_error_result(self, mock_pipeline):
+        mock_pipeline.side_effect = RuntimeError("boom")
+        results = run_site_sweep(MagicMock(), _jobs(2), {}, "prompt", self._settings(), workers=2)
+        assert [r.status for r in results] == ["error", "error"]
+        assert results[0].error == "boom"
+
+    @patch("due_diligence_reporter.report_pipeline.SWEEP_TIMEOUT_GRACE_SECONDS", 0.0)
+    @patch("due_diligence_reporter.report_pipeline.process_site_pipeline")
+    def test_stuck_site_reported_as_timed_out(self, mock_pipeline):
+        import threading
+
+        release = threading.Event()
+
+        def fake(gc, site_title, *args, **kwargs):
+            if site_title.endswith("0"):
+                release.wait(5)
+            return PipelineResult(site_title=site_title, status="report_exists")
+
+        mock_pipeline.side_effect = fake
+        try:
+            results = run_site_sweep(
+                MagicMock(), _jobs(2), {}, "prompt", self._settings(),
+                workers=2, site_timeout=0.2,
+            )
+        finally:
+            release.set()
+
+        assert results[0].status == "error"
+        assert "Timed out" in results[0].error
+        assert results[0].abandoned
+        assert results[1].status == "report_exists"
+        assert not results[1].abandoned
+        cancels = {c.args[1]: c.kwargs["cancel"] for c in mock_pipeline.call_args_list}
+        assert cancels["Alpha Site 0"].is_set()
+        assert not cancels["Alpha Site 1"].is_set()
@@ -0,0 +1,134 @@
+"""Tests for the Drive-changes-driven shared folder store."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from due_diligence_reporter.google_client import FOLDER_MIME, DriveChangesTokenError
+from due_diligence_reporter.shared_folders import SharedFolderStore
+
+PDF = "application/pdf"
+
+
+@pytest.fixture(autouse=True)
+def _folder_ids(monkeypatch):
+    monkeypatch.setenv("SIR_FOLDER_ID", "SIR")
+    monkeypatch.setenv("ISP_FOLDER_ID", "ISP")
+    monkeypatch.setenv("BUILDING_INSPECTION_FOLDER_ID", "BI")
+
+
+def _file(fid: str, name: str, parent: str, mime: str = PDF) -> dict:
+    return {"id": fid, "name": name, "mimeType": mime, "parents": [parent]}
+
+
+def _gc() -> MagicMock:
+    tree = {
+        "SIR": [_file("s2", "Site 10 SIR.pdf", "SIR"), _file("s1", "Site 9 SIR.pdf", "SIR")],
+        "ISP": [_file("i1", "Keller ISP.pdf", "ISP"), _file("ix", "Archive", "ISP", FOLDER_MIME)],
+        "BI": [_file("sub", "2026", "BI", FOLDER_MIME)],
+        "sub": [_file("b1", "Keller Inspection.pdf", "sub")],
+        "ix": [_file("old", "Old ISP.pdf", "ix")],
+    }
+    gc = MagicMock()
+    gc.drive_get_start_page_token.return_value = "t1"
+    gc.list_children.side_effect = lambda ids: [i for fid in ids for i in tree.get(fid, [])]
+    gc.drive_list_changes.return_value = ([], "t2")
+    return gc
+
+
+def _names(cache, doc_type: str) -> list[str]:
+    return [f["name"] for f in cache[doc_type]]
+
+
+class TestSharedFolderStore:
+    def test_relist_tracks_bi_subfolders_only(self, tmp_path):
+        gc = _gc()
+        cache = SharedFolderStore(str(tmp_path / "s.json")).refresh(gc)
+
+        assert _names(cache, "sir") == ["Site 9 SIR.pdf", "Site 10 SIR.pdf"]  # natural order
+        assert _names(cache, "isp") == ["Keller ISP.pdf"]  # ISP subfolders not crawled
+        assert cache["building_inspection"][0]["folder_path"] == "/2026"
+        assert "parents" not in cache["sir"][0]
+        gc.drive_list_changes.assert_not_called()
+
+    def test_next_run_applies_changes_only(self, tmp_path):
+        path = str(tmp_path / "s.json")
+        SharedFolderStore(path).refresh(_gc())
+
+        gc = _gc()
+        gc.drive_list_changes.return_value = ([
+            {"fileId": "s3", "file": _file("s3", "Site 11 SIR.pdf", "SIR")},
+            {"fileId": "s1", "file": {**_file("s1", "Site 9 SIR.pdf", "SIR"), "trashed": True}},
+            {"fileId": "i1", "file": _file("i1", "Keller ISP.pdf", "elsewhere")},
+            {"fileId": "sub", "file": _file("sub", "2026 Q1", "BI", FOLDER_MIME)},
+            {"fileId": "zz", "removed": True},
+        ], "t2")
+        cache = SharedFolderStore(path).refresh(gc)
+
+        gc.drive_list_changes.assert_called_once()
+        assert gc.drive_list_changes.call_args.args == ("t1",)
+        gc.list_children.assert_not_called()
+        assert _names(cache, "sir") == ["Site 10 SIR.pdf", "Site 11 SIR.pdf"]
+        assert _names(cache, "isp") == []
+        assert cache["building_inspection"][0]["folder_path"] == "/2026 Q1"
+
+    def test_folder_moved_in_is_listed_and_removed_folder_dropped(self, tmp_path):
+        store = SharedFolderStore(str(tmp_path / "s.json"))
+        gc = _gc()
+        store.refresh(gc)
+
+        gc.list_children.side_effect = lambda ids: (
+            [_file("b2", "Alpha Inspection.pdf", "new")] if ids == ["new"] else []
+        )
+        gc.drive_list_changes.return_value = ([
+            {"fileId": "new", "file": _file("new", "2025", "BI", FOLDER_MIME)},
+            {"fileId": "sub", "removed": True},
+        ], "t2")
+        cache = store.refresh(gc)
+
+        assert _names(cache, "building_inspection") == ["Alpha Inspection.pdf"]
+        assert cache["building_inspection"][0]["folder_path"] == "/2025"
+
+    def test_unrelated_changes_keep_cache_and_index(self, tmp_path):
+        store = SharedFolderStore(str(tmp_path / "s.json"))
+        gc = _gc()
+        first = store.refresh(gc)
+        assert first.index is not None
+
+        gc.drive_list_changes.return_value = (
+            [{"fileId": "x", "file": _file("x", "Budget.xlsx", "other")}], "t2",
+        )
+        assert store.refresh(gc) is first
+
+    def test_rejected_token_relists(self, tmp_path):
+        store = SharedFolderStore(str(tmp_path / "s.json"))
+        gc = _gc()
+        store.refresh(gc)
+        gc.drive_list_changes.side_effect = DriveChangesTokenError("gone")
+
+        store.refresh(gc)
+
+        assert gc.drive_get_start_page_token.call_count == 2
+
+    def test_changed_folder_ids_relist(self, tmp_path, monkeypatch):
+        store = SharedFolderStore(str(tmp_path / "s.json"))
+        gc = _gc()
+        store.refresh(gc)
+        monkeypatch.setenv("SIR_FOLDER_ID", "SIR2")
+
+        cache = store.refresh(gc)
+
+        gc.drive_list_changes.assert_not_called()
+        assert cache["sir"] == []
+
+    def test_failed_listing_not_persisted_as_current(self, tmp_path):
+        path = str(tmp_path / "s.json")
+        gc = _gc()
+        gc.list_children.side_effect = RuntimeError("quota")
+        assert SharedFolderStore(path).refresh(gc)["sir"] == []
+
+        gc = _gc()
+        assert len(SharedFolderStore(path).refresh(gc)["sir"]) == 2
+        gc.drive_list_changes.assert_not_called()
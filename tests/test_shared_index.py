@@ -0,0 +1,61 @@
+"""Tests for the shared-folder filename index."""
+
+from __future__ import annotations
+
+from due_diligence_reporter.shared_index import (
+    PDF_MIME,
+    SharedFolderCache,
+    SharedFolderIndex,
+    tokenize,
+)
+
+GDOC_MIME = "application/vnd.google-apps.document"
+
+
+def _cache() -> SharedFolderCache:
+    cache = SharedFolderCache()
+    cache["sir"] = [
+        {"name": "Mar 01 2026 - Alpha Keller SIR", "id": "sir_doc", "mimeType": GDOC_MIME},
+        {"name": "Mar 01 2026 - Alpha Keller SIR.pdf", "id": "sir_pdf", "mimeType": PDF_MIME},
+        {"name": "Feb 20 2026 - Alpha Boca Raton SIR.pdf", "id": "sir_boca", "mimeType": PDF_MIME},
+    ]
+    cache["isp"] = [{"name": "KellerISD program fit.pdf", "id": "isp1", "mimeType": PDF_MIME}]
+    cache["building_inspection"] = []
+    return cache
+
+
+class TestSharedFolderIndex:
+    def test_tokenize_splits_on_punctuation(self):
+        assert tokenize("Feb 20 - Alpha Boca_Raton SIR.pdf") == [
+            "feb", "20", "alpha", "boca", "raton", "sir", "pdf",
+        ]
+
+    def test_prefers_pdf_over_earlier_google_doc(self):
+        result = SharedFolderIndex.of(_cache()).match(["Alpha Keller"])
+        assert result["sir"]["id"] == "sir_pdf"
+        assert result["sir"]["doc_type"] == "sir"
+
+    def test_multi_word_term_must_be_contiguous(self):
+        result = SharedFolderIndex.of(_cache()).match(["Raton Boca"])
+        assert result["sir"] is None
+
+    def test_term_matches_word_prefix(self):
+        result = SharedFolderIndex.of(_cache()).match(["Keller"])
+        assert result["isp"]["id"] == "isp1"
+
+    def test_term_inside_a_word_not_matched(self):
+        result = SharedFolderIndex.of(_cache()).match(["aton"])
+        assert result["sir"] is None
+
+    def test_any_term_matches(self):
+        result = SharedFolderIndex.of(_cache()).match(["Southlake", "Boca Raton"])
+        assert result["sir"]["id"] == "sir_boca"
+        assert result["building_inspection"] is None
+
+    def test_index_built_once_per_cache(self):
+        cache = _cache()
+        assert SharedFolderIndex.of(cache) is SharedFolderIndex.of(cache)
+
+    def test_plain_dict_still_supported(self):
+        result = SharedFolderIndex.of(dict(_cache())).match(["boca raton"])
+        assert result["sir"]["id"] == "sir_boca"
@@ -0,0 +1,112 @@
+"""Tests for the deterministic site-record matcher."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from due_diligence_reporter.site_matcher import (
+    LLM_TOP_K,
+    city_from_address,
+    rank_site_candidates,
+    score_candidate,
+)
+from due_diligence_reporter.wrike import (
+    WRIKE_CUSTOM_FIELDS,
+    _match_site_record,
+)
+
+CANDIDATES = [
+    {"id": "1", "title": "Alpha Keller", "address": "1234 Main St, Keller, TX 76248"},
+    {"id": "2", "title": "Alpha Boca Raton", "address": "55 Palm Way, Boca Raton, FL 33431"},
+    {"id": "3", "title": "Alpha Austin Demo", "address": "1 Congress Ave, Austin, TX 78701"},
+    {"id": "4", "title": "Alpha Austin North", "address": "9 Lamar Blvd, Austin, TX 78758"},
+    {"id": "5", "title": "Alpha Southlake", "address": "100 State St, Southlake, TX 76092"},
+]
+
+
+class TestCityFromAddress:
+    def test_us_address(self):
+        assert city_from_address("1234 Main St, Keller, TX 76248") == "Keller"
+
+    def test_too_short(self):
+        assert city_from_address("Keller, TX") is None
+
+
+class TestScoreCandidate:
+    def test_exact_title_scores_one(self):
+        assert score_candidate("alpha keller", CANDIDATES[0]).score == 1.0
+
+    def test_prefixless_title_scores_one(self):
+        sc = score_candidate("Keller", CANDIDATES[0])
+        assert sc.score == 1.0
+        assert sc.matched_on == "title"
+
+    def test_address_match(self):
+        sc = score_candidate("55 Palm Way Boca Raton FL 33431", CANDIDATES[1])
+        assert sc.matched_on == "address"
+        assert sc.score == 1.0
+
+
+class TestRankSiteCandidates:
+    def test_exact_title_is_confident(self):
+        result = rank_site_candidates("Alpha Keller", CANDIDATES)
+        assert result.match["id"] == "1"
+        assert not result.ambiguous
+
+    def test_typo_dominating_match_is_confident(self):
+        result = rank_site_candidates("Southlak", CANDIDATES)
+        assert result.match["id"] == "5"
+
+    def test_partial_address_is_confident(self):
+        result = rank_site_candidates("1234 Main Street Keller", CANDIDATES)
+        assert result.match["id"] == "1"
+
+    def test_shared_city_is_ambiguous(self):
+        result = rank_site_candidates("Austin", CANDIDATES)
+        assert result.match is None
+        assert result.ambiguous
+        assert {c["id"] for c in result.shortlist[:2]} == {"3", "4"}
+
+    def test_unrelated_query_is_no_match(self):
+        result = rank_site_candidates("xyzzy", CANDIDATES)
+        assert result.match is None
+        assert not result.ambiguous
+
+    def test_shortlist_is_capped(self):
+        many = [{"id": str(i), "title": f"Alpha Austin {i}", "address": ""} for i in range(20)]
+        result = rank_site_candidates("Austin", many)
+        assert len(result.shortlist) == LLM_TOP_K
+
+
+def _record(candidate: dict) -> dict:
+    return {
+        "id": candidate["id"],
+        "title": candidate["title"],
+        "customFields": [{"id": WRIKE_CUSTOM_FIELDS["address"], "value": candidate["address"]}],
+    }
+
+
+RECORDS = [_record(c) for c in CANDIDATES]
+
+
+class TestMatchSiteRecord:
+    @patch("due_diligence_reporter.wrike._match_site_with_llm")
+    def test_confident_match_skips_llm(self, mock_llm):
+        record = _match_site_record(query="alpha boca raton", site_records=RECORDS)
+        assert record is RECORDS[1]
+        mock_llm.assert_not_called()
+
+    @patch("due_diligence_reporter.wrike._match_site_with_llm")
+    def test_ambiguous_sends_only_shortlist(self, mock_llm):
+        mock_llm.return_value = RECORDS[2]
+        record = _match_site_record(query="Austin", site_records=RECORDS)
+
+        assert record is RECORDS[2]
+        sent = mock_llm.call_args.kwargs["site_records"]
+        assert len(sent) <= LLM_TOP_K
+        assert sent[0]["id"] in {"3", "4"}
+
+    @patch("due_diligence_reporter.wrike._match_site_with_llm")
+    def test_no_resemblance_skips_llm(self, mock_llm):
+        assert _match_site_record(query="xyzzy", site_records=RECORDS) is None
+        mock_llm.assert_not_called()
@@ -0,0 +1,151 @@
+"""Tests for the cached template layout and predicted link ranges."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from due_diligence_reporter.template_layout import TemplateLayout, TemplateLayoutCache
+from due_diligence_reporter.utils import utf16_len
+
+
+def _para(*runs: tuple[int, str]) -> dict:
+    return {"paragraph": {"elements": [
+        {"startIndex": i, "textRun": {"content": c}} for i, c in runs
+    ]}}
+
+
+def _doc(content: list[dict], revision: str = "r1") -> dict:
+    return {"revisionId": revision, "body": {"content": content}}
+
+
+def _apply(text: str, replacements: dict[str, str]) -> str:
+    """What replaceAllText does to ``text``."""
+    for token, value in replacements.items():
+        text = text.replace(f"{{{{{token}}}}}", value)
+    return text
+
+
+class TestTemplateLayout:
+    def test_tokens_in_runs_and_table_cells(self):
+        doc = _doc([
+            _para((1, "Site: {{meta."), (14, "site}}\n")),
+            {"table": {"tableRows": [{"tableCells": [
+                {"content": [_para((30, "{{q1.rating}}\n"))]},
+            ]}]}},
+        ])
+        layout = TemplateLayout.from_document("t", doc)
+
+        assert layout.occurrences == ((7, "meta.site"), (30, "q1.rating"))
+        assert layout.revision_id == "r1"
+
+    def test_offsets_count_utf16_units(self):
+        layout = TemplateLayout.from_document("t", _doc([_para((1, "🏫 {{a}}\n"))]))
+        assert layout.occurrences == ((4, "a"),)
+
+    def test_predicted_starts_match_rendered_text(self):
+        text = "x {{a}} y {{link}} z {{b}} {{link}}\n"
+        layout = TemplateLayout.from_document("t", _doc([_para((1, text))]))
+        replacements = {"a": "Ünïcode 🏫 value", "link": "View SIR", "b": ""}
+
+        starts = layout.predict_starts(replacements)
+
+        rendered = _apply(text, replacements)
+        expected = [1 + utf16_len(rendered[:i]) for i in range(len(rendered))
+                    if rendered.startswith("View SIR", i)]
+        assert starts is not None
+        assert starts["link"] == expected
+
+    def test_braces_in_values_disable_prediction(self):
+        layout = TemplateLayout.from_document("t", _doc([_para((1, "{{a}} {{b}}\n"))]))
+        assert layout.predict_starts({"a": "{{b}}"}) is None
+        assert layout.hyperlink_requests({"a": "{x"}, {"a": "https://x"}) is None
+
+    def test_hyperlink_requests_cover_label(self):
+        layout = TemplateLayout.from_document("t", _doc([_para((1, "A {{l}} {{m}}\n"))]))
+
+        result = layout.hyperlink_requests(
+            {"l": "View", "m": "Other"}, {"l": "https://x", "gone": "https://y"},
+        )
+
+        assert result is not None
+        assert result.found_tokens == ["l"]
+        assert result.not_found_tokens == ["gone"]
+        assert result.requests[0]["updateTextStyle"]["range"] == {"startIndex": 3, "endIndex": 7}
+
+
+    def test_confirms_replies_against_token_counts(self):
+        layout = TemplateLayout.from_document("t", _doc([_para((1, "{{a}} {{b}} {{a}}\n"))]))
+        reqs = [{"replaceAllText": {"containsText": {"text": f"{{{{{t}}}}}"}}} for t in ("a", "b")]
+
+        def replies(*counts: int) -> list[dict]:
+            return [{"replaceAllText": {"occurrencesChanged": n}} for n in counts]
+
+        assert layout.tokens == ("a", "b")
+        assert layout.confirms(reqs, replies(2, 1))
+        assert not layout.confirms(reqs, replies(2, 0))
+        assert not layout.confirms(reqs, [])
+
+    def test_tokens_outside_the_body_are_counted_not_placed(self):
+        doc = _doc([_para((1, "{{a}} {{b}}\n"))])
+        doc["headers"] = {"h1": {"content": [_para((0, "{{a}}\n"))]}}
+        doc["footnotes"] = {"f1": {"content": [_para((0, "{{c}}\n"))]}}
+        layout = TemplateLayout.from_document("t", doc)
+        reqs = [{"replaceAllText": {"containsText": {"text": f"{{{{{t}}}}}"}}} for t in ("a", "b", "c")]
+
+        def replies(*counts: int) -> list[dict]:
+            return [{"replaceAllText": {"occurrencesChanged": n}} for n in counts]
+
+        assert layout.occurrences == ((1, "a"), (7, "b"))
+        assert layout.confirms(reqs, replies(2, 1, 1))
+        assert not layout.confirms(reqs, replies(1, 1, 0))
+
+
+class TestTemplateLayoutCache:
+    def _gc(self, revision: str = "r1") -> MagicMock:
+        gc = MagicMock()
+        gc.get_document_revision.return_value = revision
+        gc.get_document.return_value = _doc([_para((1, "{{a}}\n"))], revision)
+        return gc
+
+    def test_same_revision_reuses_layout(self, tmp_path):
+        path = str(tmp_path / "layout.json")
+        gc = self._gc()
+        first = TemplateLayoutCache(path).get(gc, "t")
+
+        # A new process loads the analyzed layout from disk
+        again = TemplateLayoutCache(path).get(gc, "t")
+
+        assert again == first
+        gc.get_document.assert_called_once_with("t")
+
+    def test_segment_counts_survive_reload(self, tmp_path):
+        path = str(tmp_path / "layout.json")
+        gc = self._gc()
+        doc = gc.get_document.return_value
+        doc["footers"] = {"f": {"content": [_para((0, "{{a}}\n"))]}}
+        TemplateLayoutCache(path).get(gc, "t")
+
+        again = TemplateLayoutCache(path).cached("t")
+
+        assert again is not None
+        assert again.segment_counts == (("a", 1),)
+
+    def test_forget_drops_layout_on_disk(self, tmp_path):
+        path = str(tmp_path / "layout.json")
+        cache = TemplateLayoutCache(path)
+        cache.get(self._gc(), "t")
+
+        cache.forget("t")
+
+        assert TemplateLayoutCache(path).cached("t") is None
+
+    def test_new_revision_reanalyzes(self):
+        cache = TemplateLayoutCache()
+        cache.get(self._gc("r1"), "t")
+        gc = self._gc("r2")
+
+        layout = cache.get(gc, "t")
+
+        assert layout.revision_id == "r2"
+        gc.get_document.assert_called_once_with("t")
+        assert cache.analyses == 2
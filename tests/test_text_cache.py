@@ -0,0 +1,164 @@
+"""Tests for the persistent extracted-text cache."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter.text_cache import TextCache, file_version
+
+
+class TestFileVersion:
+    def test_prefers_md5(self):
+        assert file_version({"md5Checksum": "abc", "modifiedTime": "2026-01-01"}) == "abc"
+
+    def test_falls_back_to_modified_time(self):
+        assert file_version({"modifiedTime": "2026-01-01T00:00:00Z"}) == "2026-01-01T00:00:00Z"
+
+    def test_none_without_either(self):
+        assert file_version({"id": "x"}) is None
+
+
+class TestTextCache:
+    def test_roundtrip(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        cache.put("f1", "v1", "hello")
+        assert cache.get("f1", "v1") == "hello"
+
+    def test_new_version_misses(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        cache.put("f1", "v1", "old")
+        assert cache.get("f1", "v2") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        TextCache(tmp_path, max_bytes=1_000_000).put("f1", "v1", "kept")
+        assert TextCache(tmp_path, max_bytes=1_000_000).get("f1", "v1") == "kept"
+
+    def test_lru_eviction(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=250)
+        cache.put("a", "v", "x" * 100)
+        cache.put("b", "v", "y" * 100)
+        # Age both entries, then touch "a" so "b" is least recently used
+        old = time.time() - 100
+        for p in tmp_path.glob("*.txt"):
+            os.utime(p, (old, old))
+        assert cache.get("a", "v") is not None
+
+        cache.put("c", "v", "z" * 100)
+
+        assert cache.get("a", "v") is not None
+        assert cache.get("b", "v") is None
+        assert cache.get("c", "v") is not None
+
+    def test_disabled_cache_stores_nothing(self, tmp_path):
+        cache = TextCache(tmp_path / "off", max_bytes=0)
+        cache.put("f1", "v1", "hello")
+        assert cache.get("f1", "v1") is None
+        assert not (tmp_path / "off").exists()
+
+    def test_get_or_extract_runs_once_per_version(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        extract = MagicMock(return_value="text")
+
+        assert cache.get_or_extract("f1", "v1", extract) == "text"
+        assert cache.get_or_extract("f1", "v1", extract) == "text"
+        assert extract.call_count == 1
+
+    def test_get_or_extract_without_version_never_caches(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        extract = MagicMock(return_value="text")
+        cache.get_or_extract("f1", None, extract)
+        cache.get_or_extract("f1", None, extract)
+        assert extract.call_count == 2
+
+    def test_failed_extraction_is_not_cached(self, tmp_path):
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        extract = MagicMock(side_effect=[RuntimeError("pool broke"), "text"])
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_extract("f1", "v1", extract)
+        assert cache.get("f1", "v1") is None
+        assert cache.get_or_extract("f1", "v1", extract) == "text"
+        assert cache.get("f1", "v1") == "text"
+
+
+class TestSharedCacheUsers:
+    @patch("due_diligence_reporter.classifier.classify_by_content_llm", return_value=("sir", 0.9))
+    @patch("due_diligence_reporter.classifier.classify_by_filename_llm", return_value=("unknown", 0.0))
+    @patch("due_diligence_reporter.server.extract_text_from_pdf_bytes", return_value="Site Investigation Report")
+    def test_tier3_reuses_text_from_read_drive_document(
+        self, _extract, _tier2, _tier3, tmp_path,
+    ):
+        from due_diligence_reporter.classifier import classify_document
+        from due_diligence_reporter.server import read_drive_document
+
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        gc = MagicMock()
+        gc.download_file.return_value = io.BytesIO(b"%PDF")
+        gc.drive_service.files.return_value.get.return_value.execute.return_value = {
+            "mimeType": "application/pdf", "md5Checksum": "m1",
+        }
+
+        with (
+            patch("due_diligence_reporter.text_cache._text_cache", cache),
+            patch("due_diligence_reporter.server._make_google_client", return_value=gc),
+        ):
+            result = asyncio.run(read_drive_document("F1", "scan_0042.pdf"))
+            doc_type, _ = classify_document("scan_0042.pdf", file_id="F1", gc=gc, file_version="m1")
+
+        assert doc_type == "sir"
+        assert result["status"] == "success"
+        assert "Site Investigation Report" in str(result)
+        gc.download_file.assert_called_once_with("F1")
+
+    @patch("due_diligence_reporter.classifier.classify_by_content_llm", return_value=("isp", 0.9))
+    @patch("due_diligence_reporter.classifier.classify_by_filename_llm", return_value=("unknown", 0.0))
+    def test_tier3_extracts_first_pages_once(self, _tier2, _tier3, tmp_path):
+        from due_diligence_reporter.classifier import TIER3_MAX_PAGES, classify_document
+
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        gc = MagicMock()
+        with (
+            patch("due_diligence_reporter.text_cache._text_cache", cache),
+            patch(
+                "due_diligence_reporter.utils.extract_text_from_pdf_bytes", return_value="ISP",
+            ) as mock_extract,
+        ):
+            classify_document("a.pdf", file_id="F2", gc=gc, file_version="m2")
+            classify_document("a.pdf", file_id="F2", gc=gc, file_version="m2")
+
+        mock_extract.assert_called_once()
+        assert mock_extract.call_args.kwargs["max_pages"] == TIER3_MAX_PAGES
+
+    def test_read_retries_after_a_failed_extraction(self, tmp_path):
+        from due_diligence_reporter.server import read_drive_document
+        from due_diligence_reporter.utils import PdfText
+
+        cache = TextCache(tmp_path, max_bytes=1_000_000)
+        gc = MagicMock()
+        gc.download_file.side_effect = lambda file_id: io.BytesIO(b"%PDF")
+        gc.drive_service.files.return_value.get.return_value.execute.return_value = {
+            "mimeType": "application/pdf", "md5Checksum": "m1",
+        }
+
+        with (
+            patch("due_diligence_reporter.text_cache._text_cache", cache),
+            patch("due_diligence_reporter.server._make_google_client", return_value=gc),
+            patch("due_diligence_reporter.utils.extract_pdf_text", side_effect=[
+                PdfText(text="", page_count=0, pages_read=0, error="mmap failed"),
+                PdfText(text="Site Investigation Report", page_count=1, pages_read=1),
+            ]),
+        ):
+            failed = asyncio.run(read_drive_document("F1", "sir.pdf"))
+            assert cache.get("F1", "m1") is None
+            result = asyncio.run(read_drive_document("F1", "sir.pdf"))
+
+        assert failed["status"] == "error"
+        assert result["status"] == "success"
+        assert result["text"] == "Site Investigation Report"
+        assert cache.get("F1", "m1") == "Site Investigation Report"
@@ -0,0 +1,639 @@
+"""Tests for concurrent tool execution in the report agent loop."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter.agent_checkpoint import AgentCheckpoint, AgentCheckpointStore
+from due_diligence_reporter.report_pipeline import (
+    RECALL_TOOL,
+    AgentContextBudget,
+    SiteContextBundle,
+    ToolExecutor,
+    _state_from_address,
+    prefetch_site_context,
+    route_tool_call_sync,
+    run_dd_report_agent,
+)
+
+
+@pytest.fixture
+def executor():
+    ex = ToolExecutor(max_concurrency=3)
+    yield ex
+    ex.close()
+
+
+@pytest.fixture(autouse=True)
+def _non_streaming(monkeypatch):
+    # The agent loop tests mock messages.create; streaming tests opt back in
+    monkeypatch.setenv("AGENT_STREAMING", "false")
+
+
+class _Recorder:
+    """Fake tool router that sleeps and records concurrency."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.order: list[str] = []
+
+    def __call__(self, tool_name: str, tool_input: dict) -> dict:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.order.append(f"start:{tool_input['tag']}")
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.order.append(f"end:{tool_input['tag']}")
+        if tool_input.get("fail"):
+            raise RuntimeError("boom")
+        return {"status": "success", "tag": tool_input["tag"]}
+
+
+class TestToolExecutor:
+    def test_independent_calls_run_concurrently_in_order(self, executor):
+        recorder = _Recorder()
+        calls = [("read_drive_document", {"tag": str(i)}) for i in range(3)]
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            t0 = time.monotonic()
+            outcomes = executor.run_batch(calls)
+            elapsed = time.monotonic() - t0
+
+        assert [o.result["tag"] for o in outcomes] == ["0", "1", "2"]
+        assert recorder.peak == 3
+        assert elapsed < 3 * recorder.delay
+        assert all(o.duration_ms >= 40 for o in outcomes)
+
+    def test_concurrency_is_bounded(self):
+        ex = ToolExecutor(max_concurrency=2)
+        recorder = _Recorder(delay=0.02)
+        try:
+            with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+                ex.run_batch([("get_site_record", {"tag": str(i)}) for i in range(6)])
+        finally:
+            ex.close()
+        assert recorder.peak == 2
+
+    def test_serial_tool_is_a_barrier(self, executor):
+        recorder = _Recorder(delay=0.02)
+        calls = [
+            ("read_drive_document", {"tag": "a"}),
+            ("read_drive_document", {"tag": "b"}),
+            ("create_dd_report", {"tag": "report"}),
+            ("check_report_completeness", {"tag": "check"}),
+        ]
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            executor.run_batch(calls)
+
+        order = recorder.order
+        assert order.index("start:report") > max(order.index("end:a"), order.index("end:b"))
+        assert order.index("start:check") > order.index("end:report")
+
+    def test_cancel_skips_side_effects_not_yet_started(self, executor):
+        recorder = _Recorder(delay=0.02)
+        cancel = threading.Event()
+
+        def route(tool_name: str, tool_input: dict) -> dict:
+            if tool_input["tag"] == "a":
+                cancel.set()  # the sweep gives up while the read is in flight
+            return recorder(tool_name, tool_input)
+
+        batch = executor.batch(cancel)
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", route):
+            batch.submit("read_drive_document", {"tag": "a"})
+            batch.submit("create_dd_report", {"tag": "report"})
+            batch.submit("send_dd_report_email", {"tag": "email"})
+            outcomes = batch.finish()
+
+        assert recorder.order == ["start:a", "end:a"]
+        assert outcomes[0].error is None
+        assert all("cancelled" in o.error for o in outcomes[1:])
+
+    def test_errors_are_captured_per_call(self, executor):
+        recorder = _Recorder(delay=0)
+        calls = [("get_site_record", {"tag": "ok"}), ("get_site_record", {"tag": "bad", "fail": True})]
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            outcomes = executor.run_batch(calls)
+
+        assert outcomes[0].error is None
+        assert outcomes[1].error == "boom"
+        assert outcomes[1].result == {"status": "error", "message": "boom"}
+
+
+class TestRouteToolCallSync:
+    def test_reuses_thread_event_loop(self):
+        loops = []
+
+        async def fake_route(tool_name, tool_input):
+            import asyncio
+            loops.append(asyncio.get_running_loop())
+            return {}
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call", fake_route):
+            route_tool_call_sync("get_site_record", {})
+            route_tool_call_sync("get_site_record", {})
+
+        assert loops[0] is loops[1]
+
+
+def _tool_use(tool_id: str, name: str, tag: str) -> SimpleNamespace:
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input={"tag": tag})
+
+
+class TestAgentLoopConcurrency:
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_results_keep_order_and_trace_per_tool(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        first = MagicMock(content=[
+            _tool_use("t1", "read_drive_document", "sir"),
+            _tool_use("t2", "read_drive_document", "isp"),
+            _tool_use("t3", "read_drive_document", "inspection"),
+        ])
+        second = MagicMock(content=[SimpleNamespace(type="text", text="done")])
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [first, second]
+
+        recorder = _Recorder(delay=0.02)
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            result = run_dd_report_agent("Alpha Keller", "prompt", tool_executor=executor)
+
+        tool_results = client.messages.create.call_args_list[1].kwargs["messages"][2]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2", "t3"]
+        assert recorder.peak == 3
+
+        trace = result["trace"]
+        assert [e.tool_name for e in trace.events] == ["read_drive_document"] * 3
+        assert all(e.duration_ms >= 15 for e in trace.events)
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_deadline_stops_agent(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        result = run_dd_report_agent(
+            "Alpha Keller", "prompt", tool_executor=executor, deadline=time.monotonic() - 1,
+        )
+
+        assert result["success"] is False
+        assert "timed out" in result["error"]
+        assert result["trace"].final_status == "timed_out"
+        mock_anthropic.return_value.messages.create.assert_not_called()
+
+
+class TestAgentPromptCaching:
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_breakpoints_and_usage(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        usage = SimpleNamespace(
+            input_tokens=50, output_tokens=20,
+            cache_creation_input_tokens=9000, cache_read_input_tokens=0,
+        )
+        first = MagicMock(content=[_tool_use("t1", "read_drive_document", "sir")], usage=usage)
+        second = MagicMock(
+            content=[SimpleNamespace(type="text", text="done")],
+            usage=SimpleNamespace(
+                input_tokens=80, output_tokens=5,
+                cache_creation_input_tokens=300, cache_read_input_tokens=9000,
+            ),
+        )
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [first, second]
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", _Recorder()):
+            result = run_dd_report_agent("Alpha Keller", "prompt", tool_executor=executor)
+
+        calls = client.messages.create.call_args_list
+        for call in calls:
+            kwargs = call.kwargs
+            assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+            assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+            assert sum("cache_control" in t for t in kwargs["tools"]) == 1
+            assert kwargs["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        # Earlier turns are not left marked
+        second_messages = calls[1].kwargs["messages"]
+        assert second_messages[0]["content"] == "Generate a DD Report for: Alpha Keller"
+
+        trace = result["trace"]
+        assert trace.llm_calls == 2
+        assert trace.cache_creation_input_tokens == 9300
+        assert trace.cache_read_input_tokens == 9000
+        assert trace.to_dict()["llm_usage"]["input_tokens"] == 130
+
+
+def _result_message(context, *results):
+    return {"role": "user", "content": [
+        context.result_block(tid, name, result) for tid, name, result in results
+    ]}
+
+
+class TestAgentContextBudget:
+    def test_under_budget_left_untouched(self):
+        context = AgentContextBudget(budget_tokens=10_000, compact_over_chars=100)
+        messages = [_result_message(context, ("t1", "read_drive_document", {"content": "x" * 500}))]
+        messages.append(_result_message(context, ("t2", "get_site_record", {"status": "success"})))
+
+        context.before_call(messages)
+
+        assert json.loads(messages[0]["content"][0]["content"])["content"] == "x" * 500
+        assert context.compactions == 0
+
+    def test_over_budget_compacts_older_large_results(self):
+        context = AgentContextBudget(budget_tokens=200, compact_over_chars=100)
+        messages = [
+            _result_message(
+                context,
+                ("t1", "read_drive_document", {"status": "success", "content": "a" * 1000}),
+                ("t2", "get_site_record", {"status": "success"}),
+            ),
+            _result_message(context, ("t3", "read_drive_document", {"content": "b" * 1000})),
+        ]
+
+        context.before_call(messages)
+        context.before_call(messages)
+
+        compacted = json.loads(messages[0]["content"][0]["content"])
+        assert compacted["compacted"] is True
+        assert compacted["recall_id"] == "t1"
+        assert compacted["summary"]["content_length"] == 1000
+        # Small results and the newest turn stay verbatim
+        assert json.loads(messages[0]["content"][1]["content"]) == {"status": "success"}
+        assert "b" * 1000 in messages[1]["content"][0]["content"]
+        assert context.compactions == 1
+        assert context.tokens_saved > 2 * 200
+
+    def test_recall_returns_full_result(self):
+        context = AgentContextBudget(budget_tokens=1, compact_over_chars=10)
+        original = {"content": "a" * 100}
+        context.result_block("t1", "read_drive_document", original)
+
+        outcome = context.recall({"recall_id": "t1"})
+        block = context.result_block("t9", RECALL_TOOL, outcome.result)
+
+        assert json.loads(block["content"]) == original
+        assert context.recall({"recall_id": "nope"}).result["status"] == "error"
+        assert context.recalls == 2
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_agent_answers_recall_without_routing(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        first = MagicMock(content=[_tool_use("t1", "read_drive_document", "sir")])
+        recall = SimpleNamespace(type="tool_use", id="t2", name=RECALL_TOOL, input={"recall_id": "t1"})
+        second = MagicMock(content=[recall])
+        third = MagicMock(content=[SimpleNamespace(type="text", text="done")])
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [first, second, third]
+
+        recorder = _Recorder(delay=0)
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            result = run_dd_report_agent("Alpha Keller", "prompt", tool_executor=executor)
+
+        assert recorder.order == ["start:sir", "end:sir"]
+        messages = client.messages.create.call_args_list[2].kwargs["messages"]
+        assert messages[2]["content"][0]["content"] == messages[4]["content"][0]["content"]
+        assert result["trace"].to_dict()["context"]["recalls"] == 1
+
+
+_FILES = {
+    "sir": {"id": "f-sir", "name": "Keller SIR.pdf", "doc_type": "sir"},
+    "isp": None,
+    "building_inspection": {"id": "f-bi", "name": "Keller BI.pdf", "doc_type": "building_inspection"},
+}
+
+
+class TestSitePrefetch:
+    def test_state_from_address(self):
+        assert _state_from_address("123 Main St, Keller, TX 76248") == "TX"
+        assert _state_from_address("9 Elm Rd, Boca Raton, FL") == "FL"
+        assert _state_from_address("Keller") is None
+        assert _state_from_address(None) is None
+
+    def test_gathers_context_in_one_concurrent_batch(self, executor):
+        calls: list[tuple[str, dict]] = []
+        lock = threading.Lock()
+
+        def fake_route(tool_name: str, tool_input: dict) -> dict:
+            with lock:
+                calls.append((tool_name, tool_input))
+            time.sleep(0.05)
+            if tool_name == "get_site_comments":
+                raise RuntimeError("wrike down")
+            return {"status": "success", "tool": tool_name, **tool_input}
+
+        t0 = time.monotonic()
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", fake_route):
+            bundle = prefetch_site_context(
+                "Alpha Keller", "https://drive/x", _FILES,
+                site_address="123 Main St, Keller, TX 76248", tool_executor=executor,
+            )
+        elapsed = time.monotonic() - t0
+
+        # The side-effecting school approval skill is left to the agent
+        assert sorted(name for name, _ in calls) == [
+            "get_site_comments", "get_site_record",
+            "read_drive_document", "read_drive_document",
+        ]
+        assert elapsed < 0.15  # four 50 ms calls on three workers
+        assert bundle.data["state"] == "TX"
+        assert "documents" not in bundle.data
+        by_id = {tool_use_id: (name, result) for tool_use_id, name, _, result in bundle.tool_calls}
+        assert by_id["prefetch_2_sir"][1]["file_id"] == "f-sir"
+        assert by_id["prefetch_1_comments"][1]["status"] == "error"
+        assert [e.event_type for e in bundle.events] == ["prefetch"] * 4
+        assert bundle.events[1].error
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_agent_starts_from_bundle(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        client = mock_anthropic.return_value
+        client.messages.create.return_value = MagicMock(
+            content=[SimpleNamespace(type="text", text="done")],
+        )
+        with patch(
+            "due_diligence_reporter.report_pipeline.route_tool_call_sync",
+            lambda name, args: {"status": "success", "tool": name},
+        ):
+            bundle = prefetch_site_context("Alpha Keller", "https://drive/x", {}, tool_executor=executor)
+        assert isinstance(bundle, SiteContextBundle)
+
+        result = run_dd_report_agent(
+            "Alpha Keller", "prompt", tool_executor=executor, context_bundle=bundle,
+        )
+
+        messages = client.messages.create.call_args.kwargs["messages"]
+        opening = messages[0]["content"]
+        assert opening.startswith("Generate a DD Report for: Alpha Keller")
+        assert "<site_context>" in opening
+        # The pre-fetched calls arrive as a tool turn the context budget can compact
+        assert [b["name"] for b in messages[1]["content"]] == ["get_site_record", "get_site_comments"]
+        assert [b["type"] for b in messages[2]["content"]] == ["tool_result", "tool_result"]
+        assert json.loads(messages[2]["content"][0]["content"])["tool"] == "get_site_record"
+        events = result["trace"].events
+        assert [e.event_type for e in events[:2]] == ["prefetch", "prefetch"]
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_prefetched_documents_are_compacted_and_checkpointed(
+        self, mock_anthropic, executor, monkeypatch, tmp_path,
+    ):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("AGENT_CONTEXT_BUDGET_TOKENS", "100")
+        monkeypatch.setenv("AGENT_COMPACT_RESULT_CHARS", "100")
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [
+            MagicMock(content=[_tool_use("t1", "read_drive_document", "isp")]),
+            MagicMock(content=[SimpleNamespace(type="text", text="done")]),
+        ]
+        bundle = SiteContextBundle({"files": {}}, tool_calls=[
+            ["prefetch_0_sir", "read_drive_document", {"file_id": "f-sir"}, {"text": "s" * 2000}],
+        ])
+        store = AgentCheckpointStore(str(tmp_path))
+        checkpoint = store.open("Alpha Keller", "fp")
+
+        with (
+            patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", _Recorder(delay=0)),
+            patch.object(AgentCheckpoint, "clear"),
+        ):
+            run_dd_report_agent(
+                "Alpha Keller", "prompt", tool_executor=executor,
+                context_bundle=bundle, checkpoint=checkpoint,
+            )
+
+        messages = client.messages.create.call_args.kwargs["messages"]
+        compacted = json.loads(messages[2]["content"][0]["content"])
+        assert compacted["compacted"] is True
+        assert compacted["recall_id"] == "prefetch_0_sir"
+        assert store.open("Alpha Keller", "fp").header["prefetched"] == bundle.tool_calls
+
+
+class TestAgentCheckpointResume:
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_interrupted_run_resumes_after_last_turn(
+        self, mock_anthropic, executor, monkeypatch, tmp_path,
+    ):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [
+            MagicMock(content=[_tool_use("t1", "read_drive_document", "sir")], usage=usage),
+            RuntimeError("job killed"),
+        ]
+        store = AgentCheckpointStore(str(tmp_path))
+        recorder = _Recorder(delay=0)
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            with pytest.raises(RuntimeError):
+                run_dd_report_agent(
+                    "Alpha Keller", "prompt", tool_executor=executor,
+                    checkpoint=store.open("Alpha Keller", "fp"),
+                )
+
+            create = SimpleNamespace(
+                type="tool_use", id="t2", name="create_dd_report", input={"tag": "report"},
+            )
+            client.messages.create.side_effect = [
+                MagicMock(content=[create], usage=usage),
+                MagicMock(content=[SimpleNamespace(type="text", text="done")], usage=usage),
+            ]
+            checkpoint = store.open("Alpha Keller", "fp")
+            assert checkpoint.resumable
+            result = run_dd_report_agent(
+                "Alpha Keller", "prompt", tool_executor=executor, checkpoint=checkpoint,
+            )
+
+        # The first turn's tool call was not repeated
+        assert recorder.order == ["start:sir", "end:sir", "start:report", "end:report"]
+        messages = client.messages.create.call_args_list[2].kwargs["messages"]
+        assert messages[1]["content"][0]["name"] == "read_drive_document"
+        assert json.loads(messages[2]["content"][0]["content"])["tag"] == "sir"
+        trace = result["trace"]
+        assert trace.resumed_turns == 1
+        assert trace.llm_calls == 3
+        assert [e.tool_name for e in trace.events] == ["read_drive_document", "create_dd_report"]
+        # No report was captured (the fake result has no document), so the run
+        # ended without one and the checkpoint is gone
+        assert not checkpoint.path.exists()
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_turn_killed_after_side_effects_does_not_repeat_them(
+        self, mock_anthropic, executor, monkeypatch, tmp_path,
+    ):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+        client = mock_anthropic.return_value
+        client.messages.create.side_effect = [
+            MagicMock(content=[
+                _tool_use("t1", "read_drive_document", "sir"),
+                _tool_use("t2", "create_dd_report", "report"),
+                _tool_use("t3", "send_dd_report_email", "email"),
+            ], usage=usage),
+        ]
+        store = AgentCheckpointStore(str(tmp_path))
+        recorder = _Recorder(delay=0)
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            # The job dies after the tools ran, before the turn is recorded
+            with patch.object(
+                AgentCheckpoint, "record_turn", side_effect=RuntimeError("job killed"),
+            ), pytest.raises(RuntimeError):
+                run_dd_report_agent(
+                    "Alpha Keller", "prompt", tool_executor=executor,
+                    checkpoint=store.open("Alpha Keller", "fp"),
+                )
+            assert sorted(recorder.order) == sorted([
+                "start:sir", "end:sir", "start:report", "end:report",
+                "start:email", "end:email",
+            ])
+            recorder.order.clear()
+
+            client.messages.create.side_effect = [
+                MagicMock(content=[SimpleNamespace(type="text", text="done")], usage=usage),
+            ]
+            checkpoint = store.open("Alpha Keller", "fp")
+            assert checkpoint.resumable
+            assert set(checkpoint.effects) == {"t2", "t3"}
+            result = run_dd_report_agent(
+                "Alpha Keller", "prompt", tool_executor=executor, checkpoint=checkpoint,
+            )
+
+        # Only the read-only call is run again; the model is not re-asked for the turn
+        assert recorder.order == ["start:sir", "end:sir"]
+        assert client.messages.create.call_count == 2
+        messages = client.messages.create.call_args.kwargs["messages"]
+        assert [b["id"] for b in messages[1]["content"]] == ["t1", "t2", "t3"]
+        assert [json.loads(b["content"])["tag"] for b in messages[2]["content"]] == [
+            "sir", "report", "email",
+        ]
+        assert result["trace"].llm_calls == 2
+
+
+class _FakeStream:
+    """Stands in for ``messages.stream``: yields block-stop events with a delay between."""
+
+    def __init__(self, blocks, delay: float, usage=None, error: Exception | None = None) -> None:
+        self.blocks = blocks
+        self.delay = delay
+        self.usage = usage
+        self.error = error
+        self.ended_at: float | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for block in self.blocks:
+            time.sleep(self.delay)
+            yield SimpleNamespace(type="content_block_stop", content_block=block)
+        if self.error is not None:
+            raise self.error
+        self.ended_at = time.monotonic()
+
+    def get_final_message(self):
+        return MagicMock(content=self.blocks, usage=self.usage)
+
+
+class TestStreamingToolDispatch:
+    def test_batch_starts_calls_as_submitted(self, executor):
+        recorder = _Recorder(delay=0.1)
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", recorder):
+            batch = executor.batch()
+            batch.submit("read_drive_document", {"tag": "a"})
+            time.sleep(0.05)
+            started_before_close = list(recorder.order)
+            batch.submit("get_site_record", {"tag": "b"})
+            outcomes = batch.finish()
+
+        assert started_before_close == ["start:a"]
+        assert [o.result["tag"] for o in outcomes] == ["a", "b"]
+
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_tools_overlap_generation(self, mock_anthropic, executor, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("AGENT_STREAMING", "true")
+        first = _FakeStream([
+            _tool_use("t1", "read_drive_document", "sir"),
+            _tool_use("t2", "read_drive_document", "isp"),
+            _tool_use("t3", "create_dd_report", "report"),
+            _tool_use("t4", "get_site_record", "after"),
+        ], delay=0.1)
+        done = _FakeStream([SimpleNamespace(type="text", text="done")], delay=0)
+        client = mock_anthropic.return_value
+        client.messages.stream.side_effect = [first, done]
+
+        started: dict[str, float] = {}
+
+        def fake_route(tool_name: str, tool_input: dict) -> dict:
+            started[tool_input["tag"]] = time.monotonic()
+            return {"status": "success", "tag": tool_input["tag"]}
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", fake_route):
+            result = run_dd_report_agent("Alpha Keller", "prompt", tool_executor=executor)
+
+        client.messages.create.assert_not_called()
+        # Reads start mid-stream; the serial tool and anything after it wait
+        assert started["sir"] < first.ended_at
+        assert started["isp"] < first.ended_at
+        assert started["report"] >= first.ended_at
+        assert started["report"] <= started["after"]
+
+        # Results are still returned in the order Claude issued the calls
+        messages = client.messages.stream.call_args_list[1].kwargs["messages"]
+        tags = [json.loads(b["content"])["tag"] for b in messages[2]["content"]]
+        assert tags == ["sir", "isp", "report", "after"]
+
+        timing = result["trace"].to_dict()["iterations"][0]
+        assert timing["streamed"] is True
+        assert timing["tools_started_early"] == 2
+        assert timing["first_tool_ms"] < timing["llm_ms"] <= timing["latency_ms"]
+
+    @patch("due_diligence_reporter.rate_limit.backoff_delay", return_value=0.0)
+    @patch("due_diligence_reporter.report_pipeline.anthropic.Anthropic")
+    def test_retried_stream_never_repeats_side_effects(
+        self, mock_anthropic, _backoff, executor, monkeypatch,
+    ):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("AGENT_STREAMING", "true")
+
+        class _Overloaded(Exception):
+            status_code = 503
+            headers: dict = {}
+
+        def blocks(prefix: str) -> list:
+            return [
+                _tool_use(f"{prefix}1", "read_drive_document", "sir"),
+                _tool_use(f"{prefix}2", "apply_school_approval_skill", "skill"),
+                _tool_use(f"{prefix}3", "get_site_record", "record"),
+            ]
+
+        client = mock_anthropic.return_value
+        client.messages.stream.side_effect = [
+            _FakeStream(blocks("a"), delay=0.02, error=_Overloaded("overloaded mid-stream")),
+            _FakeStream(blocks("b"), delay=0.02),
+            _FakeStream([SimpleNamespace(type="text", text="done")], delay=0),
+        ]
+        calls: list[str] = []
+        lock = threading.Lock()
+
+        def fake_route(tool_name: str, tool_input: dict) -> dict:
+            with lock:
+                calls.append(tool_name)
+            return {"status": "success", "tag": tool_input["tag"]}
+
+        with patch("due_diligence_reporter.report_pipeline.route_tool_call_sync", fake_route):
+            result = run_dd_report_agent("Alpha Keller", "prompt", tool_executor=executor)
+
+        # Reads from the failed attempt may repeat; the publishing skill may not
+        assert calls.count("apply_school_approval_skill") == 1
+        assert calls.count("read_drive_document") == 2
+        messages = client.messages.stream.call_args_list[2].kwargs["messages"]
+        assert [b["tool_use_id"] for b in messages[2]["content"]] == ["b1", "b2", "b3"]
+        assert result["trace"].iterations[0]["tools_started_early"] == 2
@@ -0,0 +1,136 @@
+"""Tests for the persistent classifier verdict cache."""
+
+from __future__ import annotations
+
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter import classifier
+from due_diligence_reporter.verdict_cache import VerdictCache
+
+
+class TestVerdictCache:
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "v.jsonl")
+        VerdictCache(path).put("k", ["sir", 0.9])
+        assert VerdictCache(path).get("k") == ["sir", 0.9]
+
+    def test_negative_verdicts_are_hits(self, tmp_path):
+        cache = VerdictCache(str(tmp_path / "v.jsonl"))
+        cache.put("k", {})
+        assert cache.get("k") == {}
+        assert cache.hits == 1
+
+    def test_expired_entries_miss(self, tmp_path):
+        path = str(tmp_path / "v.jsonl")
+        VerdictCache(path).put("k", ["sir", 0.9])
+        header, line = (tmp_path / "v.jsonl").read_text().splitlines()
+        record = json.loads(line)
+        record["at"] = time.time() - 7200
+        (tmp_path / "v.jsonl").write_text(f"{header}\n{json.dumps(record)}\n")
+
+        assert VerdictCache(path, ttl_seconds=0).get("k") == ["sir", 0.9]
+        assert VerdictCache(path, ttl_seconds=3600).get("k") is None
+
+    def test_schema_version_mismatch_discards_file(self, tmp_path):
+        (tmp_path / "v.jsonl").write_text(json.dumps({"version": 0, "entries": {"k": {}}}))
+        assert VerdictCache(str(tmp_path / "v.jsonl")).get("k") is None
+
+    def test_put_appends_one_line(self, tmp_path):
+        path = tmp_path / "v.jsonl"
+        cache = VerdictCache(str(path))
+        for i in range(50):
+            cache.put(f"k{i}", ["sir", 0.9])
+        before = path.read_text()
+        cache.put("k50", ["isp", 0.8])
+
+        after = path.read_text()
+        assert after.startswith(before)
+        assert json.loads(after[len(before):])["key"] == "k50"
+
+    def test_torn_line_skipped_and_log_compacted(self, tmp_path):
+        path = tmp_path / "v.jsonl"
+        cache = VerdictCache(str(path))
+        for _ in range(5):
+            cache.put("k", ["sir", 0.9])
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write('{"key": "j", "verd')
+
+        reloaded = VerdictCache(str(path))
+        assert reloaded.get("k") == ["sir", 0.9]
+        assert len(path.read_text().splitlines()) == 2
+        reloaded.put("j", ["isp", 0.8])
+        assert VerdictCache(str(path)).get("j") == ["isp", 0.8]
+
+    def test_clear(self, tmp_path):
+        path = str(tmp_path / "v.jsonl")
+        cache = VerdictCache(path)
+        cache.put("k", ["sir", 0.9])
+        cache.clear()
+        assert VerdictCache(path).get("k") is None
+
+    def test_key_covers_model_prompt_and_inputs(self):
+        base = VerdictCache.key("filename", "m1", "prompt", "a.pdf", None)
+        assert base == VerdictCache.key("filename", "m1", "prompt", "a.pdf", None)
+        assert base != VerdictCache.key("filename", "m2", "prompt", "a.pdf", None)
+        assert base != VerdictCache.key("filename", "m1", "prompt v2", "a.pdf", None)
+        assert base != VerdictCache.key("filename", "m1", "prompt", "b.pdf", None)
+        assert base != VerdictCache.key("content", "m1", "prompt", "a.pdf", None)
+
+
+def _completion(payload: dict) -> SimpleNamespace:
+    message = SimpleNamespace(content=json.dumps(payload))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def openai_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    cache = VerdictCache(str(tmp_path / "v.jsonl"))
+    monkeypatch.setattr(classifier, "get_verdict_cache", lambda: cache)
+    client = MagicMock()
+    with patch("openai.OpenAI", return_value=client):
+        yield client
+
+
+class TestClassifierUsesCache:
+    def test_filename_verdict_asked_once(self, openai_client):
+        openai_client.chat.completions.create.return_value = _completion(
+            {"doc_type": "unknown", "confidence": 0.2},
+        )
+        assert classifier.classify_by_filename_llm("scan_0042.pdf", "Alpha Keller") == ("unknown", 0.2)
+        assert classifier.classify_by_filename_llm("scan_0042.pdf", "Alpha Keller") == ("unknown", 0.2)
+        assert openai_client.chat.completions.create.call_count == 1
+
+        classifier.classify_by_filename_llm("scan_0042.pdf", "Alpha Boca Raton")
+        assert openai_client.chat.completions.create.call_count == 2
+
+    def test_content_verdict_keyed_by_text(self, openai_client):
+        openai_client.chat.completions.create.return_value = _completion(
+            {"doc_type": "isp", "confidence": 0.9},
+        )
+        classifier.classify_by_content_llm("Internet availability", "a.pdf")
+        classifier.classify_by_content_llm("Internet availability", "a.pdf")
+        classifier.classify_by_content_llm("Zoning and permits", "a.pdf")
+        assert openai_client.chat.completions.create.call_count == 2
+
+    def test_site_match_keyed_by_listing_set(self, openai_client):
+        openai_client.chat.completions.create.return_value = _completion({"matches": []})
+        assert classifier.match_file_to_site_llm(["a.pdf", "b.pdf"], "Alpha Keller") == {}
+        assert classifier.match_file_to_site_llm(["b.pdf", "a.pdf"], "Alpha Keller") == {}
+        assert openai_client.chat.completions.create.call_count == 1
+
+        classifier.match_file_to_site_llm(["a.pdf", "b.pdf", "c.pdf"], "Alpha Keller")
+        assert openai_client.chat.completions.create.call_count == 2
+
+    def test_failures_are_not_cached(self, openai_client):
+        openai_client.chat.completions.create.side_effect = [
+            RuntimeError("network"),
+            _completion({"doc_type": "sir", "confidence": 0.9}),
+        ]
+        assert classifier.classify_by_filename_llm("x.pdf") == ("unknown", 0.0)
+        assert classifier.classify_by_filename_llm("x.pdf") == ("sir", 0.9)
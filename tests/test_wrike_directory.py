@@ -0,0 +1,219 @@
+"""Tests for the cached Wrike Site Record directory."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from due_diligence_reporter.wrike import (
+    WRIKE_CUSTOM_FIELDS,
+    WRIKE_SITE_RECORD_TYPE_ID,
+    SiteRecordDirectory,
+    WrikeConfig,
+    find_site_record,
+    load_wrike_config,
+    normalize_site_key,
+)
+
+
+def _record(record_id: str, title: str, address: str = "") -> dict:
+    fields = []
+    if address:
+        fields.append({"id": WRIKE_CUSTOM_FIELDS["address"], "value": address})
+    return {
+        "id": record_id,
+        "title": title,
+        "customItemTypeId": WRIKE_SITE_RECORD_TYPE_ID,
+        "customFields": fields,
+    }
+
+
+def _response(data: list[dict]) -> MagicMock:
+    resp = MagicMock()
+    resp.ok = True
+    resp.json.return_value = {"data": data}
+    return resp
+
+
+class _FakeWrike:
+    """Serves folder listings and batch fetches from an in-memory space."""
+
+    def __init__(self, records: list[dict]) -> None:
+        self.records = {r["id"]: r for r in records}
+        self.updated: set[str] = set()
+        self.calls: list[tuple[str, dict | None]] = []
+
+    def get(self, url: str, headers=None, params=None, timeout=None) -> MagicMock:
+        self.calls.append((url, params))
+        if url.endswith("/folders") and "/spaces/" in url:
+            if params and "updatedDate" in params:
+                json.loads(params["updatedDate"])  # must be valid JSON
+                ids = sorted(self.updated)
+            else:
+                ids = sorted(self.records)
+            return _response([{"id": i} for i in ids])
+        ids = url.rsplit("/", 1)[-1].split(",")
+        return _response([self.records[i] for i in ids if i in self.records])
+
+
+@pytest.fixture
+def cfg() -> WrikeConfig:
+    return WrikeConfig(access_token="t", directory_ttl_seconds=300)
+
+
+@pytest.fixture
+def fake() -> _FakeWrike:
+    return _FakeWrike([
+        _record("ID1", "Alpha Keller", "1234 Main St, Keller, TX 76248"),
+        _record("ID2", "Alpha Boca Raton", "55 Palm Way, Boca Raton, FL 33431"),
+        _record("ID3", "Alpha Austin Demo", "1 Congress Ave, Austin, TX 78701"),
+        _record("ID4", "Alpha Austin North", "9 Lamar Blvd, Austin, TX 78758"),
+    ])
+
+
+class TestNormalizeSiteKey:
+    def test_collapses_case_punctuation_and_whitespace(self):
+        assert normalize_site_key("  Alpha  Keller, ") == "alpha keller"
+
+    def test_strips_html(self):
+        assert normalize_site_key("<p>1234 Main St.</p>") == "1234 main st"
+
+
+class TestSiteRecordDirectory:
+    def test_exact_and_normalized_title_lookup(self, cfg, fake):
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            assert directory.lookup("Alpha Keller", cfg=cfg)["id"] == "ID1"
+            assert directory.lookup("alpha  boca-raton", cfg=cfg)["id"] == "ID2"
+            assert directory.lookup("Keller", cfg=cfg)["id"] == "ID1"
+
+    def test_address_and_city_lookup(self, cfg, fake):
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            assert directory.lookup("55 Palm Way, Boca Raton, FL 33431", cfg=cfg)["id"] == "ID2"
+            assert directory.lookup("Boca Raton", cfg=cfg)["id"] == "ID2"
+
+    def test_ambiguous_city_returns_none(self, cfg, fake):
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            assert directory.lookup("Austin", cfg=cfg) is None
+
+    def test_lookups_within_ttl_make_no_requests(self, cfg, fake):
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            directory.lookup("Alpha Keller", cfg=cfg)
+            calls_after_load = len(fake.calls)
+            for _ in range(5):
+                directory.lookup("Alpha Keller", cfg=cfg)
+        assert len(fake.calls) == calls_after_load
+
+    def test_incremental_refresh_fetches_only_updated_folders(self, fake):
+        cfg = WrikeConfig(access_token="t", directory_ttl_seconds=0)
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            directory.lookup("Alpha Keller", cfg=cfg)
+            fake.calls.clear()
+            fake.records["ID5"] = _record("ID5", "Alpha Southlake")
+            fake.updated = {"ID5"}
+
+            assert directory.lookup("Alpha Southlake", cfg=cfg)["id"] == "ID5"
+
+        listing_url, listing_params = fake.calls[0]
+        assert "updatedDate" in listing_params
+        assert fake.calls[1][0].endswith("/folders/ID5")
+        assert len(fake.calls) == 2
+
+    def test_deleted_record_is_removed_by_the_periodic_full_reload(self, fake):
+        cfg = WrikeConfig(access_token="t", directory_ttl_seconds=0)
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            directory.lookup("Alpha Keller", cfg=cfg)
+            del fake.records["ID1"]  # deleted or moved out: no updatedDate change
+
+            # Incremental refreshes cannot see the deletion
+            assert directory.lookup("Alpha Keller", cfg=cfg)["id"] == "ID1"
+
+            reload_due = WrikeConfig(
+                access_token="t", directory_ttl_seconds=0, directory_full_refresh_seconds=0,
+            )
+            assert directory.lookup("Alpha Keller", cfg=reload_due) is None
+            assert all(r["id"] != "ID1" for r in directory.records(cfg=cfg))
+
+    def test_lookups_answer_from_current_records_during_a_refresh(self, fake):
+        import threading
+
+        cfg = WrikeConfig(access_token="t", directory_ttl_seconds=0)
+        directory = SiteRecordDirectory()
+        listing_started = threading.Event()
+        release = threading.Event()
+
+        def slow_get(url, headers=None, params=None, timeout=None):
+            if params and "updatedDate" in params:
+                listing_started.set()
+                release.wait(5)
+            return fake.get(url, headers=headers, params=params, timeout=timeout)
+
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=slow_get):
+            directory.lookup("Alpha Keller", cfg=cfg)
+            fake.records["ID5"] = _record("ID5", "Alpha Southlake")
+            fake.updated = {"ID5"}
+            refresher = threading.Thread(target=directory.refresh, kwargs={"cfg": cfg})
+            refresher.start()
+            try:
+                assert listing_started.wait(5)
+                assert directory.lookup("Alpha Keller", cfg=cfg)["id"] == "ID1"
+                assert directory.lookup("Alpha Southlake", cfg=cfg) is None
+            finally:
+                release.set()
+                refresher.join(5)
+
+            cfg_fresh = WrikeConfig(access_token="t", directory_ttl_seconds=300)
+            assert directory.lookup("Alpha Southlake", cfg=cfg_fresh)["id"] == "ID5"
+
+    def test_record_changed_to_another_item_type_is_removed(self, fake):
+        cfg = WrikeConfig(access_token="t", directory_ttl_seconds=0)
+        directory = SiteRecordDirectory()
+        with patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get):
+            directory.lookup("Alpha Keller", cfg=cfg)
+            fake.records["ID1"] = {**fake.records["ID1"], "customItemTypeId": "OTHER"}
+            fake.updated = {"ID1"}
+
+            assert directory.lookup("Alpha Keller", cfg=cfg) is None
+
+
+class TestFindSiteRecordUsesDirectory:
+    @patch("due_diligence_reporter.wrike._match_site_with_llm")
+    def test_indexed_match_skips_llm(self, mock_llm, cfg, fake):
+        with (
+            patch("due_diligence_reporter.wrike._SITE_DIRECTORY", SiteRecordDirectory()),
+            patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get),
+        ):
+            record = find_site_record(site_name_or_id="alpha keller", cfg=cfg)
+
+        assert record["id"] == "ID1"
+        mock_llm.assert_not_called()
+
+    @patch("due_diligence_reporter.wrike._match_site_with_llm")
+    def test_unresolved_query_falls_back_to_llm(self, mock_llm, cfg, fake):
+        mock_llm.return_value = None
+        with (
+            patch("due_diligence_reporter.wrike._SITE_DIRECTORY", SiteRecordDirectory()),
+            patch("due_diligence_reporter.wrike.requests.get", side_effect=fake.get),
+        ):
+            assert find_site_record(site_name_or_id="Austin", cfg=cfg) is None
+
+        assert len(mock_llm.call_args.kwargs["site_records"]) == 4
+
+
+class TestDirectoryTtlConfig:
+    def test_ttl_read_from_env(self, monkeypatch):
+        monkeypatch.setenv("WRIKE_ACCESS_TOKEN", "t")
+        monkeypatch.setenv("WRIKE_DIRECTORY_TTL_SECONDS", "42")
+        assert load_wrike_config().directory_ttl_seconds == 42.0
+
+    def test_invalid_ttl_uses_default(self, monkeypatch):
+        monkeypatch.setenv("WRIKE_ACCESS_TOKEN", "t")
+        monkeypatch.setenv("WRIKE_DIRECTORY_TTL_SECONDS", "soon")
+        assert load_wrike_config().directory_ttl_seconds == 300.0